@@ -0,0 +1,87 @@
+"""
+Compare analytics over many movies done on dicts with the same work on MovieBatch.
+
+The baseline converts Movie objects to dicts, as the analytics jobs did, then
+computes the totals of the view and comment counters, the top N movies by
+current_view_count, the live movies and the total views per user with plain
+Python. MovieBatch is timed building from the Movie objects and from the
+decoded movie dicts, and running the same queries on its columns.
+
+Usage:
+    python -m benchmarks.bench_batch [--rows N] [--users N] [--top N] [--backend numpy|array]
+"""
+import argparse, random, time
+from typing import Any, Callable, Iterator
+
+from twitcasting.batch import MovieBatch, np
+from twitcasting.movie import Movie, _parse_movie
+
+COUNTERS = ("current_view_count", "max_view_count", "total_view_count", "comment_count", "duration")
+
+def movie_dicts(rows: int, users: int) -> Iterator[dict]:
+    """
+    Generate movie objects as found in API responses and webhook payloads.
+    """
+    rng = random.Random(0)
+    for i in range(rows):
+        current = rng.randrange(5000)
+        yield {"id": str(i), "user_id": str(rng.randrange(users)), "is_live": rng.random() < 0.1, "comment_count": rng.randrange(3000), "duration": rng.randrange(14400), "created": 1438500282 + i, "max_view_count": current + rng.randrange(100), "current_view_count": current, "total_view_count": current * 3}
+
+def legacy_analytics(movies: list[Movie], top: int) -> tuple[Any, ...]:
+    """
+    Dict-based analytics, kept as the baseline.
+    """
+    rows = [{"id": m.id, "user_id": m.user_id, "is_live": m.is_live, **{name: getattr(m, name) for name in COUNTERS}} for m in movies]
+    totals = {name: sum(row[name] for row in rows) for name in COUNTERS}
+    ranking = [row["id"] for row in sorted(rows, key=lambda row: row["current_view_count"], reverse=True)[:top]]
+    live = [row for row in rows if row["is_live"]]
+    per_user: dict[str, int] = {}
+    for row in rows:
+        per_user[row["user_id"]] = per_user.get(row["user_id"], 0) + row["total_view_count"]
+    return totals, ranking, len(live), per_user
+
+def batch_analytics(batch: MovieBatch, top: int) -> tuple[Any, ...]:
+    """
+    The same analytics on MovieBatch.
+    """
+    totals = {name: batch.aggregate(name) for name in COUNTERS}
+    ranking = list(batch.top_k("current_view_count", top).column("id"))
+    live = batch.filter(batch.where("is_live", "==", True))
+    return totals, ranking, len(live), batch.group_by_user("total_view_count")
+
+def timed(name: str, fn: Callable[[], Any], baseline: float | None = None) -> tuple[float, Any]:
+    """
+    Run fn once and print the elapsed time.
+    """
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    ratio = f" ({baseline / elapsed:.2f}x)" if baseline else ""
+    print(f"{name:34} {elapsed * 1000:9.1f} ms{ratio}")
+    return elapsed, result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--top", type=int, default=100)
+    parser.add_argument("--backend", choices=("numpy", "array"), default="numpy" if np is not None else "array")
+    args = parser.parse_args()
+    use_numpy = args.backend == "numpy"
+    print(f"{args.rows} rows, {args.users} users, backend={args.backend}")
+    dicts = list(movie_dicts(args.rows, args.users))
+    movies = [_parse_movie(movie_data) for movie_data in dicts]
+
+    baseline, expected = timed("dicts: convert + analytics", lambda: legacy_analytics(movies, args.top))
+    _, batch = timed("MovieBatch.from_movies", lambda: MovieBatch.from_movies(movies, use_numpy=use_numpy))
+    timed("MovieBatch.from_dicts", lambda: MovieBatch.from_dicts(dicts, use_numpy=use_numpy))
+    _, result = timed("MovieBatch analytics", lambda: batch_analytics(batch, args.top), baseline)
+    # 同順位の扱いが違うので上位の ID ではなく値で比べる
+    assert result[0] == expected[0] and result[2] == expected[2] and result[3] == expected[3]
+    ranked = batch.top_k("current_view_count", args.top).column("current_view_count")
+    assert list(ranked) == sorted((m.current_view_count for m in movies), reverse=True)[:args.top]
+    for name, fn in (("aggregate x5", lambda: [batch.aggregate(name) for name in COUNTERS]), ("top_k", lambda: batch.top_k("current_view_count", args.top)), ("filter is_live", lambda: batch.filter(batch.where("is_live", "==", True))), ("group_by_user sum", lambda: batch.group_by_user("total_view_count")), ("sort", lambda: batch.sort("current_view_count", descending=True))):
+        timed(f"  {name}", fn)
+
+if __name__ == "__main__":
+    main()
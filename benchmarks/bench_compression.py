@@ -0,0 +1,115 @@
+"""
+Compare transfer size, latency and peak memory of webhook list pages with and
+without gzip and incremental decoding.
+
+The baseline requests the page without Accept-Encoding, reads the whole body
+and decodes it with json.loads before building the Webhook objects, as the
+client did before. The mock server runs in a child process so that only the
+client is measured: peak memory with tracemalloc around one call, and the
+received bytes with an instrumentation hook.
+
+Usage:
+    python -m benchmarks.bench_compression [--webhooks N] [--pages 50,1000,10000] [--number N]
+"""
+import argparse, multiprocessing, time, tracemalloc
+from multiprocessing.connection import Connection
+from typing import Any, Callable
+
+from twitcasting import instrumentation, webhook
+from twitcasting.client import TwitCastingClient, build_headers, send_request
+from twitcasting.instrumentation import RequestHook, RequestInfo
+from twitcasting.mock_server import MockTwitCastingServer
+
+class ByteCounter(RequestHook):
+    """
+    Hook summing the response bytes received.
+    """
+
+    def __init__(self) -> None:
+        self.received = 0
+
+    def on_request_end(self, info: RequestInfo) -> None:
+        self.received += info.response_bytes
+
+def serve(webhooks: int, conn: Connection) -> None:
+    """
+    Run the mock server in a child process until the parent closes the pipe.
+    """
+    with MockTwitCastingServer() as server:
+        server.seed_webhooks(webhooks)
+        conn.send(server.base_url)
+        try:
+            conn.recv()
+        except EOFError:
+            pass
+
+def legacy_get_webhook_list(client: TwitCastingClient, limit: int) -> tuple[int, list[webhook.Webhook]]:
+    """
+    get_webhook_list before compression and streaming, kept as the baseline.
+    """
+    headers = build_headers("bearer", access_token="token")
+    del headers["Accept-Encoding"]
+    response_data = send_request("GET", f"https://apiv2.twitcasting.tv/webhooks?limit={limit}&offset=0", headers, client=client)
+    return webhook._parse_webhook_list_response(response_data)
+
+def measure(counter: ByteCounter, call: Callable[[], Any], number: int) -> tuple[float, float, int]:
+    """
+    Time a call and measure its transfer size and peak memory.
+
+    Returns:
+        float: Milliseconds per call.
+        float: Peak KiB allocated during one call.
+        int: Response bytes received per call.
+    """
+    call()
+    received = counter.received
+    start = time.perf_counter()
+    for _ in range(number):
+        call()
+    elapsed = (time.perf_counter() - start) / number * 1000
+    transferred = (counter.received - received) // number
+    tracemalloc.start()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024, transferred
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--webhooks", type=int, default=10000, help="users with two webhooks each")
+    parser.add_argument("--pages", default="50,1000,10000", help="comma-separated page sizes")
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=serve, args=(args.webhooks, child), daemon=True)
+    process.start()
+    base_url = parent.recv()
+    counter = ByteCounter()
+    instrumentation.add_hook(counter)
+    try:
+        with TwitCastingClient(base_url=base_url) as client:
+            print(f"{'page':>6} {'variant':10} {'ms':>9} {'peak KiB':>10} {'bytes':>10} {'first ms':>9}")
+            for limit in (int(page) for page in args.pages.split(",")):
+                variants: dict[str, Callable[[], Any]] = {
+                    "legacy": lambda: legacy_get_webhook_list(client, limit),
+                    "streamed": lambda: webhook.get_webhook_list("bearer", access_token="token", limit=limit, client=client),
+                }
+                for name, call in variants.items():
+                    elapsed, peak, transferred = measure(counter, call, args.number)
+                    if name == "streamed":
+                        # 最初の Webhook が返るまでの時間
+                        start = time.perf_counter()
+                        stream = webhook.iter_webhooks("bearer", access_token="token", page_size=limit, client=client)
+                        next(stream)
+                        first = (time.perf_counter() - start) * 1000
+                        stream.close()
+                    else:
+                        first = elapsed
+                    print(f"{limit:6d} {name:10} {elapsed:9.3f} {peak:10.1f} {transferred:10d} {first:9.3f}")
+    finally:
+        instrumentation.remove_hook(counter)
+        parent.send(None)
+        process.join()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Report the memory used per User, Movie, App and Webhook object.
+
+Each model is compared with a copy of itself that stores its attributes in a
+per-instance __dict__, as the models did before __slots__ was introduced.
+
+Usage:
+    python -m benchmarks.bench_models_memory [--count N]
+"""
+import argparse, json, os, tracemalloc
+from typing import Callable
+
+from twitcasting.movie import Movie, _parse_movie
+from twitcasting.user import User, App, _parse_user
+from twitcasting.webhook import Webhook
+
+PAYLOAD_PATH = os.path.join(os.path.dirname(__file__), "..", "test", "webhook.json")
+
+def bytes_per_object(factory: Callable[[int], object], count: int) -> float:
+    """
+    Measure the memory allocated per object, excluding shared attribute values.
+
+    Args:
+        factory (Callable[[int], object]): Builds the i-th object.
+        count (int): Number of objects.
+
+    Returns:
+        float: Bytes per object.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # リスト自体のサイズは除く
+    return (after - before) / count - 8 if objects else 0.0
+
+def with_dict(cls: type) -> type:
+    """
+    Build a variant of a model without __slots__.
+
+    Args:
+        cls (type): Model class.
+
+    Returns:
+        type: Class sharing the methods of cls but keeping attributes in __dict__.
+    """
+    namespace = {name: value for name, value in vars(cls).items() if name not in cls.__slots__ and name not in ("__slots__", "__dict__", "__weakref__")}
+    return type(f"Dict{cls.__name__}", (), namespace)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+    with open(PAYLOAD_PATH) as f:
+        payload = json.load(f)
+    movie_args = [getattr(_parse_movie(payload["movie"]), name) for name in Movie.__slots__ if not name.startswith("_")]
+    user = _parse_user(payload["broadcaster"])
+    user_args = [user.id, user.screen_id, user.name, user.image, user.profile, user.level, user.is_live, user.last_movie_id]
+    factories = {
+        "User": lambda cls: lambda i: cls(*user_args),
+        "Movie": lambda cls: lambda i: cls(*movie_args),
+        "App": lambda cls: lambda i: cls("182224938.d37f58350925d568e2db24719fe86f7a", "app", "182224938"),
+        "Webhook": lambda cls: lambda i: cls("182224938", "livestart"),
+    }
+    print(f"{'model':8} {'__dict__':>10} {'__slots__':>10}")
+    for cls in (User, Movie, App, Webhook):
+        factory = factories[cls.__name__]
+        before = bytes_per_object(factory(with_dict(cls)), args.count)
+        after = bytes_per_object(factory(cls), args.count)
+        print(f"{cls.__name__:8} {before:8.0f} B {after:8.0f} B ({1 - after / before:.0%} smaller)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Compare payloads/sec of parse_webhook_data with the previous implementation.
+
+The previous implementation decoded bytes to str first, always used the stdlib
+json module, compared the signature with != and built every field with .get().
+
+Usage:
+    python -m benchmarks.bench_parse_webhook [--number N]
+"""
+import argparse, json, os, time
+from typing import Callable, Optional
+
+from twitcasting import webhook
+from twitcasting.movie import Movie
+from twitcasting.user import User
+
+PAYLOAD_PATH = os.path.join(os.path.dirname(__file__), "..", "test", "webhook.json")
+SIGNATURE = "09c7a17f60e7448d467b09722061223b"
+
+def legacy_parse_webhook_data(data: str, signature: Optional[str] = None) -> tuple[Movie, User]:
+    """
+    parse_webhook_data before the fast path, kept as the baseline.
+    """
+    data_obj = json.loads(data)
+    if not data_obj:
+        raise ValueError("Invalid data")
+    if signature:
+        if signature != data_obj.get("signature", ""):
+            raise ValueError("Invalid signature")
+    movie_data = data_obj.get("movie", {})
+    movie = Movie(
+        id=movie_data.get("id", ""),
+        user_id=movie_data.get("user_id", ""),
+        title=movie_data.get("title", ""),
+        subtitle=movie_data.get("subtitle", None),
+        last_owner_comment=movie_data.get("last_owner_comment", None),
+        category=movie_data.get("category", None),
+        link=movie_data.get("link", ""),
+        is_live=movie_data.get("is_live", False),
+        is_recorded=movie_data.get("is_recorded", False),
+        comment_count=movie_data.get("comment_count", 0),
+        large_thumbnail=movie_data.get("large_thumbnail", ""),
+        small_thumbnail=movie_data.get("small_thumbnail", ""),
+        country=movie_data.get("country", ""),
+        duration=movie_data.get("duration", 0),
+        created=movie_data.get("created", 0),
+        is_collabo=movie_data.get("is_collabo", False),
+        is_protected=movie_data.get("is_protected", False),
+        max_view_count=movie_data.get("max_view_count", 0),
+        current_view_count=movie_data.get("current_view_count", 0),
+        total_view_count=movie_data.get("total_view_count", 0),
+        hls_url=movie_data.get("hls_url", None)
+    )
+    user_data = data_obj.get("broadcaster", {})
+    user = User(
+        id=user_data.get("id", ""),
+        screen_id=user_data.get("screen_id", ""),
+        name=user_data.get("name", ""),
+        image=user_data.get("image", ""),
+        profile=user_data.get("profile", ""),
+        level=user_data.get("level", 0),
+        last_movie_id=user_data.get("last_movie_id", None),
+        is_live=user_data.get("is_live", False)
+    )
+    return movie, user
+
+def measure(parse: Callable[[], object], number: int, repeat: int = 5) -> float:
+    """
+    Measure the throughput of a parse call, keeping the best of several runs.
+
+    Args:
+        parse (Callable[[], object]): Parse call.
+        number (int): Number of calls per run.
+        repeat (int): Number of runs. Default is 5.
+
+    Returns:
+        float: Payloads per second.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            parse()
+        best = min(best, time.perf_counter() - start)
+    return number / best
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+    with open(PAYLOAD_PATH, "rb") as f:
+        body = f.read()
+    print(f"json backend: {webhook._json_loads.__module__}")
+    before = measure(lambda: legacy_parse_webhook_data(body.decode(), SIGNATURE), args.number)
+    after_str = measure(lambda: webhook.parse_webhook_data(body.decode(), SIGNATURE), args.number)
+    after_bytes = measure(lambda: webhook.parse_webhook_data(body, SIGNATURE), args.number)
+    print(f"before (str):  {before:10.0f} payloads/s")
+    print(f"after (str):   {after_str:10.0f} payloads/s ({after_str / before:.2f}x)")
+    print(f"after (bytes): {after_bytes:10.0f} payloads/s ({after_bytes / before:.2f}x)")
+
+if __name__ == "__main__":
+    main()
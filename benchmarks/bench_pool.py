@@ -0,0 +1,49 @@
+"""
+Compare requests/sec of get_user_info with and without connection pooling.
+
+Usage:
+    python -m benchmarks.bench_pool [--requests N] [--threads N]
+"""
+import argparse, time
+from concurrent.futures import ThreadPoolExecutor
+
+from twitcasting import user
+from twitcasting.client import TwitCastingClient
+from twitcasting.mock_server import MockTwitCastingServer
+
+def run(client: TwitCastingClient, requests: int, threads: int) -> float:
+    """
+    Send requests through a client and measure the throughput.
+
+    Args:
+        client (TwitCastingClient): Client to benchmark.
+        requests (int): Number of requests.
+        threads (int): Number of worker threads.
+
+    Returns:
+        float: Requests per second.
+    """
+    def call(i: int) -> None:
+        user.get_user_info(str(i), "bearer", access_token="token", client=client)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(call, range(requests)))
+    return requests / (time.perf_counter() - start)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+    with MockTwitCastingServer() as server:
+        # pool_size=0 では毎回接続を張り直す (プール無しと同等)
+        with TwitCastingClient(pool_size=0, base_url=server.base_url) as client:
+            without_pool = run(client, args.requests, args.threads)
+        with TwitCastingClient(pool_size=args.threads, per_host_limit=args.threads, base_url=server.base_url) as client:
+            with_pool = run(client, args.requests, args.threads)
+    print(f"without pool: {without_pool:10.1f} req/s")
+    print(f"with pool:    {with_pool:10.1f} req/s ({with_pool / without_pool:.2f}x)")
+
+if __name__ == "__main__":
+    main()
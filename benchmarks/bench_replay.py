@@ -0,0 +1,65 @@
+"""
+Compare lines/sec of replaying an NDJSON webhook archive line by line with
+parse_webhook_stream in the calling process and across a process pool.
+
+The baseline reads the file with a plain for loop and calls
+parse_webhook_data on every line, as replay scripts did before.
+
+Usage:
+    python -m benchmarks.bench_replay [--lines N] [--processes 1,2,4] [--chunk-size BYTES]
+"""
+import argparse, json, os, tempfile, time
+
+from twitcasting.replay import CHUNK_SIZE, parse_webhook_stream
+from twitcasting.webhook import parse_webhook_data
+
+PAYLOAD_PATH = os.path.join(os.path.dirname(__file__), "..", "test", "webhook.json")
+SIGNATURE = "09c7a17f60e7448d467b09722061223b"
+
+def write_archive(path: str, lines: int) -> None:
+    """
+    Write an NDJSON archive of the sample payload with distinct movie IDs.
+    """
+    with open(PAYLOAD_PATH, encoding="utf-8") as f:
+        payload = json.load(f)
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(lines):
+            payload["movie"]["id"] = str(i)
+            f.write(json.dumps(payload, ensure_ascii=False, separators=(",", ":")))
+            f.write("\n")
+
+def legacy_replay(path: str) -> int:
+    """
+    Line-by-line replay, kept as the baseline.
+    """
+    count = 0
+    with open(path, "rb") as f:
+        for line in f:
+            parse_webhook_data(line, SIGNATURE)
+            count += 1
+    return count
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=200000)
+    parser.add_argument("--processes", default=",".join(str(n) for n in sorted({1, 2, os.cpu_count() or 1})), help="comma-separated pool sizes")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "webhooks.ndjson")
+        write_archive(path, args.lines)
+        print(f"{args.lines} lines, {os.path.getsize(path) / 1024 / 1024:.1f} MiB, {os.cpu_count()} CPUs")
+        start = time.perf_counter()
+        legacy_replay(path)
+        baseline = args.lines / (time.perf_counter() - start)
+        print(f"{'line by line':22} {baseline:10.0f} lines/s")
+        for processes in [0] + [int(n) for n in args.processes.split(",")]:
+            for ordered in (True, False) if processes else (True,):
+                start = time.perf_counter()
+                count = sum(len(batch) for batch in parse_webhook_stream(path, SIGNATURE, processes=processes, ordered=ordered, chunk_size=args.chunk_size))
+                rate = count / (time.perf_counter() - start)
+                name = f"stream p={processes}" + ("" if ordered else " unordered")
+                print(f"{name:22} {rate:10.0f} lines/s ({rate / baseline:.2f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Offline benchmark suite for the public API, run against MockTwitCastingServer.
+
+Every public function is called repeatedly through a pooled client; the
+throughput and the p50/p99 latency of each are printed and saved as JSON.
+Pass --compare with an earlier result file to print the change per function,
+and --metrics to run with a MetricsAggregator hook registered (compare against
+a run without it to see the instrumentation overhead).
+
+Usage:
+    python -m benchmarks.bench_suite [--iterations N] [--latency S] [--error-rate R]
+        [--error-codes 500,2000] [--profile-size N] [--webhooks N]
+        [--output results.json] [--compare baseline.json] [--only NAME ...] [--metrics]
+"""
+import argparse, asyncio, json, os, platform, statistics, time
+from typing import Any, Callable, Optional
+
+from twitcasting import instrumentation, user, webhook
+from twitcasting.aio import AsyncTwitCastingClient
+from twitcasting.client import TwitCastingClient
+from twitcasting.mock_server import MockTwitCastingServer
+from twitcasting.reconcile import sync_webhooks
+from twitcasting.session import TwitCastingSession
+
+PAYLOAD_PATH = os.path.join(os.path.dirname(__file__), "..", "test", "webhook.json")
+SIGNATURE = "09c7a17f60e7448d467b09722061223b"
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict[str, float]:
+    """
+    Summarize the latencies of one benchmark.
+
+    Args:
+        latencies (list[float]): Seconds per call.
+        errors (int): Number of calls that raised.
+        elapsed (float): Wall-clock seconds of the whole run.
+
+    Returns:
+        dict[str, float]: calls, errors, ops_per_sec, p50_ms, p99_ms and mean_ms.
+    """
+    ordered = sorted(latencies)
+    return {
+        "calls": len(ordered),
+        "errors": errors,
+        "ops_per_sec": len(ordered) / elapsed if elapsed else 0.0,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p99_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000,
+        "mean_ms": statistics.fmean(ordered) * 1000,
+    }
+
+def measure(call: Callable[[int], Any], iterations: int, warmup: int = 5) -> dict[str, float]:
+    """
+    Time a function call by call.
+
+    Args:
+        call (Callable[[int], Any]): Function called with the iteration number.
+        iterations (int): Number of timed calls.
+        warmup (int): Number of untimed calls made first. Default is 5.
+
+    Returns:
+        dict[str, float]: Summary from summarize.
+    """
+    for i in range(warmup):
+        try:
+            call(i)
+        except Exception:
+            pass
+    latencies = []
+    errors = 0
+    start = time.perf_counter()
+    for i in range(iterations):
+        t = time.perf_counter()
+        try:
+            call(i)
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - t)
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+def run_suite(server: MockTwitCastingServer, iterations: int, only: Optional[set[str]] = None) -> dict[str, dict[str, float]]:
+    """
+    Run every benchmark against a running mock server.
+
+    Args:
+        server (MockTwitCastingServer): Running server.
+        iterations (int): Number of timed calls per benchmark.
+        only (Optional[set[str]]): Names of the benchmarks to run. None runs all. Default is None.
+
+    Returns:
+        dict[str, dict[str, float]]: Summary per benchmark name.
+    """
+    with open(PAYLOAD_PATH, "rb") as f:
+        payload = f.read()
+    auth = {"authorization_mode": "bearer", "access_token": "token"}
+    results: dict[str, dict[str, float]] = {}
+    with TwitCastingClient(base_url=server.base_url) as client, TwitCastingSession("bearer", access_token="token", client=client) as session:
+        benchmarks: dict[str, Callable[[int], Any]] = {
+            "user.get_user_info": lambda i: user.get_user_info(str(i), client=client, **auth),
+            "user.get_users_info[16]": lambda i: list(user.get_users_info([str(i * 16 + j) for j in range(16)], client=client, **auth)),
+            "user.verify_credential": lambda i: user._verify_credential(client=client, **auth),
+            "webhook.get_webhook_list": lambda i: webhook.get_webhook_list(client=client, **auth),
+            "webhook.iter_webhooks": lambda i: list(webhook.iter_webhooks(parallel_pages=4, client=client, **auth)),
+            "webhook.register_webhook": lambda i: webhook.register_webhook(user_id=f"bench{i}", events=["livestart", "liveend"], client=client, **auth),
+            "webhook.delete_webhook": lambda i: webhook.delete_webhook(user_id=f"bench{i}", client=client, **auth),
+            "reconcile.sync_webhooks[dry_run]": lambda i: sync_webhooks({"182224938": ["livestart"]}, dry_run=True, client=client, **auth),
+            "session.get_user_info": lambda i: session.get_user_info(str(i)),
+            "webhook.parse_webhook_data": lambda i: webhook.parse_webhook_data(payload, SIGNATURE),
+        }
+        for name, call in benchmarks.items():
+            if only is None or name in only:
+                results[name] = measure(call, iterations)
+
+    if only is None or "aio.get_user_info" in only:
+        async def run_async() -> dict[str, float]:
+            # 同じイベントループで接続を使い回す
+            async with AsyncTwitCastingClient(base_url=server.base_url) as async_client:
+                for i in range(5):
+                    try:
+                        await async_client.get_user_info(str(i), **auth)
+                    except Exception:
+                        pass
+                latencies = []
+                errors = 0
+                start = time.perf_counter()
+                for i in range(iterations):
+                    t = time.perf_counter()
+                    try:
+                        await async_client.get_user_info(str(i), **auth)
+                    except Exception:
+                        errors += 1
+                    latencies.append(time.perf_counter() - t)
+                return summarize(latencies, errors, time.perf_counter() - start)
+
+        results["aio.get_user_info"] = asyncio.run(run_async())
+    return results
+
+def compare(results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]]) -> None:
+    """
+    Print the change of every benchmark against a baseline.
+
+    Args:
+        results (dict[str, dict[str, float]]): Current results.
+        baseline (dict[str, dict[str, float]]): Earlier results.
+    """
+    print(f"\n{'benchmark':34} {'ops/s':>9} {'p50':>9} {'p99':>9}")
+    for name, current in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        ops = current["ops_per_sec"] / before["ops_per_sec"] - 1 if before["ops_per_sec"] else 0.0
+        p50 = current["p50_ms"] / before["p50_ms"] - 1 if before["p50_ms"] else 0.0
+        p99 = current["p99_ms"] / before["p99_ms"] - 1 if before["p99_ms"] else 0.0
+        print(f"{name:34} {ops:+8.1%} {p50:+8.1%} {p99:+8.1%}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-codes", default="500", help="comma-separated API error codes to inject")
+    parser.add_argument("--profile-size", type=int, default=None, help="characters per user profile")
+    parser.add_argument("--webhooks", type=int, default=200, help="webhooks registered before the run")
+    parser.add_argument("--output", default=None, help="JSON file to write the results to")
+    parser.add_argument("--compare", default=None, help="JSON file of an earlier run")
+    parser.add_argument("--only", nargs="*", default=None, help="benchmark names to run")
+    parser.add_argument("--metrics", action="store_true", help="register a MetricsAggregator hook")
+    args = parser.parse_args()
+    error_codes = [int(code) for code in args.error_codes.split(",") if code]
+    options = {key: value for key, value in vars(args).items() if key not in ("output", "compare", "only")}
+    with MockTwitCastingServer(latency=args.latency, latency_jitter=args.latency_jitter, error_rate=args.error_rate, error_codes=error_codes, profile_size=args.profile_size, seed=0) as server:
+        server.seed_webhooks(args.webhooks)
+        metrics = instrumentation.MetricsAggregator() if args.metrics else None
+        if metrics is not None:
+            instrumentation.add_hook(metrics)
+        try:
+            results = run_suite(server, args.iterations, set(args.only) if args.only else None)
+        finally:
+            if metrics is not None:
+                instrumentation.remove_hook(metrics)
+    print(f"{'benchmark':34} {'ops/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for name, result in results.items():
+        print(f"{name:34} {result['ops_per_sec']:10.1f} {result['p50_ms']:9.3f} {result['p99_ms']:9.3f} {result['errors']:7d}")
+    if args.output:
+        try:
+            from importlib.metadata import version
+            package_version = version("twitcasting")
+        except Exception:
+            package_version = "unknown"
+        document = {
+            "version": package_version,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "options": options,
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f)["results"])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Load-test WebhookReceiver with a local generator of webhook deliveries.
+
+The handler sleeps for --handler-delay seconds to emulate slow downstream work;
+the acknowledgement throughput should not depend on it.
+
+Usage:
+    python -m benchmarks.loadtest_receiver [--requests N] [--connections N] [--handler-delay S]
+"""
+import argparse, asyncio, os, time
+
+from twitcasting.aio import read_headers
+from twitcasting.movie import Movie
+from twitcasting.receiver import WebhookReceiver
+from twitcasting.user import User
+
+PAYLOAD_PATH = os.path.join(os.path.dirname(__file__), "..", "test", "webhook.json")
+
+async def generate(port: int, payload: bytes, requests: int, latencies: list[float], statuses: dict[int, int]) -> None:
+    """
+    Send deliveries over one keep-alive connection.
+
+    Args:
+        port (int): Receiver port.
+        payload (bytes): Webhook body.
+        requests (int): Number of deliveries.
+        latencies (list[float]): Collects the acknowledgement latency of every delivery.
+        statuses (dict[int, int]): Collects the count of every status code.
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    request = f"POST / HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n".encode() + payload
+    for _ in range(requests):
+        start = time.perf_counter()
+        writer.write(request)
+        await writer.drain()
+        status_line, _ = await read_headers(reader)
+        latencies.append(time.perf_counter() - start)
+        status = int(status_line.split(" ", 2)[1])
+        statuses[status] = statuses.get(status, 0) + 1
+    writer.close()
+
+async def main(requests: int, connections: int, handler_delay: float, queue_size: int, workers: int) -> None:
+    with open(PAYLOAD_PATH, "rb") as f:
+        payload = f.read()
+
+    async def handler(movie: Movie, user: User) -> None:
+        await asyncio.sleep(handler_delay)
+
+    async with WebhookReceiver(handler, host="127.0.0.1", port=0, queue_size=queue_size, workers=workers) as receiver:
+        latencies: list[float] = []
+        statuses: dict[int, int] = {}
+        per_connection = requests // connections
+        start = time.perf_counter()
+        await asyncio.gather(*(generate(receiver.port, payload, per_connection, latencies, statuses) for _ in range(connections)))
+        elapsed = time.perf_counter() - start
+        latencies.sort()
+        print(f"deliveries:  {len(latencies)} in {elapsed:.2f}s ({len(latencies) / elapsed:.1f} req/s)")
+        print(f"ack latency: p50={latencies[len(latencies) // 2] * 1000:.2f}ms p99={latencies[int(len(latencies) * 0.99)] * 1000:.2f}ms")
+        print(f"statuses:    {statuses}")
+        print(f"receiver:    {receiver.stats()}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--connections", type=int, default=50)
+    parser.add_argument("--handler-delay", type=float, default=0.01)
+    parser.add_argument("--queue-size", type=int, default=100000)
+    parser.add_argument("--workers", type=int, default=64)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.connections, args.handler_delay, args.queue_size, args.workers))
@@ -0,0 +1,167 @@
+"""
+Simulate live detection of LiveStatusPoller against a fixed-interval loop.
+
+A population of users goes live on a virtual clock: a few active users stream
+often, most users stream rarely. Both strategies get the same request budget;
+the report shows the API calls spent and how long after the real start each
+live was detected.
+
+Usage:
+    python -m benchmarks.sim_poller [--users N] [--hours H] [--budget RPS] [--max-interval S] [--seed S]
+"""
+import argparse, random, statistics
+from typing import Optional
+
+from twitcasting.poller import LiveStatusPoller, EVENT_LIVE_START
+from twitcasting.user import User
+
+def make_sessions(users: int, duration: float, rng: random.Random) -> dict[str, list[tuple[float, float]]]:
+    """
+    Generate the live sessions of every user.
+
+    Args:
+        users (int): Number of users.
+        duration (float): Simulated seconds.
+        rng (random.Random): Random generator.
+
+    Returns:
+        dict[str, list[tuple[float, float]]]: (start, end) of the lives per user ID.
+    """
+    sessions: dict[str, list[tuple[float, float]]] = {}
+    for i in range(users):
+        # 1 割のユーザーは 2 時間に 1 回程度、残りは 2 日に 1 回程度配信する
+        mean_gap = 7200.0 if i % 10 == 0 else 172800.0
+        t = rng.expovariate(1 / mean_gap)
+        lives = []
+        while t < duration:
+            length = rng.uniform(600.0, 3600.0)
+            lives.append((t, t + length))
+            t += length + rng.expovariate(1 / mean_gap)
+        sessions[str(i)] = lives
+    return sessions
+
+class World:
+    """
+    Virtual clock and the users' live status.
+    """
+
+    def __init__(self, sessions: dict[str, list[tuple[float, float]]]) -> None:
+        """
+        Initialize the World object.
+
+        Args:
+            sessions (dict[str, list[tuple[float, float]]]): Lives per user ID.
+        """
+        self.now = 0.0
+        self.sessions = sessions
+        self.calls = 0
+
+    def fetch(self, user_id: str) -> User:
+        """
+        Answer a get_user_info call at the current virtual time.
+
+        Args:
+            user_id (str): User ID.
+
+        Returns:
+            User: User with is_live and last_movie_id of that time.
+        """
+        self.calls += 1
+        movie_id, is_live = None, False
+        for index, (start, end) in enumerate(self.sessions[user_id]):
+            if start > self.now:
+                break
+            movie_id, is_live = f"{user_id}-{index}", self.now < end
+        return User(user_id, user_id, user_id, "", "", 1, is_live, movie_id)
+
+def latencies(sessions: dict[str, list[tuple[float, float]]], detected: dict[str, float]) -> list[float]:
+    """
+    Compute the detection latency of every live started after the first poll round.
+
+    Args:
+        sessions (dict[str, list[tuple[float, float]]]): Lives per user ID.
+        detected (dict[str, float]): Detection time per movie ID.
+
+    Returns:
+        list[float]: Latencies in seconds. Missed lives count as their whole length.
+    """
+    result = []
+    for user_id, lives in sessions.items():
+        for index, (start, end) in enumerate(lives):
+            found: Optional[float] = detected.get(f"{user_id}-{index}")
+            result.append((found if found is not None else end) - start)
+    return result
+
+def run_adaptive(sessions: dict[str, list[tuple[float, float]]], duration: float, budget: float, max_interval: float) -> tuple[int, list[float]]:
+    """
+    Detect lives with LiveStatusPoller over the simulated period.
+
+    Args:
+        sessions (dict[str, list[tuple[float, float]]]): Lives per user ID.
+        duration (float): Simulated seconds.
+        budget (float): Requests per second.
+        max_interval (float): Longest polling interval of offline users.
+
+    Returns:
+        int: API calls spent.
+        list[float]: Detection latency of every live.
+    """
+    world = World(sessions)
+    poller = LiveStatusPoller(world.fetch, sessions, requests_per_second=budget, burst=2, live_interval=600.0, max_interval=max_interval, clock=lambda: world.now)
+    detected: dict[str, float] = {}
+    while world.now < duration:
+        for event in poller.poll_due():
+            if event.event == EVENT_LIVE_START or (event.user.is_live and event.user.last_movie_id not in detected):
+                detected.setdefault(event.user.last_movie_id, world.now)
+        world.now += 1.0
+    return world.calls, latencies(sessions, detected)
+
+def run_fixed(sessions: dict[str, list[tuple[float, float]]], duration: float, budget: float, max_interval: float) -> tuple[int, list[float]]:
+    """
+    Detect lives by polling every user in turn over the simulated period.
+
+    Args:
+        sessions (dict[str, list[tuple[float, float]]]): Lives per user ID.
+        duration (float): Simulated seconds.
+        budget (float): Requests per second.
+        max_interval (float): Longest polling interval of offline users.
+
+    Returns:
+        int: API calls spent.
+        list[float]: Detection latency of every live.
+    """
+    world = World(sessions)
+    user_ids = list(sessions)
+    detected: dict[str, float] = {}
+    tokens = 0.0
+    index = 0
+    while world.now < duration:
+        tokens += budget
+        while tokens >= 1:
+            tokens -= 1
+            user = world.fetch(user_ids[index % len(user_ids)])
+            index += 1
+            if user.is_live:
+                detected.setdefault(user.last_movie_id, world.now)
+        world.now += 1.0
+    return world.calls, latencies(sessions, detected)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--hours", type=float, default=12.0)
+    parser.add_argument("--budget", type=float, default=1.0, help="requests per second")
+    parser.add_argument("--max-interval", type=float, default=21600.0, help="polling interval of dormant users in seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    duration = args.hours * 3600
+    sessions = make_sessions(args.users, duration, random.Random(args.seed))
+    print(f"{args.users} users, {sum(map(len, sessions.values()))} lives, {args.hours:g} h, budget {args.budget:g} req/s")
+    print(f"{'strategy':10} {'calls':>8} {'mean':>8} {'p50':>8} {'p95':>8}")
+    for name, run in (("fixed", run_fixed), ("adaptive", run_adaptive)):
+        calls, result = run(sessions, duration, args.budget, args.max_interval)
+        p = statistics.quantiles(result, n=20)
+        print(f"{name:10} {calls:8d} {statistics.mean(result):7.0f}s {statistics.median(result):7.0f}s {p[18]:7.0f}s")
+
+if __name__ == "__main__":
+    main()
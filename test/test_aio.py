@@ -0,0 +1,42 @@
+import asyncio
+
+from twitcasting.aio import AsyncTwitCastingClient
+from twitcasting.mock_server import MockTwitCastingServer
+from twitcasting.user import User, App
+from twitcasting.webhook import Webhook
+
+def test_async_get_user_info():
+    """
+    Test the get_user_info and verify_credential coroutines.
+    """
+    async def main(base_url: str) -> None:
+        async with AsyncTwitCastingClient(base_url=base_url) as client:
+            results = await asyncio.gather(*(client.get_user_info(str(i), 'bearer', access_token='token') for i in range(20)))
+            for i, (user_obj, supporter_count, supporting_count) in enumerate(results):
+                assert isinstance(user_obj, User)
+                assert user_obj.id == str(i)
+                assert supporter_count == 10
+                assert supporting_count == 24
+            app_obj, user_obj, _, _ = await client.verify_credential('basic', client_id='id', client_secret='secret')
+            assert isinstance(app_obj, App)
+            assert isinstance(user_obj, User)
+
+    with MockTwitCastingServer() as server:
+        asyncio.run(main(server.base_url))
+
+def test_async_webhooks():
+    """
+    Test the webhook coroutines.
+    """
+    async def main(base_url: str) -> None:
+        async with AsyncTwitCastingClient(base_url=base_url) as client:
+            await client.register_webhook('bearer', '182224938', ['livestart'], access_token='token')
+            webhook_count, webhook_list = await client.get_webhook_list('bearer', access_token='token')
+            assert webhook_count == 1
+            assert webhook_list == [Webhook('182224938', 'livestart')]
+            await client.delete_webhook('bearer', '182224938', access_token='token')
+            webhook_count, _ = await client.get_webhook_list('bearer', access_token='token')
+            assert webhook_count == 0
+
+    with MockTwitCastingServer() as server:
+        asyncio.run(main(server.base_url))
@@ -0,0 +1,108 @@
+import json, os, random
+
+import pytest
+
+from twitcasting.batch import MovieBatch, UserBatch, np
+from twitcasting.movie import _parse_movie
+
+SIGNATURE = "09c7a17f60e7448d467b09722061223b"
+BACKENDS = [False] + ([True] if np is not None else [])
+
+def make_payloads(count: int) -> list[str]:
+    """
+    Build webhook payloads from the sample with varied users and counters.
+    """
+    with open(os.path.join(os.path.dirname(__file__), 'webhook.json'), encoding='utf-8') as f:
+        payload = json.load(f)
+    rng = random.Random(0)
+    payloads = []
+    for i in range(count):
+        payload['movie'].update(id=str(i), user_id=f"u{rng.randrange(7)}", is_live=rng.random() < 0.3, current_view_count=rng.randrange(50), comment_count=rng.randrange(1000))
+        payloads.append(json.dumps(payload))
+    return payloads
+
+@pytest.mark.parametrize('use_numpy', BACKENDS)
+def test_movie_batch(use_numpy: bool):
+    """
+    Test filter, sort, top-k and aggregates against plain Python on the parsed dicts.
+    """
+    payloads = make_payloads(500)
+    rows = [json.loads(payload)['movie'] for payload in payloads]
+    batch = MovieBatch.from_webhook_payloads(payloads, signature=SIGNATURE, use_numpy=use_numpy)
+    assert len(batch) == 500 and sorted(batch.users) == sorted({row['user_id'] for row in rows})
+    assert batch.row(3)['id'] == '3' and batch.row(3)['user_id'] == rows[3]['user_id'] and batch.row(3)['is_live'] is rows[3]['is_live']
+    with pytest.raises(ValueError):
+        MovieBatch.from_webhook_payloads([payloads[0].replace(SIGNATURE, 'wrong')], signature=SIGNATURE, use_numpy=use_numpy)
+
+    live = batch.filter(batch.where('is_live', '==', True))
+    assert list(live.column('id')) == [row['id'] for row in rows if row['is_live']]
+    picked = batch.filter(batch.where('user_id', 'in', {'u1', 'u3'}))
+    assert list(picked.column('user_id')) == [row['user_id'] for row in rows if row['user_id'] in ('u1', 'u3')]
+    assert list(batch.sort('current_view_count', descending=True).column('id')) == [row['id'] for row in sorted(rows, key=lambda row: row['current_view_count'], reverse=True)]
+    top = batch.top_k('comment_count', 10)
+    assert list(top.column('comment_count')) == sorted((row['comment_count'] for row in rows), reverse=True)[:10]
+    assert len(batch.top_k('comment_count', 1000)) == 500 and len(batch.top_k('comment_count', 0)) == 0
+
+    assert batch.aggregate('current_view_count') == sum(row['current_view_count'] for row in rows)
+    assert batch.aggregate('comment_count', 'max') == max(row['comment_count'] for row in rows)
+    assert batch.aggregate(None, 'count') == 500
+    expected: dict[str, list[int]] = {}
+    for row in rows:
+        expected.setdefault(row['user_id'], []).append(row['current_view_count'])
+    assert batch.group_by_user('current_view_count') == {user_id: sum(values) for user_id, values in expected.items()}
+    assert batch.group_by_user('current_view_count', 'max') == {user_id: max(values) for user_id, values in expected.items()}
+    assert batch.group_by_user(func='count') == {user_id: len(values) for user_id, values in expected.items()}
+    live_views: dict[str, list[int]] = {}
+    for row in rows:
+        if row['is_live']:
+            live_views.setdefault(row['user_id'], []).append(row['current_view_count'])
+    assert live.group_by_user('current_view_count', 'mean') == pytest.approx({user_id: sum(values) / len(values) for user_id, values in live_views.items()})
+
+    # チャンクごとのバッチを結合してもユーザーの対応は崩れない
+    joined = MovieBatch.concat([MovieBatch.from_dicts(rows[:200], use_numpy=use_numpy), MovieBatch.from_movies(map(_parse_movie, rows[200:]), use_numpy=use_numpy)])
+    assert list(joined.column('user_id')) == [row['user_id'] for row in rows]
+    assert joined.group_by_user('comment_count') == batch.group_by_user('comment_count')
+
+@pytest.mark.parametrize('use_numpy', BACKENDS)
+def test_user_batch(use_numpy: bool):
+    """
+    Test building users from responses and webhook broadcasters.
+    """
+    responses = [{'user': {'id': str(i), 'screen_id': f"s{i}", 'level': i % 30, 'is_live': i % 4 == 0, 'last_movie_id': None}, 'supporter_count': i * 3, 'supporting_count': 1} for i in range(100)]
+    batch = UserBatch.from_responses(responses, use_numpy=use_numpy)
+    assert batch.row(5) == {'id': '5', 'screen_id': 's5', 'last_movie_id': '', 'is_live': False, 'level': 5, 'supporter_count': 15, 'supporting_count': 1}
+    assert list(batch.top_k('supporter_count', 3).column('id')) == ['99', '98', '97']
+    assert batch.filter(batch.where('is_live', '==', True)).aggregate('level', 'count') == 25
+    assert batch.filter(batch.where('level', '>=', 29)).aggregate('level', 'sum') == 29 * 3
+    broadcasters = UserBatch.from_webhook_payloads(make_payloads(3), use_numpy=use_numpy)
+    assert list(broadcasters.column('screen_id')) == ['twitcasting_jp'] * 3
+
+@pytest.mark.parametrize('use_numpy', BACKENDS)
+def test_empty_movie_batch(use_numpy: bool):
+    """
+    Test that masks of an empty batch are empty sequences of bool and that grouping it gives no users.
+    """
+    batch = MovieBatch.from_dicts([], use_numpy=use_numpy)
+    for mask in (batch.where('user_id', '==', 'u1'), batch.where('user_id', 'in', {'u1'}), batch.where('user_id', '!=', 'u1'), batch.where('is_live', '==', True)):
+        if use_numpy:
+            assert isinstance(mask, np.ndarray) and mask.dtype == bool and mask.shape == (0,)
+        else:
+            assert mask == []
+        assert len(batch.filter(mask)) == 0
+    filtered = MovieBatch.from_dicts([{'id': '1', 'user_id': 'u1'}], use_numpy=use_numpy)
+    filtered = filtered.filter(filtered.where('is_live', '==', True))
+    for empty in (batch, filtered):
+        for func in ('sum', 'mean', 'max', 'min'):
+            assert empty.group_by_user('current_view_count', func) == {}
+        assert empty.group_by_user(func='count') == {}
+
+def test_batch_without_numpy(monkeypatch: pytest.MonkeyPatch):
+    """
+    Test that asking for NumPy without it installed raises ImportError and the default falls back to arrays.
+    """
+    monkeypatch.setattr('twitcasting.batch.np', None)
+    with pytest.raises(ImportError):
+        MovieBatch.from_dicts([], use_numpy=True)
+    with pytest.raises(ImportError):
+        UserBatch.from_responses([], use_numpy=True)
+    assert MovieBatch.from_dicts([{'id': '1', 'user_id': 'u1'}]).where('user_id', '==', 'u1') == [True]
@@ -0,0 +1,52 @@
+import pytest
+
+from twitcasting import user
+from twitcasting.cache import ResponseCache
+from twitcasting.client import TwitCastingClient
+from twitcasting.exceptions import TwitCastingNotFoundException
+from twitcasting.mock_server import MockTwitCastingServer
+
+def test_cached_get_user_info():
+    """
+    Test that get_user_info is served from the cache on the second call.
+    """
+    cache = ResponseCache(maxsize=2)
+    with MockTwitCastingServer() as server, TwitCastingClient(base_url=server.base_url) as client:
+        first = user.get_user_info('twitcasting_jp', 'bearer', access_token='token', client=client, cache=cache)
+        second = user.get_user_info('twitcasting_jp', 'bearer', access_token='token', client=client, cache=cache)
+        assert first == second
+        assert server.request_count == 1
+        user.get_user_info('twitcasting_jp', 'bearer', access_token='other', client=client, cache=cache)
+        assert server.request_count == 2
+        user.get_user_info('182224938', 'bearer', access_token='token', client=client, cache=cache)
+    assert cache.stats() == {"hits": 1, "misses": 3, "evictions": 1, "size": 2}
+
+def test_ttl_and_negative_cache():
+    """
+    Test TTL expiry and negative caching.
+    """
+    now = [0.0]
+    cache = ResponseCache(ttls={"users": 10.0}, negative_ttl=5.0, clock=lambda: now[0])
+    calls = []
+
+    def fetch():
+        calls.append(now[0])
+        return len(calls)
+
+    def missing():
+        calls.append(now[0])
+        raise TwitCastingNotFoundException("Error 404")
+
+    assert cache.get_or_fetch("users", "a", "token", fetch) == 1
+    now[0] = 9.0
+    assert cache.get_or_fetch("users", "a", "token", fetch) == 1
+    now[0] = 10.0
+    assert cache.get_or_fetch("users", "a", "token", fetch) == 2
+    for _ in range(2):
+        with pytest.raises(TwitCastingNotFoundException):
+            cache.get_or_fetch("users", "b", "token", missing)
+    assert len(calls) == 3
+    now[0] = 16.0
+    with pytest.raises(TwitCastingNotFoundException):
+        cache.get_or_fetch("users", "b", "token", missing)
+    assert len(calls) == 4
@@ -0,0 +1,54 @@
+from twitcasting import user, webhook
+from twitcasting.client import TwitCastingClient
+from twitcasting.mock_server import MockTwitCastingServer
+from twitcasting.user import User
+
+def test_pooled_get_user_info():
+    """
+    Test that get_user_info reuses pooled connections.
+    """
+    with MockTwitCastingServer() as server, TwitCastingClient(pool_size=2, base_url=server.base_url) as client:
+        for _ in range(3):
+            user_obj, supporter_count, supporting_count = user.get_user_info(user_id='twitcasting_jp', authorization_mode='bearer', access_token='token', client=client)
+            assert isinstance(user_obj, User)
+            assert user_obj.id == 'twitcasting_jp'
+            assert supporter_count == 10
+            assert supporting_count == 24
+        assert client._idle_count == 1
+
+def test_pooled_webhooks():
+    """
+    Test the webhook functions through a pooled client.
+    """
+    with MockTwitCastingServer() as server, TwitCastingClient(base_url=server.base_url) as client:
+        webhook.register_webhook(authorization_mode='bearer', user_id='182224938', events=['livestart', 'liveend'], access_token='token', client=client)
+        webhook_count, webhook_list = webhook.get_webhook_list(authorization_mode='bearer', access_token='token', client=client)
+        assert webhook_count == 2
+        assert webhook.Webhook('182224938', 'livestart') in webhook_list
+        webhook.delete_webhook(authorization_mode='bearer', user_id='182224938', access_token='token', client=client)
+        webhook_count, webhook_list = webhook.get_webhook_list(authorization_mode='bearer', access_token='token', client=client)
+        assert webhook_count == 0
+
+def test_compressed_streaming():
+    """
+    Test gzip negotiation and that the webhook pages are streamed through the pool.
+    """
+    with MockTwitCastingServer() as server, TwitCastingClient(base_url=server.base_url) as client:
+        server.seed_webhooks(300)
+        webhook_count, webhook_list = webhook.get_webhook_list(authorization_mode='bearer', access_token='token', limit=1000, client=client)
+        assert webhook_count == 600 and len(webhook_list) == 600
+        compressed = server.bytes_sent
+        assert [w.user_id for w in webhook.iter_webhooks(authorization_mode='bearer', access_token='token', page_size=50, parallel_pages=2, client=client)] == [w.user_id for w in webhook_list]
+        # 途中で読むのをやめても次のリクエストは送れる
+        stream = webhook.iter_webhooks(authorization_mode='bearer', access_token='token', page_size=50, client=client)
+        next(stream)
+        stream.close()
+        assert user.get_user_info('1', authorization_mode='bearer', access_token='token', client=client)[0].id == '1'
+    with MockTwitCastingServer(compression=False) as server, TwitCastingClient(base_url=server.base_url) as client:
+        server.seed_webhooks(300)
+        assert webhook.get_webhook_list(authorization_mode='bearer', access_token='token', limit=1000, client=client) == (webhook_count, webhook_list)
+        assert server.bytes_sent > compressed * 5
+    with MockTwitCastingServer() as server, TwitCastingClient(base_url=server.base_url, pool_size=0) as client:
+        server.seed_webhooks(10)
+        # 接続を使い回さない場合も同じように展開する
+        assert webhook.get_webhook_list(authorization_mode='bearer', access_token='token', client=client)[0] == 20
@@ -0,0 +1,85 @@
+import asyncio
+
+from twitcasting.aio import AsyncTwitCastingClient
+from twitcasting.client import TwitCastingClient
+from twitcasting.comment import get_comments
+from twitcasting.commentstream import CommentStream, async_comment_fetcher, comment_fetcher
+from twitcasting.mock_server import MockTwitCastingServer
+
+AUTH = {'authorization_mode': 'bearer', 'access_token': 'token'}
+
+def test_get_comments():
+    """
+    Test the comments endpoint with offset and slice_id.
+    """
+    with MockTwitCastingServer() as server, TwitCastingClient(base_url=server.base_url) as client:
+        ids = server.seed_comments('189037369', 30)
+        all_count, comments = get_comments('189037369', client=client, **AUTH)
+        assert all_count == 30 and [c.id for c in comments] == ids[::-1][:10]
+        assert comments[0].movie_id == '189037369' and comments[0].from_user.id == '2880417757'
+        _, comments = get_comments('189037369', slice_id=ids[24], limit=50, client=client, **AUTH)
+        assert [c.id for c in comments] == ids[::-1][:5]
+
+def test_comment_stream():
+    """
+    Test cursor polling, draining of full pages, adaptive intervals and the ring buffer.
+    """
+    now = [0.0]
+    with MockTwitCastingServer() as server, TwitCastingClient(base_url=server.base_url) as client:
+        first = server.seed_comments('1', 5)
+        stream = CommentStream(comment_fetcher(client=client, **AUTH), ['missing', '1', '2'], min_interval=2.0, max_interval=60.0, buffer_size=100, clock=lambda: now[0])
+        # 404 になった配信は追わない
+        server.fail_next(404)
+        assert [c.id for c in stream.poll_due()] == first
+        assert server.request_count == 3 and 'missing' not in stream
+
+        # 2 回目以降は新しいコメントだけを取得する
+        now[0] = 2.0
+        second = server.seed_comments('1', 3)
+        assert [c.id for c in stream.poll_due()] == second
+        assert stream.cursor('1') == second[-1]
+
+        # 1 ページに収まらない分はすぐに続きを取得する
+        now[0] = 20.0
+        burst = server.seed_comments('1', 120)
+        sent = server.request_count
+        assert [c.id for c in stream.poll_due()] == burst
+        # 配信 1 の 3 ページと配信 2 の 1 回
+        assert server.request_count - sent == 4
+        assert [c.id for c in stream.recent('1')] == burst[-100:]
+
+        # コメントの多い配信は短く、ない配信は長い間隔で確認する
+        for t in range(21, 136):
+            now[0] = float(t)
+            last = server.seed_comments('1', 5)
+            stream.poll_due()
+        assert stream._states['1'].interval < 2.1
+        assert stream._states['2'].interval > 30.0
+        now[0] = 140.0
+        stream.poll_due()
+        assert stream.cursor('1') == last[-1]
+        assert stream.stats()['errors'] == 1 and stream.stats()['comments'] == 128 + 5 * 115
+        assert stream.recent('2') == []
+
+def test_comment_stream_async():
+    """
+    Test the async iterator with a coroutine fetch function.
+    """
+    async def run() -> list[str]:
+        with MockTwitCastingServer() as server:
+            ids = server.seed_comments('1', 60)
+            async with AsyncTwitCastingClient(base_url=server.base_url) as client:
+                stream = CommentStream(async_comment_fetcher(client, **AUTH), ['2'], min_interval=0.05, max_interval=0.1)
+                stream.add('1', cursor=ids[4])
+                stop = asyncio.Event()
+                received = []
+                async for comment in stream.run_async(stop):
+                    received.append(comment.id)
+                    if len(received) == 55:
+                        server.seed_comments('1', 2)
+                    if len(received) == 57:
+                        stop.set()
+                assert received[:55] == ids[5:]
+                return received
+
+    assert len(asyncio.run(run())) == 57
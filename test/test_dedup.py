@@ -0,0 +1,47 @@
+import os, tempfile
+
+import pytest
+
+from twitcasting.dedup import DedupBackend, WebhookDeduplicator, LRUDedupBackend, BloomDedupBackend, SQLiteDedupBackend, webhook_event_key
+from twitcasting.webhook import parse_webhook_data
+
+def test_webhook_deduplicator():
+    """
+    Test that repeated deliveries are suppressed within the window and accepted after it.
+    """
+    test_data_path = os.path.join(os.path.dirname(__file__), 'webhook.json')
+    with open(test_data_path, 'rb') as f:
+        movie, user = parse_webhook_data(f.read())
+    assert webhook_event_key(movie) == f"{movie.id}:{'livestart' if movie.is_live else 'liveend'}"
+
+    with tempfile.TemporaryDirectory() as directory:
+        backends = [LRUDedupBackend(window=10.0), BloomDedupBackend(window=10.0, capacity=100), SQLiteDedupBackend(os.path.join(directory, "dedup.sqlite3"), window=10.0)]
+        for backend in backends:
+            now = [1000.0]
+            deduplicator = WebhookDeduplicator(backend, clock=lambda: now[0])
+            assert list(deduplicator.filter([(movie, user), (movie, user)])) == [(movie, user)]
+            assert deduplicator.stats() == {"passed": 1, "suppressed": 1}
+            now[0] += 25.0
+            assert not deduplicator.is_duplicate(movie)
+            assert deduplicator.is_duplicate(movie)
+        # 同じファイルを使う別インスタンス（別プロセス相当）とも状態を共有する
+        shared = WebhookDeduplicator(SQLiteDedupBackend(os.path.join(directory, "dedup.sqlite3"), window=10.0), clock=lambda: 1025.0)
+        assert shared.is_duplicate(movie)
+        for backend in backends[2:]:
+            backend.close()
+        shared.backend.close()
+
+    lru = LRUDedupBackend(window=10.0, maxsize=2)
+    for key in ("a", "b", "c"):
+        assert not lru.check_and_add(key, 0.0)
+    assert not lru.check_and_add("a", 0.0)
+
+def test_dedup_backend_is_abstract():
+    """
+    Test that a backend without check_and_add cannot be instantiated.
+    """
+    class IncompleteBackend(DedupBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteBackend()
@@ -0,0 +1,49 @@
+import os, pickle, subprocess, sys
+
+from twitcasting.delta import UserSnapshotTable
+from twitcasting.movie import _parse_movie
+from twitcasting.user import User, _parse_user
+from twitcasting.webhook import parse_webhook_data
+
+def load_payload() -> bytes:
+    """
+    Read the sample webhook payload.
+    """
+    with open(os.path.join(os.path.dirname(__file__), 'webhook.json'), 'rb') as f:
+        return f.read()
+
+def test_fingerprint_and_diff():
+    """
+    Test that fingerprints are stable across copies and processes and that diff reports only changed fields.
+    """
+    movie, user = parse_webhook_data(load_payload())
+    same_movie, same_user = parse_webhook_data(load_payload())
+    assert user.fingerprint == same_user.fingerprint == pickle.loads(pickle.dumps(user)).fingerprint
+    assert movie.fingerprint == same_movie.fingerprint and user.diff(same_user) == {} and movie.diff(same_movie) == {}
+    # hash() と違いプロセスをまたいでも同じ値になる
+    code = "import sys; from twitcasting.webhook import parse_webhook_data; print(parse_webhook_data(open(sys.argv[1], 'rb').read())[1].fingerprint)"
+    output = subprocess.run([sys.executable, '-c', code, os.path.join(os.path.dirname(__file__), 'webhook.json')], capture_output=True, text=True, check=True, env={**os.environ, 'PYTHONHASHSEED': '123'}).stdout
+    assert int(output) == user.fingerprint
+
+    changed = _parse_user({'id': user.id, 'screen_id': user.screen_id, 'name': 'renamed', 'image': user.image, 'profile': user.profile, 'level': 25, 'is_live': user.is_live, 'last_movie_id': user.last_movie_id})
+    assert changed.fingerprint != user.fingerprint and changed != user
+    assert user.diff(changed) == {'name': (user.name, 'renamed'), 'level': (24, 25)}
+    live = _parse_movie({'id': movie.id, 'user_id': movie.user_id, 'is_live': True, 'current_view_count': 5})
+    assert set(movie.diff(live)) >= {'is_live', 'current_view_count', 'title'}
+
+def test_user_snapshot_table():
+    """
+    Test that only new and changed users are returned as deltas.
+    """
+    users = [User(str(i), f"s{i}", f"name{i}", "", "", i, False, None) for i in range(5)]
+    table = UserSnapshotTable(users[:3])
+    fresh = [User(str(i), f"s{i}", f"name{i}", "", "", i, i == 1, "10" if i == 1 else None) for i in range(5)]
+    deltas = table.ingest(fresh)
+    assert [(delta.user_id, delta.is_new) for delta in deltas] == [('1', False), ('3', True), ('4', True)]
+    assert deltas[0].changes == {'is_live': (False, True), 'last_movie_id': (None, '10')}
+    assert deltas[0].updates() == {'is_live': True, 'last_movie_id': '10'}
+    assert deltas[1].changes['id'] == (None, '3') and deltas[1].user is fresh[3]
+    assert table.ingest(User(u.id, u.screen_id, u.name, u.image, u.profile, u.level, u.is_live, u.last_movie_id) for u in fresh) == []
+    assert table.get('1').is_live and len(table) == 5 and '4' in table
+    assert table.remove('4') is not None and table.ingest([fresh[4]])[0].is_new
+    assert table.stats() == {'ingested': 11, 'changed': 1, 'added': 3, 'unchanged': 7, 'stored': 5}
@@ -0,0 +1,139 @@
+import asyncio, copy, os, threading
+
+import pytest
+
+from twitcasting.dispatch import POLICY_DROP, WebhookDispatcher
+from twitcasting.movie import Movie
+from twitcasting.poller import EVENT_LIVE_END, EVENT_LIVE_START
+from twitcasting.user import User
+from twitcasting.webhook import parse_webhook_data
+
+def load_events(count: int, users: list[str]) -> list[tuple[Movie, User]]:
+    """
+    Build deliveries from the sample payload, cycling through the users.
+    """
+    with open(os.path.join(os.path.dirname(__file__), 'webhook.json'), 'rb') as f:
+        movie, user = parse_webhook_data(f.read())
+    events = []
+    for i in range(count):
+        m = copy.copy(movie)
+        m.id = str(i)
+        m.user_id = users[i % len(users)]
+        m.is_live = i % 2 == 0
+        events.append((m, user))
+    return events
+
+def test_dispatch_order_and_routing():
+    """
+    Test routing by event and user, per-user ordering and parallelism across users.
+    """
+    events = load_events(40, ['a', 'b', 'c', 'd'])
+    received: dict[str, list[str]] = {}
+    active = [0, 0]
+    starts: list[str] = []
+
+    async def slow(movie: Movie, user: User) -> None:
+        active[0] += 1
+        active[1] = max(active[1], active[0])
+        await asyncio.sleep(0.001 * (int(movie.id) % 3))
+        received.setdefault(movie.user_id, []).append(movie.id)
+        active[0] -= 1
+
+    async def main() -> WebhookDispatcher:
+        async with WebhookDispatcher(workers=4) as dispatcher:
+            dispatcher.subscribe(slow)
+            dispatcher.subscribe(lambda movie, user: starts.append(movie.id), events=[EVENT_LIVE_START], user_ids=['a', 'b'])
+            dispatcher.subscribe(lambda movie, user: None, events=[EVENT_LIVE_END], user_ids=['a'])
+            for movie, user in events:
+                await dispatcher.dispatch(movie, user)
+        return dispatcher
+
+    dispatcher = asyncio.run(main())
+    for user_id, ids in received.items():
+        assert ids == [m.id for m, _ in events if m.user_id == user_id]
+    assert active[1] > 1
+    # a の配信はすべて livestart、b はすべて liveend
+    assert starts == [m.id for m, _ in events if m.user_id == 'a']
+    assert dispatcher.stats()['dispatched'] == 40 and dispatcher.stats()['processed'] == 40 + 10 + 0
+    assert dispatcher.stats()['unrouted'] == 0 and dispatcher.stats()['queued'] == 0
+
+def test_dispatch_backpressure():
+    """
+    Test that a full drop subscriber discards events and a full block subscriber
+    makes the producer wait with bounded memory, while the other subscribers
+    keep receiving events.
+    """
+    events = load_events(6, ['a'])
+
+    async def main() -> None:
+        release = asyncio.Event()
+        fast: list[str] = []
+        slow: list[str] = []
+
+        async def stuck(movie: Movie, user: User) -> None:
+            await release.wait()
+            slow.append(movie.id)
+
+        async with WebhookDispatcher(workers=2) as dispatcher:
+            dropping = dispatcher.subscribe(stuck, queue_size=2, policy=POLICY_DROP)
+            dispatcher.subscribe(lambda movie, user: fast.append(movie.id))
+            for movie, user in events:
+                await dispatcher.dispatch(movie, user)
+            while len(fast) < 6:
+                await asyncio.sleep(0.001)
+            assert dropping.stats()['dropped'] == 4 and dropping.stats()['queued'] == 2
+            release.set()
+        assert slow == ['0', '1']
+
+        release.clear()
+        slow.clear()
+        fast.clear()
+        many = load_events(1000, ['a', 'b'])
+        async with WebhookDispatcher() as dispatcher:
+            blocking = dispatcher.subscribe(stuck, queue_size=1, concurrency=1)
+            dispatcher.subscribe(lambda movie, user: fast.append(movie.id))
+
+            async def produce() -> list[int]:
+                return [await dispatcher.dispatch(movie, user) for movie, user in many]
+
+            producer = asyncio.create_task(produce())
+            while len(fast) < 2:
+                await asyncio.sleep(0.001)
+            await asyncio.sleep(0.05)
+            # 詰まった購読者の分だけ生産側が待たされ、溜まるのはキューと待っている 1 件だけ
+            assert not producer.done() and dispatcher.stats()['dispatched'] == 2
+            assert blocking.stats()['queued'] == 1 and blocking.stats()['waiting'] == 1
+            # 他の購読者には待っている配信も渡っている
+            assert fast == ['0', '1']
+            release.set()
+            assert await asyncio.wait_for(producer, 5.0) == [2] * 1000
+        assert slow == fast == [movie.id for movie, _ in many]
+        assert blocking.stats()['processed'] == 1000 and blocking.stats()['dropped'] == 0 and blocking.stats()['waiting'] == 0
+
+    asyncio.run(main())
+
+def test_dispatch_threadsafe():
+    """
+    Test dispatching from another thread to a plain function handler.
+    """
+    events = load_events(20, ['a', 'b'])
+    received: list[str] = []
+    lock = threading.Lock()
+
+    def handler(movie: Movie, user: User) -> None:
+        with lock:
+            received.append(movie.id)
+
+    async def main() -> None:
+        dispatcher = WebhookDispatcher(workers=2)
+        dispatcher.subscribe(handler, user_ids=['a'])
+        with pytest.raises(RuntimeError):
+            await dispatcher.dispatch(*events[0])
+        async with dispatcher:
+            loop = asyncio.get_running_loop()
+            futures = await loop.run_in_executor(None, lambda: [dispatcher.dispatch_threadsafe(movie, user) for movie, user in events])
+            assert [await asyncio.wrap_future(future) for future in futures] == [1, 0] * 10
+        assert dispatcher.stats()['unrouted'] == 10
+
+    asyncio.run(main())
+    assert received == [str(i) for i in range(0, 20, 2)]
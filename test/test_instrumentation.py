@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from twitcasting import instrumentation
+from twitcasting.aio import AsyncTwitCastingClient
+from twitcasting.client import TwitCastingClient
+from twitcasting.instrumentation import MetricsAggregator, RequestHook, RequestInfo
+from twitcasting.mock_server import MockTwitCastingServer
+from twitcasting.user import get_user_info
+
+class _Recorder(RequestHook):
+    def __init__(self) -> None:
+        self.started: list[RequestInfo] = []
+        self.ended: list[RequestInfo] = []
+
+    def on_request_start(self, info: RequestInfo) -> None:
+        assert instrumentation.current_request() is None
+        self.started.append(info)
+
+    def on_request_end(self, info: RequestInfo) -> None:
+        self.ended.append(info)
+
+def test_request_hooks():
+    """
+    Test that hooks see timings, sizes and error codes of sync and async requests, and that the metrics render.
+    """
+    recorder = _Recorder()
+    metrics = MetricsAggregator()
+    instrumentation.add_hook(recorder)
+    instrumentation.add_hook(metrics)
+    try:
+        with MockTwitCastingServer() as server, TwitCastingClient(base_url=server.base_url) as client:
+            get_user_info('1', 'bearer', access_token='token', client=client)
+            get_user_info('2', 'bearer', access_token='token', client=client)
+            server.fail_next(2000)
+            with pytest.raises(Exception):
+                get_user_info('3', 'bearer', access_token='token', client=client)
+
+            async def run() -> None:
+                async with AsyncTwitCastingClient(base_url=server.base_url) as async_client:
+                    await async_client.get_user_info('4', 'bearer', access_token='token')
+
+            asyncio.run(run())
+    finally:
+        instrumentation.remove_hook(recorder)
+        instrumentation.remove_hook(metrics)
+    assert not instrumentation.hooks_enabled()
+
+    assert len(recorder.started) == len(recorder.ended) == 4
+    first, second, failed, async_info = recorder.ended
+    assert (first.method, first.endpoint, first.status) == ('GET', 'users', 200)
+    assert first.reused is False and first.connect is not None and first.dns is not None
+    # 2回目はプールの接続を使い回すので接続時間は測られない
+    assert second.reused is True and second.connect is None
+    assert first.ttfb <= first.total and first.response_bytes > 0
+    assert (failed.status, failed.error_code) == (403, 2000) and failed.error is not None
+    assert async_info.status == 200 and async_info.connect is not None
+
+    snapshot = metrics.snapshot()
+    assert snapshot['requests'][('GET', 'users', '200')] == 3
+    assert snapshot['in_flight'] == 0
+    text = metrics.render()
+    assert 'twitcasting_requests_total{method="GET",endpoint="users",status="403"} 1' in text
+    assert 'twitcasting_request_errors_total{endpoint="users",code="2000",name="Execution Count Limitation"} 1' in text
+    assert 'twitcasting_request_duration_seconds_bucket{phase="total",method="GET",endpoint="users",le="+Inf"} 4' in text
+    metrics.reset()
+    assert metrics.snapshot()['requests'] == {}
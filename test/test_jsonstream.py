@@ -0,0 +1,33 @@
+import json, random
+
+import pytest
+
+from twitcasting.jsonstream import JSONArrayDecoder
+
+def test_json_array_decoder():
+    """
+    Test that array elements are returned as soon as they are complete, whatever the chunk boundaries.
+    """
+    document = {'all_count': 12345, 'webhooks': [{'user_id': str(i), 'event': 'livestart', 'note': 'ツイ"キャス'} for i in range(100)], 'total': 7}
+    body = json.dumps(document, ensure_ascii=False).encode()
+    rng = random.Random(0)
+    for _ in range(50):
+        decoder = JSONArrayDecoder('webhooks')
+        items = []
+        position = 0
+        while position < len(body):
+            size = rng.randint(1, 32)
+            items += decoder.feed(body[position:position + size])
+            position += size
+            if decoder.array_started:
+                assert decoder.fields['all_count'] == 12345
+        rest, fields = decoder.close()
+        assert items + rest == document['webhooks']
+        assert fields == {'all_count': 12345, 'total': 7}
+
+    decoder = JSONArrayDecoder('webhooks')
+    assert decoder.feed(b'{"webhooks": [1, 2, 3') == [1, 2]
+    with pytest.raises(ValueError):
+        decoder.close()
+    with pytest.raises(ValueError):
+        JSONArrayDecoder('webhooks').feed(b'[1, 2]')
@@ -0,0 +1,30 @@
+import time
+
+import pytest
+
+from twitcasting import user, webhook
+from twitcasting.client import TwitCastingClient
+from twitcasting.mock_server import MockTwitCastingServer
+
+def test_mock_server_injection():
+    """
+    Test the latency, error injection and payload size options of the mock server.
+    """
+    with MockTwitCastingServer(latency=0.05, profile_size=3000) as server, TwitCastingClient(base_url=server.base_url) as client:
+        start = time.perf_counter()
+        user_obj, _, _ = user.get_user_info('182224938', 'bearer', access_token='token', client=client)
+        assert time.perf_counter() - start >= 0.05
+        assert len(user_obj.profile) == 3000
+        server.fail_next(500)
+        server.fail_next(2000)
+        for _ in range(2):
+            with pytest.raises(Exception):
+                user.get_user_info('182224938', 'bearer', access_token='token', client=client)
+        assert server.error_count == 2
+        server.seed_webhooks(30)
+        assert webhook.get_webhook_list('bearer', access_token='token', limit=10, client=client)[0] == 60
+    with pytest.raises(ValueError):
+        MockTwitCastingServer(error_codes=(9999,))
+    with MockTwitCastingServer(error_rate=1.0, error_codes=(2000,)) as server, TwitCastingClient(base_url=server.base_url) as client:
+        with pytest.raises(Exception):
+            user.get_user_info('182224938', 'bearer', access_token='token', client=client)
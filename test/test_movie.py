@@ -0,0 +1,63 @@
+import asyncio, itertools
+
+import pytest
+
+from twitcasting import movie
+from twitcasting.aio import AsyncTwitCastingClient
+from twitcasting.client import TwitCastingClient
+from twitcasting.exceptions import TwitCastingNotFoundException
+from twitcasting.mock_server import MockTwitCastingServer
+from twitcasting.session import TwitCastingSession
+
+AUTH = {'authorization_mode': 'bearer', 'access_token': 'token'}
+
+def test_get_movie_info():
+    """
+    Test get_movie_info against the mock server.
+    """
+    with MockTwitCastingServer() as server, TwitCastingClient(base_url=server.base_url) as client:
+        movie_id = server.seed_movies('182224938', 1)[0]
+        movie_obj, broadcaster, tags = movie.get_movie_info(movie_id, client=client, **AUTH)
+        assert isinstance(movie_obj, movie.Movie)
+        assert (movie_obj.id, movie_obj.user_id, broadcaster.id, tags) == (movie_id, '182224938', '182224938', ['人気'])
+        with pytest.raises(TwitCastingNotFoundException):
+            movie.get_movie_info('1', client=client, **AUTH)
+
+def test_iter_movies_by_user():
+    """
+    Test that the movie history is paged lazily with slice_id and stops at a known movie.
+    """
+    with MockTwitCastingServer() as server, TwitCastingClient(base_url=server.base_url) as client:
+        old_ids = server.seed_movies('182224938', 120)
+        assert [m.id for m in movie.iter_movies_by_user('182224938', page_size=50, client=client, **AUTH)] == old_ids
+        assert server.request_count == 3
+
+        # 取り出した分のページしか取得しない
+        sent = server.request_count
+        assert len(list(itertools.islice(movie.iter_movies_by_user('182224938', page_size=10, client=client, **AUTH), 15))) == 15
+        assert server.request_count == sent + 2
+
+        # 差分同期: 既知の ID に達したら止まる
+        new_ids = server.seed_movies('182224938', 7)
+        sent = server.request_count
+        with TwitCastingSession(client=client, **AUTH) as session:
+            assert [m.id for m in session.iter_movies_by_user('182224938', known_ids=set(old_ids), page_size=5)] == new_ids
+        assert server.request_count == sent + 2
+        assert list(movie.iter_movies_by_user('0', client=client, **AUTH)) == []
+        with pytest.raises(ValueError):
+            movie.iter_movies_by_user('182224938', page_size=51, **AUTH)
+
+def test_movies_async():
+    """
+    Test the movie endpoints of the async client.
+    """
+    async def run() -> None:
+        with MockTwitCastingServer() as server:
+            ids = server.seed_movies('182224938', 12)
+            async with AsyncTwitCastingClient(base_url=server.base_url) as client:
+                movie_obj, _, _ = await client.get_movie_info(ids[0], **AUTH)
+                assert movie_obj.id == ids[0]
+                assert [m.id async for m in client.iter_movies_by_user('182224938', page_size=5, **AUTH)] == ids
+                assert [m.id async for m in client.iter_movies_by_user('182224938', known_ids={ids[3]}, page_size=5, **AUTH)] == ids[:3]
+
+    asyncio.run(run())
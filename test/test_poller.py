@@ -0,0 +1,42 @@
+from twitcasting.poller import LiveStatusPoller, EVENT_LIVE_START, EVENT_LIVE_END, EVENT_NEW_MOVIE
+from twitcasting.user import User
+
+def test_live_status_poller():
+    """
+    Test that only transitions are emitted, active users are polled more often and the budget is kept.
+    """
+    now = [0.0]
+    live: dict[str, tuple[bool, str]] = {"1": (False, "100"), "2": (False, "200")}
+
+    def fetch(user_id: str) -> User:
+        is_live, movie_id = live[user_id]
+        return User(user_id, f"user{user_id}", "name", "", "", 1, is_live, movie_id)
+
+    def advance(until: int) -> list:
+        events = []
+        while now[0] < until:
+            now[0] += 1.0
+            events.extend(poller.poll_due())
+        return events
+
+    poller = LiveStatusPoller(fetch, ["1", "2"], requests_per_second=0.1, burst=1, live_interval=10.0, min_interval=10.0, max_interval=1000.0, clock=lambda: now[0])
+    assert poller.poll_due() == []
+    assert advance(1000) == []
+    # 予算 (0.1 req/s) を超えて送らない
+    assert poller.call_count <= 1 + 1000 * 0.1
+
+    live["1"] = (True, "101")
+    events = advance(1100)
+    assert [(e.event, e.user.id, e.user.last_movie_id) for e in events] == [(EVENT_LIVE_START, "1", "101")]
+    assert poller.stats()["live"] == 1
+
+    live["1"] = (True, "102")
+    assert [e.event for e in advance(1120)] == [EVENT_NEW_MOVIE]
+    live["1"] = (False, "102")
+    assert [e.event for e in advance(1140)] == [EVENT_LIVE_END]
+    # 配信したユーザーは休眠中のユーザーより短い間隔で確認する
+    assert poller._interval(poller._states["1"]) < poller._interval(poller._states["2"])
+
+    poller.remove("1")
+    assert len(poller) == 1
+    assert poller.stats()["live"] == 0
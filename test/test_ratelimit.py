@@ -0,0 +1,48 @@
+import threading
+
+from twitcasting import user
+from twitcasting.client import TwitCastingClient
+from twitcasting.mock_server import MockTwitCastingServer
+from twitcasting.ratelimit import RateLimitScheduler, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+
+def test_scheduler_waits_for_reset():
+    """
+    Test that requests are held back instead of failing once the quota is used up.
+    """
+    with MockTwitCastingServer(rate_limit=3, rate_limit_window=1.0) as server:
+        scheduler = RateLimitScheduler(background_reserve=0)
+        with TwitCastingClient(base_url=server.base_url, scheduler=scheduler) as client:
+            for i in range(6):
+                user_obj, _, _ = user.get_user_info(str(i), 'bearer', access_token='token', client=client)
+                assert user_obj.id == str(i)
+        assert scheduler.delayed_count >= 1
+
+def test_priority_lane():
+    """
+    Test that interactive requests are served before background ones.
+    """
+    now = [0.0]
+    scheduler = RateLimitScheduler(background_reserve=0, clock=lambda: now[0])
+    scheduler.acquire('token')
+    scheduler.complete('token', {"X-RateLimit-Limit": "10", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "100"})
+    order: list[str] = []
+
+    def request(name: str, priority: int) -> None:
+        scheduler.acquire('token', priority)
+        order.append(name)
+        scheduler.complete('token')
+
+    background = threading.Thread(target=request, args=('background', PRIORITY_BACKGROUND))
+    background.start()
+    while not scheduler._buckets['token'].waiters:
+        pass
+    interactive = threading.Thread(target=request, args=('interactive', PRIORITY_INTERACTIVE))
+    interactive.start()
+    while len(scheduler._buckets['token'].waiters) < 2:
+        pass
+    with scheduler._condition:
+        now[0] = 100.0
+        scheduler._condition.notify_all()
+    background.join(5)
+    interactive.join(5)
+    assert order == ['interactive', 'background']
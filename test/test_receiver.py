@@ -0,0 +1,123 @@
+import asyncio, os, threading, urllib.request, urllib.error
+
+from twitcasting.dedup import DedupBackend, WebhookDeduplicator
+from twitcasting.movie import Movie
+from twitcasting.receiver import WebhookReceiver
+from twitcasting.user import User
+
+def test_webhook_receiver():
+    """
+    Test that deliveries are acknowledged, verified and handed to the handler.
+    """
+    test_data_path = os.path.join(os.path.dirname(__file__), 'webhook.json')
+    with open(test_data_path, 'rb') as f:
+        data = f.read()
+    received: list[tuple[Movie, User]] = []
+
+    def handler(movie: Movie, user: User) -> None:
+        received.append((movie, user))
+
+    def post(port: int, body: bytes) -> int:
+        request = urllib.request.Request(f"http://127.0.0.1:{port}/", data=body, method="POST")
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    async def main() -> None:
+        async with WebhookReceiver(handler, signature="09c7a17f60e7448d467b09722061223b", host="127.0.0.1", port=0) as receiver:
+            loop = asyncio.get_running_loop()
+            assert await loop.run_in_executor(None, post, receiver.port, data) == 200
+            assert await loop.run_in_executor(None, post, receiver.port, data.replace(b"09c7a17f", b"00000000")) == 403
+            assert await loop.run_in_executor(None, post, receiver.port, b"not json") == 403
+        assert receiver.stats()["processed"] == 1
+        assert receiver.stats()["rejected"] == 2
+
+    asyncio.run(main())
+    assert len(received) == 1
+    assert isinstance(received[0][0], Movie)
+    assert received[0][0].id == "189037369"
+
+def test_webhook_receiver_retry_after_503():
+    """
+    Test that a delivery answered with 503 is not treated as a duplicate when it is retried.
+    """
+    test_data_path = os.path.join(os.path.dirname(__file__), 'webhook.json')
+    with open(test_data_path, 'rb') as f:
+        data = f.read()
+    bodies = [data.replace(b'"id":"189037369"', f'"id":"{i}"'.encode()) for i in range(3)]
+    received: list[str] = []
+
+    def post(port: int, body: bytes) -> int:
+        request = urllib.request.Request(f"http://127.0.0.1:{port}/", data=body, method="POST")
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    async def main() -> None:
+        release = asyncio.Event()
+
+        async def handler(movie: Movie, user: User) -> None:
+            await release.wait()
+            received.append(movie.id)
+
+        async with WebhookReceiver(handler, host="127.0.0.1", port=0, queue_size=1, workers=1, deduplicator=WebhookDeduplicator()) as receiver:
+            loop = asyncio.get_running_loop()
+            # 1 件目はワーカーが処理中、2 件目でキューが埋まる
+            assert await loop.run_in_executor(None, post, receiver.port, bodies[0]) == 200
+            await asyncio.sleep(0.01)
+            assert await loop.run_in_executor(None, post, receiver.port, bodies[1]) == 200
+            assert await loop.run_in_executor(None, post, receiver.port, bodies[2]) == 503
+            release.set()
+            while receiver.stats()["queued"]:
+                await asyncio.sleep(0.01)
+            assert await loop.run_in_executor(None, post, receiver.port, bodies[2]) == 200
+            # 受け付けた再送は重複として扱われる
+            assert await loop.run_in_executor(None, post, receiver.port, bodies[2]) == 200
+        assert receiver.stats()["dropped"] == 1 and receiver.stats()["suppressed"] == 1
+
+    asyncio.run(main())
+    assert received == ["0", "1", "2"]
+
+def test_webhook_receiver_blocking_dedup_backend():
+    """
+    Test that a blocking deduplication backend does not stop the receiver from serving other connections.
+    """
+    test_data_path = os.path.join(os.path.dirname(__file__), 'webhook.json')
+    with open(test_data_path, 'rb') as f:
+        data = f.read()
+    bodies = [data.replace(b'"id":"189037369"', f'"id":"{i}"'.encode()) for i in range(2)]
+    gate = threading.Event()
+    received: list[str] = []
+
+    class GatedBackend(DedupBackend):
+        def check_and_add(self, key: str, now: float) -> bool:
+            gate.wait(5.0)
+            return False
+
+    def request(port: int, method: str, path: str, body: bytes | None = None) -> int:
+        request = urllib.request.Request(f"http://127.0.0.1:{port}{path}", data=body, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=5.0) as response:
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    async def main() -> None:
+        async with WebhookReceiver(lambda movie, user: received.append(movie.id), host="127.0.0.1", port=0, queue_size=1, deduplicator=WebhookDeduplicator(GatedBackend())) as receiver:
+            loop = asyncio.get_running_loop()
+            pending = loop.run_in_executor(None, request, receiver.port, "POST", "/", bodies[0])
+            while receiver._reserved == 0:
+                await asyncio.sleep(0.001)
+            # 確認中もほかの接続に応答し、確認中の配信の枠は埋まっている
+            assert await loop.run_in_executor(None, request, receiver.port, "GET", "/other") == 404
+            assert await loop.run_in_executor(None, request, receiver.port, "POST", "/", bodies[1]) == 503
+            gate.set()
+            assert await pending == 200
+        assert receiver.stats()["dropped"] == 1 and receiver.stats()["processed"] == 1
+
+    asyncio.run(main())
+    assert received == ["0"]
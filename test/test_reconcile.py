@@ -0,0 +1,34 @@
+from twitcasting.client import TwitCastingClient
+from twitcasting.mock_server import MockTwitCastingServer
+from twitcasting.reconcile import sync_webhooks, plan_webhook_changes
+
+def test_plan_webhook_changes():
+    """
+    Test the diff between the desired and registered webhooks.
+    """
+    desired = {"a": {"livestart"}, "b": {"livestart", "liveend"}, "c": set()}
+    current = {"a": {"livestart", "liveend"}, "b": {"livestart", "liveend"}, "c": {"liveend"}, "d": {"livestart"}}
+    to_register, to_delete, unchanged = plan_webhook_changes(desired, current)
+    assert to_register == {}
+    assert to_delete == {"a": ["liveend"], "c": ["liveend"], "d": ["livestart"]}
+    assert unchanged == 1
+    _, to_delete, _ = plan_webhook_changes(desired, current, prune=False)
+    assert "d" not in to_delete
+
+def test_sync_webhooks():
+    """
+    Test sync_webhooks in dry-run and apply modes against the mock server.
+    """
+    with MockTwitCastingServer() as server, TwitCastingClient(base_url=server.base_url) as client:
+        server.webhooks = {"a": {"livestart", "liveend"}, "d": {"livestart"}}
+        desired = {"a": {"livestart"}, "b": {"livestart", "liveend"}}
+        report = sync_webhooks(desired, 'bearer', access_token='token', dry_run=True, client=client)
+        assert report.registered == {"b": ["liveend", "livestart"]}
+        assert report.deleted == {"a": ["liveend"], "d": ["livestart"]}
+        assert server.webhooks == {"a": {"livestart", "liveend"}, "d": {"livestart"}}
+        report = sync_webhooks(desired, 'bearer', access_token='token', client=client)
+        assert not report.failed
+        assert server.webhooks == desired
+        report = sync_webhooks(desired, 'bearer', access_token='token', client=client)
+        assert report.registered == {} and report.deleted == {}
+        assert report.unchanged == 2
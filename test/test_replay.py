@@ -0,0 +1,51 @@
+import io, json, os
+
+from twitcasting.replay import parse_webhook_stream
+
+PAYLOAD_PATH = os.path.join(os.path.dirname(__file__), 'webhook.json')
+SIGNATURE = '09c7a17f60e7448d467b09722061223b'
+
+def make_lines(count: int) -> list[str]:
+    """
+    Build NDJSON lines from the sample payload, with malformed lines at known positions.
+    """
+    with open(PAYLOAD_PATH, encoding='utf-8') as f:
+        payload = json.load(f)
+    lines = []
+    for i in range(count):
+        payload['movie']['id'] = str(i)
+        lines.append(json.dumps(payload, ensure_ascii=False))
+    lines[10] = '{"movie": '
+    lines[20] = lines[20].replace(SIGNATURE, 'wrong')
+    lines[30] = '[1, 2]'
+    lines[40] = ''
+    return lines
+
+def test_parse_webhook_stream(tmp_path):
+    """
+    Test parallel NDJSON parsing from a path, a file object and lines, ordered and unordered.
+    """
+    lines = make_lines(200)
+    path = tmp_path / 'webhooks.ndjson'
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    expected = [str(i) for i in range(200) if i not in (10, 20, 30, 40)]
+
+    errors = []
+    batches = list(parse_webhook_stream(str(path), SIGNATURE, processes=0, chunk_size=4096, on_error=lambda *error: errors.append(error)))
+    assert len(batches) > 1
+    assert [movie.id for batch in batches for movie, _ in batch] == expected
+    assert [line_number for line_number, _, _ in errors] == [11, 21, 31]
+    assert errors[0][1] == b'{"movie": ' and 'Invalid signature' in errors[1][2]
+
+    for source in (path, io.BytesIO(path.read_bytes()), iter(lines)):
+        errors.clear()
+        batches = list(parse_webhook_stream(source, SIGNATURE, processes=2, chunk_size=4096, on_error=lambda *error: errors.append(error)))
+        assert [movie.id for batch in batches for movie, _ in batch] == expected
+        assert [line_number for line_number, _, _ in errors] == [11, 21, 31]
+        assert batches[0][0][1].id == '182224938'
+
+    unordered = parse_webhook_stream(path, processes=2, ordered=False, chunk_size=1024, on_error=lambda *error: None)
+    assert sorted(int(movie.id) for batch in unordered for movie, _ in batch) == sorted(int(i) for i in expected + ['20'])
+    # 空のファイルも読める
+    (tmp_path / 'empty.ndjson').write_bytes(b'')
+    assert list(parse_webhook_stream(tmp_path / 'empty.ndjson', processes=0)) == []
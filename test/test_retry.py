@@ -0,0 +1,103 @@
+import asyncio, time
+
+import pytest
+
+from twitcasting.aio import AsyncTwitCastingClient
+from twitcasting.client import TwitCastingClient
+from twitcasting.exceptions import TwitCastingCircuitOpenException, TwitCastingExecutionCountLimitationException, TwitCastingInternalServerErrorException, TwitCastingNetworkException, TwitCastingNotFoundException
+from twitcasting.mock_server import MockTwitCastingServer
+from twitcasting.retry import CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN, CircuitBreaker, RetryPolicy
+from twitcasting.user import get_user_info
+
+AUTH = {'authorization_mode': 'bearer', 'access_token': 'token'}
+
+def test_retry_policy():
+    """
+    Test typed HTTP errors, backoff retries of 500 and quota waits for 2000.
+    """
+    sleeps: list[float] = []
+    def sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        time.sleep(seconds)
+
+    policy = RetryPolicy(max_attempts=3, backoff=0.01, sleep=sleep, seed=0)
+    assert policy.delay(1, TwitCastingNotFoundException('Error 404', code=404)) is None
+    assert policy.delay(3, TwitCastingInternalServerErrorException('Error 500', code=500)) is None
+    assert 0 <= policy.delay(2, TwitCastingNetworkException('URL Error')) <= 0.02
+
+    with MockTwitCastingServer() as server, TwitCastingClient(base_url=server.base_url) as plain:
+        # HTTP エラーも API のエラーコードに対応した例外になる
+        server.fail_next(404)
+        with pytest.raises(TwitCastingNotFoundException) as error:
+            get_user_info('1', client=plain, **AUTH)
+        assert (error.value.code, error.value.status) == (404, 404)
+        assert error.value.headers['Content-Type'] == 'application/json'
+
+        with TwitCastingClient(base_url=server.base_url, retry=policy) as client:
+            server.fail_next(500, 2)
+            assert get_user_info('1', client=client, **AUTH)[0].id == '1'
+            assert len(sleeps) == 2 and policy.retry_count == 2
+            server.fail_next(500, 3)
+            with pytest.raises(TwitCastingInternalServerErrorException):
+                get_user_info('1', client=client, **AUTH)
+
+    with MockTwitCastingServer(rate_limit=1, rate_limit_window=1.0) as server, TwitCastingClient(base_url=server.base_url, retry=policy) as client:
+        get_user_info('1', client=client, **AUTH)
+        # 実行回数上限はリセットまで待ってから再送する
+        sleeps.clear()
+        assert get_user_info('2', client=client, **AUTH)[0].id == '2'
+        assert len(sleeps) == 1 and 0 < sleeps[0] <= 2.0
+        with TwitCastingClient(base_url=server.base_url, retry=RetryPolicy(max_quota_wait=0.0)) as impatient:
+            with pytest.raises(TwitCastingExecutionCountLimitationException) as error:
+                get_user_info('3', client=impatient, **AUTH)
+            assert error.value.retry_after is not None
+
+def test_circuit_breaker():
+    """
+    Test that the circuit opens after consecutive 500s, fails fast, and closes after a successful trial.
+    """
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=10.0, clock=lambda: now[0])
+    with MockTwitCastingServer() as server, TwitCastingClient(base_url=server.base_url, breaker=breaker) as client:
+        server.fail_next(404)
+        with pytest.raises(TwitCastingNotFoundException):
+            get_user_info('1', client=client, **AUTH)
+        assert breaker.state('users') == CIRCUIT_CLOSED
+        server.fail_next(500, 3)
+        for _ in range(2):
+            with pytest.raises(TwitCastingInternalServerErrorException):
+                get_user_info('1', client=client, **AUTH)
+        assert breaker.state('users') == CIRCUIT_OPEN
+        sent = server.request_count
+        with pytest.raises(TwitCastingCircuitOpenException) as error:
+            get_user_info('1', client=client, **AUTH)
+        assert server.request_count == sent and error.value.retry_after == 10.0
+        # 他のエンドポイントには影響しない
+        assert breaker.state('webhooks') == CIRCUIT_CLOSED
+
+        now[0] = 10.0
+        assert breaker.state('users') == CIRCUIT_HALF_OPEN
+        with pytest.raises(TwitCastingInternalServerErrorException):
+            get_user_info('1', client=client, **AUTH)
+        assert breaker.state('users') == CIRCUIT_OPEN
+        now[0] = 20.0
+        assert get_user_info('1', client=client, **AUTH)[0].id == '1'
+        assert breaker.state('users') == CIRCUIT_CLOSED
+        assert breaker.rejected_count == 1
+
+def test_retry_policy_async():
+    """
+    Test that the async client retries with the same policy and raises typed exceptions.
+    """
+    async def run() -> None:
+        with MockTwitCastingServer() as server:
+            async with AsyncTwitCastingClient(base_url=server.base_url, retry=RetryPolicy(backoff=0.001)) as client:
+                server.fail_next(500, 2)
+                user_obj, _, _ = await client.get_user_info('1', **AUTH)
+                assert user_obj.id == '1'
+                server.fail_next(404)
+                with pytest.raises(TwitCastingNotFoundException):
+                    await client.get_user_info('1', **AUTH)
+                assert server.request_count == 4
+
+    asyncio.run(run())
@@ -0,0 +1,33 @@
+import pytest
+
+from twitcasting.client import TwitCastingClient
+from twitcasting.mock_server import MockTwitCastingServer
+from twitcasting.session import TwitCastingSession
+from twitcasting.user import User, App
+from twitcasting.webhook import Webhook
+
+def test_twitcasting_session():
+    """
+    Test that a session validates once, caches verify_credentials and serves every endpoint.
+    """
+    with pytest.raises(ValueError):
+        TwitCastingSession('bearer')
+    with MockTwitCastingServer() as server, TwitCastingClient(base_url=server.base_url) as client:
+        with TwitCastingSession('basic', client_id='id', client_secret='secret', client=client, verify=True) as session:
+            assert isinstance(session.app, App)
+            assert isinstance(session.user, User)
+            assert session.headers['Authorization'].startswith('Basic ')
+            with pytest.raises(TypeError):
+                session.headers['Authorization'] = 'Bearer other'
+            user_obj, _, _ = session.get_user_info('twitcasting_jp')
+            assert user_obj.id == 'twitcasting_jp'
+            assert sorted(user_id for user_id, _, _, _ in session.get_users_info(['1', '2', '3'])) == ['1', '2', '3']
+            session.register_webhook('182224938', ['livestart', 'liveend'])
+            assert set(session.iter_webhooks()) == {Webhook('182224938', 'livestart'), Webhook('182224938', 'liveend')}
+            report = session.sync_webhooks({'182224938': ['livestart']})
+            assert report.deleted == {'182224938': ['liveend']}
+            session.delete_webhook('182224938')
+            assert session.get_webhook_list() == (0, [])
+        # 渡したクライアントはセッションを閉じても使える
+        with TwitCastingSession('bearer', access_token='token', client=client) as session:
+            assert session.get_user_info('182224938')[0].id == '182224938'
@@ -0,0 +1,75 @@
+import asyncio, threading
+
+import pytest
+
+from twitcasting.aio import AsyncTwitCastingClient
+from twitcasting.client import TwitCastingClient
+from twitcasting.exceptions import TwitCastingNotFoundException
+from twitcasting.mock_server import MockTwitCastingServer
+from twitcasting.singleflight import SingleFlight
+from twitcasting.user import get_user_info
+
+AUTH = {'authorization_mode': 'bearer', 'access_token': 'token'}
+
+def test_coalesced_threads():
+    """
+    Test that concurrent identical requests from threads share one API call and its exception.
+    """
+    singleflight = SingleFlight()
+    with MockTwitCastingServer(latency=0.2) as server, TwitCastingClient(base_url=server.base_url, singleflight=singleflight) as client:
+        barrier = threading.Barrier(8)
+        results = []
+
+        def call(user_id: str) -> None:
+            barrier.wait()
+            try:
+                results.append(get_user_info(user_id, client=client, **AUTH)[0].id)
+            except TwitCastingNotFoundException as e:
+                results.append(e)
+
+        threads = [threading.Thread(target=call, args=('1',)) for _ in range(6)] + [threading.Thread(target=call, args=('2',)) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(results) == ['1'] * 6 + ['2'] * 2
+        assert server.request_count == 2 and singleflight.stats() == {'calls': 2, 'coalesced': 6}
+
+        # 失敗も共有し、終わったあとの呼び出しはまた送信する
+        server.fail_next(404)
+        results.clear()
+        barrier.reset()
+        threads = [threading.Thread(target=call, args=('1',)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(results) == 8 and all(isinstance(result, TwitCastingNotFoundException) for result in results)
+        assert len({id(result) for result in results}) == 8
+        assert server.request_count == 3
+        get_user_info('1', client=client, **AUTH)
+        assert server.request_count == 4
+
+def test_coalesced_coroutines():
+    """
+    Test that concurrent identical coroutines share one API call, even if one of them is cancelled.
+    """
+    async def run() -> None:
+        singleflight = SingleFlight()
+        with MockTwitCastingServer(latency=0.1) as server:
+            async with AsyncTwitCastingClient(base_url=server.base_url, singleflight=singleflight) as client:
+                tasks = [asyncio.ensure_future(client.get_user_info('1', **AUTH)) for _ in range(5)]
+                other = asyncio.ensure_future(client.get_user_info('2', **AUTH))
+                await asyncio.sleep(0.02)
+                tasks[0].cancel()
+                results = await asyncio.gather(*tasks, return_exceptions=True)
+                other = await other
+                assert isinstance(results[0], asyncio.CancelledError)
+                assert all(result[0].id == '1' for result in results[1:]) and other[0].id == '2'
+                assert server.request_count == 2 and singleflight.coalesced == 4
+                with pytest.raises(TwitCastingNotFoundException):
+                    server.fail_next(404)
+                    await asyncio.gather(client.get_user_info('3', **AUTH), client.get_user_info('3', **AUTH))
+                assert server.request_count == 3 and repr(singleflight).endswith('in_flight=0)')
+
+    asyncio.run(run())
@@ -0,0 +1,108 @@
+import asyncio, sqlite3
+
+from twitcasting import movie as movie_api, user
+from twitcasting.aio import AsyncTwitCastingClient
+from twitcasting.client import TwitCastingClient
+from twitcasting.mock_server import MockTwitCastingServer
+from twitcasting.movie import _parse_movie
+from twitcasting.session import TwitCastingSession
+from twitcasting.snapshot import SnapshotStore
+from twitcasting.user import User
+from twitcasting.webhook import Webhook
+
+AUTH = {'authorization_mode': 'bearer', 'access_token': 'token'}
+
+def test_warm_restart(tmp_path):
+    """
+    Test that a restarted store serves users from the file and only refreshes the stale ones.
+    """
+    path = str(tmp_path / 'snapshot.db')
+    now = [1000.0]
+    with MockTwitCastingServer() as server, TwitCastingClient(base_url=server.base_url) as client:
+        with SnapshotStore(path, max_age=60.0, batch_size=2, clock=lambda: now[0]) as store:
+            first = user.get_user_info('1', client=client, cache=store, **AUTH)
+            assert store.stats()['pending'] == 1
+            user.get_user_info('2', client=client, cache=store, **AUTH)
+            # batch_size に達したらまとめて書き込む
+            assert store.stats()['pending'] == 0 and store.written == 2
+            now[0] = 1030.0
+            user.get_user_info('3', client=client, cache=store, **AUTH)
+        assert server.request_count == 3
+
+        now[0] = 1070.0
+        with SnapshotStore(path, max_age=60.0, clock=lambda: now[0]) as store:
+            assert store.stale_user_ids() == ['1', '2'] and store.stale_user_ids(['2', '3', '4']) == ['2', '4']
+            assert user.get_user_info('3', client=client, cache=store, **AUTH)[0].id == '3'
+            assert store.loaded == 1 and server.request_count == 3
+            # 古いスナップショットは取り直して書き戻す
+            assert user.get_user_info('1', client=client, cache=store, **AUTH) == first
+            assert server.request_count == 4 and store.stale_user_ids() == ['2']
+            assert sorted(u.id for u, _, _, _ in store.users()) == ['1', '2', '3']
+
+    async def run() -> None:
+        with MockTwitCastingServer() as server:
+            async with AsyncTwitCastingClient(base_url=server.base_url) as client:
+                with SnapshotStore(path, max_age=60.0, clock=lambda: now[0]) as store:
+                    assert (await client.get_user_info('3', cache=store, **AUTH))[0].id == '3'
+                    assert server.request_count == 0
+
+    asyncio.run(run())
+
+def test_movie_and_webhook_snapshots(tmp_path):
+    """
+    Test movie snapshots and that session webhook changes are written back to the stored list.
+    """
+    path = str(tmp_path / 'snapshot.db')
+    movie = _parse_movie({'id': '189037369', 'user_id': '182224938', 'title': 'ライブ #189037369', 'link': 'https://twitcasting.tv/twitcasting_jp/movie/189037369', 'created': 1438500282})
+    with SnapshotStore(path) as store:
+        store.put_movie(movie)
+        assert store.get_movie('189037369').title == movie.title
+    with SnapshotStore(path) as store:
+        assert [m.id for m in store.movies_by_user('182224938')] == ['189037369']
+        assert store.get_movie('189037369', max_age=-1.0) is None
+
+    with MockTwitCastingServer() as server, SnapshotStore(path) as store, TwitCastingSession(client=TwitCastingClient(base_url=server.base_url), cache=store, **AUTH) as session:
+        session.register_webhook('182224938', ['livestart'])
+        credential = session.headers['Authorization']
+        assert store.get_webhooks(credential) is None
+        assert store.webhooks_or_fetch(credential, lambda: session.iter_webhooks()) == [Webhook('182224938', 'livestart')]
+        session.register_webhook('182224938', ['liveend'])
+        session.delete_webhook('182224938', ['livestart'])
+        sent = server.request_count
+        assert store.webhooks_or_fetch(credential, lambda: session.iter_webhooks()) == [Webhook('182224938', 'liveend')]
+        assert server.request_count == sent
+        session.client.close()
+
+def test_warm_restart_movies_and_screen_ids(tmp_path):
+    """
+    Test that movie lookups and users looked up by screen_id are served from the file after a restart, also for a file of the previous schema.
+    """
+    path = str(tmp_path / 'snapshot.db')
+    # screen_id と放送者の列がない古いファイル
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.execute("CREATE TABLE users (id TEXT PRIMARY KEY, data TEXT NOT NULL, supporter_count INTEGER, supporting_count INTEGER, fetched_at REAL NOT NULL)")
+        connection.execute("CREATE TABLE movies (id TEXT PRIMARY KEY, user_id TEXT NOT NULL, data TEXT NOT NULL, fetched_at REAL NOT NULL)")
+        connection.execute("INSERT INTO users VALUES ('182224938', '{\"id\":\"182224938\",\"screen_id\":\"twitcasting_jp\",\"name\":\"ツイキャス公式\",\"image\":\"\",\"profile\":\"\",\"level\":24,\"last_movie_id\":null,\"is_live\":false}', 10, 24, 1000.0)")
+    connection.close()
+    now = [1000.0]
+    with MockTwitCastingServer() as server, TwitCastingClient(base_url=server.base_url) as client:
+        movie_id = server.seed_movies('182224938', 1)[0]
+        with SnapshotStore(path, max_age=60.0, clock=lambda: now[0]) as store:
+            assert store.get_user('twitcasting_jp')[0].id == '182224938'
+            fetched = movie_api.get_movie_info(movie_id, client=client, cache=store, **AUTH)
+            store.put_user(User('2', 'renamed', '', '', '', 1, False, None), 1, 2)
+            # 書き込み前でも screen_id で引ける
+            assert store.get_user('renamed')[0].id == '2'
+        assert server.request_count == 1
+
+        now[0] = 1030.0
+        with SnapshotStore(path, max_age=60.0, clock=lambda: now[0]) as store:
+            movie_obj, broadcaster, tags = movie_api.get_movie_info(movie_id, client=client, cache=store, **AUTH)
+            assert movie_obj.diff(fetched[0]) == {} and (broadcaster, tags) == fetched[1:]
+            assert user.get_user_info('twitcasting_jp', client=client, cache=store, **AUTH)[1:] == (10, 24)
+            assert user.get_user_info('renamed', client=client, cache=store, **AUTH)[0].id == '2'
+            assert store.loaded == 3 and server.request_count == 1
+            # 放送者なしで保存し直した配信は、取り直す
+            store.put_movie(fetched[0])
+            assert store.get_movie_info(movie_id) is None and store.get_movie(movie_id).id == movie_id
@@ -1,6 +1,8 @@
 from twitcasting import webhook, exceptions, user
 from twitcasting.movie import Movie
 from twitcasting.user import User, App
+from twitcasting.client import TwitCastingClient
+from twitcasting.mock_server import MockTwitCastingServer
 
 from . import config
 
@@ -37,4 +39,32 @@ def _test_verify_credential():
     assert isinstance(app_obj, App)
     assert isinstance(user_obj, User)
     assert isinstance(supporter_count, int)
-    assert isinstance(supported_count, int)
\ No newline at end of file
+    assert isinstance(supported_count, int)
+
+def test_get_users_info():
+    """
+    Test the get_users_info function against the mock server.
+    """
+    with MockTwitCastingServer() as server, TwitCastingClient(base_url=server.base_url) as client:
+        user_ids = [str(i) for i in range(50)] + ['missing/user']
+        results = {result[0]: result for result in user.get_users_info(user_ids, authorization_mode='bearer', access_token='token', concurrency=8, client=client)}
+    assert set(results) == set(user_ids)
+    for user_id in user_ids[:-1]:
+        _, user_obj, supporter_count, supporting_count = results[user_id]
+        assert isinstance(user_obj, User)
+        assert user_obj.id == user_id
+        assert supporter_count == 10
+        assert supporting_count == 24
+    _, error, supporter_count, supporting_count = results['missing/user']
+    assert isinstance(error, Exception)
+    assert supporter_count is None and supporting_count is None
+
+def test_user_slots_and_hash():
+    """
+    Test that User has no per-instance __dict__ and hashes consistently with __eq__.
+    """
+    user_obj = User('182224938', 'twitcasting_jp', 'ツイキャス公式', 'http://example.com/image.png', '', 24, False, '189037369')
+    same_obj = User('182224938', 'twitcasting_jp', 'ツイキャス公式', 'http://example.com/image.png', '', 24, False, '189037369')
+    assert not hasattr(user_obj, '__dict__')
+    assert user_obj == same_obj
+    assert len({user_obj, same_obj}) == 1
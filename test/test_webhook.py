@@ -2,7 +2,9 @@ from twitcasting import webhook, exceptions
 from twitcasting.movie import Movie
 from twitcasting.user import User
 from twitcasting.webhook import Webhook
-import os
+from twitcasting.client import TwitCastingClient
+from twitcasting.mock_server import MockTwitCastingServer
+import os, time
 
 from . import config
 
@@ -30,4 +32,60 @@ def test_get_webhook_list():
     print(f"Webhook List: {webhook_list}")
     assert isinstance(webhook_count, int)
     assert isinstance(webhook_list, list)
-    #assert all(isinstance(webhook, Webhook) for webhook in webhook_list)
\ No newline at end of file
+    #assert all(isinstance(webhook, Webhook) for webhook in webhook_list)
+
+def test_iter_webhooks():
+    """
+    Test that iter_webhooks walks every page in order.
+    """
+    with MockTwitCastingServer() as server, TwitCastingClient(base_url=server.base_url) as client:
+        for i in range(23):
+            server.webhooks[f"{i:03d}"] = {"livestart", "liveend"}
+        expected = webhook.get_webhook_list(authorization_mode='bearer', access_token='token', limit=50, client=client)[1]
+        for parallel_pages in (1, 3):
+            webhook_list = list(webhook.iter_webhooks(authorization_mode='bearer', access_token='token', page_size=5, parallel_pages=parallel_pages, client=client))
+            assert webhook_list == expected
+        # API は 1 ページ最大 50 件なので、それより大きいとページの間が抜ける
+        for page_size in (0, 51):
+            try:
+                webhook.iter_webhooks(authorization_mode='bearer', access_token='token', page_size=page_size, client=client)
+            except ValueError:
+                pass
+            else:
+                assert False, f"page_size={page_size} was accepted"
+
+def test_iter_webhooks_prefetch_overlaps_first_page(monkeypatch):
+    """
+    Test that the client created by iter_webhooks fetches the next page while the first page is still being read.
+    """
+    with MockTwitCastingServer() as server:
+        for i in range(15):
+            server.webhooks[f"{i:03d}"] = {"livestart"}
+        monkeypatch.setattr(webhook, 'TwitCastingClient', lambda **kwargs: TwitCastingClient(base_url=server.base_url, **kwargs))
+        webhooks = webhook.iter_webhooks(authorization_mode='bearer', access_token='token', page_size=5)
+        first = next(webhooks)
+        # 最初のページを読み終える前に、先読みのリクエストがサーバーに届く
+        deadline = time.monotonic() + 2.0
+        while server.request_count < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert server.request_count == 2
+        assert len([first, *webhooks]) == 15
+        assert server.request_count == 3
+
+def test_parse_webhook_data_bytes():
+    """
+    Test parse_webhook_data with bytes input and signature verification.
+    """
+    test_data_path = os.path.join(os.path.dirname(__file__), 'webhook.json')
+    with open(test_data_path, 'rb') as f:
+        data = f.read()
+    for payload in (data, bytearray(data), memoryview(data)):
+        movie, user = webhook.parse_webhook_data(payload, signature='09c7a17f60e7448d467b09722061223b')
+        assert movie.id == '189037369'
+        assert user.screen_id == 'twitcasting_jp'
+    try:
+        webhook.parse_webhook_data(data, signature='invalid')
+    except ValueError:
+        pass
+    else:
+        assert False, "invalid signature was accepted"
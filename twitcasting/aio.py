@@ -0,0 +1,714 @@
+import asyncio, itertools, json, socket, ssl, time
+from collections import deque
+from typing import AsyncIterator, Container, Iterable, Optional, Never
+from urllib.parse import urlsplit
+
+from . import instrumentation
+from .cache import ResponseCache
+from .client import API_BASE_URL, build_headers, decompress, http_status_error
+from .exceptions import TwitCastingException, TwitCastingExecutionCountLimitationException, TwitCastingNetworkException, raise_for_error
+from .ratelimit import RateLimitScheduler
+from .retry import CircuitBreaker, RetryPolicy, call_with_retry_async
+from .singleflight import SingleFlight
+from .comment import Comment, _parse_comments_response, _comments_query
+from .movie import Movie, _parse_movie, _parse_movie_response, _movies_by_user_query
+from .user import User, App, _parse_user_response, _parse_verify_credential_response
+from .webhook import Webhook, _parse_webhook_list_response, _parse_webhook_events_response, _delete_webhook_query
+
+class _Connection:
+    """
+    Keep-alive connection owned by AsyncTwitCastingClient.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Initialize the _Connection object.
+
+        Args:
+            reader (asyncio.StreamReader): Stream reader.
+            writer (asyncio.StreamWriter): Stream writer.
+        """
+        self.reader = reader
+        self.writer = writer
+        self.released_at = time.monotonic()
+
+    def close(self) -> None:
+        """
+        Close the connection.
+        """
+        self.writer.close()
+
+async def read_headers(reader: asyncio.StreamReader) -> tuple[str, dict[str, str]]:
+    """
+    Read the start line and headers of an HTTP/1.1 message.
+
+    Args:
+        reader (asyncio.StreamReader): Stream to read from.
+
+    Returns:
+        str: Start line.
+        dict[str, str]: Headers with lower-cased names.
+    """
+    start_line = (await reader.readuntil(b"\r\n")).decode("latin-1").rstrip("\r\n")
+    headers: dict[str, str] = {}
+    while True:
+        line = await reader.readuntil(b"\r\n")
+        if line == b"\r\n":
+            return start_line, headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+async def read_body(reader: asyncio.StreamReader, headers: dict[str, str]) -> bytes:
+    """
+    Read the body of an HTTP/1.1 message.
+
+    Args:
+        reader (asyncio.StreamReader): Stream to read from.
+        headers (dict[str, str]): Headers with lower-cased names.
+
+    Returns:
+        bytes: Body.
+    """
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks: list[bytes] = []
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";", 1)[0], 16)
+            if size == 0:
+                # trailer はすべて読み捨てる
+                while await reader.readuntil(b"\r\n") != b"\r\n":
+                    pass
+                return b"".join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+    if "content-length" in headers:
+        return await reader.readexactly(int(headers["content-length"]))
+    return await reader.read()
+
+class AsyncTwitCastingClient:
+    """
+    asyncio client for TwitCasting API.
+
+    Mirrors the functions of the user, movie, comment and webhook modules as
+    coroutines, returns the same objects and raises the same exceptions.
+    Connections are kept alive in a pool and shared by every coroutine using
+    the client.
+    """
+
+    def __init__(self, pool_size: int = 10, per_host_limit: int = 10, idle_timeout: float = 30.0, timeout: float = 30.0, base_url: Optional[str] = None, ssl_context: Optional[ssl.SSLContext] = None, scheduler: Optional[RateLimitScheduler] = None, retry: Optional[RetryPolicy] = None, breaker: Optional[CircuitBreaker] = None, singleflight: Optional[SingleFlight] = None) -> None:
+        """
+        Initialize the AsyncTwitCastingClient object.
+
+        Args:
+            pool_size (int): Maximum number of idle connections kept open. 0 disables keep-alive. Default is 10.
+            per_host_limit (int): Maximum number of connections used at the same time per host. Default is 10.
+            idle_timeout (float): Seconds after which an idle connection is discarded. Default is 30.0.
+            timeout (float): Timeout of a whole request in seconds. Default is 30.0.
+            base_url (Optional[str]): Replace the scheme and host of every request, e.g. with a local mock server. Default is None.
+            ssl_context (Optional[ssl.SSLContext]): SSL context for HTTPS connections. Default is None.
+            scheduler (Optional[RateLimitScheduler]): Rate limit scheduler applied to every request. Default is None.
+            retry (Optional[RetryPolicy]): Retry policy applied to every request. Waits use asyncio.sleep. Default is None.
+            breaker (Optional[CircuitBreaker]): Circuit breaker applied to every request. Default is None.
+            singleflight (Optional[SingleFlight]): Coalesces concurrent GET requests with the same URL and credential. Default is None.
+        """
+        if pool_size < 0:
+            raise ValueError("pool_size must be 0 or greater.")
+        if per_host_limit < 1:
+            raise ValueError("per_host_limit must be 1 or greater.")
+        self.pool_size = pool_size
+        self.per_host_limit = per_host_limit
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.base_url = (base_url or API_BASE_URL).rstrip("/")
+        self._ssl_context = ssl_context
+        self.scheduler = scheduler
+        self.retry = retry
+        self.breaker = breaker
+        self.singleflight = singleflight
+        self._idle: dict[tuple[str, str, int], deque[_Connection]] = {}
+        self._idle_count = 0
+        self._host_slots: dict[tuple[str, str, int], asyncio.Semaphore] = {}
+        self._closed = False
+
+    def __repr__(self) -> str:
+        """
+        String representation of the AsyncTwitCastingClient object.
+
+        Returns:
+            str: String representation of the AsyncTwitCastingClient object.
+        """
+        return f"AsyncTwitCastingClient(pool_size={self.pool_size}, per_host_limit={self.per_host_limit}, idle_timeout={self.idle_timeout}, timeout={self.timeout}, base_url={self.base_url})"
+
+    async def __aenter__(self) -> "AsyncTwitCastingClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """
+        Close every idle connection. Connections in use are closed when they are released.
+        """
+        self._closed = True
+        idle = [conn for connections in self._idle.values() for conn in connections]
+        self._idle.clear()
+        self._idle_count = 0
+        for conn in idle:
+            conn.close()
+        for conn in idle:
+            try:
+                await conn.writer.wait_closed()
+            except OSError:
+                pass
+
+    async def _connect(self, key: tuple[str, str, int]) -> _Connection:
+        """
+        Open a new connection.
+
+        Args:
+            key (tuple[str, str, int]): Scheme, host and port.
+
+        Returns:
+            _Connection: New connection.
+        """
+        scheme, host, port = key
+        address = host
+        info = instrumentation.current_request()
+        if info is not None:
+            # 名前解決を分けて計測し、解決済みのアドレスに接続する
+            start = time.perf_counter()
+            addresses = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+            info.dns = time.perf_counter() - start
+            address = addresses[0][4][0]
+            start = time.perf_counter()
+        if scheme == "https":
+            reader, writer = await asyncio.open_connection(address, port, ssl=self._ssl_context or ssl.create_default_context(), server_hostname=host)
+        else:
+            reader, writer = await asyncio.open_connection(address, port)
+        if info is not None:
+            info.connect = time.perf_counter() - start
+        return _Connection(reader, writer)
+
+    def _take_idle(self, key: tuple[str, str, int]) -> Optional[_Connection]:
+        """
+        Take a live idle connection for a host out of the pool.
+
+        Args:
+            key (tuple[str, str, int]): Scheme, host and port.
+
+        Returns:
+            Optional[_Connection]: Idle connection, or None if there is none.
+        """
+        now = time.monotonic()
+        connections = self._idle.get(key)
+        while connections:
+            conn = connections.pop()
+            self._idle_count -= 1
+            if now - conn.released_at <= self.idle_timeout and not conn.reader.at_eof():
+                return conn
+            conn.close()
+        return None
+
+    def _release(self, key: tuple[str, str, int], conn: _Connection, reusable: bool) -> None:
+        """
+        Return a connection to the pool.
+
+        Args:
+            key (tuple[str, str, int]): Scheme, host and port.
+            conn (_Connection): Connection.
+            reusable (bool): Whether the connection can be kept alive.
+        """
+        if reusable and not self._closed and self._idle_count < self.pool_size:
+            conn.released_at = time.monotonic()
+            self._idle.setdefault(key, deque()).append(conn)
+            self._idle_count += 1
+        else:
+            conn.close()
+
+    async def _exchange(self, conn: _Connection, request: bytes) -> tuple[int, dict[str, str], bytes]:
+        """
+        Send a request and read the response on a connection.
+
+        Args:
+            conn (_Connection): Connection.
+            request (bytes): Serialized request.
+
+        Returns:
+            int: HTTP status code.
+            dict[str, str]: Response headers with lower-cased names.
+            bytes: Response body.
+        """
+        info = instrumentation.current_request()
+        sent = time.perf_counter() if info is not None else 0.0
+        conn.writer.write(request)
+        await conn.writer.drain()
+        status_line, headers = await read_headers(conn.reader)
+        if info is not None:
+            info.ttfb = time.perf_counter() - sent
+        body = await read_body(conn.reader, headers)
+        return int(status_line.split(" ", 2)[1]), headers, body
+
+    async def _urlopen(self, method: str, url: str, headers: dict[str, str], data: Optional[bytes] = None) -> tuple[int, dict[str, str], bytes] | Never:
+        """
+        Send a request over a pooled connection.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Request URL.
+            headers (dict[str, str]): Request headers.
+            data (Optional[bytes]): Request body. Default is None.
+
+        Returns:
+            int: HTTP status code.
+            dict[str, str]: Response headers with lower-cased names.
+            bytes: Response body.
+        """
+        if self._closed:
+            raise OSError("client is closed")
+        parts = urlsplit(self.base_url + url)
+        scheme = parts.scheme
+        key = (scheme, parts.hostname or "", parts.port or (443 if scheme == "https" else 80))
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {parts.netloc}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        if data is not None or method in ("POST", "PUT"):
+            lines.append(f"Content-Length: {len(data or b'')}")
+        if self.pool_size == 0:
+            lines.append("Connection: close")
+        request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (data or b"")
+        slots = self._host_slots.get(key)
+        if slots is None:
+            slots = self._host_slots[key] = asyncio.Semaphore(self.per_host_limit)
+        async with slots:
+            conn = self._take_idle(key)
+            reused = conn is not None
+            info = instrumentation.current_request()
+            if info is not None:
+                info.reused = reused
+            if conn is None:
+                conn = await self._connect(key)
+            try:
+                try:
+                    status, response_headers, body = await self._exchange(conn, request)
+                except (asyncio.IncompleteReadError, ConnectionResetError, BrokenPipeError):
+                    # サーバー側で切断された keep-alive 接続は一度だけ張り直す
+                    if not reused:
+                        raise
+                    conn.close()
+                    conn = await self._connect(key)
+                    status, response_headers, body = await self._exchange(conn, request)
+            except BaseException:
+                conn.close()
+                raise
+            self._release(key, conn, response_headers.get("connection", "").lower() != "close")
+        return status, response_headers, body
+
+    async def _request(self, method: str, url: str, headers: dict[str, str], data: Optional[bytes] = None) -> dict | Never:
+        """
+        Send an API request and decode the JSON response.
+
+        Requests are throttled by the scheduler and retried by the retry policy
+        and the circuit breaker when they are set. Concurrent identical GET
+        requests share one call when singleflight is set. Registered
+        instrumentation hooks are notified of every attempt.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Request path and query, relative to the API base URL.
+            headers (dict[str, str]): Request headers.
+            data (Optional[bytes]): Request body. Default is None.
+
+        Returns:
+            dict: Decoded response.
+            Never: Raises an exception if the request fails.
+        """
+        if self.singleflight is not None and method == "GET":
+            return await self.singleflight.do_async((url, headers.get("Authorization")), lambda: self._send_with_retry(method, url, headers, data))
+        return await self._send_with_retry(method, url, headers, data)
+
+    async def _send_with_retry(self, method: str, url: str, headers: dict[str, str], data: Optional[bytes] = None) -> dict | Never:
+        """
+        Send an API request with the retry policy and the circuit breaker, if any.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Request path and query, relative to the API base URL.
+            headers (dict[str, str]): Request headers.
+            data (Optional[bytes]): Request body. Default is None.
+
+        Returns:
+            dict: Decoded response.
+            Never: Raises an exception if the request fails.
+        """
+        if self.retry is None and self.breaker is None:
+            return await self._attempt(method, url, headers, data)
+        return await call_with_retry_async(instrumentation.endpoint_name(url), lambda: self._attempt(method, url, headers, data), self.retry, self.breaker)
+
+    async def _attempt(self, method: str, url: str, headers: dict[str, str], data: Optional[bytes] = None) -> dict | Never:
+        """
+        Send an API request once, notifying the registered instrumentation hooks.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Request path and query, relative to the API base URL.
+            headers (dict[str, str]): Request headers.
+            data (Optional[bytes]): Request body. Default is None.
+
+        Returns:
+            dict: Decoded response.
+            Never: Raises an exception if the request fails.
+        """
+        if not instrumentation._hooks:
+            return await self._send(method, url, headers, data)
+        info, token = instrumentation.start_request(method, url, len(data) if data else 0)
+        try:
+            response_data = await self._send(method, url, headers, data)
+        except Exception as e:
+            instrumentation.end_request(info, token, e)
+            raise
+        instrumentation.end_request(info, token)
+        return response_data
+
+    async def _send(self, method: str, url: str, headers: dict[str, str], data: Optional[bytes] = None) -> dict | Never:
+        """
+        Send an API request through the scheduler, if any.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Request path and query, relative to the API base URL.
+            headers (dict[str, str]): Request headers.
+            data (Optional[bytes]): Request body. Default is None.
+
+        Returns:
+            dict: Decoded response.
+            Never: Raises an exception if the request fails.
+        """
+        if self.scheduler is None:
+            return (await self._request_json(method, url, headers, data))[1]
+        credential = headers.get("Authorization", "")
+        await self.scheduler.acquire_async(credential)
+        response_headers = None
+        exhausted = False
+        try:
+            response_headers, response_data = await self._request_json(method, url, headers, data)
+        except Exception as e:
+            response_headers = getattr(e, "headers", None)
+            exhausted = isinstance(e, TwitCastingExecutionCountLimitationException)
+            raise
+        finally:
+            self.scheduler.complete(credential, response_headers, exhausted)
+        return response_data
+
+    async def _request_json(self, method: str, url: str, headers: dict[str, str], data: Optional[bytes]) -> tuple[dict[str, str], dict] | Never:
+        """
+        Send a request and decode the JSON response.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Request path and query, relative to the API base URL.
+            headers (dict[str, str]): Request headers.
+            data (Optional[bytes]): Request body.
+
+        Returns:
+            dict[str, str]: Response headers with lower-cased names.
+            dict: Decoded response.
+            Never: Raises an exception if the request fails.
+        """
+        try:
+            async with asyncio.timeout(self.timeout):
+                status, response_headers, body = await self._urlopen(method, url, headers, data)
+        except (OSError, TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError) as e:
+            raise TwitCastingNetworkException(f"URL Error: {e}") from e
+        info = instrumentation.current_request()
+        if info is not None:
+            info.status = status
+            info.response_bytes = len(body)
+        encoding = response_headers.get("content-encoding")
+        if encoding is not None:
+            body = b"".join(decompress([body], encoding))
+        if status >= 400:
+            if info is not None:
+                info.error_code = instrumentation.error_code_from_body(body, status)
+            raise http_status_error(status, body, response_headers)
+        try:
+            response_data = json.loads(body.decode())
+        except json.JSONDecodeError as e:
+            raise TwitCastingException(f"JSON Decode Error: {e.msg}") from e
+        except UnicodeDecodeError as e:
+            raise TwitCastingException(f"JSON Decode Error: {e.reason}") from e
+        if info is not None and isinstance(response_data.get("error"), dict):
+            info.error_code = response_data["error"].get("code")
+        raise_for_error(response_data, status, response_headers)
+        return response_headers, response_data
+
+    async def get_user_info(self, user_id: str, authorization_mode: str, access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None, cache: Optional[ResponseCache] = None) -> tuple[User, int, int] | Never:
+        """
+        Get user information.
+
+        Args:
+            user_id (str): User ID.
+            authorization_mode (str): Authorization mode.
+            access_token (Optional[str]): Access token. Default is None.
+            client_id (Optional[str]): Client ID. Default is None.
+            client_secret (Optional[str]): Client secret. Default is None.
+            cache (Optional[ResponseCache]): Response cache. Default is None.
+
+        Returns:
+            User: User object.
+            int: ユーザーのサポーターの数
+            int: ユーザーがサポートしている数
+        """
+        headers = build_headers(authorization_mode, access_token, client_id, client_secret)
+        if cache is not None:
+            return await cache.get_or_fetch_async("users", user_id, headers["Authorization"], lambda: self._get_user_info(user_id, headers))
+        return await self._get_user_info(user_id, headers)
+
+    async def _get_user_info(self, user_id: str, headers: dict[str, str]) -> tuple[User, int, int] | Never:
+        """
+        Request the users endpoint.
+
+        Args:
+            user_id (str): User ID.
+            headers (dict[str, str]): Request headers.
+
+        Returns:
+            User: User object.
+            int: ユーザーのサポーターの数
+            int: ユーザーがサポートしている数
+        """
+        data = await self._request("GET", f"/users/{user_id}", headers)
+        return _parse_user_response(data)
+
+    async def get_users_info(self, user_ids: Iterable[str], authorization_mode: str, access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None, concurrency: int = 16, cache: Optional[ResponseCache] = None) -> AsyncIterator[tuple[str, User | Exception, Optional[int], Optional[int]]]:
+        """
+        Get information of many users concurrently.
+
+        Results are yielded in completion order. A failed lookup does not stop the
+        batch: the exception is yielded in place of the User object.
+
+        Args:
+            user_ids (Iterable[str]): User IDs. Consumed lazily.
+            authorization_mode (str): Authorization mode.
+            access_token (Optional[str]): Access token. Default is None.
+            client_id (Optional[str]): Client ID. Default is None.
+            client_secret (Optional[str]): Client secret. Default is None.
+            concurrency (int): Maximum number of requests in flight. Default is 16.
+            cache (Optional[ResponseCache]): Response cache. Default is None.
+
+        Yields:
+            str: User ID.
+            User | Exception: User object, or the exception raised for the user ID.
+            Optional[int]: ユーザーのサポーターの数 (None on failure)
+            Optional[int]: ユーザーがサポートしている数 (None on failure)
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be 1 or greater.")
+        build_headers(authorization_mode, access_token, client_id, client_secret)
+        pending: dict[asyncio.Task, str] = {}
+        user_id_iter = iter(user_ids)
+
+        def submit(count: int) -> None:
+            for user_id in itertools.islice(user_id_iter, count):
+                task = asyncio.ensure_future(self.get_user_info(user_id, authorization_mode, access_token, client_id, client_secret, cache))
+                pending[task] = user_id
+
+        try:
+            submit(concurrency)
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    user_id = pending.pop(task)
+                    try:
+                        user, supporter_count, supporting_count = task.result()
+                    except Exception as e:
+                        yield user_id, e, None, None
+                    else:
+                        yield user_id, user, supporter_count, supporting_count
+                submit(len(done))
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def get_movie_info(self, movie_id: str, authorization_mode: str, access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None, cache: Optional[ResponseCache] = None) -> tuple[Movie, User, list[str]] | Never:
+        """
+        Get movie information.
+
+        Args:
+            movie_id (str): Movie ID.
+            authorization_mode (str): Authorization mode.
+            access_token (Optional[str]): Access token. Default is None.
+            client_id (Optional[str]): Client ID. Default is None.
+            client_secret (Optional[str]): Client secret. Default is None.
+            cache (Optional[ResponseCache]): Response cache. Default is None.
+
+        Returns:
+            Movie: Movie object.
+            User: Broadcaster.
+            list[str]: Tags of the movie.
+        """
+        headers = build_headers(authorization_mode, access_token, client_id, client_secret)
+
+        async def fetch() -> tuple[Movie, User, list[str]]:
+            return _parse_movie_response(await self._request("GET", f"/movies/{movie_id}", headers))
+
+        if cache is not None:
+            return await cache.get_or_fetch_async("movies", movie_id, headers["Authorization"], fetch)
+        return await fetch()
+
+    async def iter_movies_by_user(self, user_id: str, authorization_mode: str, access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None, known_ids: Optional[Container[str]] = None, page_size: int = 50) -> AsyncIterator[Movie]:
+        """
+        Iterate over the movies of a user, newest first. See movie.iter_movies_by_user.
+
+        Args:
+            user_id (str): User ID.
+            authorization_mode (str): Authorization mode.
+            access_token (Optional[str]): Access token. Default is None.
+            client_id (Optional[str]): Client ID. Default is None.
+            client_secret (Optional[str]): Client secret. Default is None.
+            known_ids (Optional[Container[str]]): Movie IDs already seen. The iteration stops at the first one. Default is None.
+            page_size (int): Number of movies per request (1-50). Default is 50.
+
+        Yields:
+            Movie: Movie object.
+        """
+        if not 1 <= page_size <= 50:
+            raise ValueError("page_size must be between 1 and 50.")
+        headers = build_headers(authorization_mode, access_token, client_id, client_secret)
+        slice_id = None
+        while True:
+            data = await self._request("GET", f"/users/{user_id}/movies?{_movies_by_user_query(page_size, slice_id)}", headers)
+            movies_data = data.get("movies", [])
+            for movie_data in movies_data:
+                movie = _parse_movie(movie_data)
+                if known_ids is not None and movie.id in known_ids:
+                    return
+                yield movie
+            if len(movies_data) < page_size:
+                return
+            slice_id = movies_data[-1].get("id")
+
+    async def get_comments(self, movie_id: str, authorization_mode: str, access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None, offset: int = 0, limit: int = 10, slice_id: Optional[str] = None) -> tuple[int, list[Comment]] | Never:
+        """
+        Get the comments of a movie.
+
+        Args:
+            movie_id (str): Movie ID.
+            authorization_mode (str): Authorization mode.
+            access_token (Optional[str]): Access token. Default is None.
+            client_id (Optional[str]): Client ID. Default is None.
+            client_secret (Optional[str]): Client secret. Default is None.
+            offset (int): Offset from the newest comment. Ignored when slice_id is set. Default is 0.
+            limit (int): Number of comments to retrieve (1-50). Default is 10.
+            slice_id (Optional[str]): Only retrieve comments newer than this comment ID. Default is None.
+
+        Returns:
+            int: 総コメント数
+            list[Comment]: Comments, newest first.
+        """
+        headers = build_headers(authorization_mode, access_token, client_id, client_secret)
+        data = await self._request("GET", f"/movies/{movie_id}/comments?{_comments_query(offset, limit, slice_id)}", headers)
+        return _parse_comments_response(data, movie_id)
+
+    async def verify_credential(self, authorization_mode: str, access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None, cache: Optional[ResponseCache] = None) -> tuple[App, User, int, int] | Never:
+        """
+        Verify credentials.
+
+        Args:
+            authorization_mode (str): Authorization mode.
+            access_token (Optional[str]): Access token. Default is None.
+            client_id (Optional[str]): Client ID. Default is None.
+            client_secret (Optional[str]): Client secret. Default is None.
+            cache (Optional[ResponseCache]): Response cache. Default is None.
+
+        Returns:
+            App: App object.
+            User: User object.
+            int: ユーザーのサポーターの数
+            int: ユーザーがサポートしている数
+        """
+        headers = build_headers(authorization_mode, access_token, client_id, client_secret)
+        if cache is not None:
+            return await cache.get_or_fetch_async("verify_credentials", "", headers["Authorization"], lambda: self._verify_credential(headers))
+        return await self._verify_credential(headers)
+
+    async def _verify_credential(self, headers: dict[str, str]) -> tuple[App, User, int, int] | Never:
+        """
+        Request the verify_credentials endpoint.
+
+        Args:
+            headers (dict[str, str]): Request headers.
+
+        Returns:
+            App: App object.
+            User: User object.
+            int: ユーザーのサポーターの数
+            int: ユーザーがサポートしている数
+        """
+        data = await self._request("GET", "/verify_credentials", headers)
+        return _parse_verify_credential_response(data)
+
+    async def get_webhook_list(self, authorization_mode: str, access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None, user_id: Optional[str] = None, limit: int = 50, offset: int = 0) -> tuple[int, list[Webhook]] | Never:
+        """
+        Get the list of webhooks.
+
+        Args:
+            authorization_mode (str): Authorization mode.
+            access_token (Optional[str]): Access token.
+            client_id (Optional[str]): Client ID.
+            client_secret (Optional[str]): Client secret.
+            user_id (Optional[str]): User ID. If None, all webhooks are retrieved.
+            limit (int): Number of webhooks to retrieve. Default is 50.
+            offset (int): Offset for pagination. Default is 0.
+
+        Returns:
+            int: 登録済みWebHook件数
+            list[Webhook]: Webhook list.
+        """
+        headers = build_headers(authorization_mode, access_token, client_id, client_secret)
+        url = f"/webhooks?limit={limit}&offset={offset}"
+        if user_id:
+            url += f"&user_id={user_id}"
+        data = await self._request("GET", url, headers)
+        return _parse_webhook_list_response(data)
+
+    async def register_webhook(self, authorization_mode: str, user_id: str, events: list[str], access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None) -> tuple[str, list[str]] | Never:
+        """
+        Register a webhook.
+
+        Args:
+            authorization_mode (str): Authorization mode.
+            user_id (str): User ID.
+            events (list[str]): List of events to register.
+            access_token (Optional[str]): Access token.
+            client_id (Optional[str]): Client ID.
+            client_secret (Optional[str]): Client secret.
+
+        Returns:
+            str: User ID.
+            list[str]: List of added events.
+        """
+        headers = build_headers(authorization_mode, access_token, client_id, client_secret)
+        body = json.dumps({"user_id": user_id, "events": events}).encode()
+        data = await self._request("POST", "/webhooks", headers, body)
+        return _parse_webhook_events_response(data)
+
+    async def delete_webhook(self, authorization_mode: str, user_id: str, access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None, events: Optional[list[str]] = None) -> tuple[str, list[str]] | Never:
+        """
+        Delete a webhook.
+
+        Args:
+            authorization_mode (str): Authorization mode.
+            user_id (str): User ID.
+            access_token (Optional[str]): Access token.
+            client_id (Optional[str]): Client ID.
+            client_secret (Optional[str]): Client secret.
+            events (Optional[list[str]]): Events to delete. If None, every event of the user is deleted. Default is None.
+
+        Returns:
+            str: User ID.
+            list[str]: List of deleted events.
+        """
+        headers = build_headers(authorization_mode, access_token, client_id, client_secret)
+        data = await self._request("DELETE", f"/webhooks?{_delete_webhook_query(user_id, events)}", headers)
+        return _parse_webhook_events_response(data)
@@ -0,0 +1,708 @@
+import heapq, hmac, itertools, math, operator
+from array import array
+from typing import Any, Callable, Iterable, Optional, Self, Sequence
+
+from .movie import Movie
+from .user import User
+from .webhook import _json_loads
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 1 回にまとめて列へ追加する行数
+CHUNK_ROWS = 65536
+
+_OPS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+_AGGREGATES = ("sum", "min", "max", "mean", "count")
+
+def _chunks(iterable: Iterable[Any]) -> Iterable[list[Any]]:
+    """
+    Split an iterable into lists of CHUNK_ROWS items.
+
+    Args:
+        iterable (Iterable[Any]): Items.
+
+    Yields:
+        list[Any]: Up to CHUNK_ROWS items.
+    """
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, CHUNK_ROWS)):
+        yield chunk
+
+def _dict_field(name: str) -> Callable[[dict], Any]:
+    """
+    Getter of a key that may be missing.
+
+    Args:
+        name (str): Key.
+
+    Returns:
+        Callable[[dict], Any]: Returns the value or None.
+    """
+    return lambda data: data.get(name)
+
+def _payload_objects(payloads: Iterable[str | bytes], key: str, signature: Optional[str]) -> Iterable[dict]:
+    """
+    Decode webhook payloads and take one object out of each, without building models.
+
+    Args:
+        payloads (Iterable[str | bytes]): Webhook request bodies or NDJSON lines.
+        key (str): "movie" or "broadcaster".
+        signature (Optional[str]): Signature for verification. If None, signatures are not verified.
+
+    Yields:
+        dict: The object stored under key.
+    """
+    expected = signature.encode() if signature else None
+    for payload in payloads:
+        data_obj = _json_loads(payload)
+        if not data_obj:
+            raise ValueError("Invalid data")
+        if expected is not None and not hmac.compare_digest(expected, str(data_obj.get("signature", "")).encode()):
+            raise ValueError("Invalid signature")
+        yield data_obj.get(key, {}) if key != "broadcaster" else data_obj.get("broadcaster", data_obj.get("user", {}))
+
+class _ColumnBatch:
+    """
+    Rows stored as one typed array per field.
+
+    Integer columns are int64 and boolean columns are bool (NumPy) or
+    array("q") and array("b") (stdlib). String columns are object arrays or
+    lists. Masks returned by where are NumPy bool arrays or lists of bool.
+    """
+
+    _STR_COLUMNS: tuple[str, ...] = ()
+    _INT_COLUMNS: tuple[str, ...] = ()
+    _BOOL_COLUMNS: tuple[str, ...] = ()
+
+    def __init__(self, columns: dict[str, Any], use_numpy: Optional[bool] = None) -> None:
+        """
+        Initialize the batch from finished columns.
+
+        Args:
+            columns (dict[str, Any]): Column name to array, as built by the from_* constructors.
+            use_numpy (Optional[bool]): Whether the columns are NumPy arrays. If None, NumPy is used when installed. Default is None.
+        """
+        self._np = np is not None if use_numpy is None else use_numpy
+        if self._np and np is None:
+            raise ImportError("numpy is not installed.")
+        self._columns = columns
+
+    @classmethod
+    def _build(cls, values: dict[str, list[Any]], use_numpy: Optional[bool], **extra: Any) -> Self:
+        """
+        Convert lists of values to typed columns.
+
+        Args:
+            values (dict[str, list[Any]]): Column name to list of values.
+            use_numpy (Optional[bool]): Use NumPy arrays. If None, NumPy is used when installed.
+            **extra (Any): Other arguments of the subclass constructor.
+
+        Returns:
+            Self: New batch.
+        """
+        use_numpy = np is not None if use_numpy is None else use_numpy
+        # 列を作る前に確かめないと np.array で AttributeError になる
+        if use_numpy and np is None:
+            raise ImportError("numpy is not installed.")
+        columns = {}
+        for name, column in values.items():
+            if name in cls._STR_COLUMNS:
+                columns[name] = np.array(column, dtype=object) if use_numpy else column
+            elif name in cls._BOOL_COLUMNS:
+                columns[name] = np.array(column, dtype=bool) if use_numpy else array("b", column)
+            else:
+                # 整数列と、MovieBatch の user_code
+                columns[name] = np.array(column, dtype=np.int64) if use_numpy else array("q", column)
+        return cls(columns, use_numpy, **extra)
+
+    @classmethod
+    def _from_rows(cls, rows: Iterable[Any], field: Callable[[str], Callable[[Any], Any]], use_numpy: Optional[bool]) -> Self:
+        """
+        Collect the columns of dicts or model objects chunk by chunk.
+
+        Args:
+            rows (Iterable[Any]): Dicts or model objects.
+            field (Callable[[str], Callable[[Any], Any]]): Returns the getter of a column, e.g. operator.attrgetter.
+            use_numpy (Optional[bool]): Use NumPy arrays. If None, NumPy is used when installed.
+
+        Returns:
+            Self: New batch.
+        """
+        values: dict[str, list[Any]] = {name: [] for name in cls._STR_COLUMNS + cls._BOOL_COLUMNS + cls._INT_COLUMNS}
+        getters = {name: field(name) for name in values}
+        for chunk in _chunks(rows):
+            # 行ごとではなく列ごとに取り出す
+            for name in cls._STR_COLUMNS:
+                values[name].extend([value or "" for value in map(getters[name], chunk)])
+            for name in cls._BOOL_COLUMNS:
+                values[name].extend(map(bool, map(getters[name], chunk)))
+            for name in cls._INT_COLUMNS:
+                values[name].extend([value or 0 for value in map(getters[name], chunk)])
+        return cls._build(values, use_numpy)
+
+    def __len__(self) -> int:
+        """
+        Number of rows.
+
+        Returns:
+            int: Number of rows.
+        """
+        return len(self._columns[self._STR_COLUMNS[0]])
+
+    def __repr__(self) -> str:
+        """
+        String representation of the batch.
+
+        Returns:
+            str: String representation of the batch.
+        """
+        return f"{type(self).__name__}(rows={len(self)}, backend={'numpy' if self._np else 'array'})"
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        """
+        Names of the columns.
+        """
+        return self._STR_COLUMNS + self._BOOL_COLUMNS + self._INT_COLUMNS
+
+    def column(self, name: str) -> Any:
+        """
+        Get a column.
+
+        Args:
+            name (str): Column name.
+
+        Returns:
+            Any: NumPy array, array.array or list. Do not modify it in place.
+        """
+        if name not in self.columns:
+            raise KeyError(name)
+        return self._columns[name]
+
+    def row(self, index: int) -> dict[str, Any]:
+        """
+        Get one row as a dict.
+
+        Args:
+            index (int): Row index.
+
+        Returns:
+            dict[str, Any]: Column name to value.
+        """
+        values = {}
+        for name in self.columns:
+            value = self._cell(name, index)
+            values[name] = value.item() if hasattr(value, "item") else (bool(value) if name in self._BOOL_COLUMNS else value)
+        return values
+
+    def where(self, name: str, op: str, value: Any) -> Any:
+        """
+        Compare a column with a value.
+
+        Args:
+            name (str): Column name.
+            op (str): One of "==", "!=", "<", "<=", ">", ">=" or "in". For "in", value is a collection.
+            value (Any): Value to compare with.
+
+        Returns:
+            Any: Mask to pass to filter.
+        """
+        column = self.column(name)
+        if op == "in":
+            if self._np:
+                return np.isin(column, list(value))
+            value = set(value)
+            return [x in value for x in column]
+        compare = _OPS.get(op)
+        if compare is None:
+            raise ValueError(f"Invalid operator: {op}")
+        if self._np:
+            return np.asarray(compare(column, value), dtype=bool)
+        return [compare(x, value) for x in column]
+
+    def filter(self, mask: Any) -> Self:
+        """
+        Keep the rows where the mask is true.
+
+        Args:
+            mask (Any): Sequence of bool with one item per row, e.g. from where. Masks can be combined with & when NumPy is used.
+
+        Returns:
+            Self: New batch.
+        """
+        if self._np:
+            mask = np.asarray(mask, dtype=bool)
+            return self._derive({name: column[mask] for name, column in self._columns.items()})
+        columns = {}
+        for name, column in self._columns.items():
+            values = itertools.compress(column, mask)
+            columns[name] = array(column.typecode, values) if isinstance(column, array) else list(values)
+        return self._derive(columns)
+
+    def take(self, indices: Sequence[int]) -> Self:
+        """
+        Select rows by index.
+
+        Args:
+            indices (Sequence[int]): Row indices.
+
+        Returns:
+            Self: New batch with the rows in the given order.
+        """
+        if self._np:
+            indices = np.asarray(indices, dtype=np.intp)
+            return self._derive({name: column[indices] for name, column in self._columns.items()})
+        columns = {}
+        for name, column in self._columns.items():
+            values = map(column.__getitem__, indices)
+            columns[name] = array(column.typecode, values) if isinstance(column, array) else list(values)
+        return self._derive(columns)
+
+    def head(self, n: int) -> Self:
+        """
+        Get the first rows.
+
+        Args:
+            n (int): Number of rows.
+
+        Returns:
+            Self: New batch.
+        """
+        return self._derive({name: column[:n] for name, column in self._columns.items()})
+
+    def sort(self, name: str, descending: bool = False) -> Self:
+        """
+        Sort the rows by a column. The sort is stable.
+
+        Args:
+            name (str): Column name.
+            descending (bool): Sort from the largest value. Default is False.
+
+        Returns:
+            Self: New batch.
+        """
+        column = self.column(name)
+        if self._np and name not in self._STR_COLUMNS:
+            column = column.astype(np.int64, copy=False)
+            return self.take(np.argsort(-column if descending else column, kind="stable"))
+        return self.take(sorted(range(len(self)), key=column.__getitem__, reverse=descending))
+
+    def top_k(self, name: str, k: int) -> Self:
+        """
+        Get the k rows with the largest values of a numeric column.
+
+        Rows are ordered from the largest value; equal values keep their
+        original order, but which of several equal values at the cut-off is
+        kept is unspecified.
+
+        Args:
+            name (str): Integer or boolean column name.
+            k (int): Number of rows.
+
+        Returns:
+            Self: New batch with at most k rows.
+        """
+        if name not in self._INT_COLUMNS and name not in self._BOOL_COLUMNS:
+            raise ValueError(f"{name} is not a numeric column.")
+        if k <= 0:
+            return self.head(0)
+        column = self._columns[name]
+        if not self._np:
+            return self.take(heapq.nlargest(k, range(len(self)), key=column.__getitem__))
+        if k >= len(self):
+            return self.sort(name, descending=True)
+        negated = -column.astype(np.int64, copy=False)
+        # O(n) で上位 k 件を選んでから、その k 件だけを並べる
+        part = np.argpartition(negated, k - 1)[:k]
+        return self.take(part[np.lexsort((part, negated[part]))])
+
+    def aggregate(self, name: Optional[str], func: str = "sum") -> int | float:
+        """
+        Aggregate a numeric column over all rows.
+
+        Args:
+            name (Optional[str]): Integer or boolean column name. Not used for "count".
+            func (str): "sum", "min", "max", "mean" or "count". Default is "sum".
+
+        Returns:
+            int | float: Aggregated value. mean is a float, the others are int.
+        """
+        if func not in _AGGREGATES:
+            raise ValueError(f"Invalid aggregate: {func}")
+        if func == "count":
+            return len(self)
+        if name not in self._INT_COLUMNS and name not in self._BOOL_COLUMNS:
+            raise ValueError(f"{name} is not a numeric column.")
+        if func != "sum" and len(self) == 0:
+            raise ValueError(f"{func} of an empty batch.")
+        column = self._columns[name]
+        if self._np:
+            column = column.astype(np.int64, copy=False)
+            return float(column.mean()) if func == "mean" else int(getattr(column, func)())
+        if func == "mean":
+            return math.fsum(column) / len(column)
+        return {"sum": sum, "min": min, "max": max}[func](column)
+
+    def _cell(self, name: str, index: int) -> Any:
+        """
+        Get one value of a column.
+
+        Args:
+            name (str): Column name.
+            index (int): Row index.
+
+        Returns:
+            Any: Stored value.
+        """
+        return self._columns[name][index]
+
+    def _derive(self, columns: dict[str, Any]) -> Self:
+        """
+        Build a batch of the same type sharing the non-column attributes.
+
+        Args:
+            columns (dict[str, Any]): New columns.
+
+        Returns:
+            Self: New batch.
+        """
+        return type(self)(columns, self._np)
+
+class MovieBatch(_ColumnBatch):
+    """
+    Columnar container for many movies.
+
+    Stores id, user_id, is_live, is_recorded, comment_count, duration, created,
+    max_view_count, current_view_count and total_view_count. Text fields such
+    as the title are not kept. user_id is dictionary encoded, so filtering and
+    grouping by user work on integer codes.
+    """
+
+    _STR_COLUMNS = ("id", "user_id")
+    _BOOL_COLUMNS = ("is_live", "is_recorded")
+    _INT_COLUMNS = ("comment_count", "duration", "created", "max_view_count", "current_view_count", "total_view_count")
+
+    def __init__(self, columns: dict[str, Any], use_numpy: Optional[bool] = None, users: Optional[list[str]] = None) -> None:
+        """
+        Initialize the MovieBatch object. Use the from_* constructors instead.
+
+        Args:
+            columns (dict[str, Any]): Column name to array. user_id is stored as "user_code", an index into users.
+            use_numpy (Optional[bool]): Whether the columns are NumPy arrays. If None, NumPy is used when installed. Default is None.
+            users (Optional[list[str]]): Distinct user IDs indexed by user_code. Default is None.
+        """
+        super().__init__(columns, use_numpy)
+        self.users = users if users is not None else []
+
+    @classmethod
+    def _build(cls, values: dict[str, list[Any]], use_numpy: Optional[bool], **extra: Any) -> "MovieBatch":
+        """
+        Convert lists of values to typed columns, dictionary encoding user_id.
+
+        Args:
+            values (dict[str, list[Any]]): Column name to list of values.
+            use_numpy (Optional[bool]): Use NumPy arrays. If None, NumPy is used when installed.
+            **extra (Any): Other arguments of the constructor.
+
+        Returns:
+            MovieBatch: New batch.
+        """
+        codes: dict[str, int] = {}
+        # setdefault は未登録のユーザーに次の番号を振る
+        values["user_code"] = [codes.setdefault(user_id, len(codes)) for user_id in values.pop("user_id")]
+        return super()._build(values, use_numpy, users=list(codes), **extra)
+
+    @classmethod
+    def from_dicts(cls, movies: Iterable[dict], use_numpy: Optional[bool] = None) -> "MovieBatch":
+        """
+        Build a batch from movie objects of API responses, e.g. the "movies" list of the movies by user endpoint.
+
+        Args:
+            movies (Iterable[dict]): Movie objects.
+            use_numpy (Optional[bool]): Use NumPy arrays. If None, NumPy is used when installed. Default is None.
+
+        Returns:
+            MovieBatch: New batch.
+        """
+        return cls._from_rows(movies, _dict_field, use_numpy)
+
+    @classmethod
+    def from_webhook_payloads(cls, payloads: Iterable[str | bytes], signature: Optional[str] = None, use_numpy: Optional[bool] = None) -> "MovieBatch":
+        """
+        Build a batch from webhook payloads without creating Movie objects.
+
+        Args:
+            payloads (Iterable[str | bytes]): Webhook request bodies or lines of an NDJSON archive.
+            signature (Optional[str]): Signature for verification. If None, signatures are not verified. Default is None.
+            use_numpy (Optional[bool]): Use NumPy arrays. If None, NumPy is used when installed. Default is None.
+
+        Returns:
+            MovieBatch: New batch.
+        """
+        return cls.from_dicts(_payload_objects(payloads, "movie", signature), use_numpy)
+
+    @classmethod
+    def from_movies(cls, movies: Iterable[Movie], use_numpy: Optional[bool] = None) -> "MovieBatch":
+        """
+        Build a batch from Movie objects.
+
+        Args:
+            movies (Iterable[Movie]): Movie objects.
+            use_numpy (Optional[bool]): Use NumPy arrays. If None, NumPy is used when installed. Default is None.
+
+        Returns:
+            MovieBatch: New batch.
+        """
+        return cls._from_rows(movies, operator.attrgetter, use_numpy)
+
+    @classmethod
+    def concat(cls, batches: Iterable["MovieBatch"]) -> "MovieBatch":
+        """
+        Join batches, e.g. the chunks of a replayed archive.
+
+        Args:
+            batches (Iterable[MovieBatch]): Batches with the same backend.
+
+        Returns:
+            MovieBatch: New batch.
+        """
+        batches = list(batches)
+        if not batches:
+            return cls.from_dicts([])
+        use_numpy = batches[0]._np
+        codes: dict[str, int] = {}
+        parts: dict[str, list[Any]] = {name: [] for name in batches[0]._columns}
+        for batch in batches:
+            remap = [codes.setdefault(user_id, len(codes)) for user_id in batch.users]
+            for name, column in batch._columns.items():
+                if name == "user_code":
+                    column = np.asarray(remap, dtype=np.int64)[column] if use_numpy else array("q", map(remap.__getitem__, column))
+                parts[name].append(column)
+        if use_numpy:
+            columns = {name: np.concatenate(part) for name, part in parts.items()}
+        else:
+            columns = {name: array(part[0].typecode, itertools.chain.from_iterable(part)) if isinstance(part[0], array) else list(itertools.chain.from_iterable(part)) for name, part in parts.items()}
+        return cls(columns, use_numpy, list(codes))
+
+    def column(self, name: str) -> Any:
+        """
+        Get a column. user_id is decoded from the user codes on every call.
+
+        Args:
+            name (str): Column name.
+
+        Returns:
+            Any: NumPy array, array.array or list. Do not modify it in place.
+        """
+        if name == "user_id":
+            if self._np:
+                return np.asarray(self.users, dtype=object)[self._columns["user_code"]] if self.users else np.empty(len(self), dtype=object)
+            return [self.users[code] for code in self._columns["user_code"]]
+        return super().column(name)
+
+    def where(self, name: str, op: str, value: Any) -> Any:
+        """
+        Compare a column with a value. user_id supports "==", "!=" and "in" and is compared by code.
+
+        Args:
+            name (str): Column name.
+            op (str): One of "==", "!=", "<", "<=", ">", ">=" or "in". For "in", value is a collection.
+            value (Any): Value to compare with.
+
+        Returns:
+            Any: Mask to pass to filter.
+        """
+        if name != "user_id" or op not in ("==", "!=", "in"):
+            return super().where(name, op, value)
+        wanted = {code for code, user_id in enumerate(self.users) if (user_id in value if op == "in" else user_id == value)}
+        codes = self._columns["user_code"]
+        if self._np:
+            mask = np.isin(codes, list(wanted))
+            return ~mask if op == "!=" else mask
+        if op == "!=":
+            return [code not in wanted for code in codes]
+        return [code in wanted for code in codes]
+
+    def group_by_user(self, name: Optional[str] = None, func: str = "sum") -> dict[str, int | float]:
+        """
+        Aggregate a numeric column per broadcaster.
+
+        Args:
+            name (Optional[str]): Integer or boolean column name. Not used for "count". Default is None.
+            func (str): "sum", "min", "max", "mean" or "count". Default is "sum".
+
+        Returns:
+            dict[str, int | float]: User ID to aggregated value, for users with at least one row.
+        """
+        if func not in _AGGREGATES:
+            raise ValueError(f"Invalid aggregate: {func}")
+        if func != "count" and name not in self._INT_COLUMNS and name not in self._BOOL_COLUMNS:
+            raise ValueError(f"{name} is not a numeric column.")
+        codes = self._columns["user_code"]
+        # 空のバッチでは reduceat や max が使えない
+        if len(codes) == 0:
+            return {}
+        if self._np:
+            return self._group_by_user_numpy(codes, name, func)
+        counts = [0] * len(self.users)
+        for code in codes:
+            counts[code] += 1
+        if func == "count":
+            return {user_id: count for user_id, count in zip(self.users, counts) if count}
+        column = self._columns[name]
+        if func in ("sum", "mean"):
+            totals = [0] * len(self.users)
+            for code, value in zip(codes, column):
+                totals[code] += value
+            if func == "mean":
+                return {user_id: total / count for user_id, total, count in zip(self.users, totals, counts) if count}
+            return {user_id: total for user_id, total, count in zip(self.users, totals, counts) if count}
+        better = operator.gt if func == "max" else operator.lt
+        extremes: list[Optional[int]] = [None] * len(self.users)
+        for code, value in zip(codes, column):
+            current = extremes[code]
+            if current is None or better(value, current):
+                extremes[code] = value
+        return {user_id: value for user_id, value in zip(self.users, extremes) if value is not None}
+
+    def _group_by_user_numpy(self, codes: Any, name: Optional[str], func: str) -> dict[str, int | float]:
+        """
+        group_by_user with NumPy.
+
+        Args:
+            codes (Any): user_code column.
+            name (Optional[str]): Column name.
+            func (str): Aggregate.
+
+        Returns:
+            dict[str, int | float]: User ID to aggregated value.
+        """
+        counts = np.bincount(codes, minlength=len(self.users))
+        present = np.flatnonzero(counts)
+        if func == "count":
+            values = counts[present]
+        elif func in ("sum", "mean") and len(codes) * int(np.abs(self._columns[name]).max()) < 2 ** 53:
+            # float64 で誤差なく足せる範囲なら bincount が最も速い
+            values = np.bincount(codes, weights=self._columns[name], minlength=len(self.users))[present]
+            values = values / counts[present] if func == "mean" else values.astype(np.int64)
+        else:
+            column = self._columns[name].astype(np.int64, copy=False)
+            # ユーザーごとに連続するよう並べ替え、区間ごとに整数のまま集計する
+            order = np.argsort(codes, kind="stable")
+            sorted_codes = codes[order]
+            starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+            reduce = np.maximum if func == "max" else np.minimum if func == "min" else np.add
+            values = reduce.reduceat(column[order], starts)
+            if func == "mean":
+                values = values / counts[present]
+        return {self.users[code]: value for code, value in zip(present.tolist(), values.tolist())}
+
+    def _cell(self, name: str, index: int) -> Any:
+        """
+        Get one value of a column, decoding user_id.
+
+        Args:
+            name (str): Column name.
+            index (int): Row index.
+
+        Returns:
+            Any: Stored value.
+        """
+        if name == "user_id":
+            return self.users[self._columns["user_code"][index]]
+        return self._columns[name][index]
+
+    def _derive(self, columns: dict[str, Any]) -> "MovieBatch":
+        """
+        Build a MovieBatch sharing the user table.
+
+        Args:
+            columns (dict[str, Any]): New columns.
+
+        Returns:
+            MovieBatch: New batch.
+        """
+        return MovieBatch(columns, self._np, self.users)
+
+class UserBatch(_ColumnBatch):
+    """
+    Columnar container for many users.
+
+    Stores id, screen_id, last_movie_id, is_live, level, supporter_count and
+    supporting_count. Missing last_movie_id values are stored as "".
+    """
+
+    _STR_COLUMNS = ("id", "screen_id", "last_movie_id")
+    _BOOL_COLUMNS = ("is_live",)
+    _INT_COLUMNS = ("level", "supporter_count", "supporting_count")
+
+    @classmethod
+    def from_dicts(cls, users: Iterable[dict], use_numpy: Optional[bool] = None) -> "UserBatch":
+        """
+        Build a batch from user objects of API responses or webhook broadcasters.
+
+        supporter_count and supporting_count are read from the user object and
+        default to 0; use from_responses for the users endpoint, which returns
+        them next to the user object.
+
+        Args:
+            users (Iterable[dict]): User objects.
+            use_numpy (Optional[bool]): Use NumPy arrays. If None, NumPy is used when installed. Default is None.
+
+        Returns:
+            UserBatch: New batch.
+        """
+        return cls._from_rows(users, _dict_field, use_numpy)
+
+    @classmethod
+    def from_responses(cls, responses: Iterable[dict], use_numpy: Optional[bool] = None) -> "UserBatch":
+        """
+        Build a batch from decoded responses of the users endpoint.
+
+        Args:
+            responses (Iterable[dict]): Responses with "user", "supporter_count" and "supporting_count".
+            use_numpy (Optional[bool]): Use NumPy arrays. If None, NumPy is used when installed. Default is None.
+
+        Returns:
+            UserBatch: New batch.
+        """
+        return cls.from_dicts(({**data.get("user", {}), "supporter_count": data.get("supporter_count", 0), "supporting_count": data.get("supporting_count", 0)} for data in responses), use_numpy)
+
+    @classmethod
+    def from_webhook_payloads(cls, payloads: Iterable[str | bytes], signature: Optional[str] = None, use_numpy: Optional[bool] = None) -> "UserBatch":
+        """
+        Build a batch from the broadcasters of webhook payloads without creating User objects.
+
+        Args:
+            payloads (Iterable[str | bytes]): Webhook request bodies or lines of an NDJSON archive.
+            signature (Optional[str]): Signature for verification. If None, signatures are not verified. Default is None.
+            use_numpy (Optional[bool]): Use NumPy arrays. If None, NumPy is used when installed. Default is None.
+
+        Returns:
+            UserBatch: New batch.
+        """
+        return cls.from_dicts(_payload_objects(payloads, "broadcaster", signature), use_numpy)
+
+    @classmethod
+    def from_users(cls, users: Iterable[User], use_numpy: Optional[bool] = None) -> "UserBatch":
+        """
+        Build a batch from User objects. supporter_count and supporting_count are 0.
+
+        Args:
+            users (Iterable[User]): User objects.
+            use_numpy (Optional[bool]): Use NumPy arrays. If None, NumPy is used when installed. Default is None.
+
+        Returns:
+            UserBatch: New batch.
+        """
+        return cls._from_rows(users, lambda name: operator.attrgetter(name) if name in User.__slots__ else lambda user: 0, use_numpy)
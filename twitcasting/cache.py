@@ -0,0 +1,214 @@
+import copy, hashlib, threading, time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional, Never
+
+from .exceptions import TwitCastingNotFoundException
+
+class ResponseCache:
+    """
+    In-process TTL + LRU cache for API responses.
+
+    Entries are keyed by ``(endpoint, user_id, credential)``. Each endpoint has its
+    own TTL, and the exceptions listed in ``negative_exceptions`` are cached as
+    well so repeated lookups of a missing user do not hit the API. The cache is
+    thread-safe.
+    """
+
+    DEFAULT_TTLS: dict[str, float] = {
+        "users": 60.0,
+        "verify_credentials": 300.0,
+    }
+
+    def __init__(self, maxsize: int = 1024, ttls: Optional[dict[str, float]] = None, default_ttl: float = 60.0, negative_ttl: float = 30.0, negative_exceptions: tuple[type[Exception], ...] = (TwitCastingNotFoundException,), clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Initialize the ResponseCache object.
+
+        Args:
+            maxsize (int): Maximum number of entries. The least recently used entry is evicted first. Default is 1024.
+            ttls (Optional[dict[str, float]]): TTL in seconds per endpoint. Merged over DEFAULT_TTLS. Default is None.
+            default_ttl (float): TTL in seconds for endpoints not in ttls. Default is 60.0.
+            negative_ttl (float): TTL in seconds for cached exceptions. Default is 30.0.
+            negative_exceptions (tuple[type[Exception], ...]): Exceptions to cache. Default is (TwitCastingNotFoundException,).
+            clock (Callable[[], float]): Monotonic clock. Default is time.monotonic.
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be 1 or greater.")
+        self.maxsize = maxsize
+        self.ttls = {**self.DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.negative_ttl = negative_ttl
+        self.negative_exceptions = negative_exceptions
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, str, str], tuple[float, Any, Optional[Exception]]] = OrderedDict()
+
+    def __repr__(self) -> str:
+        """
+        String representation of the ResponseCache object.
+
+        Returns:
+            str: String representation of the ResponseCache object.
+        """
+        return f"ResponseCache(maxsize={self.maxsize}, size={len(self)}, hits={self.hits}, misses={self.misses}, evictions={self.evictions})"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(endpoint: str, user_id: str, credential: str) -> tuple[str, str, str]:
+        """
+        Build a cache key. The credential is stored as a digest only.
+
+        Args:
+            endpoint (str): Endpoint name, e.g. "users".
+            user_id (str): User ID. Empty for endpoints without one.
+            credential (str): Authorization header value.
+
+        Returns:
+            tuple[str, str, str]: Cache key.
+        """
+        return endpoint, user_id, hashlib.sha256(credential.encode()).hexdigest()
+
+    def stats(self) -> dict[str, int]:
+        """
+        Get the cache counters.
+
+        Returns:
+            dict[str, int]: hits, misses, evictions and current size.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self._entries)}
+
+    def clear(self) -> None:
+        """
+        Remove every entry. Counters are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def invalidate(self, endpoint: str, user_id: str, credential: str) -> None:
+        """
+        Remove one entry.
+
+        Args:
+            endpoint (str): Endpoint name.
+            user_id (str): User ID.
+            credential (str): Authorization header value.
+        """
+        with self._lock:
+            self._entries.pop(self.make_key(endpoint, user_id, credential), None)
+
+    def _lookup(self, key: tuple[str, str, str]) -> Optional[tuple[Any, Optional[Exception]]]:
+        """
+        Look up a live entry and count the hit or miss.
+
+        Args:
+            key (tuple[str, str, str]): Cache key.
+
+        Returns:
+            Optional[tuple[Any, Optional[Exception]]]: Cached value and exception, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value, error = entry
+                if expires_at > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value, error
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def _store(self, key: tuple[str, str, str], value: Any, error: Optional[Exception], ttl: float) -> None:
+        """
+        Store an entry, evicting the least recently used ones over maxsize.
+
+        Args:
+            key (tuple[str, str, str]): Cache key.
+            value (Any): Value to cache.
+            error (Optional[Exception]): Exception to cache instead of a value.
+            ttl (float): TTL in seconds.
+        """
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, value, error)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _store_error(self, key: tuple[str, str, str], e: Exception) -> None:
+        """
+        Store an exception for negative caching.
+
+        Args:
+            key (tuple[str, str, str]): Cache key.
+            e (Exception): Raised exception.
+        """
+        # traceback を保持しないよう複製を保存する
+        error = copy.copy(e)
+        error.__traceback__ = None
+        self._store(key, None, error, self.negative_ttl)
+
+    def get_or_fetch(self, endpoint: str, user_id: str, credential: str, fetch: Callable[[], Any]) -> Any | Never:
+        """
+        Return the cached response, or call fetch and cache its result.
+
+        Args:
+            endpoint (str): Endpoint name, e.g. "users".
+            user_id (str): User ID. Empty for endpoints without one.
+            credential (str): Authorization header value.
+            fetch (Callable[[], Any]): Function performing the request.
+
+        Returns:
+            Any: Cached or fetched response.
+            Never: Re-raises a cached exception or the exception raised by fetch.
+        """
+        key = self.make_key(endpoint, user_id, credential)
+        cached = self._lookup(key)
+        if cached is not None:
+            value, error = cached
+            if error is not None:
+                raise copy.copy(error)
+            return value
+        try:
+            value = fetch()
+        except self.negative_exceptions as e:
+            self._store_error(key, e)
+            raise
+        self._store(key, value, None, self.ttls.get(endpoint, self.default_ttl))
+        return value
+
+    async def get_or_fetch_async(self, endpoint: str, user_id: str, credential: str, fetch: Callable[[], Awaitable[Any]]) -> Any | Never:
+        """
+        Coroutine version of get_or_fetch.
+
+        Args:
+            endpoint (str): Endpoint name, e.g. "users".
+            user_id (str): User ID. Empty for endpoints without one.
+            credential (str): Authorization header value.
+            fetch (Callable[[], Awaitable[Any]]): Coroutine function performing the request.
+
+        Returns:
+            Any: Cached or fetched response.
+            Never: Re-raises a cached exception or the exception raised by fetch.
+        """
+        key = self.make_key(endpoint, user_id, credential)
+        cached = self._lookup(key)
+        if cached is not None:
+            value, error = cached
+            if error is not None:
+                raise copy.copy(error)
+            return value
+        try:
+            value = await fetch()
+        except self.negative_exceptions as e:
+            self._store_error(key, e)
+            raise
+        self._store(key, value, None, self.ttls.get(endpoint, self.default_ttl))
+        return value
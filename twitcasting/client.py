@@ -0,0 +1,829 @@
+import base64, io, json, socket, ssl, threading, time, zlib
+import http.client
+import urllib.request, urllib.error
+from collections import deque
+from email.message import Message
+from typing import Iterable, Iterator, Mapping, Optional, Never
+from urllib.parse import urlsplit
+
+from .exceptions import TwitCastingException, TwitCastingExecutionCountLimitationException, TwitCastingNetworkException, build_exception, raise_for_error
+from . import instrumentation
+from .instrumentation import RequestInfo
+from .ratelimit import RateLimitScheduler
+from .retry import CircuitBreaker, RetryPolicy, call_with_retry
+from .singleflight import SingleFlight
+
+API_BASE_URL = "https://apiv2.twitcasting.tv"
+
+# ストリーミングで読み込む単位
+CHUNK_SIZE = 65536
+
+class PooledResponse:
+    """
+    Fully read response returned by TwitCastingClient.urlopen.
+    """
+
+    def __init__(self, url: str, status: int, reason: str, headers: Message, body: bytes) -> None:
+        """
+        Initialize the PooledResponse object.
+
+        Args:
+            url (str): Requested URL.
+            status (int): HTTP status code.
+            reason (str): HTTP reason phrase.
+            headers (Message): Response headers.
+            body (bytes): Response body.
+        """
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self._body = body
+        self._offset = 0
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        """
+        Read the response body.
+
+        Args:
+            amt (Optional[int]): Maximum number of bytes to read. If None, the rest of the body is read. Default is None.
+
+        Returns:
+            bytes: Response body.
+        """
+        if amt is None:
+            body = self._body[self._offset:] if self._offset else self._body
+            self._body, self._offset = b"", 0
+            return body
+        body = self._body[self._offset:self._offset + amt]
+        self._offset += len(body)
+        return body
+
+    def getcode(self) -> int:
+        """
+        Get the HTTP status code.
+
+        Returns:
+            int: HTTP status code.
+        """
+        return self.status
+
+    def __enter__(self) -> "PooledResponse":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._body = b""
+
+class StreamingResponse:
+    """
+    Response returned by TwitCastingClient.urlopen with stream=True.
+
+    The body is read from the connection on demand; the connection goes back
+    to the pool when the body was read to the end and the response is closed.
+    """
+
+    def __init__(self, client: "TwitCastingClient", key: tuple[str, str, int], conn: http.client.HTTPConnection, response: http.client.HTTPResponse, url: str) -> None:
+        """
+        Initialize the StreamingResponse object.
+
+        Args:
+            client (TwitCastingClient): Client owning the connection.
+            key (tuple[str, str, int]): Scheme, host and port of the connection.
+            conn (http.client.HTTPConnection): Connection the response is read from.
+            response (http.client.HTTPResponse): Response with the body not read yet.
+            url (str): Requested URL.
+        """
+        self.url = url
+        self.status = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+        self._client = client
+        self._key = key
+        self._conn: Optional[http.client.HTTPConnection] = conn
+        self._response = response
+
+    def read(self, amt: Optional[int] = None) -> bytes | Never:
+        """
+        Read the response body.
+
+        Args:
+            amt (Optional[int]): Maximum number of bytes to read. If None, the rest of the body is read. Default is None.
+
+        Returns:
+            bytes: Next bytes of the body, or b"" at the end.
+        """
+        try:
+            return self._response.read(amt)
+        except (OSError, http.client.HTTPException) as e:
+            self.close()
+            raise urllib.error.URLError(e) from e
+
+    def getcode(self) -> int:
+        """
+        Get the HTTP status code.
+
+        Returns:
+            int: HTTP status code.
+        """
+        return self.status
+
+    def close(self) -> None:
+        """
+        Release the connection. It is kept alive only if the body was read to the end.
+        """
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        reusable = self._response.isclosed() and not self._response.will_close
+        if not reusable:
+            self._response.close()
+            conn.close()
+        self._client._release(self._key, conn, reusable)
+
+    def __enter__(self) -> "StreamingResponse":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+class TwitCastingClient:
+    """
+    HTTP/1.1 client that keeps persistent connections to the API in a pool.
+
+    Pass the same instance as the ``client`` argument of the endpoint functions
+    to reuse TCP/TLS connections across requests. The client is thread-safe.
+    """
+
+    def __init__(self, pool_size: int = 10, per_host_limit: int = 10, idle_timeout: float = 30.0, timeout: float = 30.0, base_url: Optional[str] = None, ssl_context: Optional[ssl.SSLContext] = None, scheduler: Optional[RateLimitScheduler] = None, retry: Optional[RetryPolicy] = None, breaker: Optional[CircuitBreaker] = None, singleflight: Optional[SingleFlight] = None) -> None:
+        """
+        Initialize the TwitCastingClient object.
+
+        Args:
+            pool_size (int): Maximum number of idle connections kept open. 0 disables keep-alive. Default is 10.
+            per_host_limit (int): Maximum number of connections used at the same time per host. Default is 10.
+            idle_timeout (float): Seconds after which an idle connection is discarded. Default is 30.0.
+            timeout (float): Socket timeout in seconds, also used when waiting for a free connection. Default is 30.0.
+            base_url (Optional[str]): Replace the scheme and host of every request, e.g. with a local mock server. Default is None.
+            ssl_context (Optional[ssl.SSLContext]): SSL context for HTTPS connections. Default is None.
+            scheduler (Optional[RateLimitScheduler]): Rate limit scheduler applied to every request. Default is None.
+            retry (Optional[RetryPolicy]): Retry policy applied to every request. Default is None.
+            breaker (Optional[CircuitBreaker]): Circuit breaker applied to every request. Default is None.
+            singleflight (Optional[SingleFlight]): Coalesces concurrent GET requests with the same URL and credential. Default is None.
+        """
+        if pool_size < 0:
+            raise ValueError("pool_size must be 0 or greater.")
+        if per_host_limit < 1:
+            raise ValueError("per_host_limit must be 1 or greater.")
+        self.pool_size = pool_size
+        self.per_host_limit = per_host_limit
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self._ssl_context = ssl_context
+        self.scheduler = scheduler
+        self.retry = retry
+        self.breaker = breaker
+        self.singleflight = singleflight
+        self._lock = threading.Lock()
+        self._idle: dict[tuple[str, str, int], deque[tuple[http.client.HTTPConnection, float]]] = {}
+        self._idle_count = 0
+        self._host_slots: dict[tuple[str, str, int], threading.BoundedSemaphore] = {}
+        self._closed = False
+
+    def __repr__(self) -> str:
+        """
+        String representation of the TwitCastingClient object.
+
+        Returns:
+            str: String representation of the TwitCastingClient object.
+        """
+        return f"TwitCastingClient(pool_size={self.pool_size}, per_host_limit={self.per_host_limit}, idle_timeout={self.idle_timeout}, timeout={self.timeout}, base_url={self.base_url})"
+
+    def __enter__(self) -> "TwitCastingClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close every idle connection. Connections in use are closed when they are released.
+        """
+        with self._lock:
+            self._closed = True
+            idle = [conn for connections in self._idle.values() for conn, _ in connections]
+            self._idle.clear()
+            self._idle_count = 0
+        for conn in idle:
+            conn.close()
+
+    def _rewrite_url(self, url: str) -> str:
+        """
+        Apply base_url to a request URL.
+
+        Args:
+            url (str): Original URL.
+
+        Returns:
+            str: URL to connect to.
+        """
+        if self.base_url is None:
+            return url
+        parts = urlsplit(url)
+        return self.base_url + url[len(f"{parts.scheme}://{parts.netloc}"):]
+
+    def _new_connection(self, scheme: str, host: str, port: int) -> http.client.HTTPConnection:
+        """
+        Open a new connection.
+
+        Args:
+            scheme (str): "http" or "https".
+            host (str): Host name.
+            port (int): Port number.
+
+        Returns:
+            http.client.HTTPConnection: New connection.
+        """
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout, context=self._ssl_context)
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    def _acquire(self, key: tuple[str, str, int]) -> tuple[http.client.HTTPConnection, bool] | Never:
+        """
+        Take a connection for a host out of the pool, or open a new one.
+
+        Args:
+            key (tuple[str, str, int]): Scheme, host and port.
+
+        Returns:
+            http.client.HTTPConnection: Connection.
+            bool: Whether the connection was reused from the pool.
+        """
+        with self._lock:
+            if self._closed:
+                raise urllib.error.URLError("client is closed")
+            slots = self._host_slots.get(key)
+            if slots is None:
+                slots = self._host_slots[key] = threading.BoundedSemaphore(self.per_host_limit)
+        if not slots.acquire(timeout=self.timeout):
+            raise urllib.error.URLError(f"no free connection to {key[1]} within {self.timeout} seconds")
+        stale: list[http.client.HTTPConnection] = []
+        conn = None
+        now = time.monotonic()
+        with self._lock:
+            connections = self._idle.get(key)
+            while connections:
+                candidate, released_at = connections.pop()
+                self._idle_count -= 1
+                if now - released_at <= self.idle_timeout:
+                    conn = candidate
+                    break
+                stale.append(candidate)
+        for candidate in stale:
+            candidate.close()
+        if conn is not None:
+            return conn, True
+        return self._new_connection(*key), False
+
+    def _release(self, key: tuple[str, str, int], conn: http.client.HTTPConnection, reusable: bool) -> None:
+        """
+        Return a connection to the pool.
+
+        Args:
+            key (tuple[str, str, int]): Scheme, host and port.
+            conn (http.client.HTTPConnection): Connection.
+            reusable (bool): Whether the connection can be kept alive.
+        """
+        keep = False
+        if reusable:
+            with self._lock:
+                if not self._closed and self._idle_count < self.pool_size:
+                    self._idle.setdefault(key, deque()).append((conn, time.monotonic()))
+                    self._idle_count += 1
+                    keep = True
+        if not keep:
+            conn.close()
+        self._host_slots[key].release()
+
+    @staticmethod
+    def _connect_timed(conn: http.client.HTTPConnection, info: RequestInfo) -> None:
+        """
+        Open a connection, recording the DNS and connect (TCP and TLS) times.
+
+        Args:
+            conn (http.client.HTTPConnection): Connection not connected yet.
+            info (RequestInfo): Request being measured.
+        """
+        def create_connection(address: tuple[str, int], *args, **kwargs) -> socket.socket:
+            host, port = address
+            resolve_start = time.perf_counter()
+            addresses = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+            info.dns = time.perf_counter() - resolve_start
+            error: Optional[OSError] = None
+            for *_, sockaddr in addresses:
+                try:
+                    return socket.create_connection((sockaddr[0], port), *args, **kwargs)
+                except OSError as e:
+                    error = e
+            raise error or OSError(f"no address for {host}")
+
+        conn._create_connection = create_connection
+        start = time.perf_counter()
+        conn.connect()
+        info.connect = time.perf_counter() - start - (info.dns or 0.0)
+
+    def urlopen(self, request: urllib.request.Request, stream: bool = False) -> PooledResponse | StreamingResponse | Never:
+        """
+        Send a request over a pooled connection.
+
+        Behaves like urllib.request.urlopen: HTTP errors raise urllib.error.HTTPError
+        and connection errors raise urllib.error.URLError.
+
+        Args:
+            request (urllib.request.Request): Request to send.
+            stream (bool): Return before reading the body of a successful response. Default is False.
+
+        Returns:
+            PooledResponse | StreamingResponse: Response with the body already read, or a StreamingResponse if stream is True.
+        """
+        url = self._rewrite_url(request.full_url)
+        parts = urlsplit(url)
+        scheme = parts.scheme
+        if scheme not in ("http", "https"):
+            raise urllib.error.URLError(f"unknown url type: {scheme}")
+        key = (scheme, parts.hostname or "", parts.port or (443 if scheme == "https" else 80))
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        method = request.get_method()
+        headers = dict(request.header_items())
+        conn, reused = self._acquire(key)
+        info = instrumentation.current_request()
+        try:
+            while True:
+                try:
+                    if info is not None:
+                        info.reused = reused
+                        if conn.sock is None:
+                            self._connect_timed(conn, info)
+                        sent = time.perf_counter()
+                    conn.request(method, path, body=request.data, headers=headers)
+                    response = conn.getresponse()
+                    if info is not None:
+                        info.ttfb = time.perf_counter() - sent
+                    if not stream or response.status >= 400:
+                        body = response.read()
+                    break
+                except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                    # サーバー側で切断された keep-alive 接続は一度だけ張り直す
+                    if not reused:
+                        raise
+                    conn.close()
+                    conn, reused = self._new_connection(*key), False
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            self._release(key, conn, False)
+            raise urllib.error.URLError(e) from e
+        if stream and response.status < 400:
+            return StreamingResponse(self, key, conn, response, url)
+        self._release(key, conn, not response.will_close)
+        if response.status >= 400:
+            raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, io.BytesIO(body))
+        return PooledResponse(url, response.status, response.reason, response.headers, body)
+
+def build_headers(authorization_mode: str, access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None) -> dict[str, str] | Never:
+    """
+    Build the request headers for an authorization mode.
+
+    Args:
+        authorization_mode (str): Authorization mode.
+            - "bearer" for Access token
+            - "basic" for Client ID and Client Secret
+        access_token (Optional[str]): Access token. Default is None.
+        client_id (Optional[str]): Client ID. Default is None.
+        client_secret (Optional[str]): Client secret. Default is None.
+
+    Returns:
+        dict[str, str]: Request headers.
+    """
+    match authorization_mode:
+        case 'basic':
+            if client_id is None or client_secret is None:
+                raise ValueError("client_id and client_secret must be provided for basic authorization.")
+            headers = {
+                'Authorization': 'Basic ' + base64.b64encode(f"{client_id}:{client_secret}".encode()).decode(),
+            }
+        case 'bearer':
+            if access_token is None:
+                raise ValueError("access_token must be provided for bearer authorization.")
+            headers = {
+                'Authorization': 'Bearer ' + access_token,
+            }
+        case _:
+            raise ValueError("Invalid authorization mode. Use 'basic' or 'bearer'.")
+    headers['Accept'] = 'application/json'
+    headers['Accept-Encoding'] = 'gzip, deflate'
+    headers['X-Api-Version'] = '2.0'
+    return headers
+
+def decompress(chunks: Iterable[bytes], encoding: Optional[str]) -> Iterator[bytes] | Never:
+    """
+    Decompress a response body chunk by chunk.
+
+    Args:
+        chunks (Iterable[bytes]): Body as received.
+        encoding (Optional[str]): Content-Encoding of the response: "gzip", "deflate", "identity" or None.
+
+    Yields:
+        bytes: Decompressed body.
+    """
+    encoding = (encoding or "identity").strip().lower()
+    if encoding == "identity":
+        yield from chunks
+        return
+    if encoding in ("gzip", "x-gzip"):
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    elif encoding == "deflate":
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS)
+    else:
+        raise TwitCastingException(f"Unsupported Content-Encoding: {encoding}")
+    try:
+        for chunk in chunks:
+            # 圧縮率が高くても一度に展開するのは CHUNK_SIZE までにする
+            data = decompressor.decompress(chunk, CHUNK_SIZE)
+            while data:
+                yield data
+                data = decompressor.decompress(decompressor.unconsumed_tail, CHUNK_SIZE)
+        data = decompressor.flush()
+    except zlib.error as e:
+        raise TwitCastingException(f"Decompression Error: {e}") from e
+    if data:
+        yield data
+
+def iter_body(response, info: Optional[RequestInfo] = None, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes] | Never:
+    """
+    Read a response body as it arrives, decompressing gzip and deflate.
+
+    Args:
+        response: Response with read(amt) and headers, e.g. from urlopen.
+        info (Optional[RequestInfo]): Request being measured. The received bytes are added to response_bytes. Default is None.
+        chunk_size (int): Maximum bytes read at a time. Default is CHUNK_SIZE.
+
+    Yields:
+        bytes: Decompressed body.
+    """
+    def read() -> Iterator[bytes]:
+        while chunk := response.read(chunk_size):
+            if info is not None:
+                info.response_bytes += len(chunk)
+            yield chunk
+
+    return decompress(read(), response.headers.get("Content-Encoding"))
+
+def _read_body(response, info: Optional[RequestInfo]) -> bytes | Never:
+    """
+    Read a whole response body, decompressing gzip and deflate.
+
+    Args:
+        response: Response with read(amt) and headers, e.g. from urlopen.
+        info (Optional[RequestInfo]): Request being measured.
+
+    Returns:
+        bytes: Decompressed body.
+    """
+    if response.headers.get("Content-Encoding") is None:
+        # 圧縮されていない応答は一度に読む
+        body = response.read()
+        if info is not None:
+            info.response_bytes += len(body)
+        return body
+    return b"".join(iter_body(response, info))
+
+def http_status_error(status: int, body: bytes = b"", headers: Optional[Mapping[str, str] | Message] = None) -> TwitCastingException:
+    """
+    Build the exception raised for an HTTP error status.
+
+    Args:
+        status (int): HTTP status code.
+        body (bytes): Response body. The TwitCasting error code is read from it if present. Default is b"".
+        headers (Optional[Mapping[str, str] | Message]): Response headers. Default is None.
+
+    Returns:
+        TwitCastingException: Exception to raise, carrying the error code, status, headers and retry_after.
+    """
+    error_code = instrumentation.error_code_from_body(body, status)
+    return build_exception(error_code if error_code is not None else status, status, headers)
+
+def _open_json(method: str, url: str, headers: Mapping[str, str], data: Optional[bytes], client: Optional[TwitCastingClient]) -> tuple[Optional[Message], dict] | Never:
+    """
+    Send a request and decode the JSON response.
+
+    Args:
+        method (str): HTTP method.
+        url (str): Request URL.
+        headers (Mapping[str, str]): Request headers.
+        data (Optional[bytes]): Request body.
+        client (Optional[TwitCastingClient]): Pooled client, or None for a one-shot connection.
+
+    Returns:
+        Optional[Message]: Response headers.
+        dict: Decoded response.
+        Never: Raises an exception if the request fails.
+    """
+    request = urllib.request.Request(url, data=data, headers=headers, method=method)
+    opener = client.urlopen if client is not None else urllib.request.urlopen
+    info = instrumentation.current_request()
+    try:
+        sent = time.perf_counter() if info is not None else 0.0
+        with opener(request) as response:
+            response_headers = response.headers
+            status = response.status
+            if info is not None:
+                info.status = status
+            body = _read_body(response, info)
+            if info is not None and info.ttfb is None:
+                info.ttfb = time.perf_counter() - sent
+            response_data = json.loads(body.decode())
+    except urllib.error.HTTPError as e:
+        raise _http_error(e, info) from e
+    except urllib.error.URLError as e:
+        raise TwitCastingNetworkException(f"URL Error: {e.reason}") from e
+    except OSError as e:
+        # 応答の読み込み中のタイムアウトは URLError にならない
+        raise TwitCastingNetworkException(f"URL Error: {e}") from e
+    except json.JSONDecodeError as e:
+        raise TwitCastingException(f"JSON Decode Error: {e.msg}") from e
+    except UnicodeDecodeError as e:
+        raise TwitCastingException(f"JSON Decode Error: {e.reason}") from e
+    if info is not None and isinstance(response_data.get("error"), dict):
+        info.error_code = response_data["error"].get("code")
+    raise_for_error(response_data, status, response_headers)
+    return response_headers, response_data
+
+def _http_error(e: urllib.error.HTTPError, info: Optional[RequestInfo]) -> TwitCastingException:
+    """
+    Build the exception of an HTTP error response and record it.
+
+    Args:
+        e (urllib.error.HTTPError): HTTP error.
+        info (Optional[RequestInfo]): Request being measured.
+
+    Returns:
+        TwitCastingException: Exception to raise.
+    """
+    try:
+        raw = e.read()
+    except OSError:
+        raw = b""
+    try:
+        body = b"".join(decompress([raw], e.headers.get("Content-Encoding")))
+    except TwitCastingException:
+        body = b""
+    if info is not None:
+        info.status = e.code
+        info.response_bytes = len(raw)
+        info.error_code = instrumentation.error_code_from_body(body, e.code)
+    return http_status_error(e.code, body, e.headers)
+
+def send_request(method: str, url: str, headers: Mapping[str, str], data: Optional[bytes] = None, client: Optional[TwitCastingClient] = None) -> dict | Never:
+    """
+    Send an API request and decode the JSON response.
+
+    Args:
+        method (str): HTTP method.
+        url (str): Request URL.
+        headers (Mapping[str, str]): Request headers.
+        data (Optional[bytes]): Request body. Default is None.
+        client (Optional[TwitCastingClient]): Pooled client. If None, a one-shot connection is used. Default is None.
+            Requests are throttled by client.scheduler and retried by client.retry
+            and client.breaker when they are set. Concurrent identical GET requests
+            share one call when client.singleflight is set. Registered
+            instrumentation hooks are notified of every attempt.
+
+    Returns:
+        dict: Decoded response.
+        Never: Raises an exception if the request fails.
+    """
+    if client is not None and client.singleflight is not None and method == "GET":
+        return client.singleflight.do((url, headers.get("Authorization")), lambda: _send_with_retry(method, url, headers, data, client))
+    return _send_with_retry(method, url, headers, data, client)
+
+def _send_with_retry(method: str, url: str, headers: Mapping[str, str], data: Optional[bytes], client: Optional[TwitCastingClient]) -> dict | Never:
+    """
+    Send an API request with the retry policy and the circuit breaker of the client, if any.
+
+    Args:
+        method (str): HTTP method.
+        url (str): Request URL.
+        headers (Mapping[str, str]): Request headers.
+        data (Optional[bytes]): Request body.
+        client (Optional[TwitCastingClient]): Pooled client, or None for a one-shot connection.
+
+    Returns:
+        dict: Decoded response.
+        Never: Raises an exception if the request fails.
+    """
+    retry = client.retry if client is not None else None
+    breaker = client.breaker if client is not None else None
+    if retry is None and breaker is None:
+        return _attempt(method, url, headers, data, client)
+    return call_with_retry(instrumentation.endpoint_name(url), lambda: _attempt(method, url, headers, data, client), retry, breaker)
+
+def _attempt(method: str, url: str, headers: Mapping[str, str], data: Optional[bytes], client: Optional[TwitCastingClient]) -> dict | Never:
+    """
+    Send an API request once, notifying the registered instrumentation hooks.
+
+    Args:
+        method (str): HTTP method.
+        url (str): Request URL.
+        headers (Mapping[str, str]): Request headers.
+        data (Optional[bytes]): Request body.
+        client (Optional[TwitCastingClient]): Pooled client, or None for a one-shot connection.
+
+    Returns:
+        dict: Decoded response.
+        Never: Raises an exception if the request fails.
+    """
+    if not instrumentation._hooks:
+        return _send(method, url, headers, data, client)
+    info, token = instrumentation.start_request(method, url, len(data) if data else 0)
+    try:
+        response_data = _send(method, url, headers, data, client)
+    except Exception as e:
+        instrumentation.end_request(info, token, e)
+        raise
+    instrumentation.end_request(info, token)
+    return response_data
+
+def _send(method: str, url: str, headers: Mapping[str, str], data: Optional[bytes], client: Optional[TwitCastingClient]) -> dict | Never:
+    """
+    Send an API request through the rate limit scheduler of the client, if any.
+
+    Args:
+        method (str): HTTP method.
+        url (str): Request URL.
+        headers (Mapping[str, str]): Request headers.
+        data (Optional[bytes]): Request body.
+        client (Optional[TwitCastingClient]): Pooled client, or None for a one-shot connection.
+
+    Returns:
+        dict: Decoded response.
+        Never: Raises an exception if the request fails.
+    """
+    scheduler = client.scheduler if client is not None else None
+    if scheduler is None:
+        return _open_json(method, url, headers, data, client)[1]
+    credential = headers.get('Authorization', '')
+    scheduler.acquire(credential)
+    response_headers = None
+    exhausted = False
+    try:
+        response_headers, response_data = _open_json(method, url, headers, data, client)
+    except Exception as e:
+        # 失敗したリクエストでもレート制限ヘッダーは返ってくる
+        response_headers = getattr(e, "headers", None)
+        exhausted = isinstance(e, TwitCastingExecutionCountLimitationException)
+        raise
+    finally:
+        scheduler.complete(credential, response_headers, exhausted)
+    return response_data
+
+class _ResponseStream:
+    """
+    Successful response of stream_request, holding the rate limit slot and the measurement until closed.
+    """
+
+    def __init__(self, response, info: Optional[RequestInfo], scheduler: Optional[RateLimitScheduler], credential: str) -> None:
+        """
+        Initialize the _ResponseStream object.
+
+        Args:
+            response: Response with the body not read yet.
+            info (Optional[RequestInfo]): Request being measured.
+            scheduler (Optional[RateLimitScheduler]): Scheduler the request was acquired from.
+            credential (str): Authorization header value.
+        """
+        self.response = response
+        self.info = info
+        self.scheduler = scheduler
+        self.credential = credential
+
+    def close(self, error: Optional[Exception] = None) -> None:
+        """
+        Close the response and complete the request.
+
+        Args:
+            error (Optional[Exception]): Exception raised while reading the body, if any. Default is None.
+        """
+        self.response.close()
+        if self.scheduler is not None:
+            self.scheduler.complete(self.credential, self.response.headers)
+        if self.info is not None:
+            instrumentation.end_request(self.info, None, error)
+
+def _open_stream(method: str, url: str, headers: Mapping[str, str], data: Optional[bytes], client: Optional[TwitCastingClient]) -> _ResponseStream | Never:
+    """
+    Send an API request once and return as soon as the response headers are received.
+
+    Args:
+        method (str): HTTP method.
+        url (str): Request URL.
+        headers (Mapping[str, str]): Request headers.
+        data (Optional[bytes]): Request body.
+        client (Optional[TwitCastingClient]): Pooled client, or None for a one-shot connection.
+
+    Returns:
+        _ResponseStream: Response with the body not read yet.
+    """
+    info = token = None
+    if instrumentation._hooks:
+        info, token = instrumentation.start_request(method, url, len(data) if data else 0)
+    scheduler = client.scheduler if client is not None else None
+    credential = headers.get('Authorization', '')
+    request = urllib.request.Request(url, data=data, headers=headers, method=method)
+    try:
+        if scheduler is not None:
+            scheduler.acquire(credential)
+        try:
+            response = _urlopen_stream(request, client, info)
+        except Exception as e:
+            if scheduler is not None:
+                scheduler.complete(credential, getattr(e, "headers", None), isinstance(e, TwitCastingExecutionCountLimitationException))
+            raise
+    except Exception as e:
+        if info is not None:
+            instrumentation.end_request(info, token, e)
+        raise
+    if token is not None:
+        # 本文は呼び出し元のコンテキストで読まれるので、計測中のリクエストはここで外す
+        instrumentation._current_request.reset(token)
+    return _ResponseStream(response, info, scheduler, credential)
+
+def _urlopen_stream(request: urllib.request.Request, client: Optional[TwitCastingClient], info: Optional[RequestInfo]):
+    """
+    Open a request without reading the body of a successful response.
+
+    Args:
+        request (urllib.request.Request): Request to send.
+        client (Optional[TwitCastingClient]): Pooled client, or None for a one-shot connection.
+        info (Optional[RequestInfo]): Request being measured.
+
+    Returns:
+        StreamingResponse | http.client.HTTPResponse: Response with the body not read yet.
+        Never: Raises an exception if the request fails.
+    """
+    try:
+        sent = time.perf_counter() if info is not None else 0.0
+        response = client.urlopen(request, stream=True) if client is not None else urllib.request.urlopen(request)
+    except urllib.error.HTTPError as e:
+        raise _http_error(e, info) from e
+    except urllib.error.URLError as e:
+        raise TwitCastingNetworkException(f"URL Error: {e.reason}") from e
+    except OSError as e:
+        raise TwitCastingNetworkException(f"URL Error: {e}") from e
+    if info is not None:
+        info.status = response.status
+        if info.ttfb is None:
+            info.ttfb = time.perf_counter() - sent
+    return response
+
+def stream_request(method: str, url: str, headers: Mapping[str, str], data: Optional[bytes] = None, client: Optional[TwitCastingClient] = None, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes] | Never:
+    """
+    Send an API request and yield the decompressed response body as it arrives.
+
+    The request is throttled, retried and measured like send_request, except
+    that retries only happen until the response headers are received. The
+    rate limit slot and the connection are held until the body is read to the
+    end or the iterator is closed.
+
+    Args:
+        method (str): HTTP method.
+        url (str): Request URL.
+        headers (Mapping[str, str]): Request headers.
+        data (Optional[bytes]): Request body. Default is None.
+        client (Optional[TwitCastingClient]): Pooled client. If None, a one-shot connection is used. Default is None.
+        chunk_size (int): Maximum bytes read at a time. Default is CHUNK_SIZE.
+
+    Yields:
+        bytes: Decompressed body.
+    """
+    retry = client.retry if client is not None else None
+    breaker = client.breaker if client is not None else None
+    if retry is None and breaker is None:
+        stream = _open_stream(method, url, headers, data, client)
+    else:
+        stream = call_with_retry(instrumentation.endpoint_name(url), lambda: _open_stream(method, url, headers, data, client), retry, breaker)
+    error = None
+    try:
+        yield from iter_body(stream.response, stream.info, chunk_size)
+    except urllib.error.URLError as e:
+        error = TwitCastingNetworkException(f"URL Error: {e.reason}")
+        raise error from e
+    except OSError as e:
+        error = TwitCastingNetworkException(f"URL Error: {e}")
+        raise error from e
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        stream.close(error)
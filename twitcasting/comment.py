@@ -0,0 +1,169 @@
+from typing import Mapping, Optional, Never
+
+from .client import TwitCastingClient, build_headers, send_request
+from .user import User, _parse_user
+
+class Comment:
+    """
+    Comment class for TwitCasting API.
+    """
+
+    __slots__ = ("id", "movie_id", "message", "from_user", "created")
+
+    def __init__(self, id: str, movie_id: str, message: str, from_user: User, created: int) -> None:
+        """
+        Initialize the Comment object.
+
+        Args:
+            id (str): Comment ID.
+            movie_id (str): Movie ID.
+            message (str): Comment text.
+            from_user (User): Commenter.
+            created (int): Created timestamp.
+        """
+        self.id = id
+        self.movie_id = movie_id
+        self.message = message
+        self.from_user = from_user
+        self.created = created
+
+    def __repr__(self) -> str:
+        """
+        String representation of the Comment object.
+
+        Returns:
+            str: String representation of the Comment object.
+        """
+        return f"Comment(id={self.id}, movie_id={self.movie_id}, message={self.message}, from_user={self.from_user.id}, created={self.created})"
+
+    def __str__(self) -> str:
+        """
+        String representation of the Comment object.
+
+        Returns:
+            str: String representation of the Comment object.
+        """
+        return f"Comment: {self.message} (by {self.from_user.name})"
+
+    def __eq__(self, other: object) -> bool:
+        """
+        Check equality of two Comment objects.
+
+        Args:
+            other (object): Other object to compare.
+
+        Returns:
+            bool: True if equal, False otherwise.
+        """
+        if not isinstance(other, Comment):
+            return NotImplemented
+        return self.id == other.id and self.movie_id == other.movie_id and self.message == other.message and self.from_user == other.from_user and self.created == other.created
+
+    def __hash__(self) -> int:
+        """
+        Hash of the Comment object. Comment IDs are unique, so only the ID is hashed.
+
+        Returns:
+            int: Hash value.
+        """
+        return hash(self.id)
+
+    def __reduce__(self) -> tuple[type["Comment"], tuple[str, str, str, User, int]]:
+        """
+        Pickle the Comment object as its constructor arguments.
+
+        Returns:
+            tuple[type[Comment], tuple[str, str, str, User, int]]: Class and positional arguments.
+        """
+        return Comment, (self.id, self.movie_id, self.message, self.from_user, self.created)
+
+def _parse_comment(comment_data: dict, movie_id: str) -> Comment:
+    """
+    Build a Comment object from a comment object of an API response.
+
+    Args:
+        comment_data (dict): Comment object.
+        movie_id (str): Movie ID of the comment.
+
+    Returns:
+        Comment: Comment object.
+    """
+    return Comment(comment_data.get('id', ''), movie_id, comment_data.get('message', ''), _parse_user(comment_data.get('from_user', {})), comment_data.get('created', 0))
+
+def _parse_comments_response(data: dict, movie_id: str) -> tuple[int, list[Comment]]:
+    """
+    Parse the response of the comments endpoint.
+
+    Args:
+        data (dict): Decoded response.
+        movie_id (str): Requested movie ID.
+
+    Returns:
+        int: 総コメント数
+        list[Comment]: Comments, newest first.
+    """
+    #{
+    #    "movie_id": "189037369",
+    #    "all_count": 2124,
+    #    "comments": [{"id": "7134775954", "message": "モイ！", "from_user": {...}, "created": 1479579471}, ...]
+    #}
+    movie_id = str(data.get('movie_id', movie_id))
+    return data.get('all_count', 0), [_parse_comment(comment_data, movie_id) for comment_data in data.get('comments', [])]
+
+def _comments_query(offset: int, limit: int, slice_id: Optional[str]) -> str:
+    """
+    Build the query string of the comments endpoint.
+
+    Args:
+        offset (int): Offset from the newest comment. Ignored when slice_id is set.
+        limit (int): Number of comments.
+        slice_id (Optional[str]): Only comments newer than this comment ID.
+
+    Returns:
+        str: Query string.
+    """
+    if slice_id is not None:
+        return f"limit={limit}&slice_id={slice_id}"
+    return f"offset={offset}&limit={limit}"
+
+def get_comments(movie_id: str, authorization_mode: str, access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None, offset: int = 0, limit: int = 10, slice_id: Optional[str] = None, client: Optional[TwitCastingClient] = None) -> tuple[int, list[Comment]] | Never:
+    """
+    Get the comments of a movie.
+
+    Args:
+        movie_id (str): Movie ID.
+        authorization_mode (str): Authorization mode.
+        access_token (Optional[str]): Access token. Default is None.
+        client_id (Optional[str]): Client ID. Default is None.
+        client_secret (Optional[str]): Client secret. Default is None.
+        offset (int): Offset from the newest comment. Ignored when slice_id is set. Default is 0.
+        limit (int): Number of comments to retrieve (1-50). Default is 10.
+        slice_id (Optional[str]): Only retrieve comments newer than this comment ID. Default is None.
+        client (Optional[TwitCastingClient]): Pooled HTTP client. Default is None.
+
+    Returns:
+        int: 総コメント数
+        list[Comment]: Comments, newest first.
+    """
+    headers = build_headers(authorization_mode, access_token, client_id, client_secret)
+    return _request_comments(movie_id, headers, offset, limit, slice_id, client)
+
+def _request_comments(movie_id: str, headers: Mapping[str, str], offset: int = 0, limit: int = 10, slice_id: Optional[str] = None, client: Optional[TwitCastingClient] = None) -> tuple[int, list[Comment]] | Never:
+    """
+    Get the comments of a movie with prebuilt request headers.
+
+    Args:
+        movie_id (str): Movie ID.
+        headers (Mapping[str, str]): Request headers built by build_headers.
+        offset (int): Offset from the newest comment. Ignored when slice_id is set. Default is 0.
+        limit (int): Number of comments to retrieve (1-50). Default is 10.
+        slice_id (Optional[str]): Only retrieve comments newer than this comment ID. Default is None.
+        client (Optional[TwitCastingClient]): Pooled HTTP client. Default is None.
+
+    Returns:
+        int: 総コメント数
+        list[Comment]: Comments, newest first.
+    """
+    url = f"https://apiv2.twitcasting.tv/movies/{movie_id}/comments?{_comments_query(offset, limit, slice_id)}"
+    data = send_request('GET', url, headers, client=client)
+    return _parse_comments_response(data, movie_id)
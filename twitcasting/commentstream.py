@@ -0,0 +1,452 @@
+import asyncio, heapq, inspect, itertools, logging, threading, time
+from collections import deque
+from typing import TYPE_CHECKING, AsyncIterator, Awaitable, Callable, Iterable, Iterator, Optional
+
+from .client import TwitCastingClient, build_headers
+from .comment import Comment, _request_comments
+from .exceptions import TwitCastingNotFoundException
+from .ratelimit import RateLimitScheduler, PRIORITY_BACKGROUND
+
+if TYPE_CHECKING:
+    from .aio import AsyncTwitCastingClient
+
+logger = logging.getLogger(__name__)
+
+class _MovieState:
+    """
+    Polling state of one movie.
+    """
+
+    __slots__ = ("cursor", "recent", "rate", "interval", "polled_at", "due", "generation")
+
+    def __init__(self, cursor: Optional[str], buffer_size: int, interval: float, now: float) -> None:
+        """
+        Initialize the _MovieState object.
+
+        Args:
+            cursor (Optional[str]): ID of the newest comment already seen, or None.
+            buffer_size (int): Number of recent comments kept.
+            interval (float): Initial polling interval in seconds.
+            now (float): Current clock time.
+        """
+        self.cursor = cursor
+        self.recent: deque[Comment] = deque(maxlen=buffer_size)
+        self.rate = 0.0
+        self.interval = interval
+        self.polled_at: Optional[float] = None
+        self.due = now
+        self.generation = 0
+
+def comment_fetcher(authorization_mode: str, access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None, client: Optional[TwitCastingClient] = None) -> Callable[[str, Optional[str], int], list[Comment]]:
+    """
+    Build the fetch function of CommentStream from credentials.
+
+    Requests are sent with PRIORITY_BACKGROUND so that a RateLimitScheduler on
+    the client serves interactive lookups first.
+
+    Args:
+        authorization_mode (str): Authorization mode.
+        access_token (Optional[str]): Access token. Default is None.
+        client_id (Optional[str]): Client ID. Default is None.
+        client_secret (Optional[str]): Client secret. Default is None.
+        client (Optional[TwitCastingClient]): Pooled HTTP client. Default is None.
+
+    Returns:
+        Callable[[str, Optional[str], int], list[Comment]]: Function returning the comments of a movie newer than a comment ID.
+    """
+    headers = build_headers(authorization_mode, access_token, client_id, client_secret)
+
+    def fetch(movie_id: str, slice_id: Optional[str], limit: int) -> list[Comment]:
+        with RateLimitScheduler.priority(PRIORITY_BACKGROUND):
+            return _request_comments(movie_id, headers, limit=limit, slice_id=slice_id, client=client)[1]
+    return fetch
+
+def async_comment_fetcher(client: "AsyncTwitCastingClient", authorization_mode: str, access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None) -> Callable[[str, Optional[str], int], Awaitable[list[Comment]]]:
+    """
+    Build a coroutine fetch function of CommentStream from an async client and credentials.
+
+    Args:
+        client (AsyncTwitCastingClient): Async client.
+        authorization_mode (str): Authorization mode.
+        access_token (Optional[str]): Access token. Default is None.
+        client_id (Optional[str]): Client ID. Default is None.
+        client_secret (Optional[str]): Client secret. Default is None.
+
+    Returns:
+        Callable[[str, Optional[str], int], Awaitable[list[Comment]]]: Coroutine function returning the comments of a movie newer than a comment ID.
+    """
+    build_headers(authorization_mode, access_token, client_id, client_secret)
+
+    async def fetch(movie_id: str, slice_id: Optional[str], limit: int) -> list[Comment]:
+        with RateLimitScheduler.priority(PRIORITY_BACKGROUND):
+            return (await client.get_comments(movie_id, authorization_mode, access_token, client_id, client_secret, limit=limit, slice_id=slice_id))[1]
+    return fetch
+
+class CommentStream:
+    """
+    Follow the comments of many live movies.
+
+    Every movie keeps a cursor, the ID of the newest comment seen, and is
+    polled with slice_id=cursor so that a poll only returns new comments. The
+    polling interval of a movie follows its comment rate: it is polled when
+    about target_batch new comments are expected, between min_interval and
+    max_interval, and immediately again when a poll returns a full page. All
+    polls share a token bucket of requests_per_second; when more movies are due
+    than the budget allows, the most overdue go first.
+
+    New comments are returned oldest first and the last buffer_size comments
+    of every movie are kept in a ring buffer (see recent). Movies that no
+    longer exist (404) are dropped.
+    """
+
+    def __init__(self, fetch: Callable[[str, Optional[str], int], list[Comment] | Awaitable[list[Comment]]], movie_ids: Iterable[str] = (), page_size: int = 50, requests_per_second: float = 5.0, burst: int = 10, target_batch: float = 10.0, min_interval: float = 2.0, max_interval: float = 60.0, smoothing: float = 0.5, buffer_size: int = 100, clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep) -> None:
+        """
+        Initialize the CommentStream object.
+
+        Args:
+            fetch (Callable[[str, Optional[str], int], list[Comment] | Awaitable[list[Comment]]]): Function or coroutine function returning, newest first, up to limit comments of a movie newer than a comment ID (None for the latest). See comment_fetcher and async_comment_fetcher.
+            movie_ids (Iterable[str]): Movie IDs to follow. Default is ().
+            page_size (int): Number of comments per request (1-50). Default is 50.
+            requests_per_second (float): Global request budget. Default is 5.0.
+            burst (int): Maximum number of requests sent back to back. Default is 10.
+            target_batch (float): Number of new comments a poll aims to return. Default is 10.0.
+            min_interval (float): Shortest polling interval of a movie in seconds. Default is 2.0.
+            max_interval (float): Longest polling interval of a movie in seconds. Default is 60.0.
+            smoothing (float): Weight of the last poll in the comment rate (0-1). Default is 0.5.
+            buffer_size (int): Number of recent comments kept per movie. Default is 100.
+            clock (Callable[[], float]): Monotonic clock. Default is time.monotonic.
+            sleep (Callable[[float], None]): Sleep function used by run. Default is time.sleep.
+        """
+        if not 1 <= page_size <= 50:
+            raise ValueError("page_size must be between 1 and 50.")
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second must be greater than 0.")
+        if burst < 1:
+            raise ValueError("burst must be 1 or greater.")
+        if not 0 < min_interval <= max_interval:
+            raise ValueError("min_interval must be greater than 0 and not greater than max_interval.")
+        if not 0 < smoothing <= 1:
+            raise ValueError("smoothing must be greater than 0 and not greater than 1.")
+        self.fetch = fetch
+        self.page_size = page_size
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.target_batch = target_batch
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.smoothing = smoothing
+        self.buffer_size = buffer_size
+        self.call_count = 0
+        self.comment_count = 0
+        self.error_count = 0
+        self._is_coroutine = inspect.iscoroutinefunction(fetch)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._states: dict[str, _MovieState] = {}
+        self._heap: list[tuple[float, int, str, int]] = []
+        self._sequence = itertools.count()
+        self._tokens = float(burst)
+        self._refilled_at = clock()
+        for movie_id in movie_ids:
+            self.add(movie_id)
+
+    def __repr__(self) -> str:
+        """
+        String representation of the CommentStream object.
+
+        Returns:
+            str: String representation of the CommentStream object.
+        """
+        return f"CommentStream(movies={len(self._states)}, requests_per_second={self.requests_per_second}, calls={self.call_count}, comments={self.comment_count}, errors={self.error_count})"
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __contains__(self, movie_id: object) -> bool:
+        return movie_id in self._states
+
+    def stats(self) -> dict[str, int]:
+        """
+        Get the stream counters.
+
+        Returns:
+            dict[str, int]: movies, calls, comments and errors.
+        """
+        with self._lock:
+            return {"movies": len(self._states), "calls": self.call_count, "comments": self.comment_count, "errors": self.error_count}
+
+    def add(self, movie_id: str, cursor: Optional[str] = None) -> None:
+        """
+        Start following a movie. Adding a movie already followed does nothing.
+
+        Args:
+            movie_id (str): Movie ID.
+            cursor (Optional[str]): ID of the newest comment already seen, e.g. saved before a restart. If None, the first poll returns the latest page_size comments. Default is None.
+        """
+        with self._lock:
+            if movie_id in self._states:
+                return
+            now = self._clock()
+            state = self._states[movie_id] = _MovieState(cursor, self.buffer_size, self.min_interval, now)
+            self._schedule(movie_id, state, now)
+
+    def remove(self, movie_id: str) -> None:
+        """
+        Stop following a movie, e.g. once the live has ended.
+
+        Args:
+            movie_id (str): Movie ID.
+        """
+        with self._lock:
+            self._states.pop(movie_id, None)
+
+    def cursor(self, movie_id: str) -> Optional[str]:
+        """
+        Get the ID of the newest comment seen for a movie.
+
+        Args:
+            movie_id (str): Movie ID.
+
+        Returns:
+            Optional[str]: Comment ID, or None if no comment was seen or the movie is not followed.
+        """
+        with self._lock:
+            state = self._states.get(movie_id)
+            return state.cursor if state is not None else None
+
+    def recent(self, movie_id: str) -> list[Comment]:
+        """
+        Get the recent comments of a movie kept in its ring buffer.
+
+        Args:
+            movie_id (str): Movie ID.
+
+        Returns:
+            list[Comment]: Up to buffer_size comments, oldest first. Empty if the movie is not followed.
+        """
+        with self._lock:
+            state = self._states.get(movie_id)
+            return list(state.recent) if state is not None else []
+
+    def _schedule(self, movie_id: str, state: _MovieState, due: float) -> None:
+        """
+        Push the next poll of a movie. Must be called with the lock held.
+
+        Args:
+            movie_id (str): Movie ID.
+            state (_MovieState): Polling state of the movie.
+            due (float): Clock time of the next poll.
+        """
+        # 古いエントリは世代番号で無効にし、取り出した時に読み捨てる
+        state.generation += 1
+        state.due = due
+        heapq.heappush(self._heap, (due, next(self._sequence), movie_id, state.generation))
+
+    def _drop_stale(self) -> None:
+        """
+        Pop invalidated heap entries. Must be called with the lock held.
+        """
+        while self._heap:
+            _, _, movie_id, generation = self._heap[0]
+            state = self._states.get(movie_id)
+            if state is not None and state.generation == generation:
+                return
+            heapq.heappop(self._heap)
+
+    def _refill(self, now: float) -> None:
+        """
+        Refill the request budget. Must be called with the lock held.
+
+        Args:
+            now (float): Current clock time.
+        """
+        self._tokens = min(float(self.burst), self._tokens + (now - self._refilled_at) * self.requests_per_second)
+        self._refilled_at = now
+
+    def next_due(self) -> Optional[float]:
+        """
+        Get the seconds until the next poll may be sent.
+
+        Returns:
+            Optional[float]: Seconds to wait, 0 if a poll is due, or None if no movie is followed.
+        """
+        with self._lock:
+            self._drop_stale()
+            if not self._heap:
+                return None
+            now = self._clock()
+            self._refill(now)
+            token_wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.requests_per_second
+            return max(self._heap[0][0] - now, token_wait, 0.0)
+
+    def _take_due(self) -> Optional[tuple[str, _MovieState]]:
+        """
+        Pop the most overdue movie if it is due and the budget allows a request.
+
+        Returns:
+            Optional[tuple[str, _MovieState]]: Movie ID and state, or None.
+        """
+        with self._lock:
+            self._drop_stale()
+            now = self._clock()
+            if not self._heap or self._heap[0][0] > now:
+                return None
+            self._refill(now)
+            if self._tokens < 1:
+                return None
+            self._tokens -= 1
+            _, _, movie_id, _ = heapq.heappop(self._heap)
+            self.call_count += 1
+            return movie_id, self._states[movie_id]
+
+    def _update(self, movie_id: str, state: _MovieState, comments: Optional[list[Comment]], error: Optional[Exception] = None) -> list[Comment]:
+        """
+        Record the result of a poll, advance the cursor and schedule the next poll.
+
+        Args:
+            movie_id (str): Movie ID.
+            state (_MovieState): Polling state of the movie.
+            comments (Optional[list[Comment]]): Polled comments, newest first, or None if the poll failed.
+            error (Optional[Exception]): Exception raised by the poll. Default is None.
+
+        Returns:
+            list[Comment]: New comments, oldest first.
+        """
+        with self._lock:
+            if self._states.get(movie_id) is not state:
+                return []
+            now = self._clock()
+            if comments is None:
+                self.error_count += 1
+                if isinstance(error, TwitCastingNotFoundException):
+                    # 削除・非公開になった配信は追わない
+                    del self._states[movie_id]
+                    return []
+                state.interval = min(state.interval * 2, self.max_interval)
+                self._schedule(movie_id, state, now + state.interval)
+                return []
+            cursor = int(state.cursor) if state.cursor is not None else None
+            # slice_id より古いコメントが混ざっても二重に返さない
+            new = sorted((comment for comment in comments if cursor is None or int(comment.id) > cursor), key=lambda comment: int(comment.id))
+            full = len(comments) >= self.page_size and state.cursor is not None
+            if new:
+                state.cursor = new[-1].id
+                state.recent.extend(new)
+                self.comment_count += len(new)
+            first = state.polled_at is None
+            if not first and now > state.polled_at:
+                rate = len(new) / (now - state.polled_at)
+                state.rate = self.smoothing * rate + (1 - self.smoothing) * state.rate
+            state.polled_at = now
+            if full:
+                # 取りこぼさないようすぐに続きを取得する
+                self._schedule(movie_id, state, now)
+                return new
+            if first:
+                # 初回に取得した分は過去のコメントなので、速さの推定には使わない
+                state.interval = self.min_interval
+            elif state.rate > 0:
+                state.interval = self.target_batch / state.rate
+            else:
+                state.interval *= 1.5
+            state.interval = min(max(state.interval, self.min_interval), self.max_interval)
+            self._schedule(movie_id, state, now + state.interval)
+            return new
+
+    def poll_due(self) -> list[Comment]:
+        """
+        Poll every due movie the budget allows.
+
+        Returns:
+            list[Comment]: New comments, oldest first per movie.
+        """
+        if self._is_coroutine:
+            raise TypeError("poll_due requires a plain fetch function; use poll_due_async.")
+        comments: list[Comment] = []
+        while (taken := self._take_due()) is not None:
+            movie_id, state = taken
+            try:
+                polled = self.fetch(movie_id, state.cursor, self.page_size)
+            except Exception as e:
+                logger.warning("polling comments of movie %s failed: %s", movie_id, e)
+                comments.extend(self._update(movie_id, state, None, e))
+            else:
+                comments.extend(self._update(movie_id, state, polled))
+        return comments
+
+    async def _poll_async(self, movie_id: str, state: _MovieState) -> list[Comment]:
+        """
+        Poll one movie from the event loop.
+
+        Args:
+            movie_id (str): Movie ID.
+            state (_MovieState): Polling state of the movie.
+
+        Returns:
+            list[Comment]: New comments, oldest first.
+        """
+        try:
+            if self._is_coroutine:
+                polled = await self.fetch(movie_id, state.cursor, self.page_size)
+            else:
+                polled = await asyncio.to_thread(self.fetch, movie_id, state.cursor, self.page_size)
+        except Exception as e:
+            logger.warning("polling comments of movie %s failed: %s", movie_id, e)
+            return self._update(movie_id, state, None, e)
+        return self._update(movie_id, state, polled)
+
+    async def poll_due_async(self) -> list[Comment]:
+        """
+        Poll every due movie the budget allows, concurrently.
+
+        Returns:
+            list[Comment]: New comments, oldest first per movie.
+        """
+        taken: list[tuple[str, _MovieState]] = []
+        while (due := self._take_due()) is not None:
+            taken.append(due)
+        results = await asyncio.gather(*(self._poll_async(movie_id, state) for movie_id, state in taken))
+        return [comment for comments in results for comment in comments]
+
+    def run(self, stop: Optional[threading.Event] = None) -> Iterator[Comment]:
+        """
+        Poll until stopped and yield the new comments.
+
+        Args:
+            stop (Optional[threading.Event]): Event ending the loop when set. Default is None (run forever).
+
+        Yields:
+            Comment: New comment.
+        """
+        while stop is None or not stop.is_set():
+            yield from self.poll_due()
+            delay = self.next_due()
+            delay = self.min_interval if delay is None else delay
+            if stop is not None:
+                stop.wait(delay)
+            else:
+                self._sleep(delay)
+
+    async def run_async(self, stop: Optional[asyncio.Event] = None) -> AsyncIterator[Comment]:
+        """
+        Coroutine version of run.
+
+        Args:
+            stop (Optional[asyncio.Event]): Event ending the loop when set. Default is None (run forever).
+
+        Yields:
+            Comment: New comment.
+        """
+        while stop is None or not stop.is_set():
+            for comment in await self.poll_due_async():
+                yield comment
+            delay = self.next_due()
+            delay = self.min_interval if delay is None else delay
+            if stop is None:
+                await asyncio.sleep(delay)
+                continue
+            try:
+                await asyncio.wait_for(stop.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,320 @@
+import abc, hashlib, math, sqlite3, threading, time
+from collections import OrderedDict
+from typing import Callable, Iterable, Iterator, Optional
+
+from .movie import Movie
+from .user import User
+
+def webhook_event_key(movie: Movie) -> str:
+    """
+    Build the deduplication key of a webhook delivery.
+
+    The event is inferred from Movie.is_live: a live movie is a livestart
+    delivery, otherwise a liveend delivery.
+
+    Args:
+        movie (Movie): Movie of the delivery.
+
+    Returns:
+        str: "<movie id>:livestart" or "<movie id>:liveend".
+    """
+    return f"{movie.id}:{'livestart' if movie.is_live else 'liveend'}"
+
+class DedupBackend(abc.ABC):
+    """
+    Base class of the stores remembering which deliveries were already seen.
+
+    blocking tells whether check_and_add may wait on I/O or on other
+    processes. WebhookReceiver runs blocking backends in a thread so that the
+    event loop keeps serving other connections.
+    """
+
+    blocking = True
+
+    @abc.abstractmethod
+    def check_and_add(self, key: str, now: float) -> bool:
+        """
+        Record a key and tell whether it was already recorded within the window.
+
+        Args:
+            key (str): Deduplication key.
+            now (float): Current UNIX time.
+
+        Returns:
+            bool: True if the key was seen before, False if it is new.
+        """
+
+class LRUDedupBackend(DedupBackend):
+    """
+    In-memory store keeping the keys seen in the last window seconds, bounded to maxsize keys.
+    """
+
+    blocking = False
+
+    def __init__(self, window: float = 600.0, maxsize: int = 100000) -> None:
+        """
+        Initialize the LRUDedupBackend object.
+
+        Args:
+            window (float): Seconds a key is remembered. Default is 600.0.
+            maxsize (int): Maximum number of keys. The oldest key is forgotten first. Default is 100000.
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be 1 or greater.")
+        self.window = window
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._seen: OrderedDict[str, float] = OrderedDict()
+
+    def __repr__(self) -> str:
+        """
+        String representation of the LRUDedupBackend object.
+
+        Returns:
+            str: String representation of the LRUDedupBackend object.
+        """
+        return f"LRUDedupBackend(window={self.window}, maxsize={self.maxsize}, size={len(self._seen)})"
+
+    def check_and_add(self, key: str, now: float) -> bool:
+        with self._lock:
+            # 期限切れのキーは古い順に並んでいるので先頭から捨てる
+            while self._seen:
+                oldest_key, seen_at = next(iter(self._seen.items()))
+                if now - seen_at < self.window:
+                    break
+                del self._seen[oldest_key]
+            if key in self._seen:
+                return True
+            self._seen[key] = now
+            while len(self._seen) > self.maxsize:
+                self._seen.popitem(last=False)
+            return False
+
+class BloomDedupBackend(DedupBackend):
+    """
+    Constant-memory store based on two rotating Bloom filters.
+
+    Keys are added to the current filter and looked up in both; the filters
+    rotate every window seconds, so a key is remembered for between window and
+    2 * window seconds. False positives (a new delivery reported as a duplicate)
+    happen at roughly error_rate.
+    """
+
+    blocking = False
+
+    def __init__(self, window: float = 600.0, capacity: int = 100000, error_rate: float = 0.001) -> None:
+        """
+        Initialize the BloomDedupBackend object.
+
+        Args:
+            window (float): Seconds between filter rotations. Default is 600.0.
+            capacity (int): Expected number of keys per window. Default is 100000.
+            error_rate (float): Target false positive rate at capacity. Default is 0.001.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be 1 or greater.")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1.")
+        self.window = window
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bit_count = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.bit_count / capacity * math.log(2)))
+        self._lock = threading.Lock()
+        self._current = bytearray((self.bit_count + 7) // 8)
+        self._previous = bytearray(len(self._current))
+        self._rotated_at: Optional[float] = None
+
+    def __repr__(self) -> str:
+        """
+        String representation of the BloomDedupBackend object.
+
+        Returns:
+            str: String representation of the BloomDedupBackend object.
+        """
+        return f"BloomDedupBackend(window={self.window}, capacity={self.capacity}, error_rate={self.error_rate}, bytes={len(self._current) * 2})"
+
+    def _positions(self, key: str) -> list[int]:
+        """
+        Get the bit positions of a key (double hashing).
+
+        Args:
+            key (str): Deduplication key.
+
+        Returns:
+            list[int]: Bit positions.
+        """
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bit_count for i in range(self.hash_count)]
+
+    def check_and_add(self, key: str, now: float) -> bool:
+        positions = self._positions(key)
+        with self._lock:
+            if self._rotated_at is None:
+                self._rotated_at = now
+            elif now - self._rotated_at >= 2 * self.window:
+                self._current = bytearray(len(self._current))
+                self._previous = bytearray(len(self._current))
+                self._rotated_at = now
+            elif now - self._rotated_at >= self.window:
+                self._previous, self._current = self._current, bytearray(len(self._current))
+                self._rotated_at = now
+            current = self._current
+            previous = self._previous
+            in_current = all(current[p >> 3] & (1 << (p & 7)) for p in positions)
+            if in_current:
+                return True
+            in_previous = all(previous[p >> 3] & (1 << (p & 7)) for p in positions)
+            for p in positions:
+                current[p >> 3] |= 1 << (p & 7)
+            return in_previous
+
+class SQLiteDedupBackend(DedupBackend):
+    """
+    Store shared by several processes through a SQLite database file.
+
+    Every receiver process pointing at the same file sees the keys recorded by
+    the others. Expired keys are purged every purge_interval seconds.
+    """
+
+    def __init__(self, path: str, window: float = 600.0, purge_interval: float = 60.0, timeout: float = 5.0) -> None:
+        """
+        Initialize the SQLiteDedupBackend object.
+
+        Args:
+            path (str): Path of the database file.
+            window (float): Seconds a key is remembered. Default is 600.0.
+            purge_interval (float): Seconds between purges of expired keys. Default is 60.0.
+            timeout (float): Seconds to wait for a lock held by another process. Default is 5.0.
+        """
+        self.path = path
+        self.window = window
+        self.purge_interval = purge_interval
+        self.timeout = timeout
+        self._local = threading.local()
+        self._purged_at = 0.0
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("CREATE TABLE IF NOT EXISTS webhook_dedup (key TEXT PRIMARY KEY, seen_at REAL NOT NULL)")
+        connection.commit()
+
+    def __repr__(self) -> str:
+        """
+        String representation of the SQLiteDedupBackend object.
+
+        Returns:
+            str: String representation of the SQLiteDedupBackend object.
+        """
+        return f"SQLiteDedupBackend(path={self.path}, window={self.window})"
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Get the connection of the current thread.
+
+        Returns:
+            sqlite3.Connection: Connection.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = sqlite3.connect(self.path, timeout=self.timeout)
+        return connection
+
+    def check_and_add(self, key: str, now: float) -> bool:
+        connection = self._connection()
+        with connection:
+            if now - self._purged_at >= self.purge_interval:
+                self._purged_at = now
+                connection.execute("DELETE FROM webhook_dedup WHERE seen_at <= ?", (now - self.window,))
+            # 期限切れの行は上書きし、期限内の行が残っていれば重複とみなす
+            cursor = connection.execute(
+                "INSERT INTO webhook_dedup (key, seen_at) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET seen_at = excluded.seen_at WHERE webhook_dedup.seen_at <= ?",
+                (key, now, now - self.window),
+            )
+            return cursor.rowcount == 0
+
+    def close(self) -> None:
+        """
+        Close the connection of the current thread.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+class WebhookDeduplicator:
+    """
+    Suppress repeated deliveries of the same webhook event.
+
+    TwitCasting retries deliveries, so the same livestart/liveend of a movie can
+    arrive several times. Deliveries are keyed by movie ID and event (see
+    webhook_event_key) and checked against a backend: LRUDedupBackend (default),
+    BloomDedupBackend for constant memory, or SQLiteDedupBackend to share the
+    state between processes.
+    """
+
+    def __init__(self, backend: Optional[DedupBackend] = None, clock: Callable[[], float] = time.time) -> None:
+        """
+        Initialize the WebhookDeduplicator object.
+
+        Args:
+            backend (Optional[DedupBackend]): Store of seen keys. If None, LRUDedupBackend() is used. Default is None.
+            clock (Callable[[], float]): Clock returning UNIX time. Default is time.time.
+        """
+        self.backend = backend if backend is not None else LRUDedupBackend()
+        self.suppressed_count = 0
+        self.passed_count = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        """
+        String representation of the WebhookDeduplicator object.
+
+        Returns:
+            str: String representation of the WebhookDeduplicator object.
+        """
+        return f"WebhookDeduplicator(backend={self.backend!r}, passed={self.passed_count}, suppressed={self.suppressed_count})"
+
+    def is_duplicate(self, movie: Movie) -> bool:
+        """
+        Record a delivery and tell whether it was already seen.
+
+        Args:
+            movie (Movie): Movie of the delivery.
+
+        Returns:
+            bool: True if the delivery is a duplicate.
+        """
+        duplicate = self.backend.check_and_add(webhook_event_key(movie), self._clock())
+        with self._lock:
+            if duplicate:
+                self.suppressed_count += 1
+            else:
+                self.passed_count += 1
+        return duplicate
+
+    def filter(self, deliveries: Iterable[tuple[Movie, User]]) -> Iterator[tuple[Movie, User]]:
+        """
+        Drop duplicate deliveries from a stream of parse_webhook_data results.
+
+        Args:
+            deliveries (Iterable[tuple[Movie, User]]): Parsed deliveries.
+
+        Yields:
+            tuple[Movie, User]: Deliveries seen for the first time.
+        """
+        for movie, user in deliveries:
+            if not self.is_duplicate(movie):
+                yield movie, user
+
+    def stats(self) -> dict[str, int]:
+        """
+        Get the counters.
+
+        Returns:
+            dict[str, int]: passed and suppressed counts.
+        """
+        with self._lock:
+            return {"passed": self.passed_count, "suppressed": self.suppressed_count}
@@ -0,0 +1,153 @@
+from typing import Any, Iterable, Iterator, Optional
+
+from .user import User, _USER_DEFAULTS, _user_state
+
+class UserDelta:
+    """
+    Change of one user detected by UserSnapshotTable.
+    """
+
+    __slots__ = ("user_id", "user", "changes", "is_new")
+
+    def __init__(self, user_id: str, user: User, changes: dict[str, tuple[Any, Any]], is_new: bool) -> None:
+        """
+        Initialize the UserDelta object.
+
+        Args:
+            user_id (str): User ID.
+            user (User): Newest User object.
+            changes (dict[str, tuple[Any, Any]]): Changed field name to (old value, new value). For a new user the old values are None.
+            is_new (bool): Whether the user was not in the table before.
+        """
+        self.user_id = user_id
+        self.user = user
+        self.changes = changes
+        self.is_new = is_new
+
+    def __repr__(self) -> str:
+        """
+        String representation of the UserDelta object.
+
+        Returns:
+            str: String representation of the UserDelta object.
+        """
+        return f"UserDelta(user_id={self.user_id}, changes={self.changes}, is_new={self.is_new})"
+
+    def updates(self) -> dict[str, Any]:
+        """
+        Get the new values of the changed fields.
+
+        Returns:
+            dict[str, Any]: Changed field name to new value.
+        """
+        return {name: new for name, (_, new) in self.changes.items()}
+
+class UserSnapshotTable:
+    """
+    Latest User object per user ID, reporting only real changes.
+
+    Fresh results are compared with User.diff, which stops at User.__eq__
+    for unchanged users and only builds the per-field dict for users that
+    changed. Comparing the fields of two objects is cheaper than hashing a
+    fresh one, so fingerprints are not used here; they identify content
+    across processes, e.g. for consumers that deduplicate published deltas.
+
+    The table can be seeded from a SnapshotStore after a restart:
+    ``UserSnapshotTable(user for user, *_ in store.users())``.
+    """
+
+    def __init__(self, users: Iterable[User] = ()) -> None:
+        """
+        Initialize the UserSnapshotTable object.
+
+        Args:
+            users (Iterable[User]): Known users. They are stored without producing deltas. Default is empty.
+        """
+        self._users: dict[str, User] = {user.id: user for user in users}
+        self.ingested_count = 0
+        self.changed_count = 0
+        self.added_count = 0
+
+    def __repr__(self) -> str:
+        """
+        String representation of the UserSnapshotTable object.
+
+        Returns:
+            str: String representation of the UserSnapshotTable object.
+        """
+        return f"UserSnapshotTable(users={len(self._users)})"
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def __contains__(self, user_id: object) -> bool:
+        return user_id in self._users
+
+    def __iter__(self) -> Iterator[User]:
+        return iter(list(self._users.values()))
+
+    def get(self, user_id: str) -> Optional[User]:
+        """
+        Get the stored User object.
+
+        Args:
+            user_id (str): User ID.
+
+        Returns:
+            Optional[User]: Stored User object, or None if unknown.
+        """
+        return self._users.get(user_id)
+
+    def remove(self, user_id: str) -> Optional[User]:
+        """
+        Forget a user.
+
+        Args:
+            user_id (str): User ID.
+
+        Returns:
+            Optional[User]: Removed User object, or None if unknown.
+        """
+        return self._users.pop(user_id, None)
+
+    def stats(self) -> dict[str, int]:
+        """
+        Get the counters.
+
+        Returns:
+            dict[str, int]: ingested, changed, added, unchanged and stored counts.
+        """
+        return {
+            "ingested": self.ingested_count,
+            "changed": self.changed_count,
+            "added": self.added_count,
+            "unchanged": self.ingested_count - self.changed_count - self.added_count,
+            "stored": len(self._users),
+        }
+
+    def ingest(self, users: Iterable[User]) -> list[UserDelta]:
+        """
+        Store fresh User objects and get the deltas.
+
+        Args:
+            users (Iterable[User]): Fresh results, e.g. the users returned by get_users_info. A user appearing twice is compared with its previous entry in the same batch.
+
+        Returns:
+            list[UserDelta]: One delta per new or changed user, in input order. Unchanged users are left out.
+        """
+        deltas = []
+        for user in users:
+            self.ingested_count += 1
+            previous = self._users.get(user.id)
+            self._users[user.id] = user
+            if previous is None:
+                self.added_count += 1
+                deltas.append(UserDelta(user.id, user, {name: (None, value) for name, value in zip(_USER_DEFAULTS, _user_state(user))}, True))
+                continue
+            if previous is user:
+                continue
+            changes = previous.diff(user)
+            if changes:
+                self.changed_count += 1
+                deltas.append(UserDelta(user.id, user, changes, False))
+        return deltas
@@ -0,0 +1,407 @@
+import asyncio, concurrent.futures, inspect, logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from .movie import Movie
+from .poller import EVENT_LIVE_END, EVENT_LIVE_START
+from .user import User
+
+logger = logging.getLogger(__name__)
+
+POLICY_BLOCK = "block"
+POLICY_DROP = "drop"
+
+def webhook_event(movie: Movie) -> str:
+    """
+    Get the event type of a webhook delivery.
+
+    Webhook payloads do not carry the event name, but the movie of a livestart
+    delivery is live and the movie of a liveend delivery is not.
+
+    Args:
+        movie (Movie): Movie of the delivery.
+
+    Returns:
+        str: EVENT_LIVE_START or EVENT_LIVE_END.
+    """
+    return EVENT_LIVE_START if movie.is_live else EVENT_LIVE_END
+
+class Subscription:
+    """
+    Handler registered to a WebhookDispatcher with its own bounded queue.
+
+    Queued events are grouped by Movie.user_id. A user is handed to at most one
+    worker at a time, so events of the same user reach the handler in the order
+    they were dispatched, while events of different users run in parallel.
+
+    With POLICY_BLOCK, an event arriving while the queue is full is put in the
+    subscription's intake together with a future, and the dispatch call waits
+    on that future. Workers move intake events into the queue in arrival order
+    as room frees up. The intake holds at most one event per waiting dispatch
+    call, so memory stays bounded and the producer slows down to the pace of
+    the subscriber.
+    """
+
+    def __init__(self, handler: Callable[[Movie, User], Any | Awaitable[Any]], events: Optional[Iterable[str]] = None, user_ids: Optional[Iterable[str]] = None, queue_size: int = 100, policy: str = POLICY_BLOCK, concurrency: int = 4) -> None:
+        """
+        Initialize the Subscription object.
+
+        Args:
+            handler (Callable[[Movie, User], Any | Awaitable[Any]]): Function or coroutine function called for every matching event. Plain functions run in the dispatcher's thread pool.
+            events (Optional[Iterable[str]]): Event types to receive. If None, every event is received. Default is None.
+            user_ids (Optional[Iterable[str]]): Broadcaster user IDs to receive. If None, every user is received. Default is None.
+            queue_size (int): Maximum number of events waiting for the handler. Default is 100.
+            policy (str): POLICY_BLOCK to make dispatch wait until the queue has room, POLICY_DROP to discard events while the queue is full. Default is POLICY_BLOCK.
+            concurrency (int): Maximum number of users handled at the same time. Default is 4.
+        """
+        if queue_size < 1:
+            raise ValueError("queue_size must be 1 or greater.")
+        if concurrency < 1:
+            raise ValueError("concurrency must be 1 or greater.")
+        if policy not in (POLICY_BLOCK, POLICY_DROP):
+            raise ValueError(f"Invalid policy: {policy}")
+        self.handler = handler
+        self.events = frozenset(events) if events is not None else None
+        self.user_ids = frozenset(user_ids) if user_ids is not None else None
+        self.queue_size = queue_size
+        self.policy = policy
+        self.concurrency = concurrency
+        self.delivered_count = 0
+        self.dropped_count = 0
+        self.processed_count = 0
+        self.failed_count = 0
+        self._is_coroutine = inspect.iscoroutinefunction(handler)
+        # user_id -> 未処理のイベント。キーがあるユーザーは _ready に入っているか処理中
+        self._pending: dict[str, deque[tuple[Movie, User]]] = {}
+        self._queued = 0
+        # POLICY_BLOCK でキューが空くのを待っているイベントと、待っている dispatch に知らせる future
+        self._waiting: deque[tuple[Movie, User, asyncio.Future]] = deque()
+        self._ready: Optional[asyncio.Queue] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._worker_tasks: list[asyncio.Task] = []
+
+    def __repr__(self) -> str:
+        """
+        String representation of the Subscription object.
+
+        Returns:
+            str: String representation of the Subscription object.
+        """
+        events = sorted(self.events) if self.events is not None else None
+        return f"Subscription(handler={getattr(self.handler, '__qualname__', self.handler)}, events={events}, queue_size={self.queue_size}, policy={self.policy}, concurrency={self.concurrency})"
+
+    def matches(self, event: str, user_id: str) -> bool:
+        """
+        Check whether an event is routed to this subscription.
+
+        Args:
+            event (str): Event type.
+            user_id (str): Broadcaster user ID.
+
+        Returns:
+            bool: True if the subscription receives the event.
+        """
+        return (self.events is None or event in self.events) and (self.user_ids is None or user_id in self.user_ids)
+
+    def stats(self) -> dict[str, int]:
+        """
+        Get the delivery counters.
+
+        Returns:
+            dict[str, int]: delivered, dropped, processed, failed, queued and waiting counts.
+        """
+        return {
+            "delivered": self.delivered_count,
+            "dropped": self.dropped_count,
+            "processed": self.processed_count,
+            "failed": self.failed_count,
+            "queued": self._queued,
+            "waiting": len(self._waiting),
+        }
+
+    def _start(self, executor: Optional[ThreadPoolExecutor]) -> None:
+        """
+        Start the workers in the running event loop.
+
+        Args:
+            executor (Optional[ThreadPoolExecutor]): Thread pool for plain function handlers.
+        """
+        self._ready = asyncio.Queue()
+        self._idle = asyncio.Event()
+        if self._queued == 0:
+            self._idle.set()
+        self._worker_tasks = [asyncio.create_task(self._work(executor)) for _ in range(self.concurrency)]
+
+    async def _stop(self, drain: bool) -> None:
+        """
+        Stop the workers.
+
+        Args:
+            drain (bool): Wait until the queued events are handled.
+        """
+        if drain and self._idle is not None:
+            await self._idle.wait()
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        # 止めた後も dispatch が待ち続けないよう、待っているイベントは破棄する
+        while self._waiting:
+            _, _, waiter = self._waiting.popleft()
+            self.dropped_count += 1
+            if not waiter.done():
+                waiter.set_result(False)
+
+    def _offer(self, movie: Movie, user: User) -> bool | asyncio.Future:
+        """
+        Accept an event according to the policy without waiting.
+
+        Args:
+            movie (Movie): Movie of the event.
+            user (User): Broadcaster of the event.
+
+        Returns:
+            bool | asyncio.Future: True if queued, False if dropped. With POLICY_BLOCK and a full queue, a future resolved to True once the event is queued, or to False if the subscription stops first.
+        """
+        # 待っているイベントがあれば、追い越さないよう後ろに並べる
+        if self._queued < self.queue_size and not self._waiting:
+            self._enqueue(movie, user)
+            return True
+        if self.policy == POLICY_DROP:
+            self.dropped_count += 1
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiting.append((movie, user, waiter))
+        return waiter
+
+    def _enqueue(self, movie: Movie, user: User) -> None:
+        """
+        Put an event into the queue of its user.
+
+        Args:
+            movie (Movie): Movie of the event.
+            user (User): Broadcaster of the event.
+        """
+        self._queued += 1
+        self._idle.clear()
+        self.delivered_count += 1
+        queue = self._pending.get(movie.user_id)
+        if queue is None:
+            self._pending[movie.user_id] = deque(((movie, user),))
+            self._ready.put_nowait(movie.user_id)
+        else:
+            queue.append((movie, user))
+
+    def _admit(self) -> None:
+        """
+        Move events from the intake into the queue while it has room.
+        """
+        while self._waiting and self._queued < self.queue_size:
+            movie, user, waiter = self._waiting.popleft()
+            if waiter.done():
+                # 待っていた dispatch が取り消された
+                self.dropped_count += 1
+                continue
+            self._enqueue(movie, user)
+            waiter.set_result(True)
+
+    async def _work(self, executor: Optional[ThreadPoolExecutor]) -> None:
+        """
+        Worker taking one event of a ready user at a time.
+
+        Args:
+            executor (Optional[ThreadPoolExecutor]): Thread pool for plain function handlers.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            user_id = await self._ready.get()
+            queue = self._pending[user_id]
+            movie, user = queue.popleft()
+            try:
+                if self._is_coroutine:
+                    await self.handler(movie, user)
+                else:
+                    await loop.run_in_executor(executor, self.handler, movie, user)
+                self.processed_count += 1
+            except Exception:
+                self.failed_count += 1
+                logger.exception("subscriber %r failed for movie %s", self, movie.id)
+            finally:
+                # 同じユーザーの次のイベントは他のユーザーの後ろに並べ直す
+                if queue:
+                    self._ready.put_nowait(user_id)
+                else:
+                    del self._pending[user_id]
+                self._queued -= 1
+                self._admit()
+                if self._queued == 0:
+                    self._idle.set()
+
+class WebhookDispatcher:
+    """
+    Route webhook events to subscribed handlers.
+
+    Handlers subscribe by event type and broadcaster user ID. Each subscription
+    has a bounded queue and its own workers. With POLICY_DROP a full
+    subscriber discards the overflow. With POLICY_BLOCK dispatch first hands
+    the event to every other subscriber and then waits until the full ones
+    have room, so the producer is slowed down while the other subscribers
+    keep working on what they received. Events of the same Movie.user_id are
+    delivered to every subscriber in dispatch order.
+
+    ``dispatch`` can be passed directly as the handler of a WebhookReceiver.
+    """
+
+    def __init__(self, workers: int = 4) -> None:
+        """
+        Initialize the WebhookDispatcher object.
+
+        Args:
+            workers (int): Default concurrency of subscriptions and size of the thread pool for plain function handlers. Default is 4.
+        """
+        if workers < 1:
+            raise ValueError("workers must be 1 or greater.")
+        self.workers = workers
+        self.dispatched_count = 0
+        self.unrouted_count = 0
+        self._subscriptions: list[Subscription] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def __repr__(self) -> str:
+        """
+        String representation of the WebhookDispatcher object.
+
+        Returns:
+            str: String representation of the WebhookDispatcher object.
+        """
+        return f"WebhookDispatcher(workers={self.workers}, subscriptions={len(self._subscriptions)})"
+
+    @property
+    def subscriptions(self) -> list[Subscription]:
+        """
+        Registered subscriptions in registration order.
+        """
+        return list(self._subscriptions)
+
+    def subscribe(self, handler: Callable[[Movie, User], Any | Awaitable[Any]], events: Optional[Iterable[str]] = None, user_ids: Optional[Iterable[str]] = None, queue_size: int = 100, policy: str = POLICY_BLOCK, concurrency: Optional[int] = None) -> Subscription:
+        """
+        Register a handler.
+
+        Args:
+            handler (Callable[[Movie, User], Any | Awaitable[Any]]): Function or coroutine function called with ``(Movie, User)``.
+            events (Optional[Iterable[str]]): Event types to receive, e.g. EVENT_LIVE_START. If None, every event is received. Default is None.
+            user_ids (Optional[Iterable[str]]): Broadcaster user IDs to receive. If None, every user is received. Default is None.
+            queue_size (int): Maximum number of events waiting for the handler. Default is 100.
+            policy (str): POLICY_BLOCK or POLICY_DROP. Default is POLICY_BLOCK.
+            concurrency (Optional[int]): Maximum number of users handled at the same time. If None, workers is used. Default is None.
+
+        Returns:
+            Subscription: Registered subscription.
+        """
+        subscription = Subscription(handler, events, user_ids, queue_size, policy, concurrency or self.workers)
+        self._subscriptions.append(subscription)
+        if self._loop is not None:
+            subscription._start(self._executor)
+        return subscription
+
+    async def unsubscribe(self, subscription: Subscription, drain: bool = True) -> None:
+        """
+        Remove a subscription.
+
+        Args:
+            subscription (Subscription): Subscription returned by subscribe.
+            drain (bool): Wait until its queued events are handled. Default is True.
+        """
+        self._subscriptions.remove(subscription)
+        await subscription._stop(drain)
+
+    def stats(self) -> dict[str, int]:
+        """
+        Get the counters summed over the subscriptions.
+
+        Returns:
+            dict[str, int]: dispatched and unrouted events, plus delivered, dropped, processed, failed, queued and waiting counts.
+        """
+        totals = {"dispatched": self.dispatched_count, "unrouted": self.unrouted_count, "delivered": 0, "dropped": 0, "processed": 0, "failed": 0, "queued": 0, "waiting": 0}
+        for subscription in self._subscriptions:
+            for key, value in subscription.stats().items():
+                totals[key] += value
+        return totals
+
+    async def start(self) -> None:
+        """
+        Start the workers of every subscription in the running event loop.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="twitcasting-dispatch")
+        for subscription in self._subscriptions:
+            subscription._start(self._executor)
+
+    async def stop(self, drain: bool = True) -> None:
+        """
+        Stop the workers.
+
+        Args:
+            drain (bool): Wait until the queued events are handled. Default is True.
+        """
+        await asyncio.gather(*(subscription._stop(drain) for subscription in self._subscriptions))
+        self._loop = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def __aenter__(self) -> "WebhookDispatcher":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def dispatch(self, movie: Movie, user: User, event: Optional[str] = None) -> int:
+        """
+        Queue an event to every matching subscription.
+
+        Args:
+            movie (Movie): Movie of the event.
+            user (User): Broadcaster of the event.
+            event (Optional[str]): Event type. If None, it is derived from movie.is_live. Default is None.
+
+        Returns:
+            int: Number of subscriptions the event was queued to.
+        """
+        if self._loop is None:
+            raise RuntimeError("WebhookDispatcher is not started.")
+        if event is None:
+            event = webhook_event(movie)
+        self.dispatched_count += 1
+        targets = [subscription for subscription in self._subscriptions if subscription.matches(event, movie.user_id)]
+        if not targets:
+            self.unrouted_count += 1
+            return 0
+        results = [subscription._offer(movie, user) for subscription in targets]
+        accepted = sum(result is True for result in results)
+        waiters = [result for result in results if isinstance(result, asyncio.Future)]
+        if waiters:
+            # 他の購読者へ渡し終えてから、満杯の POLICY_BLOCK の購読者だけをまとめて待つ
+            accepted += sum(result is True for result in await asyncio.gather(*waiters))
+        return accepted
+
+    def dispatch_threadsafe(self, movie: Movie, user: User, event: Optional[str] = None) -> concurrent.futures.Future:
+        """
+        Queue an event from another thread, e.g. while replaying an archive.
+
+        Calls made from one thread keep their order.
+
+        Args:
+            movie (Movie): Movie of the event.
+            user (User): Broadcaster of the event.
+            event (Optional[str]): Event type. If None, it is derived from movie.is_live. Default is None.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the number of subscriptions the event was queued to.
+        """
+        if self._loop is None:
+            raise RuntimeError("WebhookDispatcher is not started.")
+        return asyncio.run_coroutine_threadsafe(self.dispatch(movie, user, event), self._loop)
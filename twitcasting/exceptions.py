@@ -1,59 +1,100 @@
-class TwitCastingInvailedTokenException(Exception):
+import time
+from email.message import Message
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+class TwitCastingException(Exception):
+    """
+    Base class of the exceptions raised for API errors.
+
+    Attributes:
+        code (Optional[int]): TwitCasting error code, or the HTTP status if the response had none.
+        status (Optional[int]): HTTP status of the response, or None if no response was received.
+        retry_after (Optional[float]): Seconds to wait before retrying, from Retry-After or X-RateLimit-Reset.
+        headers (Optional[Mapping[str, str] | Message]): Response headers.
+    """
+
+    def __init__(self, *args, code: Optional[int] = None, status: Optional[int] = None, retry_after: Optional[float] = None, headers: Optional[Mapping[str, str] | Message] = None) -> None:
+        """
+        Initialize the TwitCastingException object.
+
+        Args:
+            *args: Exception message.
+            code (Optional[int]): TwitCasting error code. Default is None.
+            status (Optional[int]): HTTP status. Default is None.
+            retry_after (Optional[float]): Seconds to wait before retrying. Default is None.
+            headers (Optional[Mapping[str, str] | Message]): Response headers. Default is None.
+        """
+        super().__init__(*args)
+        self.code = code
+        self.status = status
+        self.retry_after = retry_after
+        self.headers = headers
+
+class TwitCastingInvailedTokenException(TwitCastingException):
     """Exception raised for invalid token errors."""
     pass
 
-class TwitCastingValidationErrorException(Exception):
+class TwitCastingValidationErrorException(TwitCastingException):
     """Exception raised for validation errors."""
     pass
 
-class TwitCastingInvalidWebhookURLException(Exception):
+class TwitCastingInvalidWebhookURLException(TwitCastingException):
     """Exception raised for invalid webhook URL errors."""
     pass
 
-class TwitCastingExecutionCountLimitationException(Exception):
+class TwitCastingExecutionCountLimitationException(TwitCastingException):
     """Exception raised for execution count limitation errors."""
     pass
 
-class TwitCastingApplicationDisabledException(Exception):
+class TwitCastingApplicationDisabledException(TwitCastingException):
     """Exception raised for disabled application errors."""
     pass
 
-class TwitCastingProtectedException(Exception):
+class TwitCastingProtectedException(TwitCastingException):
     """Exception raised for protected content errors."""
     pass
 
-class TwitCastingDuplicateException(Exception):
+class TwitCastingDuplicateException(TwitCastingException):
     """Exception raised for duplicate comments errors."""
     pass
 
-class TwitCastingTooManyCommentsException(Exception):
+class TwitCastingTooManyCommentsException(TwitCastingException):
     """Exception raised for too many comments errors."""
     pass
 
-class TwitCastingOutOfScopeException(Exception):
+class TwitCastingOutOfScopeException(TwitCastingException):
     """Exception raised for out of scope errors."""
     pass
 
-class TwitCastingEmailUnverifiedException(Exception):
+class TwitCastingEmailUnverifiedException(TwitCastingException):
     """Exception raised for unverified email errors."""
     pass
 
-class TwitCastingBadRequestException(Exception):
+class TwitCastingBadRequestException(TwitCastingException):
     """Exception raised for bad request errors."""
     pass
 
-class TwitCastingForbiddenException(Exception):
+class TwitCastingForbiddenException(TwitCastingException):
     """Exception raised for forbidden errors."""
     pass
 
-class TwitCastingNotFoundException(Exception):
+class TwitCastingNotFoundException(TwitCastingException):
     """Exception raised for not found errors."""
     pass
 
-class TwitCastingInternalServerErrorException(Exception):
+class TwitCastingInternalServerErrorException(TwitCastingException):
     """Exception raised for internal server errors."""
     pass
 
+class TwitCastingNetworkException(TwitCastingException):
+    """Exception raised when no response was received (connection error or timeout)."""
+    pass
+
+class TwitCastingCircuitOpenException(TwitCastingException):
+    """Exception raised without sending the request while the circuit breaker of the endpoint is open."""
+    pass
+
 ERROR_CODES_DICT = {
     1000: ("Invalid Token", "アクセストークンが不正", TwitCastingInvailedTokenException),
     1001: ("Validation Error", "バリデーションエラー", TwitCastingValidationErrorException),
@@ -70,3 +111,66 @@ ERROR_CODES_DICT = {
     404: ("Not Found", "コンテンツが見つからない", TwitCastingNotFoundException),
     500: ("Internal Server Error", "その他エラー", TwitCastingInternalServerErrorException),
 }
+
+def retry_after_seconds(headers: Optional[Mapping[str, str] | Message], code: Optional[int] = None) -> Optional[float]:
+    """
+    Read how long to wait before retrying from the response headers.
+
+    Args:
+        headers (Optional[Mapping[str, str] | Message]): Response headers. Names are matched in lower case as well.
+        code (Optional[int]): Error code. For 2000 the wait until X-RateLimit-Reset is used when Retry-After is missing. Default is None.
+
+    Returns:
+        Optional[float]: Seconds to wait, or None if the headers do not tell.
+    """
+    if headers is None:
+        return None
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    if value is not None:
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            pass
+    if code == 2000:
+        reset = headers.get("X-RateLimit-Reset") or headers.get("x-ratelimit-reset")
+        try:
+            return max(float(reset) - time.time(), 0.0) if reset is not None else None
+        except ValueError:
+            return None
+    return None
+
+def build_exception(error_code: Optional[int], status: Optional[int] = None, headers: Optional[Mapping[str, str] | Message] = None) -> TwitCastingException:
+    """
+    Build the exception of an API error.
+
+    Args:
+        error_code (Optional[int]): TwitCasting error code.
+        status (Optional[int]): HTTP status of the response. Default is None.
+        headers (Optional[Mapping[str, str] | Message]): Response headers. Default is None.
+
+    Returns:
+        TwitCastingException: The exception class registered in ERROR_CODES_DICT for the error code, or TwitCastingException if unknown.
+    """
+    error_tuple: tuple = ERROR_CODES_DICT.get(error_code, ("Unknown Error", "Unknown Error", TwitCastingException))
+    exception = error_tuple[2]
+    return exception(f"Error {error_code}: {error_tuple[0]} - {error_tuple[1]}", code=error_code, status=status, retry_after=retry_after_seconds(headers, error_code), headers=headers)
+
+def raise_for_error(data: dict, status: Optional[int] = None, headers: Optional[Mapping[str, str] | Message] = None) -> None:
+    """
+    Raise the exception matching the error object of an API response, if any.
+
+    Args:
+        data (dict): Decoded JSON response.
+        status (Optional[int]): HTTP status of the response. Default is None.
+        headers (Optional[Mapping[str, str] | Message]): Response headers. Default is None.
+
+    Raises:
+        TwitCastingException: The exception class registered in ERROR_CODES_DICT for the error code.
+    """
+    error = data.get("error", None)
+    if error:
+        raise build_exception(error.get("code", None), status, headers)
@@ -0,0 +1,347 @@
+import bisect, contextvars, json, threading, time
+from typing import Optional
+from urllib.parse import urlsplit
+
+from .exceptions import ERROR_CODES_DICT
+
+class RequestInfo:
+    """
+    Measurements of one API request, passed to the hooks.
+
+    Timings are in seconds and stay None when they could not be measured:
+    dns and connect are only set when the request opened a new connection of a
+    pooled client, ttfb is the time from sending the request to the response
+    headers, and total covers the whole call including rate limit waits.
+    """
+
+    __slots__ = ("method", "url", "endpoint", "started_at", "request_bytes", "status", "error_code", "error", "response_bytes", "reused", "dns", "connect", "ttfb", "total", "_start")
+
+    def __init__(self, method: str, url: str, request_bytes: int = 0) -> None:
+        """
+        Initialize the RequestInfo object.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Request URL.
+            request_bytes (int): Size of the request body. Default is 0.
+        """
+        self.method = method
+        self.url = url
+        self.endpoint = endpoint_name(url)
+        self.started_at = time.time()
+        self.request_bytes = request_bytes
+        self.status: Optional[int] = None
+        self.error_code: Optional[int] = None
+        self.error: Optional[Exception] = None
+        self.response_bytes = 0
+        self.reused: Optional[bool] = None
+        self.dns: Optional[float] = None
+        self.connect: Optional[float] = None
+        self.ttfb: Optional[float] = None
+        self.total: Optional[float] = None
+        self._start = time.perf_counter()
+
+    def __repr__(self) -> str:
+        """
+        String representation of the RequestInfo object.
+
+        Returns:
+            str: String representation of the RequestInfo object.
+        """
+        return f"RequestInfo(method={self.method}, endpoint={self.endpoint}, status={self.status}, error_code={self.error_code}, total={self.total})"
+
+class RequestHook:
+    """
+    Base class of the objects notified of every API request.
+
+    Register an instance with add_hook. Both methods are called on the thread
+    or task sending the request, so they should return quickly.
+    """
+
+    def on_request_start(self, info: RequestInfo) -> None:
+        """
+        Called before a request is sent.
+
+        Args:
+            info (RequestInfo): Request being sent. Only method, url, endpoint and request_bytes are set.
+        """
+
+    def on_request_end(self, info: RequestInfo) -> None:
+        """
+        Called after a request completed or failed.
+
+        Args:
+            info (RequestInfo): Measurements of the request.
+        """
+
+# 登録済みのフック。送信のたびに読むので差し替え式のタプルで持つ
+_hooks: tuple[RequestHook, ...] = ()
+_hooks_lock = threading.Lock()
+_current_request: contextvars.ContextVar[Optional[RequestInfo]] = contextvars.ContextVar("twitcasting_request", default=None)
+
+def add_hook(hook: RequestHook) -> None:
+    """
+    Register a hook for every request sent by the library.
+
+    Args:
+        hook (RequestHook): Hook to register.
+    """
+    global _hooks
+    with _hooks_lock:
+        if hook not in _hooks:
+            _hooks = _hooks + (hook,)
+
+def remove_hook(hook: RequestHook) -> None:
+    """
+    Unregister a hook.
+
+    Args:
+        hook (RequestHook): Hook to unregister.
+    """
+    global _hooks
+    with _hooks_lock:
+        _hooks = tuple(h for h in _hooks if h is not hook)
+
+def hooks_enabled() -> bool:
+    """
+    Tell whether any hook is registered.
+
+    Returns:
+        bool: True if requests have to be measured.
+    """
+    return bool(_hooks)
+
+def current_request() -> Optional[RequestInfo]:
+    """
+    Get the request being measured in the current thread or task.
+
+    Returns:
+        Optional[RequestInfo]: Request, or None if no hook is registered.
+    """
+    return _current_request.get()
+
+def endpoint_name(url: str) -> str:
+    """
+    Get the endpoint name of a request URL, as used by ResponseCache.
+
+    Args:
+        url (str): Request URL, absolute or relative to the API base URL.
+
+    Returns:
+        str: First path segment, e.g. "users" for /users/{user_id}.
+    """
+    return urlsplit(url).path.lstrip("/").split("/", 1)[0]
+
+def start_request(method: str, url: str, request_bytes: int = 0) -> tuple[RequestInfo, contextvars.Token]:
+    """
+    Start measuring a request and notify the hooks.
+
+    Args:
+        method (str): HTTP method.
+        url (str): Request URL.
+        request_bytes (int): Size of the request body. Default is 0.
+
+    Returns:
+        RequestInfo: Measurements to fill in.
+        contextvars.Token: Token to pass to end_request.
+    """
+    info = RequestInfo(method, url, request_bytes)
+    for hook in _hooks:
+        hook.on_request_start(info)
+    return info, _current_request.set(info)
+
+def end_request(info: RequestInfo, token: Optional[contextvars.Token], error: Optional[Exception] = None) -> None:
+    """
+    Finish measuring a request and notify the hooks.
+
+    Args:
+        info (RequestInfo): Measurements of the request.
+        token (Optional[contextvars.Token]): Token returned by start_request, or None if it was already reset.
+        error (Optional[Exception]): Exception raised by the request, if any. Default is None.
+    """
+    if token is not None:
+        _current_request.reset(token)
+    info.total = time.perf_counter() - info._start
+    if error is not None:
+        info.error = error
+        if info.error_code is None:
+            info.error_code = _error_code(error)
+    for hook in _hooks:
+        hook.on_request_end(info)
+
+def error_code_from_body(body: bytes, status: int) -> Optional[int]:
+    """
+    Get the TwitCasting error code of an HTTP error response.
+
+    Args:
+        body (bytes): Response body.
+        status (int): HTTP status code.
+
+    Returns:
+        Optional[int]: Error code from the body, else the status if it is a known code, else None.
+    """
+    try:
+        code = json.loads(body.decode()).get("error", {}).get("code")
+    except (ValueError, AttributeError):
+        code = None
+    if isinstance(code, int):
+        return code
+    return status if status in ERROR_CODES_DICT else None
+
+# 例外クラスから TwitCasting のエラーコードを引く
+_ERROR_CODES_BY_TYPE = {exception: code for code, (_, _, exception) in ERROR_CODES_DICT.items()}
+
+def _error_code(error: Exception) -> Optional[int]:
+    """
+    Get the TwitCasting error code of an exception.
+
+    Args:
+        error (Exception): Raised exception.
+
+    Returns:
+        Optional[int]: Error code, or None if the exception is not an API error.
+    """
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        return code
+    return _ERROR_CODES_BY_TYPE.get(type(error))
+
+class MetricsAggregator(RequestHook):
+    """
+    Hook keeping request counters and latency histograms, rendered as Prometheus text.
+
+    Metrics are labelled by method and endpoint. Errors are counted per
+    TwitCasting error code with the name from ERROR_CODES_DICT.
+    """
+
+    DEFAULT_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS, prefix: str = "twitcasting") -> None:
+        """
+        Initialize the MetricsAggregator object.
+
+        Args:
+            buckets (tuple[float, ...]): Upper bounds of the histogram buckets in seconds. Default is DEFAULT_BUCKETS.
+            prefix (str): Prefix of the metric names. Default is "twitcasting".
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._requests: dict[tuple[str, str, str], int] = {}
+        self._errors: dict[tuple[str, str, str], int] = {}
+        self._bytes: dict[tuple[str, str, str], int] = {}
+        # (phase, method, endpoint) -> [バケットごとの件数..., 合計秒数, 件数]
+        self._histograms: dict[tuple[str, str, str], list[float]] = {}
+
+    def __repr__(self) -> str:
+        """
+        String representation of the MetricsAggregator object.
+
+        Returns:
+            str: String representation of the MetricsAggregator object.
+        """
+        return f"MetricsAggregator(requests={sum(self._requests.values())}, errors={sum(self._errors.values())}, in_flight={self._in_flight})"
+
+    def on_request_start(self, info: RequestInfo) -> None:
+        with self._lock:
+            self._in_flight += 1
+
+    def on_request_end(self, info: RequestInfo) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            status = str(info.status) if info.status is not None else "none"
+            key = (info.method, info.endpoint, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            if info.error_code is not None or info.error is not None:
+                code = str(info.error_code) if info.error_code is not None else "none"
+                error_key = (info.endpoint, code, ERROR_CODES_DICT.get(info.error_code, ("Unknown Error",))[0] if info.error_code is not None else type(info.error).__name__)
+                self._errors[error_key] = self._errors.get(error_key, 0) + 1
+            for direction, size in (("sent", info.request_bytes), ("received", info.response_bytes)):
+                if size:
+                    bytes_key = (direction, info.method, info.endpoint)
+                    self._bytes[bytes_key] = self._bytes.get(bytes_key, 0) + size
+            for phase, value in (("total", info.total), ("dns", info.dns), ("connect", info.connect), ("ttfb", info.ttfb)):
+                if value is not None:
+                    self._observe((phase, info.method, info.endpoint), value)
+
+    def _observe(self, key: tuple[str, str, str], value: float) -> None:
+        """
+        Add an observation to a histogram. Must be called with the lock held.
+
+        Args:
+            key (tuple[str, str, str]): Phase, method and endpoint.
+            value (float): Seconds.
+        """
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = [0.0] * (len(self.buckets) + 2)
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            histogram[index] += 1
+        histogram[-2] += value
+        histogram[-1] += 1
+
+    def snapshot(self) -> dict[str, dict]:
+        """
+        Get a copy of the counters.
+
+        Returns:
+            dict[str, dict]: requests, errors and bytes keyed by label tuples, and in_flight.
+        """
+        with self._lock:
+            return {"requests": dict(self._requests), "errors": dict(self._errors), "bytes": dict(self._bytes), "in_flight": self._in_flight}
+
+    def reset(self) -> None:
+        """
+        Clear every counter and histogram.
+        """
+        with self._lock:
+            self._requests.clear()
+            self._errors.clear()
+            self._bytes.clear()
+            self._histograms.clear()
+
+    def render(self) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: Metrics text.
+        """
+        p = self.prefix
+        lines: list[str] = []
+        with self._lock:
+            lines += [f"# HELP {p}_requests_total API requests by status.", f"# TYPE {p}_requests_total counter"]
+            for (method, endpoint, status), count in sorted(self._requests.items()):
+                lines.append(f'{p}_requests_total{{method="{method}",endpoint="{endpoint}",status="{status}"}} {count}')
+            lines += [f"# HELP {p}_request_errors_total Failed API requests by TwitCasting error code.", f"# TYPE {p}_request_errors_total counter"]
+            for (endpoint, code, name), count in sorted(self._errors.items()):
+                lines.append(f'{p}_request_errors_total{{endpoint="{endpoint}",code="{code}",name="{_escape(name)}"}} {count}')
+            lines += [f"# HELP {p}_bytes_total Request and response body bytes.", f"# TYPE {p}_bytes_total counter"]
+            for (direction, method, endpoint), size in sorted(self._bytes.items()):
+                lines.append(f'{p}_bytes_total{{direction="{direction}",method="{method}",endpoint="{endpoint}"}} {size}')
+            lines += [f"# HELP {p}_requests_in_flight API requests being sent.", f"# TYPE {p}_requests_in_flight gauge", f"{p}_requests_in_flight {self._in_flight}"]
+            lines += [f"# HELP {p}_request_duration_seconds API request latency by phase (dns, connect, ttfb, total).", f"# TYPE {p}_request_duration_seconds histogram"]
+            for (phase, method, endpoint), histogram in sorted(self._histograms.items()):
+                labels = f'phase="{phase}",method="{method}",endpoint="{endpoint}"'
+                cumulative = 0.0
+                for bound, count in zip(self.buckets, histogram):
+                    cumulative += count
+                    lines.append(f'{p}_request_duration_seconds_bucket{{{labels},le="{bound:g}"}} {cumulative:g}')
+                lines.append(f'{p}_request_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram[-1]:g}')
+                lines.append(f"{p}_request_duration_seconds_sum{{{labels}}} {histogram[-2]:.6f}")
+                lines.append(f"{p}_request_duration_seconds_count{{{labels}}} {histogram[-1]:g}")
+        return "\n".join(lines) + "\n"
+
+def _escape(value: str) -> str:
+    """
+    Escape a Prometheus label value.
+
+    Args:
+        value (str): Label value.
+
+    Returns:
+        str: Escaped value.
+    """
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,235 @@
+import codecs, json, re
+from typing import Any, Optional
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# パーサーの状態
+_START, _KEY, _NEXT, _ARRAY_FIRST, _ARRAY_ITEM, _ARRAY_NEXT, _DONE = range(7)
+
+class JSONArrayDecoder:
+    """
+    Incremental decoder of a JSON object holding one large array, e.g. the
+    ``webhooks`` of a webhook list response.
+
+    Feed the body chunk by chunk: every element of the array is returned by
+    feed as soon as it is complete, so the whole body is never held in memory.
+    The other members of the object are collected in fields; the members
+    written before the array (such as all_count) are available as soon as the
+    array starts.
+    """
+
+    def __init__(self, key: str) -> None:
+        """
+        Initialize the JSONArrayDecoder object.
+
+        Args:
+            key (str): Name of the array member to stream.
+        """
+        self.key = key
+        self.fields: dict[str, Any] = {}
+        self.array_started = False
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = _START
+        self._batch = True
+
+    def __repr__(self) -> str:
+        """
+        String representation of the JSONArrayDecoder object.
+
+        Returns:
+            str: String representation of the JSONArrayDecoder object.
+        """
+        return f"JSONArrayDecoder(key={self.key}, fields={self.fields}, buffered={len(self._buffer) - self._pos})"
+
+    def feed(self, data: bytes) -> list[Any]:
+        """
+        Decode the next chunk of the body.
+
+        Args:
+            data (bytes): Next bytes of the body.
+
+        Returns:
+            list[Any]: Array elements completed by the chunk.
+
+        Raises:
+            ValueError: If the body is not a JSON object.
+        """
+        self._buffer = self._buffer[self._pos:] + self._text.decode(data)
+        self._pos = 0
+        items: list[Any] = []
+        self._parse(items, False)
+        return items
+
+    def close(self) -> tuple[list[Any], dict[str, Any]]:
+        """
+        Finish decoding once the body is complete.
+
+        Returns:
+            list[Any]: Array elements still pending (e.g. a number at the very end).
+            dict[str, Any]: Members of the object other than the array.
+
+        Raises:
+            ValueError: If the body ended before the object was complete.
+        """
+        self._buffer = self._buffer[self._pos:] + self._text.decode(b"", True)
+        self._pos = 0
+        items: list[Any] = []
+        self._parse(items, True)
+        if self._state != _DONE:
+            raise ValueError("Incomplete JSON body")
+        return items, self.fields
+
+    def _value(self, pos: int, final: bool) -> Optional[tuple[Any, int]]:
+        """
+        Decode one JSON value.
+
+        Args:
+            pos (int): Position of the value in the buffer.
+            final (bool): Whether no more data will be fed.
+
+        Returns:
+            Optional[tuple[Any, int]]: Value and end position, or None if more data is needed.
+        """
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return None
+        # 数値はバッファの末尾で切れているかもしれない
+        if end >= len(self._buffer) and not final:
+            return None
+        return value, end
+
+    def _parse_array(self, items: list[Any], pos: int, final: bool) -> int:
+        """
+        Consume array elements as far as possible.
+
+        Args:
+            items (list[Any]): List the completed array elements are appended to.
+            pos (int): Position in the buffer.
+            final (bool): Whether no more data will be fed.
+
+        Returns:
+            int: Position after the consumed text.
+        """
+        # 要素ごとの処理が大半を占めるので、ループを分けてローカル変数で回す
+        buffer = self._buffer
+        size = len(buffer)
+        decode = self._decoder.raw_decode
+        append = items.append
+        state = self._state
+        if self._batch and state != _ARRAY_NEXT:
+            # 最後の "}," までをまとめて C のデコーダーに渡す。文字列や入れ子の中で
+            # 切れていれば不正な JSON になるので、その場合は以降 1 要素ずつ読む
+            cut = buffer.rfind("},", pos)
+            if cut >= 0:
+                try:
+                    items.extend(json.loads("[" + buffer[pos:cut + 1] + "]"))
+                except json.JSONDecodeError:
+                    self._batch = False
+                else:
+                    pos = cut + 1
+                    state = _ARRAY_NEXT
+        while True:
+            if pos < size and buffer[pos] in " \t\n\r":
+                pos = _WHITESPACE.match(buffer, pos).end()
+            if pos >= size:
+                break
+            char = buffer[pos]
+            if state == _ARRAY_NEXT:
+                if char == ",":
+                    state = _ARRAY_ITEM
+                    pos += 1
+                    continue
+                if char == "]":
+                    state = _NEXT
+                    pos += 1
+                    break
+                raise ValueError(f"Expected ',' or ']' at position {pos}")
+            if char == "]" and state == _ARRAY_FIRST:
+                state = _NEXT
+                pos += 1
+                break
+            try:
+                value, end = decode(buffer, pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                break
+            # 数値はバッファの末尾で切れているかもしれない
+            if end >= size and not final:
+                break
+            append(value)
+            pos = end
+            state = _ARRAY_NEXT
+        self._state = state
+        return pos
+
+    def _parse(self, items: list[Any], final: bool) -> None:
+        """
+        Consume the buffered text as far as possible.
+
+        Args:
+            items (list[Any]): List the completed array elements are appended to.
+            final (bool): Whether no more data will be fed.
+        """
+        buffer = self._buffer
+        while True:
+            pos = _WHITESPACE.match(buffer, self._pos).end()
+            if pos >= len(buffer):
+                self._pos = pos
+                return
+            char = buffer[pos]
+            state = self._state
+            if state == _START:
+                if char != "{":
+                    raise ValueError(f"Expected a JSON object at position {pos}")
+                self._state = _KEY
+                pos += 1
+            elif state == _KEY:
+                if char == "}":
+                    self._state = _DONE
+                    pos += 1
+                else:
+                    key = self._value(pos, final)
+                    if key is None:
+                        return
+                    colon = _WHITESPACE.match(buffer, key[1]).end()
+                    if colon >= len(buffer):
+                        return
+                    if buffer[colon] != ":":
+                        raise ValueError(f"Expected ':' at position {colon}")
+                    start = _WHITESPACE.match(buffer, colon + 1).end()
+                    if start >= len(buffer):
+                        return
+                    if key[0] == self.key and buffer[start] == "[":
+                        self.array_started = True
+                        self._state = _ARRAY_FIRST
+                        pos = start + 1
+                    else:
+                        value = self._value(start, final)
+                        if value is None:
+                            return
+                        self.fields[key[0]] = value[0]
+                        self._state = _NEXT
+                        pos = value[1]
+            elif state == _NEXT:
+                if char == ",":
+                    self._state = _KEY
+                elif char == "}":
+                    self._state = _DONE
+                else:
+                    raise ValueError(f"Expected ',' or '}}' at position {pos}")
+                pos += 1
+            elif state in (_ARRAY_FIRST, _ARRAY_ITEM, _ARRAY_NEXT):
+                pos = self._parse_array(items, pos, final)
+                if self._state != _NEXT:
+                    self._pos = pos
+                    return
+            else:
+                raise ValueError(f"Extra data at position {pos}")
+            self._pos = pos
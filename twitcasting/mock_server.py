@@ -0,0 +1,466 @@
+import gzip, json, random, re, threading, time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Sequence
+from urllib.parse import urlsplit, parse_qs
+
+from .exceptions import ERROR_CODES_DICT
+
+# API のエラーコードと返される HTTP ステータス
+ERROR_HTTP_STATUS = {1000: 401, 1001: 400, 1002: 400, 2000: 403, 2001: 403, 2002: 403, 2003: 403, 2004: 403, 2005: 403, 2006: 403, 400: 400, 403: 403, 404: 404, 500: 500}
+
+class MockTwitCastingServer:
+    """
+    Local HTTP/1.1 server that imitates the TwitCasting API for tests and benchmarks.
+
+    Serves ``/users/{id}``, ``/users/{id}/movies``, ``/movies/{id}``,
+    ``/movies/{id}/comments``, ``/verify_credentials`` and ``/webhooks``
+    (GET/POST/DELETE).
+    Point a TwitCastingClient at it with ``base_url=server.base_url``.
+
+    Every response can be delayed by latency, a share of the requests can be
+    failed with API error codes (error_rate / error_codes, or fail_next for
+    the next requests), and the size of the user payloads can be grown with
+    profile_size. Bodies are gzipped when the request accepts it.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, rate_limit: Optional[int] = None, rate_limit_window: float = 60.0, latency: float = 0.0, latency_jitter: float = 0.0, error_rate: float = 0.0, error_codes: Sequence[int] = (500,), profile_size: Optional[int] = None, seed: Optional[int] = None, compression: bool = True) -> None:
+        """
+        Initialize the MockTwitCastingServer object.
+
+        Args:
+            host (str): Host to bind. Default is "127.0.0.1".
+            port (int): Port to bind. 0 picks a free port. Default is 0.
+            rate_limit (Optional[int]): Calls allowed per window. Responses carry X-RateLimit-* headers and fail with error 2000 once exhausted. None disables the limit. Default is None.
+            rate_limit_window (float): Length of the rate limit window in seconds. Default is 60.0.
+            latency (float): Seconds added before every response. Default is 0.0.
+            latency_jitter (float): Random extra delay of up to this many seconds. Default is 0.0.
+            error_rate (float): Share of the requests failed with one of error_codes. Default is 0.0.
+            error_codes (Sequence[int]): API error codes injected by error_rate, e.g. 500 or 2000. Default is (500,).
+            profile_size (Optional[int]): Length in characters of the user profiles. None keeps the short sample profile. Default is None.
+            seed (Optional[int]): Seed of the random generator used for jitter and errors. Default is None.
+            compression (bool): Gzip the bodies of requests sending Accept-Encoding: gzip. Default is True.
+        """
+        for code in error_codes:
+            if code not in ERROR_HTTP_STATUS:
+                raise ValueError(f"Unknown error code: {code}")
+        self.host = host
+        self.port = port
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+        self._rate_limit_remaining = rate_limit or 0
+        self._rate_limit_reset = time.time() + rate_limit_window
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.error_codes = tuple(error_codes)
+        self.profile_size = profile_size
+        self.compression = compression
+        self.bytes_sent = 0
+        self.webhooks: dict[str, set[str]] = {}
+        self.movies: dict[str, list[dict]] = {}
+        self._movie_index: dict[str, dict] = {}
+        self._next_movie_id = 189000000
+        self.comments: dict[str, list[dict]] = {}
+        self._next_comment_id = 7134775000
+        self.request_count = 0
+        self.error_count = 0
+        self._random = random.Random(seed)
+        self._forced_errors: deque[int] = deque()
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def __repr__(self) -> str:
+        """
+        String representation of the MockTwitCastingServer object.
+
+        Returns:
+            str: String representation of the MockTwitCastingServer object.
+        """
+        return f"MockTwitCastingServer(host={self.host}, port={self.port})"
+
+    @property
+    def base_url(self) -> str:
+        """
+        Base URL of the running server.
+
+        Returns:
+            str: Base URL.
+        """
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> None:
+        """
+        Start serving in a background thread.
+        """
+        self._server = ThreadingHTTPServer((self.host, self.port), _make_handler(self))
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the server.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "MockTwitCastingServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def fail_next(self, code: int, count: int = 1) -> None:
+        """
+        Fail the next requests with an API error.
+
+        Args:
+            code (int): API error code, e.g. 500 or 2000.
+            count (int): Number of requests to fail. Default is 1.
+        """
+        if code not in ERROR_HTTP_STATUS:
+            raise ValueError(f"Unknown error code: {code}")
+        with self._lock:
+            self._forced_errors.extend([code] * count)
+
+    def seed_webhooks(self, count: int, events: Sequence[str] = ("livestart", "liveend")) -> None:
+        """
+        Register webhooks for count generated users, to grow the /webhooks listings.
+
+        Args:
+            count (int): Number of users.
+            events (Sequence[str]): Events registered for every user. Default is ("livestart", "liveend").
+        """
+        with self._lock:
+            for i in range(count):
+                self.webhooks.setdefault(str(1000000 + i), set()).update(events)
+
+    def seed_movies(self, user_id: str, count: int) -> list[str]:
+        """
+        Publish count movies for a user, newer than the ones already published.
+
+        Args:
+            user_id (str): User ID.
+            count (int): Number of movies.
+
+        Returns:
+            list[str]: IDs of the new movies, newest first.
+        """
+        with self._lock:
+            movies = []
+            for _ in range(count):
+                self._next_movie_id += 1
+                movie = _movie_payload(str(self._next_movie_id), user_id)
+                self._movie_index[movie["id"]] = movie
+                movies.append(movie)
+            movies.reverse()
+            self.movies[user_id] = movies + self.movies.get(user_id, [])
+            return [movie["id"] for movie in movies]
+
+    def seed_comments(self, movie_id: str, count: int) -> list[str]:
+        """
+        Post count comments to a movie, newer than the ones already posted.
+
+        Args:
+            movie_id (str): Movie ID.
+            count (int): Number of comments.
+
+        Returns:
+            list[str]: IDs of the new comments, oldest first.
+        """
+        with self._lock:
+            comments = self.comments.setdefault(movie_id, [])
+            ids = []
+            for _ in range(count):
+                self._next_comment_id += 1
+                comment_id = str(self._next_comment_id)
+                comments.append({"id": comment_id, "message": f"モイ！ {comment_id}", "from_user": _user_payload("2880417757"), "created": 1479579471 + len(comments)})
+                ids.append(comment_id)
+            return ids
+
+    def delay(self) -> float:
+        """
+        Draw the delay of a response.
+
+        Returns:
+            float: Seconds to wait before responding.
+        """
+        if not self.latency_jitter:
+            return self.latency
+        with self._lock:
+            return self.latency + self._random.uniform(0.0, self.latency_jitter)
+
+    def injected_error(self) -> Optional[int]:
+        """
+        Decide whether to fail a request.
+
+        Returns:
+            Optional[int]: API error code to answer with, or None.
+        """
+        with self._lock:
+            if self._forced_errors:
+                code = self._forced_errors.popleft()
+            elif self.error_rate and self._random.random() < self.error_rate:
+                code = self._random.choice(self.error_codes)
+            else:
+                return None
+            self.error_count += 1
+            return code
+
+    def rate_limit_headers(self) -> tuple[dict[str, str], bool]:
+        """
+        Count a call against the rate limit.
+
+        Returns:
+            dict[str, str]: X-RateLimit-* headers. Empty if the limit is disabled.
+            bool: Whether the call exceeds the limit.
+        """
+        if self.rate_limit is None:
+            return {}, False
+        with self._lock:
+            now = time.time()
+            if now >= self._rate_limit_reset:
+                self._rate_limit_remaining = self.rate_limit
+                self._rate_limit_reset = now + self.rate_limit_window
+            exceeded = self._rate_limit_remaining <= 0
+            if not exceeded:
+                self._rate_limit_remaining -= 1
+            headers = {
+                "X-RateLimit-Limit": str(self.rate_limit),
+                "X-RateLimit-Remaining": str(self._rate_limit_remaining),
+                "X-RateLimit-Reset": str(int(self._rate_limit_reset + 0.999)),
+            }
+            return headers, exceeded
+
+    def handle(self, method: str, path: str, query: dict[str, list[str]], body: bytes) -> tuple[int, dict]:
+        """
+        Build the response for a request.
+
+        Args:
+            method (str): HTTP method.
+            path (str): Request path.
+            query (dict[str, list[str]]): Parsed query string.
+            body (bytes): Request body.
+
+        Returns:
+            int: HTTP status code.
+            dict: JSON response.
+        """
+        with self._lock:
+            self.request_count += 1
+        match = re.fullmatch(r"/users/([^/]+)", path)
+        if method == "GET" and match:
+            return 200, {"supporter_count": 10, "supporting_count": 24, "user": _user_payload(match.group(1), self.profile_size)}
+        match = re.fullmatch(r"/users/([^/]+)/movies", path)
+        if method == "GET" and match:
+            limit = int(query.get("limit", ["20"])[0])
+            offset = int(query.get("offset", ["0"])[0])
+            slice_id = query.get("slice_id", [None])[0]
+            with self._lock:
+                movies = self.movies.get(match.group(1), [])
+                # slice_id を指定すると offset は無視される
+                page = [movie for movie in movies if int(movie["id"]) < int(slice_id)][:limit] if slice_id else movies[offset:offset + limit]
+                return 200, {"total_count": len(movies), "movies": page}
+        match = re.fullmatch(r"/movies/([^/]+)/comments", path)
+        if method == "GET" and match:
+            limit = int(query.get("limit", ["10"])[0])
+            offset = int(query.get("offset", ["0"])[0])
+            slice_id = query.get("slice_id", [None])[0]
+            with self._lock:
+                # 古い順に保存しているので、新しい順に並べ替えて返す
+                comments = self.comments.get(match.group(1), [])
+                if slice_id:
+                    page = [comment for comment in comments if int(comment["id"]) > int(slice_id)][:limit]
+                else:
+                    page = comments[max(len(comments) - offset - limit, 0):max(len(comments) - offset, 0)]
+                return 200, {"movie_id": match.group(1), "all_count": len(comments), "comments": page[::-1]}
+        match = re.fullmatch(r"/movies/([^/]+)", path)
+        if method == "GET" and match:
+            with self._lock:
+                movie = self._movie_index.get(match.group(1))
+            if movie is None:
+                return 404, _error_payload(404)
+            return 200, {"movie": movie, "broadcaster": _user_payload(movie["user_id"], self.profile_size), "tags": ["人気"]}
+        if method == "GET" and path == "/verify_credentials":
+            return 200, {
+                "app": {"client_id": "182224938.d37f58350925d568e2db24719fe86f7a", "name": "Mock App", "owner_user_id": "182224938"},
+                "user": _user_payload("182224938", self.profile_size),
+                "supporter_count": 10,
+                "supporting_count": 24,
+            }
+        if path == "/webhooks":
+            return self._handle_webhooks(method, query, body)
+        return 404, {"error": {"code": 404, "message": "Not Found"}}
+
+    def _handle_webhooks(self, method: str, query: dict[str, list[str]], body: bytes) -> tuple[int, dict]:
+        """
+        Build the response for the /webhooks endpoint.
+
+        Args:
+            method (str): HTTP method.
+            query (dict[str, list[str]]): Parsed query string.
+            body (bytes): Request body.
+
+        Returns:
+            int: HTTP status code.
+            dict: JSON response.
+        """
+        with self._lock:
+            if method == "GET":
+                user_id = query.get("user_id", [None])[0]
+                limit = int(query.get("limit", ["50"])[0])
+                offset = int(query.get("offset", ["0"])[0])
+                webhooks = [
+                    {"user_id": webhook_user_id, "event": event}
+                    for webhook_user_id, events in self.webhooks.items()
+                    if user_id is None or webhook_user_id == user_id
+                    for event in sorted(events)
+                ]
+                return 200, {"all_count": len(webhooks), "webhooks": webhooks[offset:offset + limit]}
+            if method == "POST":
+                data = json.loads(body or b"{}")
+                user_id = data.get("user_id", "")
+                events = data.get("events", [])
+                self.webhooks.setdefault(user_id, set()).update(events)
+                return 200, {"user_id": user_id, "added_events": events}
+            if method == "DELETE":
+                user_id = query.get("user_id", [""])[0]
+                events = query.get("events[]", None)
+                current = self.webhooks.get(user_id, set())
+                deleted = sorted(current if events is None else current & set(events))
+                current.difference_update(deleted)
+                if not current:
+                    self.webhooks.pop(user_id, None)
+                return 200, {"user_id": user_id, "deleted_events": deleted}
+        return 400, {"error": {"code": 400, "message": "Bad Request"}}
+
+def _error_payload(code: int) -> dict:
+    """
+    Build the error object of an API error.
+
+    Args:
+        code (int): API error code.
+
+    Returns:
+        dict: Error response.
+    """
+    return {"error": {"code": code, "message": ERROR_CODES_DICT[code][0]}}
+
+def _user_payload(user_id: str, profile_size: Optional[int] = None) -> dict:
+    """
+    Build a user object for a mock response.
+
+    Args:
+        user_id (str): User ID.
+        profile_size (Optional[int]): Length of the profile in characters. None keeps the sample profile. Default is None.
+
+    Returns:
+        dict: User object.
+    """
+    profile = "ツイキャスの公式アカウントです。"
+    if profile_size is not None:
+        profile = (profile * (profile_size // len(profile) + 1))[:profile_size]
+    return {
+        "id": user_id,
+        "screen_id": f"screen_{user_id}",
+        "name": f"User {user_id}",
+        "image": "http://202-234-44-53.moi.st/image3s/pbs.twimg.com/profile_images/613625726512705536/GLlBoXcS_normal.png",
+        "profile": profile,
+        "level": 24,
+        "last_movie_id": "189037369",
+        "is_live": False,
+        "supporter_count": 10,
+        "supporting_count": 24,
+        "created": 1282529778,
+    }
+
+def _movie_payload(movie_id: str, user_id: str) -> dict:
+    """
+    Build a movie object for a mock response.
+
+    Args:
+        movie_id (str): Movie ID.
+        user_id (str): User ID of the broadcaster.
+
+    Returns:
+        dict: Movie object.
+    """
+    return {
+        "id": movie_id,
+        "user_id": user_id,
+        "title": f"ライブ #{movie_id}",
+        "subtitle": "ライブ配信中！",
+        "last_owner_comment": "もいもい",
+        "category": "girls_jcjk_jp",
+        "link": f"http://twitcasting.tv/screen_{user_id}/movie/{movie_id}",
+        "is_live": False,
+        "is_recorded": False,
+        "comment_count": 2124,
+        "large_thumbnail": f"http://202-230-12-92.twitcasting.tv/image3/image.twitcasting.tv/image55_1/39/7b/{movie_id}-1.jpg",
+        "small_thumbnail": f"http://202-230-12-92.twitcasting.tv/image3/image.twitcasting.tv/image55_1/39/7b/{movie_id}-1-s.jpg",
+        "country": "jp",
+        "duration": 1186,
+        "created": 1438500282 + int(movie_id) - 189000000,
+        "is_collabo": False,
+        "is_protected": False,
+        "max_view_count": 1675,
+        "current_view_count": 20848,
+        "total_view_count": 20848,
+        "hls_url": f"https://twitcasting.tv/screen_{user_id}/metastream.m3u8/?video=1",
+    }
+
+def _make_handler(mock: MockTwitCastingServer) -> type[BaseHTTPRequestHandler]:
+    """
+    Create the request handler class bound to a server.
+
+    Args:
+        mock (MockTwitCastingServer): Server state.
+
+    Returns:
+        type[BaseHTTPRequestHandler]: Request handler class.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def _dispatch(self) -> None:
+            parts = urlsplit(self.path)
+            length = int(self.headers.get("Content-Length", 0) or 0)
+            body = self.rfile.read(length) if length else b""
+            delay = mock.delay()
+            if delay > 0:
+                time.sleep(delay)
+            headers, exceeded = mock.rate_limit_headers()
+            error_code = 2000 if exceeded else mock.injected_error()
+            if error_code is not None:
+                with mock._lock:
+                    mock.request_count += 1
+                status, payload = ERROR_HTTP_STATUS[error_code], _error_payload(error_code)
+            else:
+                status, payload = mock.handle(self.command, parts.path, parse_qs(parts.query), body)
+            data = json.dumps(payload).encode()
+            if mock.compression and "gzip" in self.headers.get("Accept-Encoding", ""):
+                data = gzip.compress(data, compresslevel=6)
+                headers["Content-Encoding"] = "gzip"
+            with mock._lock:
+                mock.bytes_sent += len(data)
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        do_GET = do_POST = do_DELETE = _dispatch
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    return Handler
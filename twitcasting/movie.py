@@ -1,12 +1,18 @@
-from typing import Optional
+import operator
+from typing import Any, Container, Iterator, Mapping, Optional, Never
 
 from .exceptions import ERROR_CODES_DICT
+from .cache import ResponseCache
+from .client import TwitCastingClient, build_headers, send_request
+from .user import User, _content_fingerprint, _parse_user
 
 class Movie:
     """
     Movie class for TwitCasting API.
     """
 
+    __slots__ = ("id", "user_id", "title", "subtitle", "last_owner_comment", "category", "link", "is_live", "is_recorded", "comment_count", "large_thumbnail", "small_thumbnail", "country", "duration", "created", "is_collabo", "is_protected", "max_view_count", "current_view_count", "total_view_count", "hls_url", "_fingerprint")
+
     def __init__(self, id: str, user_id: str, title: str, subtitle: Optional[str], last_owner_comment: Optional[str], category: Optional[str], link: str, is_live: bool, is_recorded: bool, comment_count: int, large_thumbnail: str, small_thumbnail: str, country: str, duration: int, created: int, is_collabo: bool, is_protected: bool, max_view_count: int, current_view_count: int, total_view_count: int, hls_url: Optional[str]) -> None:
         """
         Initialize the Movie object.
@@ -54,4 +60,214 @@ class Movie:
         self.max_view_count = max_view_count
         self.current_view_count = current_view_count
         self.total_view_count = total_view_count
-        self.hls_url = hls_url
\ No newline at end of file
+        self.hls_url = hls_url
+
+    def __reduce__(self) -> tuple[type["Movie"], tuple[Any, ...]]:
+        """
+        Pickle the Movie object as its constructor arguments, e.g. to send it between processes.
+
+        Returns:
+            tuple[type[Movie], tuple[Any, ...]]: Class and positional arguments.
+        """
+        return Movie, _movie_state(self)
+
+    @property
+    def fingerprint(self) -> int:
+        """
+        Stable 64-bit hash of all fields.
+
+        It is computed on first access and cached, so the fields must not be
+        changed afterwards. Unlike hash(), it is the same in every process.
+        """
+        try:
+            return self._fingerprint
+        except AttributeError:
+            self._fingerprint = _content_fingerprint(_movie_state(self))
+            return self._fingerprint
+
+    def diff(self, other: "Movie") -> dict[str, tuple[Any, Any]]:
+        """
+        Get the fields that differ from another Movie object.
+
+        Args:
+            other (Movie): Newer Movie object.
+
+        Returns:
+            dict[str, tuple[Any, Any]]: Field name to (value of self, value of other). Empty if equal.
+        """
+        old, new = _movie_state(self), _movie_state(other)
+        if old == new:
+            return {}
+        return {name: (a, b) for name, a, b in zip(_MOVIE_DEFAULTS, old, new) if a != b}
+
+# Movie のコンストラクタ引数の順に並べた (APIのキー, 既定値)
+_MOVIE_FIELDS: tuple[tuple[str, Any], ...] = (
+    ("id", ""),
+    ("user_id", ""),
+    ("title", ""),
+    ("subtitle", None),
+    ("last_owner_comment", None),
+    ("category", None),
+    ("link", ""),
+    ("is_live", False),
+    ("is_recorded", False),
+    ("comment_count", 0),
+    ("large_thumbnail", ""),
+    ("small_thumbnail", ""),
+    ("country", ""),
+    ("duration", 0),
+    ("created", 0),
+    ("is_collabo", False),
+    ("is_protected", False),
+    ("max_view_count", 0),
+    ("current_view_count", 0),
+    ("total_view_count", 0),
+    ("hls_url", None),
+)
+_MOVIE_DEFAULTS: dict[str, Any] = dict(_MOVIE_FIELDS)
+_movie_values = operator.itemgetter(*_MOVIE_DEFAULTS)
+_movie_state = operator.attrgetter(*_MOVIE_DEFAULTS)
+
+def _parse_movie(movie_data: dict) -> Movie:
+    """
+    Build a Movie object from a movie object of an API response.
+
+    Args:
+        movie_data (dict): Movie object.
+
+    Returns:
+        Movie: Movie object.
+    """
+    return Movie(*_movie_values({**_MOVIE_DEFAULTS, **movie_data}))
+
+def _parse_movie_response(data: dict) -> tuple[Movie, User, list[str]]:
+    """
+    Parse the response of the movies endpoint.
+
+    Args:
+        data (dict): Decoded response.
+
+    Returns:
+        Movie: Movie object.
+        User: Broadcaster.
+        list[str]: Tags of the movie.
+    """
+    return _parse_movie(data.get('movie', {})), _parse_user(data.get('broadcaster', {})), data.get('tags', [])
+
+def get_movie_info(movie_id: str, authorization_mode: str, access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None, client: Optional[TwitCastingClient] = None, cache: Optional[ResponseCache] = None) -> tuple[Movie, User, list[str]] | Never:
+    """
+    Get movie information.
+
+    Args:
+        movie_id (str): Movie ID.
+        authorization_mode (str): Authorization mode.
+        access_token (Optional[str]): Access token. Default is None.
+        client_id (Optional[str]): Client ID. Default is None.
+        client_secret (Optional[str]): Client secret. Default is None.
+        client (Optional[TwitCastingClient]): Pooled HTTP client. Default is None.
+        cache (Optional[ResponseCache]): Response cache. Default is None.
+
+    Returns:
+        Movie: Movie object.
+        User: Broadcaster.
+        list[str]: Tags of the movie.
+    """
+    headers = build_headers(authorization_mode, access_token, client_id, client_secret)
+    return _request_movie_info(movie_id, headers, client, cache)
+
+def _request_movie_info(movie_id: str, headers: Mapping[str, str], client: Optional[TwitCastingClient] = None, cache: Optional[ResponseCache] = None) -> tuple[Movie, User, list[str]] | Never:
+    """
+    Get movie information with prebuilt request headers.
+
+    Args:
+        movie_id (str): Movie ID.
+        headers (Mapping[str, str]): Request headers built by build_headers.
+        client (Optional[TwitCastingClient]): Pooled HTTP client. Default is None.
+        cache (Optional[ResponseCache]): Response cache. Default is None.
+
+    Returns:
+        Movie: Movie object.
+        User: Broadcaster.
+        list[str]: Tags of the movie.
+    """
+    url = f"https://apiv2.twitcasting.tv/movies/{movie_id}"
+    if cache is not None:
+        return cache.get_or_fetch('movies', movie_id, headers['Authorization'], lambda: _parse_movie_response(send_request('GET', url, headers, client=client)))
+    data = send_request('GET', url, headers, client=client)
+    return _parse_movie_response(data)
+
+def _movies_by_user_query(page_size: int, slice_id: Optional[str]) -> str:
+    """
+    Build the query string of a page of the movies of a user.
+
+    Args:
+        page_size (int): Number of movies per page.
+        slice_id (Optional[str]): Only movies older than this movie ID. None starts from the newest.
+
+    Returns:
+        str: Query string.
+    """
+    query = f"limit={page_size}"
+    if slice_id is not None:
+        query += f"&slice_id={slice_id}"
+    return query
+
+def iter_movies_by_user(user_id: str, authorization_mode: str, access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None, known_ids: Optional[Container[str]] = None, page_size: int = 50, client: Optional[TwitCastingClient] = None) -> Iterator[Movie] | Never:
+    """
+    Iterate over the movies of a user, newest first, fetching the pages on demand.
+
+    Pages are requested with slice_id (movies older than the last one
+    received), so movies published during the iteration do not shift the
+    pages. The iteration stops at the first movie in known_ids: for an
+    incremental sync, pass the IDs already stored and only the pages holding
+    new movies are downloaded.
+
+    Args:
+        user_id (str): User ID.
+        authorization_mode (str): Authorization mode.
+        access_token (Optional[str]): Access token. Default is None.
+        client_id (Optional[str]): Client ID. Default is None.
+        client_secret (Optional[str]): Client secret. Default is None.
+        known_ids (Optional[Container[str]]): Movie IDs already seen. Default is None.
+        page_size (int): Number of movies per request (1-50). Default is 50.
+        client (Optional[TwitCastingClient]): Pooled HTTP client. Default is None.
+
+    Yields:
+        Movie: Movie object.
+    """
+    if not 1 <= page_size <= 50:
+        raise ValueError("page_size must be between 1 and 50.")
+    headers = build_headers(authorization_mode, access_token, client_id, client_secret)
+    return _iter_movies_by_user(user_id, headers, known_ids, page_size, client)
+
+def _iter_movies_by_user(user_id: str, headers: Mapping[str, str], known_ids: Optional[Container[str]] = None, page_size: int = 50, client: Optional[TwitCastingClient] = None) -> Iterator[Movie] | Never:
+    """
+    Iterate over the movies of a user with prebuilt request headers.
+
+    Args:
+        user_id (str): User ID.
+        headers (Mapping[str, str]): Request headers built by build_headers.
+        known_ids (Optional[Container[str]]): Movie IDs already seen. Default is None.
+        page_size (int): Number of movies per request (1-50). Default is 50.
+        client (Optional[TwitCastingClient]): Pooled HTTP client. Default is None.
+
+    Yields:
+        Movie: Movie object.
+    """
+    slice_id = None
+    while True:
+        url = f"https://apiv2.twitcasting.tv/users/{user_id}/movies?{_movies_by_user_query(page_size, slice_id)}"
+        data = send_request('GET', url, headers, client=client)
+        #{
+        #    "total_count": 2124,
+        #    "movies": [{"id": "189037369", ...}, ...]
+        #}
+        movies_data = data.get('movies', [])
+        for movie_data in movies_data:
+            movie = _parse_movie(movie_data)
+            if known_ids is not None and movie.id in known_ids:
+                return
+            yield movie
+        if len(movies_data) < page_size:
+            return
+        slice_id = movies_data[-1].get('id')
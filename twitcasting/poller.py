@@ -0,0 +1,394 @@
+import heapq, itertools, logging, math, threading, time
+from typing import Callable, Iterable, Iterator, Optional
+
+from .client import TwitCastingClient, build_headers
+from .cache import ResponseCache
+from .ratelimit import RateLimitScheduler, PRIORITY_BACKGROUND
+from .user import User, get_user_info
+
+logger = logging.getLogger(__name__)
+
+EVENT_LIVE_START = "livestart"
+EVENT_LIVE_END = "liveend"
+EVENT_NEW_MOVIE = "newmovie"
+
+class LiveStatusEvent:
+    """
+    Live status transition detected by LiveStatusPoller.
+    """
+
+    __slots__ = ("event", "user", "previous_movie_id", "detected_at")
+
+    def __init__(self, event: str, user: User, previous_movie_id: Optional[str], detected_at: float) -> None:
+        """
+        Initialize the LiveStatusEvent object.
+
+        Args:
+            event (str): EVENT_LIVE_START, EVENT_LIVE_END or EVENT_NEW_MOVIE.
+            user (User): User as returned by the poll that detected the transition.
+            previous_movie_id (Optional[str]): last_movie_id seen by the previous poll.
+            detected_at (float): Clock time of the detection.
+        """
+        self.event = event
+        self.user = user
+        self.previous_movie_id = previous_movie_id
+        self.detected_at = detected_at
+
+    def __repr__(self) -> str:
+        """
+        String representation of the LiveStatusEvent object.
+
+        Returns:
+            str: String representation of the LiveStatusEvent object.
+        """
+        return f"LiveStatusEvent(event={self.event}, user_id={self.user.id}, movie_id={self.user.last_movie_id}, previous_movie_id={self.previous_movie_id}, detected_at={self.detected_at})"
+
+class _UserState:
+    """
+    Polling state of one user.
+    """
+
+    __slots__ = ("user", "activity", "activity_at", "weight", "due", "generation")
+
+    def __init__(self, weight: float, now: float) -> None:
+        """
+        Initialize the _UserState object.
+
+        Args:
+            weight (float): Share of the polling budget.
+            now (float): Current clock time.
+        """
+        self.user: Optional[User] = None
+        self.activity = 0.0
+        self.activity_at = now
+        self.weight = weight
+        self.due = now
+        self.generation = 0
+
+def user_fetcher(authorization_mode: str, access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None, client: Optional[TwitCastingClient] = None, cache: Optional[ResponseCache] = None) -> Callable[[str], User]:
+    """
+    Build the fetch function of LiveStatusPoller from credentials.
+
+    Requests are sent with PRIORITY_BACKGROUND so that a RateLimitScheduler on
+    the client serves interactive lookups first.
+
+    Args:
+        authorization_mode (str): Authorization mode.
+        access_token (Optional[str]): Access token. Default is None.
+        client_id (Optional[str]): Client ID. Default is None.
+        client_secret (Optional[str]): Client secret. Default is None.
+        client (Optional[TwitCastingClient]): Pooled HTTP client. Default is None.
+        cache (Optional[ResponseCache]): Response cache. Its TTL bounds how fresh the polled status can be. Default is None.
+
+    Returns:
+        Callable[[str], User]: Function returning the current User of a user ID.
+    """
+    build_headers(authorization_mode, access_token, client_id, client_secret)
+
+    def fetch(user_id: str) -> User:
+        with RateLimitScheduler.priority(PRIORITY_BACKGROUND):
+            return get_user_info(user_id, authorization_mode, access_token, client_id, client_secret, client, cache)[0]
+    return fetch
+
+class LiveStatusPoller:
+    """
+    Poll the live status of users that webhooks cannot be registered for.
+
+    Users are kept in a heap ordered by the time of their next poll. A live user
+    is polled every live_interval seconds. The rest of the request budget is
+    shared among the offline users in proportion to the square root of their
+    activity, an exponentially decaying count of the lives seen recently, so
+    historically active users are polled often and dormant ones back off, down
+    to max_interval. All polls go through a token bucket of requests_per_second;
+    when more users are due than the budget allows, the most overdue go first.
+
+    Only transitions are reported: EVENT_LIVE_START, EVENT_LIVE_END, and
+    EVENT_NEW_MOVIE when last_movie_id changes without a start being observed
+    (a new live right after the previous one, or a whole live between two
+    polls). The first poll of a user only records its state.
+    """
+
+    def __init__(self, fetch: Callable[[str], User], user_ids: Iterable[str] = (), requests_per_second: float = 1.0, burst: int = 5, live_interval: float = 60.0, min_interval: float = 30.0, max_interval: float = 3600.0, activity_half_life: float = 86400.0, clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep) -> None:
+        """
+        Initialize the LiveStatusPoller object.
+
+        Args:
+            fetch (Callable[[str], User]): Function returning the current User of a user ID. See user_fetcher.
+            user_ids (Iterable[str]): User IDs to poll. Default is ().
+            requests_per_second (float): Global request budget. Default is 1.0.
+            burst (int): Maximum number of requests sent back to back. Default is 5.
+            live_interval (float): Polling interval of live users in seconds. Default is 60.0.
+            min_interval (float): Shortest polling interval of offline users in seconds. Default is 30.0.
+            max_interval (float): Longest polling interval of offline users in seconds. Default is 3600.0.
+            activity_half_life (float): Seconds for a seen live to lose half of its weight. Default is 86400.0.
+            clock (Callable[[], float]): Monotonic clock. Default is time.monotonic.
+            sleep (Callable[[float], None]): Sleep function used by run. Default is time.sleep.
+        """
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second must be greater than 0.")
+        if burst < 1:
+            raise ValueError("burst must be 1 or greater.")
+        if not 0 < min_interval <= max_interval:
+            raise ValueError("min_interval must be greater than 0 and not greater than max_interval.")
+        self.fetch = fetch
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.live_interval = live_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.activity_half_life = activity_half_life
+        self.call_count = 0
+        self.error_count = 0
+        self.event_count = 0
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._states: dict[str, _UserState] = {}
+        self._heap: list[tuple[float, int, str, int]] = []
+        self._sequence = itertools.count()
+        self._total_weight = 0.0
+        self._live_count = 0
+        self._tokens = float(burst)
+        self._refilled_at = clock()
+        for user_id in user_ids:
+            self.add(user_id)
+
+    def __repr__(self) -> str:
+        """
+        String representation of the LiveStatusPoller object.
+
+        Returns:
+            str: String representation of the LiveStatusPoller object.
+        """
+        return f"LiveStatusPoller(users={len(self._states)}, requests_per_second={self.requests_per_second}, calls={self.call_count}, events={self.event_count}, errors={self.error_count})"
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def stats(self) -> dict[str, int]:
+        """
+        Get the poller counters.
+
+        Returns:
+            dict[str, int]: users, live users, calls, events and errors.
+        """
+        with self._lock:
+            return {"users": len(self._states), "live": self._live_count, "calls": self.call_count, "events": self.event_count, "errors": self.error_count}
+
+    def _schedule(self, user_id: str, state: _UserState, due: float) -> None:
+        """
+        Push the next poll of a user. Must be called with the lock held.
+
+        Args:
+            user_id (str): User ID.
+            state (_UserState): Polling state of the user.
+            due (float): Clock time of the next poll.
+        """
+        # 古いエントリは世代番号で無効にし、取り出した時に読み捨てる
+        state.generation += 1
+        state.due = due
+        heapq.heappush(self._heap, (due, next(self._sequence), user_id, state.generation))
+
+    def _set_weight(self, state: _UserState, weight: float) -> None:
+        """
+        Change the budget share of a user. Must be called with the lock held.
+
+        Args:
+            state (_UserState): Polling state of the user.
+            weight (float): New share. 0 for live users.
+        """
+        self._total_weight += weight - state.weight
+        state.weight = weight
+
+    def _interval(self, state: _UserState) -> float:
+        """
+        Compute the polling interval of a user from its share of the budget. Must be called with the lock held.
+
+        Args:
+            state (_UserState): Polling state of the user.
+
+        Returns:
+            float: Seconds until the next poll.
+        """
+        if state.user is not None and state.user.is_live:
+            return self.live_interval
+        # ライブ中のユーザーの分を除いた予算を重みで分け合う
+        spare = max(self.requests_per_second - self._live_count / self.live_interval, self.requests_per_second * 0.1)
+        return min(max(self._total_weight / (spare * state.weight), self.min_interval), self.max_interval)
+
+    def add(self, user_id: str, user: Optional[User] = None) -> None:
+        """
+        Start polling a user. Adding a user already polled does nothing.
+
+        Args:
+            user_id (str): User ID.
+            user (Optional[User]): Known current state, used as the baseline of the first poll. Default is None.
+        """
+        with self._lock:
+            if user_id in self._states:
+                return
+            now = self._clock()
+            state = self._states[user_id] = _UserState(0.0, now)
+            if user is not None and user.is_live:
+                state.user = user
+                self._live_count += 1
+                self._schedule(user_id, state, now + self.live_interval)
+                return
+            self._set_weight(state, 1.0)
+            if user is not None:
+                state.user = user
+                self._schedule(user_id, state, now + self._interval(state))
+            else:
+                self._schedule(user_id, state, now)
+
+    def remove(self, user_id: str) -> None:
+        """
+        Stop polling a user.
+
+        Args:
+            user_id (str): User ID.
+        """
+        with self._lock:
+            state = self._states.pop(user_id, None)
+            if state is not None:
+                self._set_weight(state, 0.0)
+                if state.user is not None and state.user.is_live:
+                    self._live_count -= 1
+
+    def next_due(self) -> Optional[float]:
+        """
+        Get the seconds until the next poll may be sent.
+
+        Returns:
+            Optional[float]: Seconds to wait, 0 if a poll is due, or None if no user is polled.
+        """
+        with self._lock:
+            self._drop_stale()
+            if not self._heap:
+                return None
+            now = self._clock()
+            self._refill(now)
+            token_wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.requests_per_second
+            return max(self._heap[0][0] - now, token_wait, 0.0)
+
+    def _drop_stale(self) -> None:
+        """
+        Pop invalidated heap entries. Must be called with the lock held.
+        """
+        while self._heap:
+            _, _, user_id, generation = self._heap[0]
+            state = self._states.get(user_id)
+            if state is not None and state.generation == generation:
+                return
+            heapq.heappop(self._heap)
+
+    def _refill(self, now: float) -> None:
+        """
+        Refill the request budget. Must be called with the lock held.
+
+        Args:
+            now (float): Current clock time.
+        """
+        self._tokens = min(float(self.burst), self._tokens + (now - self._refilled_at) * self.requests_per_second)
+        self._refilled_at = now
+
+    def _take_due(self) -> Optional[tuple[str, _UserState]]:
+        """
+        Pop the most overdue user if it is due and the budget allows a request.
+
+        Returns:
+            Optional[tuple[str, _UserState]]: User ID and state, or None.
+        """
+        with self._lock:
+            self._drop_stale()
+            now = self._clock()
+            if not self._heap or self._heap[0][0] > now:
+                return None
+            self._refill(now)
+            if self._tokens < 1:
+                return None
+            self._tokens -= 1
+            _, _, user_id, _ = heapq.heappop(self._heap)
+            return user_id, self._states[user_id]
+
+    def _update(self, user_id: str, state: _UserState, user: Optional[User]) -> list[LiveStatusEvent]:
+        """
+        Record the result of a poll, compute the transitions and schedule the next poll.
+
+        Args:
+            user_id (str): User ID.
+            state (_UserState): Polling state of the user.
+            user (Optional[User]): Polled user, or None if the poll failed.
+
+        Returns:
+            list[LiveStatusEvent]: Detected transitions.
+        """
+        events: list[LiveStatusEvent] = []
+        with self._lock:
+            if self._states.get(user_id) is not state:
+                return events
+            now = self._clock()
+            if user is None:
+                self._schedule(user_id, state, now + max(self._interval(state), self.min_interval))
+                return events
+            previous = state.user
+            state.user = user
+            if previous is not None:
+                if user.is_live and not previous.is_live:
+                    events.append(LiveStatusEvent(EVENT_LIVE_START, user, previous.last_movie_id, now))
+                elif previous.is_live and not user.is_live:
+                    if user.last_movie_id != previous.last_movie_id:
+                        events.append(LiveStatusEvent(EVENT_NEW_MOVIE, user, previous.last_movie_id, now))
+                    events.append(LiveStatusEvent(EVENT_LIVE_END, user, previous.last_movie_id, now))
+                elif user.last_movie_id != previous.last_movie_id:
+                    events.append(LiveStatusEvent(EVENT_NEW_MOVIE, user, previous.last_movie_id, now))
+            was_live = previous is not None and previous.is_live
+            self._live_count += int(user.is_live) - int(was_live)
+            state.activity *= 0.5 ** ((now - state.activity_at) / self.activity_half_life)
+            state.activity_at = now
+            if any(event.event != EVENT_LIVE_END for event in events):
+                state.activity += 1.0
+            # 検出遅延の平均を最小にするには配信頻度の平方根に比例して確認する
+            self._set_weight(state, 0.0 if user.is_live else math.sqrt(1.0 + state.activity * 10.0))
+            self._schedule(user_id, state, now + self._interval(state))
+            self.event_count += len(events)
+        return events
+
+    def poll_due(self) -> list[LiveStatusEvent]:
+        """
+        Poll every due user the budget allows.
+
+        Returns:
+            list[LiveStatusEvent]: Transitions detected by the polls.
+        """
+        events: list[LiveStatusEvent] = []
+        while (taken := self._take_due()) is not None:
+            user_id, state = taken
+            self.call_count += 1
+            try:
+                user = self.fetch(user_id)
+            except Exception:
+                self.error_count += 1
+                logger.exception("polling user %s failed", user_id)
+                user = None
+            events.extend(self._update(user_id, state, user))
+        return events
+
+    def run(self, stop: Optional[threading.Event] = None) -> Iterator[LiveStatusEvent]:
+        """
+        Poll until stopped and yield the transitions.
+
+        Args:
+            stop (Optional[threading.Event]): Event ending the loop when set. Default is None (run forever).
+
+        Yields:
+            LiveStatusEvent: Detected transitions.
+        """
+        while stop is None or not stop.is_set():
+            yield from self.poll_due()
+            delay = self.next_due()
+            delay = self.min_interval if delay is None else delay
+            if stop is not None:
+                stop.wait(delay)
+            else:
+                self._sleep(delay)
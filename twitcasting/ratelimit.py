@@ -0,0 +1,285 @@
+import asyncio, contextlib, contextvars, heapq, itertools, threading, time
+from email.message import Message
+from typing import Callable, Iterator, Mapping, Optional, Never
+
+from .exceptions import TwitCastingExecutionCountLimitationException
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+_current_priority: contextvars.ContextVar[int] = contextvars.ContextVar("twitcasting_priority", default=PRIORITY_INTERACTIVE)
+
+class _Bucket:
+    """
+    Token bucket of one credential, refilled when the API quota window resets.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize the _Bucket object.
+        """
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self.in_flight = 0
+        self.waiters: list[tuple[int, int]] = []
+
+    def refill(self, now: float) -> None:
+        """
+        Refill the bucket if the quota window has reset.
+
+        Args:
+            now (float): Current UNIX time.
+        """
+        if self.reset_at is not None and now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = None
+
+class RateLimitScheduler:
+    """
+    Scheduler that keeps API requests inside the rate limit of each credential.
+
+    The quota is read from the ``X-RateLimit-Remaining`` / ``X-RateLimit-Reset``
+    response headers. When the quota of a credential runs low, requests are
+    held back until the window resets instead of failing with error 2000.
+    Waiting requests are served in priority order, so interactive lookups
+    (PRIORITY_INTERACTIVE) skip ahead of background refreshes (PRIORITY_BACKGROUND).
+
+    Pass it to TwitCastingClient or AsyncTwitCastingClient to apply it to every request.
+    """
+
+    def __init__(self, background_reserve: int = 10, max_wait: Optional[float] = None, exhausted_backoff: float = 60.0, clock: Callable[[], float] = time.time) -> None:
+        """
+        Initialize the RateLimitScheduler object.
+
+        Args:
+            background_reserve (int): Number of remaining calls kept for interactive requests. Background requests wait once the quota drops to it. Default is 10.
+            max_wait (Optional[float]): Maximum seconds to wait for quota. If exceeded, TwitCastingExecutionCountLimitationException is raised. None waits as long as needed. Default is None.
+            exhausted_backoff (float): Seconds to hold requests after error 2000 when the reset time is unknown. Default is 60.0.
+            clock (Callable[[], float]): Clock returning UNIX time. Default is time.time.
+        """
+        self.background_reserve = background_reserve
+        self.max_wait = max_wait
+        self.exhausted_backoff = exhausted_backoff
+        self.delayed_count = 0
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._buckets: dict[str, _Bucket] = {}
+        self._sequence = itertools.count()
+
+    def __repr__(self) -> str:
+        """
+        String representation of the RateLimitScheduler object.
+
+        Returns:
+            str: String representation of the RateLimitScheduler object.
+        """
+        return f"RateLimitScheduler(background_reserve={self.background_reserve}, max_wait={self.max_wait}, credentials={len(self._buckets)}, delayed_count={self.delayed_count})"
+
+    @staticmethod
+    @contextlib.contextmanager
+    def priority(priority: int) -> Iterator[None]:
+        """
+        Set the priority of the requests sent inside the block.
+
+        Args:
+            priority (int): PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND or any int. Lower runs first.
+        """
+        token = _current_priority.set(priority)
+        try:
+            yield
+        finally:
+            _current_priority.reset(token)
+
+    def remaining(self, credential: str) -> Optional[int]:
+        """
+        Get the number of calls left for a credential.
+
+        Args:
+            credential (str): Authorization header value.
+
+        Returns:
+            Optional[int]: Calls left in the current window, or None if not known yet.
+        """
+        with self._condition:
+            bucket = self._buckets.get(credential)
+            if bucket is None or bucket.remaining is None:
+                return None
+            bucket.refill(self._clock())
+            return None if bucket.remaining is None else bucket.remaining - bucket.in_flight
+
+    def _bucket(self, credential: str) -> _Bucket:
+        """
+        Get or create the bucket of a credential. Must be called with the lock held.
+
+        Args:
+            credential (str): Authorization header value.
+
+        Returns:
+            _Bucket: Bucket of the credential.
+        """
+        bucket = self._buckets.get(credential)
+        if bucket is None:
+            bucket = self._buckets[credential] = _Bucket()
+        return bucket
+
+    def _poll(self, bucket: _Bucket, ticket: tuple[int, int]) -> Optional[float]:
+        """
+        Try to take a token for a queued request. Must be called with the lock held.
+
+        Args:
+            bucket (_Bucket): Bucket of the credential.
+            ticket (tuple[int, int]): Priority and sequence number of the request.
+
+        Returns:
+            Optional[float]: None if a token was taken, otherwise seconds to wait before polling again.
+        """
+        now = self._clock()
+        bucket.refill(now)
+        if bucket.waiters[0] != ticket:
+            return self.exhausted_backoff
+        if bucket.remaining is not None:
+            reserve = self.background_reserve if ticket[0] > PRIORITY_INTERACTIVE else 0
+            if bucket.remaining - bucket.in_flight <= reserve:
+                if bucket.reset_at is None:
+                    # リセット時刻が分からない場合は実行中のリクエストの応答を待つ
+                    return self.exhausted_backoff if bucket.in_flight == 0 else 1.0
+                return max(bucket.reset_at - now, 0.0)
+        heapq.heappop(bucket.waiters)
+        bucket.in_flight += 1
+        return None
+
+    def _enqueue(self, credential: str, priority: Optional[int]) -> tuple[_Bucket, tuple[int, int]]:
+        """
+        Queue a request. Must be called with the lock held.
+
+        Args:
+            credential (str): Authorization header value.
+            priority (Optional[int]): Priority of the request, or None for the current priority.
+
+        Returns:
+            _Bucket: Bucket of the credential.
+            tuple[int, int]: Ticket of the request.
+        """
+        bucket = self._bucket(credential)
+        ticket = (_current_priority.get() if priority is None else priority, next(self._sequence))
+        heapq.heappush(bucket.waiters, ticket)
+        return bucket, ticket
+
+    def _dequeue(self, bucket: _Bucket, ticket: tuple[int, int]) -> None:
+        """
+        Remove a request from the queue and wake up the others. Must be called with the lock held.
+
+        Args:
+            bucket (_Bucket): Bucket of the credential.
+            ticket (tuple[int, int]): Ticket of the request.
+        """
+        if ticket in bucket.waiters:
+            bucket.waiters.remove(ticket)
+            heapq.heapify(bucket.waiters)
+        self._condition.notify_all()
+
+    def acquire(self, credential: str, priority: Optional[int] = None) -> None | Never:
+        """
+        Wait until a request may be sent with a credential.
+
+        Args:
+            credential (str): Authorization header value.
+            priority (Optional[int]): Priority of the request. If None, the priority set with priority() is used. Default is None.
+
+        Raises:
+            TwitCastingExecutionCountLimitationException: If the wait would exceed max_wait.
+        """
+        with self._condition:
+            bucket, ticket = self._enqueue(credential, priority)
+            deadline = None if self.max_wait is None else self._clock() + self.max_wait
+            delayed = False
+            try:
+                while (delay := self._poll(bucket, ticket)) is not None:
+                    if deadline is not None and self._clock() + delay > deadline and bucket.waiters[0] == ticket:
+                        raise TwitCastingExecutionCountLimitationException("Error 2000: Execution Count Limitation - rate limit would be exceeded", code=2000)
+                    if not delayed:
+                        delayed = True
+                        self.delayed_count += 1
+                    self._condition.wait(delay)
+            finally:
+                self._dequeue(bucket, ticket)
+
+    async def acquire_async(self, credential: str, priority: Optional[int] = None) -> None | Never:
+        """
+        Coroutine version of acquire.
+
+        Args:
+            credential (str): Authorization header value.
+            priority (Optional[int]): Priority of the request. If None, the priority set with priority() is used. Default is None.
+
+        Raises:
+            TwitCastingExecutionCountLimitationException: If the wait would exceed max_wait.
+        """
+        with self._condition:
+            bucket, ticket = self._enqueue(credential, priority)
+            deadline = None if self.max_wait is None else self._clock() + self.max_wait
+        delayed = False
+        try:
+            while True:
+                with self._condition:
+                    delay = self._poll(bucket, ticket)
+                    if delay is None:
+                        return
+                    if deadline is not None and self._clock() + delay > deadline and bucket.waiters[0] == ticket:
+                        raise TwitCastingExecutionCountLimitationException("Error 2000: Execution Count Limitation - rate limit would be exceeded", code=2000)
+                    if not delayed:
+                        delayed = True
+                        self.delayed_count += 1
+                # 他スレッドからの通知を受け取れないため短い間隔で再確認する
+                await asyncio.sleep(min(delay, 0.05))
+        finally:
+            with self._condition:
+                self._dequeue(bucket, ticket)
+
+    def complete(self, credential: str, headers: Optional[Mapping[str, str] | Message] = None, exhausted: bool = False) -> None:
+        """
+        Record the end of a request and update the quota from the response headers.
+
+        Args:
+            credential (str): Authorization header value.
+            headers (Optional[Mapping[str, str] | Message]): Response headers, or None if no response was received. Default is None.
+            exhausted (bool): Whether the request failed with error 2000. Default is False.
+        """
+        with self._condition:
+            bucket = self._bucket(credential)
+            bucket.in_flight = max(bucket.in_flight - 1, 0)
+            if headers is not None:
+                limit = _header_int(headers, "X-RateLimit-Limit")
+                remaining = _header_int(headers, "X-RateLimit-Remaining")
+                reset = _header_int(headers, "X-RateLimit-Reset")
+                if limit is not None:
+                    bucket.limit = limit
+                if remaining is not None:
+                    bucket.remaining = remaining
+                if reset is not None:
+                    bucket.reset_at = float(reset)
+            if exhausted:
+                bucket.remaining = 0
+                if bucket.reset_at is None or bucket.reset_at <= self._clock():
+                    bucket.reset_at = self._clock() + self.exhausted_backoff
+            self._condition.notify_all()
+
+def _header_int(headers: Mapping[str, str] | Message, name: str) -> Optional[int]:
+    """
+    Read an integer header case-insensitively.
+
+    Args:
+        headers (Mapping[str, str] | Message): Response headers.
+        name (str): Header name.
+
+    Returns:
+        Optional[int]: Header value, or None if missing or invalid.
+    """
+    value = headers.get(name)
+    if value is None:
+        value = headers.get(name.lower())
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
@@ -0,0 +1,254 @@
+import asyncio, inspect, logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Optional
+
+from .aio import read_headers
+from .dedup import WebhookDeduplicator
+from .movie import Movie
+from .user import User
+from .webhook import parse_webhook_data
+
+logger = logging.getLogger(__name__)
+
+_REASONS = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed", 411: "Length Required", 413: "Payload Too Large", 503: "Service Unavailable"}
+
+class WebhookReceiver:
+    """
+    asyncio HTTP server receiving TwitCasting webhook deliveries.
+
+    Each POST is parsed and its signature verified before the response is sent.
+    Valid deliveries are acknowledged with 200 immediately and queued; a pool of
+    workers drains the queue and calls the handler with ``(Movie, User)``, so a
+    slow handler never delays the acknowledgement. When the queue is full the
+    delivery is answered with 503 so that TwitCasting retries it later.
+    Retried deliveries already seen by the deduplicator are acknowledged
+    without calling the handler again. Deduplicators whose backend is
+    blocking, such as SQLiteDedupBackend, are checked in a thread.
+    """
+
+    def __init__(self, handler: Callable[[Movie, User], Any | Awaitable[Any]], signature: Optional[str] = None, host: str = "0.0.0.0", port: int = 8080, path: str = "/", queue_size: int = 1000, workers: int = 4, max_body_size: int = 1024 * 1024, deduplicator: Optional[WebhookDeduplicator] = None) -> None:
+        """
+        Initialize the WebhookReceiver object.
+
+        Args:
+            handler (Callable[[Movie, User], Any | Awaitable[Any]]): Function or coroutine function called for every delivery. Plain functions run in a thread pool.
+            signature (Optional[str]): Webhook signature of the app. If None, signatures are not verified. Default is None.
+            host (str): Host to bind. Default is "0.0.0.0".
+            port (int): Port to bind. 0 picks a free port. Default is 8080.
+            path (str): Path accepting deliveries. Default is "/".
+            queue_size (int): Maximum number of deliveries waiting for a worker. Default is 1000.
+            workers (int): Number of workers calling the handler. Default is 4.
+            max_body_size (int): Maximum accepted body size in bytes. Default is 1 MiB.
+            deduplicator (Optional[WebhookDeduplicator]): Suppresses repeated deliveries of the same event. If None, every delivery is handled. Default is None.
+        """
+        if workers < 1:
+            raise ValueError("workers must be 1 or greater.")
+        self.handler = handler
+        self.signature = signature
+        self.host = host
+        self.port = port
+        self.path = path
+        self.queue_size = queue_size
+        self.workers = workers
+        self.max_body_size = max_body_size
+        self.deduplicator = deduplicator
+        self.received_count = 0
+        self.rejected_count = 0
+        self.dropped_count = 0
+        self.processed_count = 0
+        self.failed_count = 0
+        self._is_coroutine = inspect.iscoroutinefunction(handler)
+        self._queue: Optional[asyncio.Queue] = None
+        # 重複の確認をスレッドで待っている配信の数。その分のキューの枠を押さえておく
+        self._reserved = 0
+        self._server: Optional[asyncio.Server] = None
+        self._worker_tasks: list[asyncio.Task] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def __repr__(self) -> str:
+        """
+        String representation of the WebhookReceiver object.
+
+        Returns:
+            str: String representation of the WebhookReceiver object.
+        """
+        return f"WebhookReceiver(host={self.host}, port={self.port}, path={self.path}, queue_size={self.queue_size}, workers={self.workers})"
+
+    def stats(self) -> dict[str, int]:
+        """
+        Get the delivery counters.
+
+        Returns:
+            dict[str, int]: received, rejected, dropped, processed, failed, queued and suppressed counts.
+        """
+        return {
+            "received": self.received_count,
+            "rejected": self.rejected_count,
+            "dropped": self.dropped_count,
+            "processed": self.processed_count,
+            "failed": self.failed_count,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "suppressed": self.deduplicator.suppressed_count if self.deduplicator is not None else 0,
+        }
+
+    async def start(self) -> None:
+        """
+        Start listening and start the workers.
+        """
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        if not self._is_coroutine:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="twitcasting-webhook")
+        self._worker_tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self, drain: bool = True) -> None:
+        """
+        Stop listening and stop the workers.
+
+        Args:
+            drain (bool): Wait until the queued deliveries are handled. Default is True.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if drain and self._queue is not None:
+            await self._queue.join()
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def serve_forever(self) -> None:
+        """
+        Start the receiver and serve until cancelled.
+        """
+        await self.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.stop()
+
+    def run(self) -> None:
+        """
+        Run the receiver in a new event loop until interrupted.
+        """
+        try:
+            asyncio.run(self.serve_forever())
+        except KeyboardInterrupt:
+            pass
+
+    async def __aenter__(self) -> "WebhookReceiver":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def _work(self) -> None:
+        """
+        Worker calling the handler for queued deliveries.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            movie, user = await self._queue.get()
+            try:
+                if self._is_coroutine:
+                    await self.handler(movie, user)
+                else:
+                    await loop.run_in_executor(self._executor, self.handler, movie, user)
+                self.processed_count += 1
+            except Exception:
+                self.failed_count += 1
+                logger.exception("webhook handler failed for movie %s", movie.id)
+            finally:
+                self._queue.task_done()
+
+    def _has_room(self) -> bool:
+        """
+        Check whether one more delivery fits in the queue.
+
+        Returns:
+            bool: True if the delivery can be queued.
+        """
+        return self._queue.maxsize <= 0 or self._queue.qsize() + self._reserved < self._queue.maxsize
+
+    async def _accept(self, method: str, path: str, body: bytes) -> int:
+        """
+        Validate a delivery and queue it.
+
+        Args:
+            method (str): HTTP method.
+            path (str): Request path.
+            body (bytes): Request body.
+
+        Returns:
+            int: HTTP status code to answer with.
+        """
+        if path.split("?", 1)[0] != self.path:
+            return 404
+        if method != "POST":
+            return 405
+        self.received_count += 1
+        try:
+            movie, user = parse_webhook_data(body, self.signature)
+        except (ValueError, TypeError, AttributeError):
+            self.rejected_count += 1
+            return 403 if self.signature else 400
+        # 503 で断った配信の再送を重複扱いしないよう、キーはキューに入れられるときだけ記録する
+        if not self._has_room():
+            self.dropped_count += 1
+            return 503
+        if self.deduplicator is not None:
+            if self.deduplicator.backend.blocking:
+                # SQLite のロック待ちなどでイベントループを止めないよう、スレッドで確かめる
+                self._reserved += 1
+                try:
+                    duplicate = await asyncio.to_thread(self.deduplicator.is_duplicate, movie)
+                finally:
+                    self._reserved -= 1
+            else:
+                duplicate = self.deduplicator.is_duplicate(movie)
+            if duplicate:
+                return 200
+        self._queue.put_nowait((movie, user))
+        return 200
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serve the requests of one keep-alive connection.
+
+        Args:
+            reader (asyncio.StreamReader): Stream reader.
+            writer (asyncio.StreamWriter): Stream writer.
+        """
+        try:
+            while True:
+                try:
+                    request_line, headers = await read_headers(reader)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                method, path, version = (request_line.split(" ") + ["", "", ""])[:3]
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                length = headers.get("content-length")
+                if length is None or not length.isdigit():
+                    status = 411 if method == "POST" else await self._accept(method, path, b"")
+                    keep_alive = keep_alive and method != "POST"
+                elif int(length) > self.max_body_size:
+                    status, keep_alive = 413, False
+                else:
+                    body = await reader.readexactly(int(length))
+                    status = await self._accept(method, path, body)
+                reason = _REASONS.get(status, "")
+                writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Length: 0\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode())
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return
+        finally:
+            writer.close()
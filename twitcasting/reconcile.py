@@ -0,0 +1,167 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Mapping, Optional, Never
+
+from .client import TwitCastingClient, build_headers
+from .webhook import _iter_webhooks, _request_register_webhook, _request_delete_webhook
+
+WEBHOOK_EVENTS = frozenset({"livestart", "liveend"})
+
+class WebhookSyncReport:
+    """
+    Result of sync_webhooks.
+    """
+
+    def __init__(self, dry_run: bool) -> None:
+        """
+        Initialize the WebhookSyncReport object.
+
+        Args:
+            dry_run (bool): Whether the changes were only planned.
+        """
+        self.dry_run = dry_run
+        self.registered: dict[str, list[str]] = {}
+        self.deleted: dict[str, list[str]] = {}
+        self.failed: dict[str, Exception] = {}
+        self.unchanged = 0
+
+    def __repr__(self) -> str:
+        """
+        String representation of the WebhookSyncReport object.
+
+        Returns:
+            str: String representation of the WebhookSyncReport object.
+        """
+        return f"WebhookSyncReport(dry_run={self.dry_run}, registered={len(self.registered)}, deleted={len(self.deleted)}, failed={len(self.failed)}, unchanged={self.unchanged})"
+
+    def __str__(self) -> str:
+        """
+        String representation of the WebhookSyncReport object.
+
+        Returns:
+            str: String representation of the WebhookSyncReport object.
+        """
+        action = "Planned" if self.dry_run else "Applied"
+        return f"{action}: {len(self.registered)} users registered, {len(self.deleted)} users deleted, {len(self.failed)} failed, {self.unchanged} unchanged"
+
+def plan_webhook_changes(desired: Mapping[str, Iterable[str]], current: Mapping[str, Iterable[str]], prune: bool = True) -> tuple[dict[str, list[str]], dict[str, list[str]], int] | Never:
+    """
+    Compute the minimal changes turning the current webhooks into the desired ones.
+
+    Args:
+        desired (Mapping[str, Iterable[str]]): Desired events per user ID.
+        current (Mapping[str, Iterable[str]]): Registered events per user ID.
+        prune (bool): Delete the webhooks of users missing from desired. Default is True.
+
+    Returns:
+        dict[str, list[str]]: Events to register per user ID.
+        dict[str, list[str]]: Events to delete per user ID.
+        int: Number of users already in the desired state.
+    """
+    to_register: dict[str, list[str]] = {}
+    to_delete: dict[str, list[str]] = {}
+    unchanged = 0
+    user_ids = set(desired) | set(current) if prune else set(desired)
+    for user_id in sorted(user_ids):
+        desired_events = set(desired.get(user_id, ()))
+        invalid = desired_events - WEBHOOK_EVENTS
+        if invalid:
+            raise ValueError(f"event must be either 'livestart' or 'liveend': {sorted(invalid)}")
+        current_events = set(current.get(user_id, ()))
+        if desired_events - current_events:
+            to_register[user_id] = sorted(desired_events - current_events)
+        if current_events - desired_events:
+            to_delete[user_id] = sorted(current_events - desired_events)
+        if desired_events == current_events:
+            unchanged += 1
+    return to_register, to_delete, unchanged
+
+def sync_webhooks(desired: Mapping[str, Iterable[str]], authorization_mode: str, access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None, concurrency: int = 8, dry_run: bool = False, prune: bool = True, client: Optional[TwitCastingClient] = None) -> WebhookSyncReport | Never:
+    """
+    Make the registered webhooks match the desired state.
+
+    The registered webhooks are paged through with iter_webhooks, the minimal
+    set of register/delete calls is computed, and the calls are applied with
+    bounded concurrency. A failing user does not stop the others; its exception
+    is recorded in the report.
+
+    Args:
+        desired (Mapping[str, Iterable[str]]): Desired events per user ID. An empty set deletes the user's webhooks.
+        authorization_mode (str): Authorization mode.
+            - "bearer" for Access token
+            - "basic" for Client ID and Client Secret
+        access_token (Optional[str]): Access token.
+        client_id (Optional[str]): Client ID.
+        client_secret (Optional[str]): Client secret.
+        concurrency (int): Maximum number of requests in flight. Default is 8.
+        dry_run (bool): Only compute the changes without applying them. Default is False.
+        prune (bool): Delete the webhooks of users missing from desired. Default is True.
+        client (Optional[TwitCastingClient]): Pooled HTTP client. If None, a client is created for the sync. Default is None.
+
+    Returns:
+        WebhookSyncReport: Registered and deleted events per user ID, failures and the number of unchanged users.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be 1 or greater.")
+    headers = build_headers(authorization_mode, access_token, client_id, client_secret)
+    return _sync_webhooks(desired, headers, concurrency, dry_run, prune, client)
+
+def _sync_webhooks(desired: Mapping[str, Iterable[str]], headers: Mapping[str, str], concurrency: int = 8, dry_run: bool = False, prune: bool = True, client: Optional[TwitCastingClient] = None) -> WebhookSyncReport | Never:
+    """
+    Make the registered webhooks match the desired state with prebuilt request headers.
+
+    Args:
+        desired (Mapping[str, Iterable[str]]): Desired events per user ID. An empty set deletes the user's webhooks.
+        headers (Mapping[str, str]): Request headers built by build_headers.
+        concurrency (int): Maximum number of requests in flight. Default is 8.
+        dry_run (bool): Only compute the changes without applying them. Default is False.
+        prune (bool): Delete the webhooks of users missing from desired. Default is True.
+        client (Optional[TwitCastingClient]): Pooled HTTP client. If None, a client is created for the sync. Default is None.
+
+    Returns:
+        WebhookSyncReport: Registered and deleted events per user ID, failures and the number of unchanged users.
+    """
+    owns_client = client is None
+    if client is None:
+        client = TwitCastingClient(pool_size=concurrency, per_host_limit=concurrency)
+    try:
+        current: dict[str, set[str]] = {}
+        for webhook in _iter_webhooks(headers, parallel_pages=concurrency, client=client):
+            current.setdefault(webhook.user_id, set()).add(webhook.event)
+        to_register, to_delete, unchanged = plan_webhook_changes(desired, current, prune)
+        report = WebhookSyncReport(dry_run)
+        report.unchanged = unchanged
+        if dry_run:
+            report.registered = to_register
+            report.deleted = to_delete
+            return report
+
+        def apply(user_id: str) -> tuple[Optional[list[str]], Optional[list[str]]]:
+            deleted = None
+            registered = None
+            if user_id in to_delete:
+                if user_id in desired and set(desired[user_id]):
+                    _, deleted = _request_delete_webhook(headers, user_id, to_delete[user_id], client)
+                else:
+                    _, deleted = _request_delete_webhook(headers, user_id, None, client)
+            if user_id in to_register:
+                _, registered = _request_register_webhook(headers, user_id, to_register[user_id], client)
+            return deleted, registered
+
+        user_ids = sorted(set(to_register) | set(to_delete))
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = {user_id: executor.submit(contextvars.copy_context().run, apply, user_id) for user_id in user_ids}
+            for user_id, future in futures.items():
+                try:
+                    deleted, registered = future.result()
+                except Exception as e:
+                    report.failed[user_id] = e
+                    continue
+                if deleted is not None:
+                    report.deleted[user_id] = deleted
+                if registered is not None:
+                    report.registered[user_id] = registered
+        return report
+    finally:
+        if owns_client:
+            client.close()
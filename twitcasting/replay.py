@@ -0,0 +1,200 @@
+import logging, mmap, multiprocessing, os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Callable, IO, Iterable, Iterator, Optional
+
+from .movie import Movie
+from .user import User
+from .webhook import parse_webhook_data
+
+logger = logging.getLogger(__name__)
+
+# 1 タスクで処理する入力の目安
+CHUNK_SIZE = 1024 * 1024
+
+def parse_webhook_stream(source: str | os.PathLike | IO | Iterable[str | bytes], signature: Optional[str] = None, processes: Optional[int] = None, ordered: bool = True, chunk_size: int = CHUNK_SIZE, on_error: Optional[Callable[[int, bytes, str], None]] = None) -> Iterator[list[tuple[Movie, User]]]:
+    """
+    Parse archived webhook bodies, one JSON object per line (NDJSON), in parallel.
+
+    The input is cut into chunks of about chunk_size bytes at line boundaries:
+    a path is memory-mapped, a file is read in chunk_size blocks, and an
+    iterable of lines is grouped. Every chunk is parsed by a process of the
+    pool and yields one batch. Malformed lines (invalid JSON, wrong signature,
+    unexpected shape) are skipped and reported to on_error; blank lines are
+    ignored.
+
+    Args:
+        source (str | os.PathLike | IO | Iterable[str | bytes]): Path of an NDJSON file, a file object, or an iterable of lines.
+        signature (Optional[str]): Signature for verification. Default is None.
+        processes (Optional[int]): Number of worker processes. None uses os.cpu_count(); 0 parses in the calling process. Default is None.
+        ordered (bool): Yield the batches in input order. If False, batches are yielded as soon as they are parsed. Default is True.
+        chunk_size (int): Approximate size in bytes of the input parsed by one task. Default is 1 MiB.
+        on_error (Optional[Callable[[int, bytes, str], None]]): Called with the line number (from 1), the line and the error message of every malformed line. If None, they are logged as warnings. Default is None.
+
+    Yields:
+        list[tuple[Movie, User]]: Movie and User objects of the valid lines of one chunk.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be 1 or greater.")
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes < 0:
+        raise ValueError("processes must be 0 or greater.")
+    report = on_error if on_error is not None else _log_error
+    chunks = _numbered(_iter_chunks(source, chunk_size))
+    if processes == 0:
+        for first_line, chunk in chunks:
+            yield from _emit(_parse_chunk(chunk, first_line, signature), report)
+        return
+    # 入力を読み進めすぎないよう、処理待ちのタスク数を抑える
+    window = processes * 2
+    # スレッドを使うプロセスから fork するとデッドロックしうるので forkserver を使う
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    executor = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context(method))
+    try:
+        if ordered:
+            queue: deque[Future] = deque()
+            for first_line, chunk in chunks:
+                queue.append(executor.submit(_parse_chunk, chunk, first_line, signature))
+                if len(queue) >= window:
+                    yield from _emit(queue.popleft().result(), report)
+            while queue:
+                yield from _emit(queue.popleft().result(), report)
+        else:
+            pending: set[Future] = set()
+            for first_line, chunk in chunks:
+                pending.add(executor.submit(_parse_chunk, chunk, first_line, signature))
+                if len(pending) >= window:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from _emit(future.result(), report)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from _emit(future.result(), report)
+    finally:
+        # 途中で止められた場合は残りのタスクを捨てる
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def _log_error(line_number: int, line: bytes, message: str) -> None:
+    """
+    Default on_error of parse_webhook_stream.
+    """
+    logger.warning("Skipped malformed webhook at line %d: %s", line_number, message)
+
+def _emit(result: tuple[list[tuple[Movie, User]], list[tuple[int, bytes, str]]], report: Callable[[int, bytes, str], None]) -> Iterator[list[tuple[Movie, User]]]:
+    """
+    Report the malformed lines of a parsed chunk and yield its batch.
+
+    Args:
+        result (tuple[list[tuple[Movie, User]], list[tuple[int, bytes, str]]]): Result of _parse_chunk.
+        report (Callable[[int, bytes, str], None]): Error callback.
+
+    Yields:
+        list[tuple[Movie, User]]: Batch, if not empty.
+    """
+    batch, errors = result
+    for error in errors:
+        report(*error)
+    if batch:
+        yield batch
+
+def _parse_chunk(chunk: bytes, first_line: int, signature: Optional[str]) -> tuple[list[tuple[Movie, User]], list[tuple[int, bytes, str]]]:
+    """
+    Parse the lines of a chunk. Runs in the worker processes.
+
+    Args:
+        chunk (bytes): Complete lines.
+        first_line (int): Line number of the first line.
+        signature (Optional[str]): Signature for verification.
+
+    Returns:
+        list[tuple[Movie, User]]: Movie and User objects of the valid lines.
+        list[tuple[int, bytes, str]]: Line number, line and error message of the malformed lines.
+    """
+    batch: list[tuple[Movie, User]] = []
+    errors: list[tuple[int, bytes, str]] = []
+    append = batch.append
+    for line_number, line in enumerate(chunk.split(b"\n"), first_line):
+        if not line or line.isspace():
+            continue
+        try:
+            append(parse_webhook_data(line, signature))
+        except Exception as e:
+            # JSON 以外に、オブジェクトでない行や型の合わない値もここで弾く
+            errors.append((line_number, line, f"{type(e).__name__}: {e}"))
+    return batch, errors
+
+def _numbered(chunks: Iterator[bytes]) -> Iterator[tuple[int, bytes]]:
+    """
+    Attach the number of its first line to every chunk.
+
+    Args:
+        chunks (Iterator[bytes]): Chunks ending at line boundaries.
+
+    Yields:
+        int: Line number of the first line of the chunk.
+        bytes: Chunk.
+    """
+    line_number = 1
+    for chunk in chunks:
+        yield line_number, chunk
+        line_number += chunk.count(b"\n")
+
+def _iter_chunks(source: str | os.PathLike | IO | Iterable[str | bytes], chunk_size: int) -> Iterator[bytes]:
+    """
+    Cut the input into chunks of complete lines.
+
+    Args:
+        source (str | os.PathLike | IO | Iterable[str | bytes]): Path, file object or iterable of lines.
+        chunk_size (int): Approximate chunk size in bytes.
+
+    Yields:
+        bytes: Chunk. Every chunk but the last ends with a newline.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                size = len(mm)
+                start = 0
+                while start < size:
+                    end = mm.find(b"\n", min(start + chunk_size, size) - 1)
+                    end = size if end < 0 else end + 1
+                    yield mm[start:end]
+                    start = end
+    elif hasattr(source, "read"):
+        rest = b""
+        while True:
+            block = source.read(chunk_size)
+            if not block:
+                break
+            if isinstance(block, str):
+                block = block.encode()
+            block = rest + block
+            cut = block.rfind(b"\n") + 1
+            if cut:
+                yield block[:cut]
+                rest = block[cut:]
+            else:
+                # 1 行が chunk_size より長い
+                rest = block
+        if rest:
+            yield rest
+    else:
+        lines: list[bytes] = []
+        size = 0
+        for line in source:
+            if isinstance(line, str):
+                line = line.encode()
+            if not line.endswith(b"\n"):
+                line += b"\n"
+            lines.append(line)
+            size += len(line)
+            if size >= chunk_size:
+                yield b"".join(lines)
+                lines.clear()
+                size = 0
+        if lines:
+            yield b"".join(lines)
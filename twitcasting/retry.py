@@ -0,0 +1,322 @@
+import asyncio, random, threading, time
+from typing import Awaitable, Callable, Collection, Optional, TypeVar, Never
+
+from .exceptions import TwitCastingCircuitOpenException, TwitCastingException, TwitCastingExecutionCountLimitationException, TwitCastingNetworkException
+
+T = TypeVar("T")
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+def is_server_failure(error: Exception) -> bool:
+    """
+    Tell whether an exception means the API is unhealthy.
+
+    Network errors and 5xx responses are server failures; client errors such
+    as 404 or the quota error 2000 are not.
+
+    Args:
+        error (Exception): Raised exception.
+
+    Returns:
+        bool: True for network errors and 5xx responses.
+    """
+    if isinstance(error, TwitCastingNetworkException):
+        return True
+    if isinstance(error, TwitCastingException):
+        return error.code == 500 or (error.status is not None and error.status >= 500)
+    return False
+
+class RetryPolicy:
+    """
+    When and how long to wait before resending a failed request.
+
+    Network errors and the error codes in retry_codes (500 by default) are
+    retried with exponential backoff and jitter: attempt n waits a random time
+    between (1 - jitter) and 1 times min(backoff * 2 ** (n - 1), max_backoff),
+    or the Retry-After of the response if longer. Error 2000 is retried once the
+    quota resets (X-RateLimit-Reset) if that is at most max_quota_wait seconds away.
+
+    Pass it to TwitCastingClient or AsyncTwitCastingClient to apply it to every request.
+    """
+
+    def __init__(self, max_attempts: int = 3, backoff: float = 0.5, max_backoff: float = 30.0, jitter: float = 1.0, retry_codes: Collection[int] = (500,), retry_network: bool = True, max_quota_wait: Optional[float] = 60.0, sleep: Callable[[float], None] = time.sleep, seed: Optional[int] = None) -> None:
+        """
+        Initialize the RetryPolicy object.
+
+        Args:
+            max_attempts (int): Maximum number of attempts per request, including the first. Default is 3.
+            backoff (float): Wait in seconds before the first retry. Default is 0.5.
+            max_backoff (float): Upper bound of the backoff in seconds. Default is 30.0.
+            jitter (float): Share of the backoff randomized (0 disables, 1 is full jitter). Default is 1.0.
+            retry_codes (Collection[int]): Error codes retried with backoff. Default is (500,).
+            retry_network (bool): Retry connection errors and timeouts. Default is True.
+            max_quota_wait (Optional[float]): Maximum seconds to wait for the quota after error 2000. None disables quota waits. Default is 60.0.
+            sleep (Callable[[float], None]): Function used to wait by the sync client. Default is time.sleep.
+            seed (Optional[int]): Seed of the jitter. Default is None.
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be 1 or greater.")
+        if not 0 <= jitter <= 1:
+            raise ValueError("jitter must be between 0 and 1.")
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_codes = frozenset(retry_codes)
+        self.retry_network = retry_network
+        self.max_quota_wait = max_quota_wait
+        self.sleep = sleep
+        self.retry_count = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        """
+        String representation of the RetryPolicy object.
+
+        Returns:
+            str: String representation of the RetryPolicy object.
+        """
+        return f"RetryPolicy(max_attempts={self.max_attempts}, backoff={self.backoff}, max_backoff={self.max_backoff}, retry_codes={sorted(self.retry_codes)}, retry_count={self.retry_count})"
+
+    def delay(self, attempt: int, error: Exception) -> Optional[float]:
+        """
+        Get the wait before the next attempt.
+
+        Args:
+            attempt (int): Number of attempts made so far (1 after the first failure).
+            error (Exception): Exception raised by the last attempt.
+
+        Returns:
+            Optional[float]: Seconds to wait, or None if the request must not be retried.
+        """
+        if attempt >= self.max_attempts or isinstance(error, TwitCastingCircuitOpenException):
+            return None
+        if isinstance(error, TwitCastingExecutionCountLimitationException):
+            # リセット時刻が分からない場合やスケジューラーが諦めた場合は再送しない
+            if self.max_quota_wait is None or error.retry_after is None or error.retry_after > self.max_quota_wait:
+                return None
+            return error.retry_after
+        if isinstance(error, TwitCastingNetworkException):
+            if not self.retry_network:
+                return None
+        elif not isinstance(error, TwitCastingException) or error.code not in self.retry_codes:
+            return None
+        base = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+        with self._lock:
+            wait = base * (1 - self.jitter * self._random.random())
+        return max(wait, error.retry_after or 0.0)
+
+    def _next_delay(self, attempt: int, error: Exception) -> Optional[float]:
+        """
+        Get the wait before the next attempt and count the retry.
+
+        Args:
+            attempt (int): Number of attempts made so far.
+            error (Exception): Exception raised by the last attempt.
+
+        Returns:
+            Optional[float]: Seconds to wait, or None if the request must not be retried.
+        """
+        wait = self.delay(attempt, error)
+        if wait is not None:
+            with self._lock:
+                self.retry_count += 1
+        return wait
+
+class _Circuit:
+    """
+    State of the circuit of one endpoint.
+    """
+
+    __slots__ = ("state", "failures", "opened_at", "trials")
+
+    def __init__(self) -> None:
+        """
+        Initialize the _Circuit object.
+        """
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trials = 0
+
+class CircuitBreaker:
+    """
+    Fail fast on an endpoint while the API keeps failing.
+
+    After failure_threshold consecutive server failures (see is_server_failure)
+    the circuit of the endpoint opens and requests raise
+    TwitCastingCircuitOpenException without being sent. After recovery_timeout
+    seconds up to half_open_max trial requests are let through: a success closes
+    the circuit, a failure opens it again. Endpoints are keyed by the first path
+    segment, e.g. "users" or "webhooks".
+
+    Pass it to TwitCastingClient or AsyncTwitCastingClient to apply it to every request.
+    """
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0, half_open_max: int = 1, clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Initialize the CircuitBreaker object.
+
+        Args:
+            failure_threshold (int): Consecutive server failures that open the circuit. Default is 5.
+            recovery_timeout (float): Seconds the circuit stays open before trial requests are allowed. Default is 30.0.
+            half_open_max (int): Trial requests allowed at the same time while half open. Default is 1.
+            clock (Callable[[], float]): Monotonic clock. Default is time.monotonic.
+        """
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be 1 or greater.")
+        if half_open_max < 1:
+            raise ValueError("half_open_max must be 1 or greater.")
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max = half_open_max
+        self.rejected_count = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._circuits: dict[str, _Circuit] = {}
+
+    def __repr__(self) -> str:
+        """
+        String representation of the CircuitBreaker object.
+
+        Returns:
+            str: String representation of the CircuitBreaker object.
+        """
+        return f"CircuitBreaker(failure_threshold={self.failure_threshold}, recovery_timeout={self.recovery_timeout}, open={[key for key, circuit in self._circuits.items() if circuit.state != CIRCUIT_CLOSED]}, rejected_count={self.rejected_count})"
+
+    def state(self, endpoint: str) -> str:
+        """
+        Get the state of the circuit of an endpoint.
+
+        Args:
+            endpoint (str): Endpoint name.
+
+        Returns:
+            str: CIRCUIT_CLOSED, CIRCUIT_OPEN or CIRCUIT_HALF_OPEN.
+        """
+        with self._lock:
+            circuit = self._circuits.get(endpoint)
+            if circuit is None:
+                return CIRCUIT_CLOSED
+            if circuit.state == CIRCUIT_OPEN and self._clock() - circuit.opened_at >= self.recovery_timeout:
+                return CIRCUIT_HALF_OPEN
+            return circuit.state
+
+    def before_request(self, endpoint: str) -> None | Never:
+        """
+        Let a request through or fail fast.
+
+        Args:
+            endpoint (str): Endpoint name.
+
+        Raises:
+            TwitCastingCircuitOpenException: If the circuit is open, or half open with every trial slot taken.
+        """
+        with self._lock:
+            circuit = self._circuits.get(endpoint)
+            if circuit is None or circuit.state == CIRCUIT_CLOSED:
+                return
+            remaining = circuit.opened_at + self.recovery_timeout - self._clock()
+            if circuit.state == CIRCUIT_OPEN and remaining <= 0:
+                circuit.state = CIRCUIT_HALF_OPEN
+                circuit.trials = 0
+            if circuit.state == CIRCUIT_HALF_OPEN and circuit.trials < self.half_open_max:
+                circuit.trials += 1
+                return
+            self.rejected_count += 1
+        raise TwitCastingCircuitOpenException(f"Circuit open: /{endpoint} is failing, retry in {max(remaining, 0.0):.1f} seconds", retry_after=max(remaining, 0.0))
+
+    def record(self, endpoint: str, error: Optional[Exception] = None) -> None:
+        """
+        Record the result of a request let through by before_request.
+
+        Args:
+            endpoint (str): Endpoint name.
+            error (Optional[Exception]): Exception raised by the request, or None on success. Default is None.
+        """
+        failed = error is not None and is_server_failure(error)
+        with self._lock:
+            circuit = self._circuits.get(endpoint)
+            if circuit is None:
+                if not failed:
+                    return
+                circuit = self._circuits[endpoint] = _Circuit()
+            if circuit.state == CIRCUIT_HALF_OPEN:
+                circuit.trials = max(circuit.trials - 1, 0)
+            if not failed:
+                circuit.state = CIRCUIT_CLOSED
+                circuit.failures = 0
+                return
+            circuit.failures += 1
+            if circuit.state == CIRCUIT_HALF_OPEN or circuit.failures >= self.failure_threshold:
+                circuit.state = CIRCUIT_OPEN
+                circuit.opened_at = self._clock()
+
+def call_with_retry(endpoint: str, call: Callable[[], T], retry: Optional[RetryPolicy], breaker: Optional[CircuitBreaker]) -> T | Never:
+    """
+    Call a request function under a retry policy and a circuit breaker.
+
+    Args:
+        endpoint (str): Endpoint name used by the circuit breaker.
+        call (Callable[[], T]): Function sending the request once.
+        retry (Optional[RetryPolicy]): Retry policy, or None to send once.
+        breaker (Optional[CircuitBreaker]): Circuit breaker, or None.
+
+    Returns:
+        T: Result of the call.
+        Never: Raises the exception of the last attempt.
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        if breaker is not None:
+            breaker.before_request(endpoint)
+        try:
+            result = call()
+        except Exception as e:
+            if breaker is not None:
+                breaker.record(endpoint, e)
+            wait = retry._next_delay(attempt, e) if retry is not None else None
+            if wait is None:
+                raise
+            retry.sleep(wait)
+            continue
+        if breaker is not None:
+            breaker.record(endpoint)
+        return result
+
+async def call_with_retry_async(endpoint: str, call: Callable[[], Awaitable[T]], retry: Optional[RetryPolicy], breaker: Optional[CircuitBreaker]) -> T | Never:
+    """
+    Coroutine version of call_with_retry. Waits with asyncio.sleep.
+
+    Args:
+        endpoint (str): Endpoint name used by the circuit breaker.
+        call (Callable[[], Awaitable[T]]): Coroutine function sending the request once.
+        retry (Optional[RetryPolicy]): Retry policy, or None to send once.
+        breaker (Optional[CircuitBreaker]): Circuit breaker, or None.
+
+    Returns:
+        T: Result of the call.
+        Never: Raises the exception of the last attempt.
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        if breaker is not None:
+            breaker.before_request(endpoint)
+        try:
+            result = await call()
+        except Exception as e:
+            if breaker is not None:
+                breaker.record(endpoint, e)
+            wait = retry._next_delay(attempt, e) if retry is not None else None
+            if wait is None:
+                raise
+            await asyncio.sleep(wait)
+            continue
+        if breaker is not None:
+            breaker.record(endpoint)
+        return result
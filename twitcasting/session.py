@@ -0,0 +1,247 @@
+from types import MappingProxyType
+from typing import Container, Iterable, Iterator, Mapping, Optional, Never
+
+from .cache import ResponseCache
+from .client import TwitCastingClient, build_headers
+from .comment import Comment, _request_comments
+from .movie import Movie, _request_movie_info, _iter_movies_by_user
+from .reconcile import WebhookSyncReport, _sync_webhooks
+from .snapshot import SnapshotStore
+from .user import User, App, _request_user_info, _iter_users_info, _request_verify_credential
+from .webhook import Webhook, _request_webhook_list, _iter_webhooks, _request_register_webhook, _request_delete_webhook
+
+class TwitCastingSession:
+    """
+    Credentials bound to a pooled client, with every endpoint as a method.
+
+    The credentials are validated and the request headers are built once when
+    the session is created; every call reuses the same read-only header set, so
+    a request only has to build its URL. The raw secrets are not kept.
+    """
+
+    def __init__(self, authorization_mode: str, access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None, client: Optional[TwitCastingClient] = None, cache: Optional[ResponseCache] = None, verify: bool = False) -> None:
+        """
+        Initialize the TwitCastingSession object.
+
+        Args:
+            authorization_mode (str): Authorization mode.
+                - "bearer" for Access token
+                - "basic" for Client ID and Client Secret
+            access_token (Optional[str]): Access token. Default is None.
+            client_id (Optional[str]): Client ID. Default is None.
+            client_secret (Optional[str]): Client secret. Default is None.
+            client (Optional[TwitCastingClient]): Pooled HTTP client. If None, a client is created and closed with the session. Default is None.
+            cache (Optional[ResponseCache]): Response cache used by get_user_info, get_users_info, get_movie_info and verify_credentials. A SnapshotStore also records webhook registrations and deletions. Default is None.
+            verify (bool): Call verify_credentials once now and keep the App and User. Default is False.
+        """
+        self.authorization_mode = authorization_mode
+        self.headers: Mapping[str, str] = MappingProxyType(build_headers(authorization_mode, access_token, client_id, client_secret))
+        self.cache = cache
+        self.app: Optional[App] = None
+        self.user: Optional[User] = None
+        self._owns_client = client is None
+        self.client = client if client is not None else TwitCastingClient()
+        if verify:
+            try:
+                self.verify_credentials()
+            except Exception:
+                self.close()
+                raise
+
+    def __repr__(self) -> str:
+        """
+        String representation of the TwitCastingSession object.
+
+        Returns:
+            str: String representation of the TwitCastingSession object.
+        """
+        return f"TwitCastingSession(authorization_mode={self.authorization_mode}, app={self.app}, user={self.user})"
+
+    def __enter__(self) -> "TwitCastingSession":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the client if the session created it.
+        """
+        if self._owns_client:
+            self.client.close()
+
+    def verify_credentials(self) -> tuple[App, User, int, int] | Never:
+        """
+        Verify the credentials and keep the App and User on the session.
+
+        Returns:
+            App: App object.
+            User: User object.
+            int: ユーザーのサポーターの数
+            int: ユーザーがサポートしている数
+        """
+        result = _request_verify_credential(self.headers, self.client, self.cache)
+        self.app, self.user = result[0], result[1]
+        return result
+
+    def get_user_info(self, user_id: str) -> tuple[User, int, int] | Never:
+        """
+        Get user information.
+
+        Args:
+            user_id (str): User ID.
+
+        Returns:
+            User: User object.
+            int: ユーザーのサポーターの数
+            int: ユーザーがサポートしている数
+        """
+        return _request_user_info(user_id, self.headers, self.client, self.cache)
+
+    def get_users_info(self, user_ids: Iterable[str], concurrency: int = 16) -> Iterator[tuple[str, User | Exception, Optional[int], Optional[int]]]:
+        """
+        Get information of many users in parallel. See user.get_users_info.
+
+        Args:
+            user_ids (Iterable[str]): User IDs. Consumed lazily.
+            concurrency (int): Maximum number of requests in flight. Default is 16.
+
+        Yields:
+            str: User ID.
+            User | Exception: User object, or the exception raised for the user ID.
+            Optional[int]: ユーザーのサポーターの数 (None on failure)
+            Optional[int]: ユーザーがサポートしている数 (None on failure)
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be 1 or greater.")
+        return _iter_users_info(user_ids, self.headers, concurrency, self.client, self.cache)
+
+    def get_movie_info(self, movie_id: str) -> tuple[Movie, User, list[str]] | Never:
+        """
+        Get movie information.
+
+        Args:
+            movie_id (str): Movie ID.
+
+        Returns:
+            Movie: Movie object.
+            User: Broadcaster.
+            list[str]: Tags of the movie.
+        """
+        return _request_movie_info(movie_id, self.headers, self.client, self.cache)
+
+    def iter_movies_by_user(self, user_id: str, known_ids: Optional[Container[str]] = None, page_size: int = 50) -> Iterator[Movie] | Never:
+        """
+        Iterate over the movies of a user, newest first. See movie.iter_movies_by_user.
+
+        Args:
+            user_id (str): User ID.
+            known_ids (Optional[Container[str]]): Movie IDs already seen. The iteration stops at the first one. Default is None.
+            page_size (int): Number of movies per request (1-50). Default is 50.
+
+        Yields:
+            Movie: Movie object.
+        """
+        if not 1 <= page_size <= 50:
+            raise ValueError("page_size must be between 1 and 50.")
+        return _iter_movies_by_user(user_id, self.headers, known_ids, page_size, self.client)
+
+    def get_comments(self, movie_id: str, offset: int = 0, limit: int = 10, slice_id: Optional[str] = None) -> tuple[int, list[Comment]] | Never:
+        """
+        Get the comments of a movie.
+
+        Args:
+            movie_id (str): Movie ID.
+            offset (int): Offset from the newest comment. Ignored when slice_id is set. Default is 0.
+            limit (int): Number of comments to retrieve (1-50). Default is 10.
+            slice_id (Optional[str]): Only retrieve comments newer than this comment ID. Default is None.
+
+        Returns:
+            int: 総コメント数
+            list[Comment]: Comments, newest first.
+        """
+        return _request_comments(movie_id, self.headers, offset, limit, slice_id, self.client)
+
+    def get_webhook_list(self, user_id: Optional[str] = None, limit: int = 50, offset: int = 0) -> tuple[int, list[Webhook]] | Never:
+        """
+        Get the list of webhooks.
+
+        Args:
+            user_id (Optional[str]): User ID. If None, all webhooks are retrieved.
+            limit (int): Number of webhooks to retrieve. Default is 50.
+            offset (int): Offset for pagination. Default is 0.
+
+        Returns:
+            int: 登録済みWebHook件数
+            list[Webhook]: Webhook list.
+        """
+        return _request_webhook_list(self.headers, user_id, limit, offset, self.client)
+
+    def iter_webhooks(self, user_id: Optional[str] = None, page_size: int = 50, parallel_pages: int = 1) -> Iterator[Webhook] | Never:
+        """
+        Iterate over every registered webhook. See webhook.iter_webhooks.
+
+        Args:
+            user_id (Optional[str]): User ID. If None, all webhooks are retrieved.
+            page_size (int): Number of webhooks per request (1-50). Default is 50.
+            parallel_pages (int): Number of pages fetched ahead in parallel. Default is 1.
+
+        Yields:
+            Webhook: Webhook object.
+        """
+        if not 1 <= page_size <= 50:
+            raise ValueError("page_size must be between 1 and 50.")
+        if parallel_pages < 1:
+            raise ValueError("parallel_pages must be 1 or greater.")
+        return _iter_webhooks(self.headers, user_id, page_size, parallel_pages, self.client)
+
+    def register_webhook(self, user_id: str, events: list[str]) -> tuple[str, list[str]] | Never:
+        """
+        Register a webhook.
+
+        Args:
+            user_id (str): User ID.
+            events (list[str]): List of events to register.
+
+        Returns:
+            str: User ID.
+            list[str]: List of added events.
+        """
+        user_id, added_events = _request_register_webhook(self.headers, user_id, events, self.client)
+        if isinstance(self.cache, SnapshotStore):
+            self.cache.update_webhooks(self.headers["Authorization"], user_id, added=added_events)
+        return user_id, added_events
+
+    def delete_webhook(self, user_id: str, events: Optional[list[str]] = None) -> tuple[str, list[str]] | Never:
+        """
+        Delete a webhook.
+
+        Args:
+            user_id (str): User ID.
+            events (Optional[list[str]]): Events to delete. If None, every event of the user is deleted. Default is None.
+
+        Returns:
+            str: User ID.
+            list[str]: List of deleted events.
+        """
+        user_id, deleted_events = _request_delete_webhook(self.headers, user_id, events, self.client)
+        if isinstance(self.cache, SnapshotStore):
+            self.cache.update_webhooks(self.headers["Authorization"], user_id, deleted=deleted_events)
+        return user_id, deleted_events
+
+    def sync_webhooks(self, desired: Mapping[str, Iterable[str]], concurrency: int = 8, dry_run: bool = False, prune: bool = True) -> WebhookSyncReport | Never:
+        """
+        Make the registered webhooks match the desired state. See reconcile.sync_webhooks.
+
+        Args:
+            desired (Mapping[str, Iterable[str]]): Desired events per user ID. An empty set deletes the user's webhooks.
+            concurrency (int): Maximum number of requests in flight. Default is 8.
+            dry_run (bool): Only compute the changes without applying them. Default is False.
+            prune (bool): Delete the webhooks of users missing from desired. Default is True.
+
+        Returns:
+            WebhookSyncReport: Registered and deleted events per user ID, failures and the number of unchanged users.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be 1 or greater.")
+        return _sync_webhooks(desired, self.headers, concurrency, dry_run, prune, self.client)
@@ -0,0 +1,132 @@
+import asyncio, copy, threading
+from typing import Any, Awaitable, Callable, Hashable, Optional, TypeVar, Never
+
+T = TypeVar("T")
+
+class _Call:
+    """
+    Request in flight, waited on by the coalesced callers.
+    """
+
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls into one.
+
+    While a call for a key is in flight, other callers with the same key wait
+    for it and get its result or exception instead of calling again. Nothing is
+    kept once the call returns; combine with ResponseCache to reuse results.
+
+    Pass it to TwitCastingClient or AsyncTwitCastingClient to coalesce GET
+    requests with the same URL and credential. The same instance works for
+    threads (do) and coroutines (do_async).
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize the SingleFlight object.
+        """
+        self.calls = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self._tasks: dict[tuple[asyncio.AbstractEventLoop, Hashable], asyncio.Future] = {}
+
+    def __repr__(self) -> str:
+        """
+        String representation of the SingleFlight object.
+
+        Returns:
+            str: String representation of the SingleFlight object.
+        """
+        return f"SingleFlight(calls={self.calls}, coalesced={self.coalesced}, in_flight={len(self._calls) + len(self._tasks)})"
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T | Never:
+        """
+        Call fn, or wait for the call in flight with the same key.
+
+        Args:
+            key (Hashable): Identity of the call.
+            fn (Callable[[], T]): Function performing the call.
+
+        Returns:
+            T: Result of the shared call.
+            Never: Raises the exception of the shared call. Waiters get a copy.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                # traceback を共有しないよう複製を送出する
+                raise copy.copy(call.error)
+            return call.value
+        try:
+            call.value = fn()
+            return call.value
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T | Never:
+        """
+        Coroutine version of do.
+
+        The call runs in its own task, so cancelling one caller does not cancel
+        it for the others.
+
+        Args:
+            key (Hashable): Identity of the call.
+            fn (Callable[[], Awaitable[T]]): Coroutine function performing the call.
+
+        Returns:
+            T: Result of the shared call.
+            Never: Raises the exception of the shared call.
+        """
+        loop = asyncio.get_running_loop()
+        task_key = (loop, key)
+        task = self._tasks.get(task_key)
+        if task is None:
+            task = self._tasks[task_key] = asyncio.ensure_future(fn())
+            with self._lock:
+                self.calls += 1
+
+            def forget(done: asyncio.Future) -> None:
+                if self._tasks.get(task_key) is done:
+                    del self._tasks[task_key]
+                # 待つ側が全員キャンセルされても警告を出さない
+                if not done.cancelled():
+                    done.exception()
+
+            task.add_done_callback(forget)
+        else:
+            with self._lock:
+                self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict[str, int]:
+        """
+        Get the counters.
+
+        Returns:
+            dict[str, int]: calls (actually performed) and coalesced (served by a call in flight).
+        """
+        with self._lock:
+            return {"calls": self.calls, "coalesced": self.coalesced}
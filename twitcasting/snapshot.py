@@ -0,0 +1,513 @@
+import json, sqlite3, threading, time
+from typing import Any, Awaitable, Callable, Iterable, Iterator, Optional, Never
+
+from .cache import ResponseCache
+from .movie import Movie
+from .user import User
+from .webhook import Webhook
+
+# ファイルに書き戻すエンドポイント
+_PERSISTED_ENDPOINTS = ("users", "movies")
+
+class SnapshotStore(ResponseCache):
+    """
+    ResponseCache backed by a SQLite file, so that a restarted worker starts warm.
+
+    User, Movie and Webhook snapshots are stored with the time they were
+    fetched. Pass the store as the ``cache`` argument: get_user_info and
+    get_movie_info first look in memory, then in the file, and only call the
+    API when the snapshot is older than max_age. Users can be looked up by ID
+    or by screen_id. Fetched users and movies are written back in batches of
+    batch_size, or after flush_interval seconds, in one transaction.
+
+    A cold start is then a local read plus a refresh of stale_user_ids().
+    Webhook lists are stored per credential (see webhooks_or_fetch).
+    """
+
+    def __init__(self, path: str, max_age: float = 3600.0, batch_size: int = 100, flush_interval: float = 5.0, maxsize: int = 1024, ttls: Optional[dict[str, float]] = None, timeout: float = 5.0, clock: Callable[[], float] = time.time) -> None:
+        """
+        Initialize the SnapshotStore object.
+
+        Args:
+            path (str): Path of the database file.
+            max_age (float): Seconds a stored snapshot is served without calling the API. Default is 3600.0.
+            batch_size (int): Number of pending writes that triggers a flush. Default is 100.
+            flush_interval (float): Seconds after which pending writes are flushed on the next write. Default is 5.0.
+            maxsize (int): Maximum number of entries of the in-memory cache. Default is 1024.
+            ttls (Optional[dict[str, float]]): TTL in seconds per endpoint of the in-memory cache. Default is None.
+            timeout (float): Seconds to wait for a lock held by another process. Default is 5.0.
+            clock (Callable[[], float]): Clock returning UNIX time, used for the fetch timestamps. Default is time.time.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be 1 or greater.")
+        super().__init__(maxsize=maxsize, ttls=ttls)
+        self.path = path
+        self.max_age = max_age
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        self.loaded = 0
+        self.written = 0
+        self._wall_clock = clock
+        self._local = threading.local()
+        self._pending_lock = threading.Lock()
+        self._pending_users: dict[str, tuple[str, str, Optional[int], Optional[int], float, str]] = {}
+        self._pending_movies: dict[str, tuple[str, str, str, float, Optional[str], Optional[str]]] = {}
+        self._flushed_at = clock()
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        with connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS users (id TEXT PRIMARY KEY, data TEXT NOT NULL, supporter_count INTEGER, supporting_count INTEGER, fetched_at REAL NOT NULL, screen_id TEXT)")
+            connection.execute("CREATE TABLE IF NOT EXISTS movies (id TEXT PRIMARY KEY, user_id TEXT NOT NULL, data TEXT NOT NULL, fetched_at REAL NOT NULL, broadcaster TEXT, tags TEXT)")
+            # 列が足りない古いファイルは列を足し、screen_id は保存済みのデータから埋める
+            if _add_columns(connection, "users", {"screen_id": "TEXT"}):
+                rows = connection.execute("SELECT id, data FROM users").fetchall()
+                connection.executemany("UPDATE users SET screen_id = ? WHERE id = ?", ((json.loads(data).get("screen_id"), user_id) for user_id, data in rows))
+            _add_columns(connection, "movies", {"broadcaster": "TEXT", "tags": "TEXT"})
+            connection.execute("CREATE INDEX IF NOT EXISTS users_screen_id ON users (screen_id)")
+            connection.execute("CREATE INDEX IF NOT EXISTS movies_user_id ON movies (user_id)")
+            connection.execute("CREATE TABLE IF NOT EXISTS webhooks (credential TEXT NOT NULL, user_id TEXT NOT NULL, event TEXT NOT NULL, PRIMARY KEY (credential, user_id, event))")
+            connection.execute("CREATE TABLE IF NOT EXISTS webhook_lists (credential TEXT PRIMARY KEY, fetched_at REAL NOT NULL)")
+
+    def __repr__(self) -> str:
+        """
+        String representation of the SnapshotStore object.
+
+        Returns:
+            str: String representation of the SnapshotStore object.
+        """
+        return f"SnapshotStore(path={self.path}, max_age={self.max_age}, loaded={self.loaded}, written={self.written}, pending={len(self._pending_users) + len(self._pending_movies)})"
+
+    def __enter__(self) -> "SnapshotStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Get the connection of the current thread.
+
+        Returns:
+            sqlite3.Connection: Connection.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = sqlite3.connect(self.path, timeout=self.timeout)
+        return connection
+
+    def close(self) -> None:
+        """
+        Flush the pending writes and close the connection of the current thread.
+        """
+        self.flush()
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def stats(self) -> dict[str, int]:
+        """
+        Get the cache counters.
+
+        Returns:
+            dict[str, int]: hits, misses, evictions and size of the in-memory cache, plus loaded (served from the file), written and pending.
+        """
+        counters = super().stats()
+        with self._pending_lock:
+            counters.update(loaded=self.loaded, written=self.written, pending=len(self._pending_users) + len(self._pending_movies))
+        return counters
+
+    def _expired(self, fetched_at: float, max_age: Optional[float]) -> bool:
+        """
+        Tell whether a snapshot is too old to be served.
+
+        Args:
+            fetched_at (float): UNIX time the snapshot was fetched.
+            max_age (Optional[float]): Maximum age in seconds, or None for the store's max_age.
+
+        Returns:
+            bool: True if the snapshot is too old.
+        """
+        return self._wall_clock() - fetched_at > (self.max_age if max_age is None else max_age)
+
+    def put_user(self, user: User, supporter_count: Optional[int] = None, supporting_count: Optional[int] = None, fetched_at: Optional[float] = None) -> None:
+        """
+        Store a user snapshot. The write is batched.
+
+        Args:
+            user (User): User object.
+            supporter_count (Optional[int]): ユーザーのサポーターの数. Default is None.
+            supporting_count (Optional[int]): ユーザーがサポートしている数. Default is None.
+            fetched_at (Optional[float]): UNIX time the user was fetched. None is now. Default is None.
+        """
+        row = (user.id, _dumps(user), supporter_count, supporting_count, self._wall_clock() if fetched_at is None else fetched_at, user.screen_id)
+        with self._pending_lock:
+            self._pending_users[user.id] = row
+        self._maybe_flush()
+
+    def get_user(self, user_id: str, max_age: Optional[float] = None) -> Optional[tuple[User, Optional[int], Optional[int]]]:
+        """
+        Get a stored user snapshot.
+
+        Args:
+            user_id (str): User ID or screen_id.
+            max_age (Optional[float]): Maximum age in seconds. None uses the store's max_age. Default is None.
+
+        Returns:
+            Optional[tuple[User, Optional[int], Optional[int]]]: User, supporter count and supporting count, or None if missing or too old.
+        """
+        with self._pending_lock:
+            row = self._pending_users.get(user_id)
+            if row is None:
+                row = next((pending for pending in self._pending_users.values() if pending[5] == user_id), None)
+        if row is None:
+            # ID が一致する行を優先し、screen_id が使い回された場合は新しい方を使う
+            row = self._connection().execute("SELECT id, data, supporter_count, supporting_count, fetched_at FROM users WHERE id = ? OR screen_id = ? ORDER BY id = ? DESC, fetched_at DESC LIMIT 1", (user_id, user_id, user_id)).fetchone()
+        if row is None or self._expired(row[4], max_age):
+            return None
+        return User(**json.loads(row[1])), row[2], row[3]
+
+    def users(self) -> Iterator[tuple[User, Optional[int], Optional[int], float]]:
+        """
+        Iterate over every stored user, to rebuild a view at startup.
+
+        Yields:
+            User: User object.
+            Optional[int]: ユーザーのサポーターの数
+            Optional[int]: ユーザーがサポートしている数
+            float: UNIX time the user was fetched.
+        """
+        self.flush()
+        for _, data, supporter_count, supporting_count, fetched_at in self._connection().execute("SELECT id, data, supporter_count, supporting_count, fetched_at FROM users"):
+            yield User(**json.loads(data)), supporter_count, supporting_count, fetched_at
+
+    def stale_user_ids(self, user_ids: Optional[Iterable[str]] = None, max_age: Optional[float] = None) -> list[str]:
+        """
+        Get the users whose snapshot is missing or too old, i.e. the ones to refresh.
+
+        Args:
+            user_ids (Optional[Iterable[str]]): User IDs to check. None checks every stored user. Default is None.
+            max_age (Optional[float]): Maximum age in seconds. None uses the store's max_age. Default is None.
+
+        Returns:
+            list[str]: User IDs to fetch from the API.
+        """
+        self.flush()
+        oldest = self._wall_clock() - (self.max_age if max_age is None else max_age)
+        connection = self._connection()
+        if user_ids is None:
+            return [row[0] for row in connection.execute("SELECT id FROM users WHERE fetched_at < ? ORDER BY id", (oldest,))]
+        fresh = set()
+        user_ids = list(user_ids)
+        # SQLite の変数の上限を超えないように分けて問い合わせる
+        for start in range(0, len(user_ids), 500):
+            chunk = user_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            fresh.update(row[0] for row in connection.execute(f"SELECT id FROM users WHERE fetched_at >= ? AND id IN ({placeholders})", (oldest, *chunk)))
+        return [user_id for user_id in user_ids if user_id not in fresh]
+
+    def put_movie(self, movie: Movie, fetched_at: Optional[float] = None, broadcaster: Optional[User] = None, tags: Optional[Iterable[str]] = None) -> None:
+        """
+        Store a movie snapshot. The write is batched.
+
+        Args:
+            movie (Movie): Movie object.
+            fetched_at (Optional[float]): UNIX time the movie was fetched. None is now. Default is None.
+            broadcaster (Optional[User]): Broadcaster returned with the movie. Without it, get_movie_info does not serve the snapshot. Default is None.
+            tags (Optional[Iterable[str]]): Tags returned with the movie. Default is None.
+        """
+        row = (movie.id, movie.user_id, _dumps(movie), self._wall_clock() if fetched_at is None else fetched_at, _dumps(broadcaster) if broadcaster is not None else None, json.dumps(list(tags or ()), ensure_ascii=False))
+        with self._pending_lock:
+            self._pending_movies[movie.id] = row
+        self._maybe_flush()
+
+    def get_movie(self, movie_id: str, max_age: Optional[float] = None) -> Optional[Movie]:
+        """
+        Get a stored movie snapshot.
+
+        Args:
+            movie_id (str): Movie ID.
+            max_age (Optional[float]): Maximum age in seconds. None uses the store's max_age. Default is None.
+
+        Returns:
+            Optional[Movie]: Movie object, or None if missing or too old.
+        """
+        with self._pending_lock:
+            row = self._pending_movies.get(movie_id)
+        if row is None:
+            row = self._connection().execute("SELECT id, user_id, data, fetched_at FROM movies WHERE id = ?", (movie_id,)).fetchone()
+        if row is None or self._expired(row[3], max_age):
+            return None
+        return Movie(**json.loads(row[2]))
+
+    def get_movie_info(self, movie_id: str, max_age: Optional[float] = None) -> Optional[tuple[Movie, User, list[str]]]:
+        """
+        Get a stored response of the movie info endpoint.
+
+        Args:
+            movie_id (str): Movie ID.
+            max_age (Optional[float]): Maximum age in seconds. None uses the store's max_age. Default is None.
+
+        Returns:
+            Optional[tuple[Movie, User, list[str]]]: Movie, broadcaster and tags, or None if missing, too old or stored without a broadcaster.
+        """
+        with self._pending_lock:
+            row = self._pending_movies.get(movie_id)
+        if row is None:
+            row = self._connection().execute("SELECT id, user_id, data, fetched_at, broadcaster, tags FROM movies WHERE id = ?", (movie_id,)).fetchone()
+        if row is None or row[4] is None or self._expired(row[3], max_age):
+            return None
+        return Movie(**json.loads(row[2])), User(**json.loads(row[4])), json.loads(row[5])
+
+    def movies_by_user(self, user_id: str) -> list[Movie]:
+        """
+        Get every stored movie of a user, whatever its age.
+
+        Args:
+            user_id (str): User ID.
+
+        Returns:
+            list[Movie]: Movie objects, newest first.
+        """
+        self.flush()
+        rows = self._connection().execute("SELECT data FROM movies WHERE user_id = ?", (user_id,))
+        movies = [Movie(**json.loads(data)) for data, in rows]
+        movies.sort(key=lambda movie: movie.created, reverse=True)
+        return movies
+
+    def put_webhooks(self, credential: str, webhooks: Iterable[Webhook], fetched_at: Optional[float] = None) -> None:
+        """
+        Replace the stored webhook list of a credential. Written immediately.
+
+        Args:
+            credential (str): Authorization header value. Only its digest is stored.
+            webhooks (Iterable[Webhook]): Every registered webhook.
+            fetched_at (Optional[float]): UNIX time the list was fetched. None is now. Default is None.
+        """
+        digest = self.make_key("webhooks", "", credential)[2]
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM webhooks WHERE credential = ?", (digest,))
+            connection.executemany("INSERT OR IGNORE INTO webhooks (credential, user_id, event) VALUES (?, ?, ?)", ((digest, webhook.user_id, webhook.event) for webhook in webhooks))
+            connection.execute("INSERT OR REPLACE INTO webhook_lists (credential, fetched_at) VALUES (?, ?)", (digest, self._wall_clock() if fetched_at is None else fetched_at))
+
+    def update_webhooks(self, credential: str, user_id: str, added: Iterable[str] = (), deleted: Iterable[str] = ()) -> None:
+        """
+        Apply a register/delete to the stored webhook list of a credential, keeping its fetch time.
+
+        Args:
+            credential (str): Authorization header value.
+            user_id (str): User ID.
+            added (Iterable[str]): Registered events. Default is ().
+            deleted (Iterable[str]): Deleted events. Default is ().
+        """
+        digest = self.make_key("webhooks", "", credential)[2]
+        connection = self._connection()
+        with connection:
+            connection.executemany("INSERT OR IGNORE INTO webhooks (credential, user_id, event) VALUES (?, ?, ?)", ((digest, user_id, event) for event in added))
+            connection.executemany("DELETE FROM webhooks WHERE credential = ? AND user_id = ? AND event = ?", ((digest, user_id, event) for event in deleted))
+
+    def get_webhooks(self, credential: str, max_age: Optional[float] = None) -> Optional[list[Webhook]]:
+        """
+        Get the stored webhook list of a credential.
+
+        Args:
+            credential (str): Authorization header value.
+            max_age (Optional[float]): Maximum age in seconds. None uses the store's max_age. Default is None.
+
+        Returns:
+            Optional[list[Webhook]]: Webhook list, or None if never stored or too old.
+        """
+        digest = self.make_key("webhooks", "", credential)[2]
+        connection = self._connection()
+        row = connection.execute("SELECT fetched_at FROM webhook_lists WHERE credential = ?", (digest,)).fetchone()
+        if row is None or self._expired(row[0], max_age):
+            return None
+        rows = connection.execute("SELECT user_id, event FROM webhooks WHERE credential = ? ORDER BY user_id, event", (digest,))
+        return [Webhook(user_id, event) for user_id, event in rows]
+
+    def webhooks_or_fetch(self, credential: str, fetch: Callable[[], Iterable[Webhook]], max_age: Optional[float] = None) -> list[Webhook] | Never:
+        """
+        Return the stored webhook list, or call fetch and store its result.
+
+        Args:
+            credential (str): Authorization header value.
+            fetch (Callable[[], Iterable[Webhook]]): Function listing every webhook, e.g. lambda: session.iter_webhooks().
+            max_age (Optional[float]): Maximum age in seconds. None uses the store's max_age. Default is None.
+
+        Returns:
+            list[Webhook]: Webhook list.
+        """
+        webhooks = self.get_webhooks(credential, max_age)
+        if webhooks is not None:
+            with self._pending_lock:
+                self.loaded += 1
+            return webhooks
+        webhooks = list(fetch())
+        self.put_webhooks(credential, webhooks)
+        return webhooks
+
+    def _maybe_flush(self) -> None:
+        """
+        Flush the pending writes if the batch is full or the interval has passed.
+        """
+        with self._pending_lock:
+            pending = len(self._pending_users) + len(self._pending_movies)
+            due = pending >= self.batch_size or (pending and self._wall_clock() - self._flushed_at >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write the pending snapshots to the file in one transaction.
+        """
+        with self._pending_lock:
+            users, self._pending_users = self._pending_users, {}
+            movies, self._pending_movies = self._pending_movies, {}
+            self._flushed_at = self._wall_clock()
+        if not users and not movies:
+            return
+        connection = self._connection()
+        try:
+            with connection:
+                # 古いスナップショットで新しいものを上書きしない
+                connection.executemany("INSERT INTO users (id, data, supporter_count, supporting_count, fetched_at, screen_id) VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET data = excluded.data, supporter_count = excluded.supporter_count, supporting_count = excluded.supporting_count, fetched_at = excluded.fetched_at, screen_id = excluded.screen_id WHERE excluded.fetched_at >= users.fetched_at", users.values())
+                connection.executemany("INSERT INTO movies (id, user_id, data, fetched_at, broadcaster, tags) VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET user_id = excluded.user_id, data = excluded.data, fetched_at = excluded.fetched_at, broadcaster = excluded.broadcaster, tags = excluded.tags WHERE excluded.fetched_at >= movies.fetched_at", movies.values())
+        except sqlite3.Error:
+            # 書き込めなかった分は次の flush で再試行する
+            with self._pending_lock:
+                for user_id, row in users.items():
+                    self._pending_users.setdefault(user_id, row)
+                for movie_id, row in movies.items():
+                    self._pending_movies.setdefault(movie_id, row)
+            raise
+        with self._pending_lock:
+            self.written += len(users) + len(movies)
+
+    def _read_snapshot(self, endpoint: str, key: str) -> Any:
+        """
+        Get the stored response of a persisted endpoint.
+
+        Args:
+            endpoint (str): "users" or "movies".
+            key (str): User ID, screen_id or movie ID.
+
+        Returns:
+            Any: Stored response, or None if missing or too old.
+        """
+        snapshot = self.get_user(key) if endpoint == "users" else self.get_movie_info(key)
+        if snapshot is not None:
+            with self._pending_lock:
+                self.loaded += 1
+        return snapshot
+
+    def _write_snapshot(self, endpoint: str, value: Any) -> None:
+        """
+        Store a fetched response of a persisted endpoint.
+
+        Args:
+            endpoint (str): "users" or "movies".
+            value (Any): Parsed response.
+        """
+        if endpoint == "users":
+            self.put_user(*value)
+        else:
+            movie, broadcaster, tags = value
+            self.put_movie(movie, broadcaster=broadcaster, tags=tags)
+
+    def _load(self, endpoint: str, key: str, fetch: Callable[[], Any]) -> Any | Never:
+        """
+        Serve a response from the file, or fetch it and store it.
+
+        Args:
+            endpoint (str): "users" or "movies".
+            key (str): User ID, screen_id or movie ID.
+            fetch (Callable[[], Any]): Function performing the request.
+
+        Returns:
+            Any: Stored or fetched response.
+        """
+        snapshot = self._read_snapshot(endpoint, key)
+        if snapshot is not None:
+            return snapshot
+        value = fetch()
+        self._write_snapshot(endpoint, value)
+        return value
+
+    def get_or_fetch(self, endpoint: str, user_id: str, credential: str, fetch: Callable[[], Any]) -> Any | Never:
+        """
+        Return the cached response, the stored snapshot, or call fetch and store its result.
+
+        The "users" and "movies" endpoints are persisted; other endpoints use the in-memory cache only.
+
+        Args:
+            endpoint (str): Endpoint name, e.g. "users".
+            user_id (str): User ID, or movie ID for "movies". Empty for endpoints without one.
+            credential (str): Authorization header value.
+            fetch (Callable[[], Any]): Function performing the request.
+
+        Returns:
+            Any: Cached, stored or fetched response.
+            Never: Re-raises a cached exception or the exception raised by fetch.
+        """
+        if endpoint not in _PERSISTED_ENDPOINTS:
+            return super().get_or_fetch(endpoint, user_id, credential, fetch)
+        return super().get_or_fetch(endpoint, user_id, credential, lambda: self._load(endpoint, user_id, fetch))
+
+    async def get_or_fetch_async(self, endpoint: str, user_id: str, credential: str, fetch: Callable[[], Awaitable[Any]]) -> Any | Never:
+        """
+        Coroutine version of get_or_fetch.
+
+        Args:
+            endpoint (str): Endpoint name, e.g. "users".
+            user_id (str): User ID, or movie ID for "movies". Empty for endpoints without one.
+            credential (str): Authorization header value.
+            fetch (Callable[[], Awaitable[Any]]): Coroutine function performing the request.
+
+        Returns:
+            Any: Cached, stored or fetched response.
+            Never: Re-raises a cached exception or the exception raised by fetch.
+        """
+        if endpoint not in _PERSISTED_ENDPOINTS:
+            return await super().get_or_fetch_async(endpoint, user_id, credential, fetch)
+
+        async def load() -> Any:
+            snapshot = self._read_snapshot(endpoint, user_id)
+            if snapshot is not None:
+                return snapshot
+            value = await fetch()
+            self._write_snapshot(endpoint, value)
+            return value
+
+        return await super().get_or_fetch_async(endpoint, user_id, credential, load)
+
+def _dumps(obj: User | Movie) -> str:
+    """
+    Serialize a model to JSON through its slots.
+
+    Args:
+        obj (User | Movie): Model object.
+
+    Returns:
+        str: JSON object of the constructor arguments.
+    """
+    return json.dumps({name: getattr(obj, name) for name in obj.__slots__ if not name.startswith("_")}, ensure_ascii=False, separators=(",", ":"))
+
+def _add_columns(connection: sqlite3.Connection, table: str, columns: dict[str, str]) -> list[str]:
+    """
+    Add the columns missing from a table created by an older version.
+
+    Args:
+        connection (sqlite3.Connection): Connection.
+        table (str): Table name.
+        columns (dict[str, str]): Column name to type.
+
+    Returns:
+        list[str]: Names of the added columns.
+    """
+    existing = {row[1] for row in connection.execute(f"PRAGMA table_info({table})")}
+    added = [name for name in columns if name not in existing]
+    for name in added:
+        connection.execute(f"ALTER TABLE {table} ADD COLUMN {name} {columns[name]}")
+    return added
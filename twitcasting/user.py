@@ -1,15 +1,20 @@
-import urllib, base64, json
+import urllib, base64, json, itertools, contextvars, operator, hashlib
 import urllib.request, urllib.error
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
 from urllib.parse import urlencode
-from typing import Optional, Never
+from typing import Any, Iterable, Iterator, Mapping, Optional, Never
 
 from .exceptions import ERROR_CODES_DICT
+from .client import TwitCastingClient, build_headers, send_request
+from .cache import ResponseCache
 
 class User:
     """
     User class for TwitCasting API.
     """
 
+    __slots__ = ("id", "screen_id", "name", "image", "profile", "level", "last_movie_id", "is_live", "_fingerprint")
+
     def __init__(self, id: str, screen_id: str, name: str, image: str, profile: str, level: int, is_live: bool, last_movie_id: Optional[str] = None) -> None:
         """
         Initialize the User object.
@@ -65,11 +70,60 @@ class User:
             return NotImplemented
         return self.id == other.id and self.screen_id == other.screen_id and self.name == other.name and self.image == other.image and self.profile == other.profile and self.level == other.level and self.last_movie_id == other.last_movie_id and self.is_live == other.is_live
 
+    def __hash__(self) -> int:
+        """
+        Hash of the User object. Equal users share the same ID, so only the ID is hashed.
+
+        Returns:
+            int: Hash value.
+        """
+        return hash(self.id)
+
+    def __reduce__(self) -> tuple[type["User"], tuple[Any, ...]]:
+        """
+        Pickle the User object as its constructor arguments, e.g. to send it between processes.
+
+        Returns:
+            tuple[type[User], tuple[Any, ...]]: Class and positional arguments.
+        """
+        return User, (self.id, self.screen_id, self.name, self.image, self.profile, self.level, self.is_live, self.last_movie_id)
+
+    @property
+    def fingerprint(self) -> int:
+        """
+        Stable 64-bit hash of all fields.
+
+        It is computed on first access and cached, so the fields must not be
+        changed afterwards. Unlike hash(), it is the same in every process.
+        """
+        try:
+            return self._fingerprint
+        except AttributeError:
+            self._fingerprint = _content_fingerprint(_user_state(self))
+            return self._fingerprint
+
+    def diff(self, other: "User") -> dict[str, tuple[Any, Any]]:
+        """
+        Get the fields that differ from another User object.
+
+        Args:
+            other (User): Newer User object.
+
+        Returns:
+            dict[str, tuple[Any, Any]]: Field name to (value of self, value of other). Empty if equal.
+        """
+        # 変化のないユーザーが大半なので、まず __eq__ で打ち切る
+        if self == other:
+            return {}
+        return {name: (a, b) for name, a, b in zip(_USER_DEFAULTS, _user_state(self), _user_state(other)) if a != b}
+
 class App:
     """
     App class for TwitCasting API.
     """
 
+    __slots__ = ("client_id", "name", "owner_user_id")
+
     def _validate(self) -> None:
         """
         Validate the App object.
@@ -112,7 +166,87 @@ class App:
         """
         return f"App: {self.name} (Client ID: {self.client_id})"
 
-def get_user_info(user_id: str, authorization_mode: str, access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None) -> tuple[User, int, int] | Never:
+# User のコンストラクタ引数の順に並べた (APIのキー, 既定値)
+_USER_FIELDS: tuple[tuple[str, Any], ...] = (
+    ('id', ''),
+    ('screen_id', ''),
+    ('name', ''),
+    ('image', ''),
+    ('profile', ''),
+    ('level', 0),
+    ('is_live', False),
+    ('last_movie_id', None),
+)
+_USER_DEFAULTS: dict[str, Any] = dict(_USER_FIELDS)
+_user_values = operator.itemgetter(*_USER_DEFAULTS)
+_user_state = operator.attrgetter(*_USER_DEFAULTS)
+
+def _content_fingerprint(values: tuple[Any, ...]) -> int:
+    """
+    Hash the field values of a model.
+
+    Args:
+        values (tuple[Any, ...]): Field values in constructor order. Only str, int, bool and None are expected.
+
+    Returns:
+        int: 64-bit fingerprint.
+    """
+    return int.from_bytes(hashlib.blake2b(repr(values).encode(), digest_size=8).digest(), "big")
+
+def _parse_user(user_data: dict) -> User:
+    """
+    Build a User object from a user object of an API response.
+
+    Args:
+        user_data (dict): User object.
+
+    Returns:
+        User: User object.
+    """
+    return User(*_user_values({**_USER_DEFAULTS, **user_data}))
+
+def _parse_user_response(data: dict) -> tuple[User, int, int]:
+    """
+    Parse the response of the users endpoint.
+
+    Args:
+        data (dict): Decoded response.
+
+    Returns:
+        User: User object.
+        int: ユーザーのサポーターの数
+        int: ユーザーがサポートしている数
+    """
+    user_data = data.get('user', {})
+    user = _parse_user(user_data)
+    # API はカウントを user の外に置く。古い形のレスポンスのため user の中も見る
+    supporter_count = data.get('supporter_count', user_data.get('supporter_count', 0))
+    supporting_count = data.get('supporting_count', user_data.get('supporting_count', 0))
+    return user, supporter_count, supporting_count
+
+def _parse_verify_credential_response(data: dict) -> tuple[App, User, int, int]:
+    """
+    Parse the response of the verify_credentials endpoint.
+
+    Args:
+        data (dict): Decoded response.
+
+    Returns:
+        App: App object.
+        User: User object.
+        int: ユーザーのサポーターの数
+        int: ユーザーがサポートしている数
+    """
+    app_data = data.get('app', {})
+    app = App(
+        client_id=app_data.get('client_id', ''),
+        name=app_data.get('name', ''),
+        owner_user_id=app_data.get('owner_user_id', '')
+    )
+    user, supporter_count, supporting_count = _parse_user_response(data)
+    return app, user, supporter_count, supporting_count
+
+def get_user_info(user_id: str, authorization_mode: str, access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None, client: Optional[TwitCastingClient] = None, cache: Optional[ResponseCache] = None) -> tuple[User, int, int] | Never:
     """
     Get user information.
 
@@ -122,64 +256,115 @@ def get_user_info(user_id: str, authorization_mode: str, access_token: Optional[
         access_token (Optional[str]): Access token. Default is None.
         client_id (Optional[str]): Client ID. Default is None.
         client_secret (Optional[str]): Client secret. Default is None.
+        client (Optional[TwitCastingClient]): Pooled HTTP client. Default is None.
+        cache (Optional[ResponseCache]): Response cache. Default is None.
+    Returns:
+        User: User object.
+        int: ユーザーのサポーターの数
+        int: ユーザーがサポートしている数
+    """
+    headers = build_headers(authorization_mode, access_token, client_id, client_secret)
+    return _request_user_info(user_id, headers, client, cache)
+
+def _request_user_info(user_id: str, headers: Mapping[str, str], client: Optional[TwitCastingClient] = None, cache: Optional[ResponseCache] = None) -> tuple[User, int, int] | Never:
+    """
+    Get user information with prebuilt request headers.
+
+    Args:
+        user_id (str): User ID.
+        headers (Mapping[str, str]): Request headers built by build_headers.
+        client (Optional[TwitCastingClient]): Pooled HTTP client. Default is None.
+        cache (Optional[ResponseCache]): Response cache. Default is None.
+
     Returns:
         User: User object.
         int: ユーザーのサポーターの数
         int: ユーザーがサポートしている数
     """
-    match authorization_mode:
-        case 'basic':
-            if client_id is None or client_secret is None:
-                raise ValueError("client_id and client_secret must be provided for basic authorization.")
-            headers = {
-                'Authorization': 'Basic ' + base64.b64encode(f"{client_id}:{client_secret}".encode()).decode(),
-            }
-        case 'bearer':
-            if access_token is None:
-                raise ValueError("access_token must be provided for bearer authorization.")
-            headers = {
-                'Authorization': 'Bearer ' + access_token,
-            }
-        case _:
-            raise ValueError("Invalid authorization mode. Use 'basic' or 'bearer'.")
     url = f"https://apiv2.twitcasting.tv/users/{user_id}"
-    headers['Accept'] = 'application/json'
-    headers['X-Api-Version'] = '2.0'
-    request = urllib.request.Request(url, headers=headers)
+    if cache is not None:
+        return cache.get_or_fetch('users', user_id, headers['Authorization'], lambda: _parse_user_response(send_request('GET', url, headers, client=client)))
+    data = send_request('GET', url, headers, client=client)
+    return _parse_user_response(data)
+
+def get_users_info(user_ids: Iterable[str], authorization_mode: str, access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None, concurrency: int = 16, client: Optional[TwitCastingClient] = None, cache: Optional[ResponseCache] = None) -> Iterator[tuple[str, User | Exception, Optional[int], Optional[int]]]:
+    """
+    Get information of many users in parallel.
+
+    Results are yielded in completion order. A failed lookup does not stop the
+    batch: the exception is yielded in place of the User object.
+
+    Args:
+        user_ids (Iterable[str]): User IDs. Consumed lazily.
+        authorization_mode (str): Authorization mode.
+        access_token (Optional[str]): Access token. Default is None.
+        client_id (Optional[str]): Client ID. Default is None.
+        client_secret (Optional[str]): Client secret. Default is None.
+        concurrency (int): Maximum number of requests in flight. Default is 16.
+        client (Optional[TwitCastingClient]): Pooled HTTP client. If None, a client is created for the batch. Default is None.
+        cache (Optional[ResponseCache]): Response cache. Default is None.
+
+    Yields:
+        str: User ID.
+        User | Exception: User object, or the exception raised for the user ID.
+        Optional[int]: ユーザーのサポーターの数 (None on failure)
+        Optional[int]: ユーザーがサポートしている数 (None on failure)
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be 1 or greater.")
+    headers = build_headers(authorization_mode, access_token, client_id, client_secret)
+    return _iter_users_info(user_ids, headers, concurrency, client, cache)
+
+def _iter_users_info(user_ids: Iterable[str], headers: Mapping[str, str], concurrency: int = 16, client: Optional[TwitCastingClient] = None, cache: Optional[ResponseCache] = None) -> Iterator[tuple[str, User | Exception, Optional[int], Optional[int]]]:
+    """
+    Get information of many users in parallel with prebuilt request headers.
+
+    Args:
+        user_ids (Iterable[str]): User IDs. Consumed lazily.
+        headers (Mapping[str, str]): Request headers built by build_headers.
+        concurrency (int): Maximum number of requests in flight. Default is 16.
+        client (Optional[TwitCastingClient]): Pooled HTTP client. If None, a client is created for the batch. Default is None.
+        cache (Optional[ResponseCache]): Response cache. Default is None.
+
+    Yields:
+        str: User ID.
+        User | Exception: User object, or the exception raised for the user ID.
+        Optional[int]: ユーザーのサポーターの数 (None on failure)
+        Optional[int]: ユーザーがサポートしている数 (None on failure)
+    """
+    owns_client = client is None
+    if client is None:
+        client = TwitCastingClient(pool_size=concurrency, per_host_limit=concurrency)
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    pending: dict[Future, str] = {}
+    user_id_iter = iter(user_ids)
+
+    def submit(count: int) -> None:
+        for user_id in itertools.islice(user_id_iter, count):
+            # RateLimitScheduler.priority() の設定をワーカースレッドに引き継ぐ
+            future = executor.submit(contextvars.copy_context().run, _request_user_info, user_id, headers, client, cache)
+            pending[future] = user_id
+
     try:
-        with urllib.request.urlopen(request) as response:
-            data = json.loads(response.read().decode())
-    except urllib.error.HTTPError as e:
-        error_code = e.code
-        error_message = ERROR_CODES_DICT.get(error_code, ("Unknown Error", "Unknown Error", Exception))[1]
-        raise Exception(f"Error {error_code}: {error_message}")
-    except urllib.error.URLError as e:
-        raise Exception(f"URL Error: {e.reason}")
-    except json.JSONDecodeError as e:
-        raise Exception(f"JSON Decode Error: {e.msg}")
-    error = data.get('error', None)
-    if error:
-        error_code = error.get("code", None)
-        error_tuple:Optional[tuple] = ERROR_CODES_DICT.get(error_code, "Unknown error")
-        exception = error_tuple[2]
-        raise exception(f"Error {error_code}: {error_tuple[0]} - {error_tuple[1]}")
-    user_data = data.get('user', {})
-    user: User
-    user = User(
-        id=user_data.get('id', ''),
-        screen_id=user_data.get('screen_id', ''),
-        name=user_data.get('name', ''),
-        image=user_data.get('image', ''),
-        profile=user_data.get('profile', ''),
-        level=user_data.get('level', 0),
-        last_movie_id=user_data.get('last_movie_id', None),
-        is_live=user_data.get('is_live', False)
-    )
-    supporter_count = user_data.get('supporter_count', 0)
-    supporting_count = user_data.get('supporting_count', 0)
-    return user, supporter_count, supporting_count
+        # 未送信の ID を溜め込まないよう、実行中の件数を concurrency の 2 倍までに抑える
+        submit(concurrency * 2)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                user_id = pending.pop(future)
+                try:
+                    user, supporter_count, supporting_count = future.result()
+                except Exception as e:
+                    yield user_id, e, None, None
+                else:
+                    yield user_id, user, supporter_count, supporting_count
+            submit(len(done))
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        if owns_client:
+            client.close()
 
-def _verify_credential(authorization_mode: str, access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None) -> tuple[App, User, int, int] | Never:
+def _verify_credential(authorization_mode: str, access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None, client: Optional[TwitCastingClient] = None, cache: Optional[ResponseCache] = None) -> tuple[App, User, int, int] | Never:
     """
     Verify credentials.
 
@@ -188,6 +373,26 @@ def _verify_credential(authorization_mode: str, access_token: Optional[str] = No
         access_token (Optional[str]): Access token. Default is None.
         client_id (Optional[str]): Client ID. Default is None.
         client_secret (Optional[str]): Client secret. Default is None.
+        client (Optional[TwitCastingClient]): Pooled HTTP client. Default is None.
+        cache (Optional[ResponseCache]): Response cache. Default is None.
+
+    Returns:
+        App: App object.
+        User: User object.
+        int: ユーザーのサポーターの数
+        int: ユーザーがサポートしている数
+    """
+    headers = build_headers(authorization_mode, access_token, client_id, client_secret)
+    return _request_verify_credential(headers, client, cache)
+
+def _request_verify_credential(headers: Mapping[str, str], client: Optional[TwitCastingClient] = None, cache: Optional[ResponseCache] = None) -> tuple[App, User, int, int] | Never:
+    """
+    Verify credentials with prebuilt request headers.
+
+    Args:
+        headers (Mapping[str, str]): Request headers built by build_headers.
+        client (Optional[TwitCastingClient]): Pooled HTTP client. Default is None.
+        cache (Optional[ResponseCache]): Response cache. Default is None.
 
     Returns:
         App: App object.
@@ -195,61 +400,8 @@ def _verify_credential(authorization_mode: str, access_token: Optional[str] = No
         int: ユーザーのサポーターの数
         int: ユーザーがサポートしている数
     """
-    match authorization_mode:
-        case 'basic':
-            if client_id is None or client_secret is None:
-                raise ValueError("client_id and client_secret must be provided for basic authorization.")
-            headers = {
-                'Authorization': 'Basic ' + base64.b64encode(f"{client_id}:{client_secret}".encode()).decode(),
-            }
-        case 'bearer':
-            if access_token is None:
-                raise ValueError("access_token must be provided for bearer authorization.")
-            headers = {
-                'Authorization': 'Bearer ' + access_token,
-            }
-        case _:
-            raise ValueError("Invalid authorization mode. Use 'basic' or 'bearer'.")
     url = f"https://apiv2.twitcasting.tv/verify_credentials"
-    headers['Accept'] = 'application/json'
-    headers['X-Api-Version'] = '2.0'
-    request = urllib.request.Request(url, headers=headers)
-    try:
-        with urllib.request.urlopen(request) as response:
-            data = json.loads(response.read().decode())
-    except urllib.error.HTTPError as e:
-        error_code = e.code
-        error_message = ERROR_CODES_DICT.get(error_code, ("Unknown Error", "Unknown Error", Exception))[1]
-        raise Exception(f"Error {error_code}: {error_message}")
-    except urllib.error.URLError as e:
-        raise Exception(f"URL Error: {e.reason}")
-    except json.JSONDecodeError as e:
-        raise Exception(f"JSON Decode Error: {e.msg}")
-    error = data.get('error', None)
-    if error:
-        error_code = error.get("code", None)
-        error_tuple:Optional[tuple] = ERROR_CODES_DICT.get(error_code, "Unknown error")
-        exception = error_tuple[2]
-        raise exception(f"Error {error_code}: {error_tuple[0]} - {error_tuple[1]}")
-    app_data = data.get('app', {})
-    app: App
-    app = App(
-        client_id=app_data.get('client_id', ''),
-        name=app_data.get('name', ''),
-        owner_user_id=app_data.get('owner_user_id', '')
-    )
-    user_data = data.get('user', {})
-    user: User
-    user = User(
-        id=user_data.get('id', ''),
-        screen_id=user_data.get('screen_id', ''),
-        name=user_data.get('name', ''),
-        image=user_data.get('image', ''),
-        profile=user_data.get('profile', ''),
-        level=user_data.get('level', 0),
-        last_movie_id=user_data.get('last_movie_id', None),
-        is_live=user_data.get('is_live', False)
-    )
-    supporter_count = user_data.get('supporter_count', 0)
-    supporting_count = user_data.get('supporting_count', 0)
-    return app, user, supporter_count, supporting_count
\ No newline at end of file
+    if cache is not None:
+        return cache.get_or_fetch('verify_credentials', '', headers['Authorization'], lambda: _parse_verify_credential_response(send_request('GET', url, headers, client=client)))
+    data = send_request('GET', url, headers, client=client)
+    return _parse_verify_credential_response(data)
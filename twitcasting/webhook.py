@@ -1,16 +1,29 @@
-import urllib, base64, json
+import urllib, base64, json, contextvars, hmac
 import urllib.request, urllib.error
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
 from urllib.parse import urlencode
-from typing import Never, Optional
+from typing import Iterator, Mapping, Never, Optional
 
-from .exceptions import ERROR_CODES_DICT
-from .user import User
-from .movie import Movie
+from .exceptions import ERROR_CODES_DICT, TwitCastingException, raise_for_error
+from .client import TwitCastingClient, build_headers, send_request, stream_request
+from .jsonstream import JSONArrayDecoder
+from .user import User, _parse_user
+from .movie import Movie, _parse_movie
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 class Webhook:
     """
     Webhook class for TwitCasting API.
     """
+
+    __slots__ = ("user_id", "event")
+
     def _validate(self):
         """
         Validate the Webhook object.
@@ -53,7 +66,71 @@ class Webhook:
             return NotImplemented
         return not self.__eq__(other)
 
-def get_webhook_list(authorization_mode: str, access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None, user_id: Optional[str] = None, limit: int = 50, offset: int = 0) -> tuple[int, list[Webhook]] | Never:
+    def __hash__(self):
+        return hash((self.user_id, self.event))
+
+def _parse_webhook_list_response(response_data: dict) -> tuple[int, list[Webhook]]:
+    """
+    Parse the response of the webhook list endpoint.
+
+    Args:
+        response_data (dict): Decoded response.
+
+    Returns:
+        int: 登録済みWebHook件数
+        list[Webhook]: Webhook list.
+    """
+    all_count = response_data.get("all_count", 0)
+    webhooks_data = response_data.get("webhooks", [])
+    return all_count, [_parse_webhook(webhook_data) for webhook_data in webhooks_data]
+
+def _parse_webhook(webhook_data: dict) -> Webhook:
+    """
+    Parse one webhook of a webhook list response.
+
+    Args:
+        webhook_data (dict): Webhook object.
+
+    Returns:
+        Webhook: Webhook object.
+    """
+    return Webhook(webhook_data.get("user_id", ""), webhook_data.get("event", ""))
+
+def _parse_webhook_events_response(response_data: dict) -> tuple[str, list[str]]:
+    """
+    Parse the response of the webhook register/delete endpoints.
+
+    Args:
+        response_data (dict): Decoded response.
+
+    Returns:
+        str: User ID.
+        list[str]: List of events.
+    """
+    user_id = response_data.get("user_id", "")
+    # API は added_events / deleted_events を返す
+    for key in ("added_events", "deleted_events", "events"):
+        if key in response_data:
+            return user_id, response_data[key]
+    return user_id, []
+
+def _delete_webhook_query(user_id: str, events: Optional[list[str]]) -> str:
+    """
+    Build the query string of the webhook delete endpoint.
+
+    Args:
+        user_id (str): User ID.
+        events (Optional[list[str]]): Events to delete, or None for every event.
+
+    Returns:
+        str: Query string.
+    """
+    query = [("user_id", user_id)]
+    if events is not None:
+        query += [("events[]", event) for event in events]
+    return urlencode(query)
+
+def get_webhook_list(authorization_mode: str, access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None, user_id: Optional[str] = None, limit: int = 50, offset: int = 0, client: Optional[TwitCastingClient] = None) -> tuple[int, list[Webhook]] | Never:
     """
     Get the list of webhooks.
 
@@ -67,41 +144,34 @@ def get_webhook_list(authorization_mode: str, access_token: Optional[str] = None
         user_id (Optional[str]): User ID. If None, all webhooks are retrieved.
         limit (int): Number of webhooks to retrieve. Default is 50.
         offset (int): Offset for pagination. Default is 0.
+        client (Optional[TwitCastingClient]): Pooled HTTP client. Default is None.
 
     Returns:
         int: 登録済みWebHook件数
         list[Webhook]: Webhook list.
         Never: Raises an exception if the request fails.
     """
-    match authorization_mode:
-        case "bearer":
-            headers = {
-                "Authorization": f"Bearer {access_token}"
-            }
-        case "basic":
-            headers = {
-                "Authorization": f"Basic {base64.b64encode(f'{client_id}:{client_secret}'.encode()).decode()}"
-            }
-        case _:
-            raise ValueError("Invalid authorization mode. Use 'bearer' or 'basic'.")
-    headers["Accept"] = "application/json"
-    headers["X-Api-Version"] = "2.0"
-    url = f"https://apiv2.twitcasting.tv/webhooks?limit={limit}&offset={offset}"
-    if user_id:
-        url += f"&user_id={user_id}"
-    try:
-        response = urllib.request.urlopen(urllib.request.Request(url, headers=headers))
-        response_data = json.loads(response.read().decode())
-    except urllib.error.HTTPError as e:
-        error_code = e.code
-        error_message = ERROR_CODES_DICT.get(error_code, "Unknown error")
-        raise Exception(f"Error {error_code}: {error_message}") from e
-    except urllib.error.URLError as e:
-        raise Exception(f"URL Error: {e.reason}") from e
-    except json.JSONDecodeError as e:
-        raise Exception(f"JSON Decode Error: {e.msg}") from e
-    except Exception as e:
-        raise Exception(f"An unexpected error occurred: {str(e)}") from e
+    headers = build_headers(authorization_mode, access_token, client_id, client_secret)
+    return _request_webhook_list(headers, user_id, limit, offset, client)
+
+def _request_webhook_list(headers: Mapping[str, str], user_id: Optional[str] = None, limit: int = 50, offset: int = 0, client: Optional[TwitCastingClient] = None) -> tuple[int, list[Webhook]] | Never:
+    """
+    Get the list of webhooks with prebuilt request headers.
+
+    Args:
+        headers (Mapping[str, str]): Request headers built by build_headers.
+        user_id (Optional[str]): User ID. If None, all webhooks are retrieved.
+        limit (int): Number of webhooks to retrieve. Default is 50.
+        offset (int): Offset for pagination. Default is 0.
+        client (Optional[TwitCastingClient]): Pooled HTTP client. Default is None.
+
+    Returns:
+        int: 登録済みWebHook件数
+        list[Webhook]: Webhook list.
+        Never: Raises an exception if the request fails.
+    """
+    decoder = JSONArrayDecoder("webhooks")
+    webhooks = list(_stream_webhook_list(decoder, headers, user_id, limit, offset, client))
     #{
     #    "all_count": 2,
     #    "webhooks": [
@@ -109,22 +179,135 @@ def get_webhook_list(authorization_mode: str, access_token: Optional[str] = None
     #      {"user_id":"7134775954","event":"liveend"}
     #    ]
     #}
-    webhooks:list[Webhook] = []
-    error = response_data.get("error", None)
-    if error:
-        error_code = error.get("code", None)
-        error_tuple:Optional[tuple] = ERROR_CODES_DICT.get(error_code, "Unknown error")
-        exception = error_tuple[2]
-        raise exception(f"Error {error_code}: {error_tuple[0]} - {error_tuple[1]}")
-    all_count = response_data.get("all_count", 0)
-    webhooks_data = response_data.get("webhooks", [])
+    return decoder.fields.get("all_count", 0), webhooks
+
+def _stream_webhook_list(decoder: JSONArrayDecoder, headers: Mapping[str, str], user_id: Optional[str] = None, limit: int = 50, offset: int = 0, client: Optional[TwitCastingClient] = None) -> Iterator[Webhook] | Never:
+    """
+    Get a page of webhooks, yielding every webhook as soon as it is received.
+
+    The body is decoded incrementally, so the page is never held in memory as
+    a whole. Members written before the array, such as all_count, are in
+    decoder.fields once decoder.array_started is True; the others at the end.
+
+    Args:
+        decoder (JSONArrayDecoder): Decoder of the "webhooks" array.
+        headers (Mapping[str, str]): Request headers built by build_headers.
+        user_id (Optional[str]): User ID. If None, all webhooks are retrieved.
+        limit (int): Number of webhooks to retrieve. Default is 50.
+        offset (int): Offset for pagination. Default is 0.
+        client (Optional[TwitCastingClient]): Pooled HTTP client. Default is None.
+
+    Yields:
+        Webhook: Webhook object.
+    """
+    url = f"https://apiv2.twitcasting.tv/webhooks?limit={limit}&offset={offset}"
+    if user_id:
+        url += f"&user_id={user_id}"
+    for chunk in stream_request("GET", url, headers, client=client):
+        try:
+            webhooks_data = decoder.feed(chunk)
+        except ValueError as e:
+            raise TwitCastingException(f"JSON Decode Error: {e}") from e
+        for webhook_data in webhooks_data:
+            yield _parse_webhook(webhook_data)
+    try:
+        webhooks_data, fields = decoder.close()
+    except ValueError as e:
+        raise TwitCastingException(f"JSON Decode Error: {e}") from e
+    raise_for_error(fields)
     for webhook_data in webhooks_data:
-        user_id = webhook_data.get("user_id", "")
-        event = webhook_data.get("event", "")
-        webhooks.append(Webhook(user_id, event))
-    return all_count, webhooks
+        yield _parse_webhook(webhook_data)
 
-def register_webhook(authorization_mode: str, user_id: str, events: list[str], access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None) -> tuple[str, list[str]] | Never:
+def iter_webhooks(authorization_mode: str, access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None, user_id: Optional[str] = None, page_size: int = 50, parallel_pages: int = 1, client: Optional[TwitCastingClient] = None) -> Iterator[Webhook] | Never:
+    """
+    Iterate over every registered webhook, fetching the pages on demand.
+
+    The first page gives all_count, from which the remaining pages are planned.
+    While a page is consumed, the next parallel_pages pages are fetched in the
+    background, so at most parallel_pages + 1 pages are held in memory.
+
+    Args:
+        authorization_mode (str): Authorization mode.
+            - "bearer" fro Access token
+            - "basic" for Client ID and Client Secret
+        access_token (Optional[str]): Access token.
+        client_id (Optional[str]): Client ID.
+        client_secret (Optional[str]): Client secret.
+        user_id (Optional[str]): User ID. If None, all webhooks are retrieved.
+        page_size (int): Number of webhooks per request (1-50). Default is 50.
+        parallel_pages (int): Number of pages fetched ahead in parallel. Default is 1.
+        client (Optional[TwitCastingClient]): Pooled HTTP client. If None, a client is created for the iteration. A shared client needs a per_host_limit larger than parallel_pages for the prefetch to overlap the first page. Default is None.
+
+    Yields:
+        Webhook: Webhook object.
+    """
+    if not 1 <= page_size <= 50:
+        raise ValueError("page_size must be between 1 and 50.")
+    if parallel_pages < 1:
+        raise ValueError("parallel_pages must be 1 or greater.")
+    headers = build_headers(authorization_mode, access_token, client_id, client_secret)
+    return _iter_webhooks(headers, user_id, page_size, parallel_pages, client)
+
+def _iter_webhooks(headers: Mapping[str, str], user_id: Optional[str] = None, page_size: int = 50, parallel_pages: int = 1, client: Optional[TwitCastingClient] = None) -> Iterator[Webhook] | Never:
+    """
+    Iterate over every registered webhook with prebuilt request headers.
+
+    Args:
+        headers (Mapping[str, str]): Request headers built by build_headers.
+        user_id (Optional[str]): User ID. If None, all webhooks are retrieved.
+        page_size (int): Number of webhooks per request (1-50). Default is 50.
+        parallel_pages (int): Number of pages fetched ahead in parallel. Default is 1.
+        client (Optional[TwitCastingClient]): Pooled HTTP client. If None, a client is created for the iteration. Default is None.
+
+    Yields:
+        Webhook: Webhook object.
+    """
+    owns_client = client is None
+    if client is None:
+        # 最初のページのストリームが接続を 1 本使ったままなので、先読みの分とは別に 1 本用意する
+        client = TwitCastingClient(pool_size=parallel_pages + 1, per_host_limit=parallel_pages + 1)
+    executor = ThreadPoolExecutor(max_workers=parallel_pages)
+    pages: deque[Future] = deque()
+
+    def fetch(offset: int) -> Future:
+        return executor.submit(contextvars.copy_context().run, _request_webhook_list, headers, user_id, page_size, offset, client)
+
+    def plan(all_count: int) -> Iterator[int]:
+        offsets = iter(range(page_size, all_count, page_size))
+        for offset in offsets:
+            pages.append(fetch(offset))
+            if len(pages) >= parallel_pages:
+                break
+        return offsets
+
+    try:
+        # 最初のページは届いた順に返し、all_count が分かった時点で次のページの取得を始める
+        decoder = JSONArrayDecoder("webhooks")
+        offsets = None
+        for webhook in _stream_webhook_list(decoder, headers, user_id, page_size, 0, client):
+            if offsets is None and "all_count" in decoder.fields:
+                offsets = plan(decoder.fields["all_count"])
+            yield webhook
+        if offsets is None:
+            offsets = plan(decoder.fields.get("all_count", 0))
+        webhooks: list[Webhook] = []
+        while True:
+            yield from webhooks
+            if not pages:
+                return
+            _, webhooks = pages.popleft().result()
+            if not webhooks:
+                # 取得中に件数が減った場合は残りのページを読まない
+                return
+            next_offset = next(offsets, None)
+            if next_offset is not None:
+                pages.append(fetch(next_offset))
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        if owns_client:
+            client.close()
+
+def register_webhook(authorization_mode: str, user_id: str, events: list[str], access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None, client: Optional[TwitCastingClient] = None) -> tuple[str, list[str]] | Never:
     """
     Register a webhook.
 
@@ -137,58 +320,44 @@ def register_webhook(authorization_mode: str, user_id: str, events: list[str], a
         client_secret (Optional[str]): Client secret.
         user_id (str): User ID.
         events (list[str]): List of events to register.
+        client (Optional[TwitCastingClient]): Pooled HTTP client. Default is None.
+
+    Returns:
+        str: User ID.
+        list[str]: List of added events.
+        Never: Raises an exception if the request fails.
+    """
+    headers = build_headers(authorization_mode, access_token, client_id, client_secret)
+    return _request_register_webhook(headers, user_id, events, client)
+
+def _request_register_webhook(headers: Mapping[str, str], user_id: str, events: list[str], client: Optional[TwitCastingClient] = None) -> tuple[str, list[str]] | Never:
+    """
+    Register a webhook with prebuilt request headers.
+
+    Args:
+        headers (Mapping[str, str]): Request headers built by build_headers.
+        user_id (str): User ID.
+        events (list[str]): List of events to register.
+        client (Optional[TwitCastingClient]): Pooled HTTP client. Default is None.
 
     Returns:
         str: User ID.
         list[str]: List of added events.
         Never: Raises an exception if the request fails.
     """
-    match authorization_mode:
-        case "bearer":
-            headers = {
-                "Authorization": f"Bearer {access_token}"
-            }
-        case "basic":
-            headers = {
-                "Authorization": f"Basic {base64.b64encode(f'{client_id}:{client_secret}'.encode()).decode()}"
-            }
-        case _:
-            raise ValueError("Invalid authorization mode. Use 'bearer' or 'basic'.")
-    headers["Accept"] = "application/json"
-    headers["X-Api-Version"] = "2.0"
     url = f"https://apiv2.twitcasting.tv/webhooks"
     data = {
         "user_id": user_id,
         "events": events
     }
-    try:
-        response = urllib.request.urlopen(urllib.request.Request(url, data=json.dumps(data).encode(), headers=headers))
-        response_data = json.loads(response.read().decode())
-    except urllib.error.HTTPError as e:
-        error_code = e.code
-        error_message = ERROR_CODES_DICT.get(error_code, "Unknown error")
-        raise Exception(f"Error {error_code}: {error_message}") from e
-    except urllib.error.URLError as e:
-        raise Exception(f"URL Error: {e.reason}") from e
-    except json.JSONDecodeError as e:
-        raise Exception(f"JSON Decode Error: {e.msg}") from e
-    except Exception as e:
-        raise Exception(f"An unexpected error occurred: {str(e)}") from e
+    response_data = send_request("POST", url, headers, data=json.dumps(data).encode(), client=client)
     #{
     #  "user_id":"7134775954",
     #  "events":["livestart","liveend"]
     #}
-    error = response_data.get("error", None)
-    if error:
-        error_code = error.get("code", None)
-        error_tuple:Optional[tuple] = ERROR_CODES_DICT.get(error_code, "Unknown error")
-        exception = error_tuple[2]
-        raise exception(f"Error {error_code}: {error_tuple[0]} - {error_tuple[1]}")
-    user_id = response_data.get("user_id", "")
-    events = response_data.get("events", [])
-    return user_id, events
+    return _parse_webhook_events_response(response_data)
 
-def delete_webhook(authorization_mode:str, user_id: str, access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None) -> tuple[str, list[str]] | Never:
+def delete_webhook(authorization_mode:str, user_id: str, access_token: Optional[str] = None, client_id: Optional[str] = None, client_secret: Optional[str] = None, client: Optional[TwitCastingClient] = None, events: Optional[list[str]] = None) -> tuple[str, list[str]] | Never:
     """
     Delete a webhook.
 
@@ -200,106 +369,66 @@ def delete_webhook(authorization_mode:str, user_id: str, access_token: Optional[
         client_id (Optional[str]): Client ID.
         client_secret (Optional[str]): Client secret.
         user_id (str): User ID.
+        client (Optional[TwitCastingClient]): Pooled HTTP client. Default is None.
+        events (Optional[list[str]]): Events to delete. If None, every event of the user is deleted. Default is None.
 
     Returns:
         str: User ID.
         list[str]: List of deleted events.
         Never: Raises an exception if the request fails.
     """
-    match authorization_mode:
-        case "bearer":
-            headers = {
-                "Authorization": f"Bearer {access_token}"
-            }
-        case "basic":
-            headers = {
-                "Authorization": f"Basic {base64.b64encode(f'{client_id}:{client_secret}'.encode()).decode()}"
-            }
-        case _:
-            raise ValueError("Invalid authorization mode. Use 'bearer' or 'basic'.")
-    headers["Accept"] = "application/json"
-    headers["X-Api-Version"] = "2.0"
-    url = f"https://apiv2.twitcasting.tv/webhooks?user_id={user_id}"
-    try:
-        response = urllib.request.urlopen(urllib.request.Request(url, method="DELETE", headers=headers))
-        response_data = json.loads(response.read().decode())
-    except urllib.error.HTTPError as e:
-        error_code = e.code
-        error_message = ERROR_CODES_DICT.get(error_code, "Unknown error")
-        raise Exception(f"Error {error_code}: {error_message}") from e
-    except urllib.error.URLError as e:
-        raise Exception(f"URL Error: {e.reason}") from e
-    except json.JSONDecodeError as e:
-        raise Exception(f"JSON Decode Error: {e.msg}") from e
-    except Exception as e:
-        raise Exception(f"An unexpected error occurred: {str(e)}") from e
+    headers = build_headers(authorization_mode, access_token, client_id, client_secret)
+    return _request_delete_webhook(headers, user_id, events, client)
+
+def _request_delete_webhook(headers: Mapping[str, str], user_id: str, events: Optional[list[str]] = None, client: Optional[TwitCastingClient] = None) -> tuple[str, list[str]] | Never:
+    """
+    Delete a webhook with prebuilt request headers.
+
+    Args:
+        headers (Mapping[str, str]): Request headers built by build_headers.
+        user_id (str): User ID.
+        events (Optional[list[str]]): Events to delete. If None, every event of the user is deleted. Default is None.
+        client (Optional[TwitCastingClient]): Pooled HTTP client. Default is None.
+
+    Returns:
+        str: User ID.
+        list[str]: List of deleted events.
+        Never: Raises an exception if the request fails.
+    """
+    url = f"https://apiv2.twitcasting.tv/webhooks?{_delete_webhook_query(user_id, events)}"
+    response_data = send_request("DELETE", url, headers, client=client)
     #{
     #  "user_id":"7134775954",
     #  "events":["livestart","liveend"]
     #}
-    error = response_data.get("error", None)
-    if error:
-        error_code = error.get("code", None)
-        error_tuple:Optional[tuple] = ERROR_CODES_DICT.get(error_code, "Unknown error")
-        exception = error_tuple[2]
-        raise exception(f"Error {error_code}: {error_tuple[0]} - {error_tuple[1]}")
-    user_id = response_data.get("user_id", "")
-    events = response_data.get("events", [])
-    return user_id, events
+    return _parse_webhook_events_response(response_data)
 
-def parse_webhook_data(data: str, signature: Optional[str]= None) -> tuple[Movie, User] | Never:
+def parse_webhook_data(data: str | bytes | bytearray | memoryview, signature: Optional[str]= None) -> tuple[Movie, User] | Never:
     """
     Parse the webhook data.
 
     Args:
-        data (str): Webhook data.
+        data (str | bytes | bytearray | memoryview): Webhook data. Request bodies can be passed without decoding.
         signature (Optional[str]): Signature for verification.
 
     Returns:
-        bool: Whether the data is valid or not.
         Movie: Movie object.
         User: User object.
         Never: Raises an exception if the request fails.
     """
-    data_obj = json.loads(data)
+    if _json_loads is json.loads and not isinstance(data, str):
+        # json.loads の文字コード判定より UTF-8 として直接デコードする方が速い
+        data = bytes(data).decode()
+    data_obj = _json_loads(data)
     if not data_obj:
         raise ValueError("Invalid data")
     if signature:
-        if signature != data_obj.get("signature", ""):
+        if not hmac.compare_digest(signature.encode(), str(data_obj.get("signature", "")).encode()):
             raise ValueError("Invalid signature")
-    movie_data = data_obj.get("movie", {})
-    movie: Movie = Movie(
-        id=movie_data.get("id", ""),
-        user_id=movie_data.get("user_id", ""),
-        title=movie_data.get("title", ""),
-        subtitle=movie_data.get("subtitle", None),
-        last_owner_comment=movie_data.get("last_owner_comment", None),
-        category=movie_data.get("category", None),
-        link=movie_data.get("link", ""),
-        is_live=movie_data.get("is_live", False),
-        is_recorded=movie_data.get("is_recorded", False),
-        comment_count=movie_data.get("comment_count", 0),
-        large_thumbnail=movie_data.get("large_thumbnail", ""),
-        small_thumbnail=movie_data.get("small_thumbnail", ""),
-        country=movie_data.get("country", ""),
-        duration=movie_data.get("duration", 0),
-        created=movie_data.get("created", 0),
-        is_collabo=movie_data.get("is_collabo", False),
-        is_protected=movie_data.get("is_protected", False),
-        max_view_count=movie_data.get("max_view_count", 0),
-        current_view_count=movie_data.get("current_view_count", 0),
-        total_view_count=movie_data.get("total_view_count", 0),
-        hls_url=movie_data.get("hls_url", None)
-    )
-    user_data = data_obj.get("user", {})
-    user: User = User(
-        id=user_data.get("id", ""),
-        screen_id=user_data.get("screen_id", ""),
-        name=user_data.get("name", ""),
-        image=user_data.get("image", ""),
-        profile=user_data.get("profile", ""),
-        level=user_data.get("level", 0),
-        last_movie_id=user_data.get("last_movie_id", None),
-        is_live=user_data.get("is_live", False)
-    )
-    return movie, user
\ No newline at end of file
+    movie: Movie = _parse_movie(data_obj.get("movie", {}))
+    # 配信者は broadcaster キーで送られてくる
+    user_data = data_obj.get("broadcaster")
+    if user_data is None:
+        user_data = data_obj.get("user", {})
+    user: User = _parse_user(user_data)
+    return movie, user